@@ -11,3 +11,45 @@ class InvalidParameterError(Exception):
         # Inicializa a exceção com a mensagem fornecida ou uma mensagem padrão.
         self.message = message
         super().__init__(self.message)  # Chama o construtor da classe base com a mensagem.
+
+
+class TribunalIndisponivelError(Exception):
+    """Exceção lançada quando o circuito de um tribunal está aberto após falhas consecutivas.
+
+    Enquanto o circuito estiver aberto, as consultas ao tribunal falham imediatamente, sem realizar
+    requisições, até que o tempo de espera configurado termine.
+
+    :param message: Mensagem de erro personalizada, padrão é "Tribunal indisponível".
+    """
+
+    def __init__(self, message="Tribunal indisponível"):
+        # Inicializa a exceção com a mensagem fornecida ou uma mensagem padrão.
+        self.message = message
+        super().__init__(self.message)  # Chama o construtor da classe base com a mensagem.
+
+
+class TribunalInexistenteError(Exception):
+    """Exceção lançada quando não há crawler registrado para a sigla do tribunal informada.
+
+    :param message: Mensagem de erro personalizada, padrão é "Tribunal inexistente".
+    """
+
+    def __init__(self, message="Tribunal inexistente"):
+        # Inicializa a exceção com a mensagem fornecida ou uma mensagem padrão.
+        self.message = message
+        super().__init__(self.message)  # Chama o construtor da classe base com a mensagem.
+
+
+class DestinoInternoError(OSError):
+    """Exceção lançada quando o host de um callback resolve para um endereço de rede interna.
+
+    Deriva de OSError para ser tratada pelo conector do aiohttp como uma falha de conexão, sem que a
+    requisição chegue a ser enviada.
+
+    :param message: Mensagem de erro personalizada, padrão é "Destino de rede interna".
+    """
+
+    def __init__(self, message="Destino de rede interna"):
+        # Inicializa a exceção com a mensagem fornecida ou uma mensagem padrão.
+        self.message = message
+        super().__init__(self.message)  # Chama o construtor da classe base com a mensagem.
@@ -1,8 +1,12 @@
-from typing import Literal
+from datetime import datetime
+from ipaddress import ip_address
+from typing import Literal, Optional
 from uuid import UUID
 from re import fullmatch
+from urllib.parse import urlparse
 
-from pydantic import BaseModel, model_validator, Field
+from decouple import Csv, config
+from pydantic import BaseModel, model_validator, field_validator, Field
 
 from api.exceptions import InvalidParameterError
 
@@ -10,6 +14,77 @@ from api.exceptions import InvalidParameterError
 SIGLAS_TRIBUNAIS_DISPONIVEIS = Literal['TJAL', 'TJCE']
 
 
+def valida_padrao_numero_processo(numero_processo):
+    """
+    Verifica se o número do processo segue o padrão NNNNNNN-DD.AAAA.J.TR.OOOO.
+
+    :param numero_processo: Número do processo.
+    :raises InvalidParameterError: se numero_processo não for um texto compatível com o padrão especificado.
+    """
+    if not isinstance(numero_processo, str):
+        raise InvalidParameterError(
+            f"numero_processo {numero_processo!r} não é um texto no padrão NNNNNNN-DD.AAAA.J.TR.OOOO"
+        )
+    pattern = r'\d{7}-\d{2}\.\d{4}\.8\.\d{2}\.\d{4}'
+    result = fullmatch(pattern, numero_processo)
+    if not result:
+        raise InvalidParameterError(
+            f"numero_processo '{numero_processo}' não é compatível com o padrão NNNNNNN-DD.AAAA.J.TR.OOOO"
+        )
+
+
+def endereco_interno(endereco):
+    """
+    Verifica se um endereço IP não é público: rede privada, loopback, link-local (como o 169.254.169.254 dos
+    metadados da nuvem), multicast, reservado ou não especificado.
+
+    :param endereco: Endereço IPv4 ou IPv6.
+    :return: True se o endereço não for público.
+    """
+    ip = ip_address(endereco)
+    # Endereços IPv4 mapeados em IPv6 (::ffff:127.0.0.1) são avaliados como IPv4
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return not ip.is_global or ip.is_multicast
+
+
+def hosts_bloqueados():
+    """
+    Lista os nomes de host que não podem receber callbacks: localhost, o host do Redis e os informados em
+    CALLBACK_HOSTS_BLOQUEADOS (separados por vírgula), como os nomes dos demais serviços da rede interna.
+
+    :return: Conjunto dos nomes, em minúsculas.
+    """
+    host_redis = urlparse(config("REDIS_URL", "redis://localhost:6379")).hostname
+    bloqueados = config("CALLBACK_HOSTS_BLOQUEADOS", default="", cast=Csv())
+    return {host.lower() for host in ("localhost", host_redis, *bloqueados) if host}
+
+
+def valida_url_callback(callback_url):
+    """
+    Verifica se a URL de callback é uma URL HTTP ou HTTPS para um destino externo, recusando endereços de rede
+    interna e os hosts bloqueados. Nomes de host são verificados novamente, após a resolução, no envio do callback.
+
+    :param callback_url: URL de callback, ou None.
+    :return: A própria URL.
+    :raises InvalidParameterError: se callback_url não for uma URL HTTP ou HTTPS ou apontar para a rede interna.
+    """
+    if callback_url is not None:
+        url = urlparse(callback_url)
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise InvalidParameterError(f"callback_url '{callback_url}' não é uma URL HTTP ou HTTPS válida")
+
+        host = url.hostname.rstrip(".").lower()
+        try:
+            interno = endereco_interno(host)
+        except ValueError:
+            # Nome de host, e não um endereço IP
+            interno = host in hosts_bloqueados() or host.endswith(".localhost")
+        if interno:
+            raise InvalidParameterError(f"callback_url '{callback_url}' aponta para um endereço de rede interna")
+    return callback_url
+
+
 class ConsultaProcessoInput(BaseModel):
     """Modelo de entrada para consulta de um processo."""
 
@@ -23,6 +98,12 @@ class ConsultaProcessoInput(BaseModel):
     # Sigla do tribunal que pertence ao processo,
     # deve estar na lista de siglas disponíveis.
 
+    callback_url: Optional[str] = None
+    # URL que recebe um POST com o resultado quando a solicitação for encerrada.
+
+    monitorar: bool = False
+    # Se verdadeiro, captura apenas as movimentações novas desde a última captura monitorada do processo.
+
     @model_validator(mode="before")
     def valida_numero_processo(self):
         """
@@ -30,15 +111,18 @@ class ConsultaProcessoInput(BaseModel):
 
         :raises InvalidParameterError: se numero_processo não for compatível com o padrão especificado.
         """
-        numero_processo = self.get("numero_processo", '')
-        pattern = r'\d{7}-\d{2}\.\d{4}\.8\.\d{2}\.\d{4}'
-        result = fullmatch(pattern, numero_processo)
-        if not result:
-            raise InvalidParameterError(
-                f"numero_processo '{numero_processo}' não é compatível com o padrão NNNNNNN-DD.AAAA.J.TR.OOOO"
-            )
+        valida_padrao_numero_processo(self.get("numero_processo", ''))
         return self
 
+    @field_validator("callback_url")
+    def valida_callback_url(cls, callback_url):
+        """
+        Valida o campo callback_url, verificando se é uma URL HTTP ou HTTPS.
+
+        :raises InvalidParameterError: se callback_url não for uma URL HTTP ou HTTPS.
+        """
+        return valida_url_callback(callback_url)
+
 
 class StatusSolicitacaoInput(BaseModel):
     """Modelo de entrada para consulta do status de uma solicitação."""
@@ -59,3 +143,83 @@ class StatusSolicitacaoInput(BaseModel):
             raise InvalidParameterError(
                 f"numero_solicitacao '{self.get('numero_solicitacao')}' não é compatível com o formato UUID"
             )
+
+
+class StatusSolicitacaoLoteInput(BaseModel):
+    """Modelo de entrada para consulta do status de várias solicitações."""
+
+    numeros_solicitacao: list[str]  # Números de solicitação no formato UUID.
+
+    status: Optional[list[str]] = None
+    # Se informado, devolve apenas as solicitações com um destes status.
+
+    compacto: bool = False
+    # Se verdadeiro, devolve apenas o status das solicitações, sem os dados capturados.
+
+    @model_validator(mode="after")
+    def valida_numeros_solicitacao(self):
+        """
+        Valida o campo numeros_solicitacao, verificando a quantidade de solicitações e se todas estão no formato UUID.
+
+        :raises InvalidParameterError: se a quantidade exceder o máximo ou algum número não estiver no formato UUID.
+        """
+        tamanho_maximo = config("STATUS_LOTE_TAMANHO_MAXIMO", default=1000, cast=int)
+        if len(self.numeros_solicitacao) > tamanho_maximo:
+            raise InvalidParameterError(
+                f"numeros_solicitacao contém {len(self.numeros_solicitacao)} solicitações, o máximo é {tamanho_maximo}"
+            )
+        for numero_solicitacao in self.numeros_solicitacao:
+            try:
+                UUID(numero_solicitacao)
+            except ValueError:
+                raise InvalidParameterError(
+                    f"numero_solicitacao '{numero_solicitacao}' não é compatível com o formato UUID"
+                )
+        return self
+
+
+class ProcessoInput(BaseModel):
+    """Modelo de entrada para identificação de um processo (sigla do tribunal e número)."""
+
+    sigla_tribunal: SIGLAS_TRIBUNAIS_DISPONIVEIS  # Sigla do tribunal que pertence ao processo.
+
+    numero_processo: str  # Número do processo, no padrão NNNNNNN-DD.AAAA.J.TR.OOOO.
+
+    @model_validator(mode="before")
+    def valida_numero_processo(self):
+        """
+        Valida o campo numero_processo, verificando se ele segue o padrão NNNNNNN-DD.AAAA.J.TR.OOOO.
+
+        :raises InvalidParameterError: se numero_processo não for compatível com o padrão especificado.
+        """
+        valida_padrao_numero_processo(self.get("numero_processo", ''))
+        return self
+
+
+class AlteracoesProcessoInput(ProcessoInput):
+    """Modelo de entrada para consulta das alterações de um processo monitorado."""
+
+    desde: Optional[datetime] = None
+    # Se informado, devolve apenas as alterações capturadas após esta data.
+
+
+class AgendamentoInput(ProcessoInput):
+    """Modelo de entrada para inclusão de um processo no monitoramento agendado."""
+
+    intervalo_segundos: int = Field(default=86400, ge=60)
+    # Intervalo entre duas capturas do processo.
+
+    prioridade: int = Field(default=0, ge=0, le=10)
+    # Processos de maior prioridade são capturados primeiro quando há mais capturas vencidas que o orçamento.
+
+    callback_url: Optional[str] = None
+    # URL que recebe um POST com o resultado de cada captura.
+
+    @field_validator("callback_url")
+    def valida_callback_url(cls, callback_url):
+        """
+        Valida o campo callback_url, verificando se é uma URL HTTP ou HTTPS.
+
+        :raises InvalidParameterError: se callback_url não for uma URL HTTP ou HTTPS.
+        """
+        return valida_url_callback(callback_url)
@@ -24,6 +24,26 @@ class ConsultaProcessoOutput(BaseModel):
             )
 
 
+class SolicitacaoLoteOutput(BaseModel):
+    """Modelo de saída para uma solicitação criada a partir de um lote."""
+    indice: int
+    numero_processo: str
+    sigla_tribunal: str
+    numero_solicitacao: str
+
+
+class ErroLoteOutput(BaseModel):
+    """Modelo de saída para um item inválido de um lote."""
+    indice: int
+    message: str
+
+
+class ConsultaProcessoLoteOutput(BaseModel):
+    """Modelo de saída para a consulta de um lote de processos."""
+    solicitacoes: list[SolicitacaoLoteOutput]
+    erros: list[ErroLoteOutput]
+
+
 class ExtractDataOutput(BaseModel):
     """Modelo de saída para detalhes de um processo."""
     classe: str
@@ -55,6 +75,46 @@ class StatusSolicitacaoOutput(BaseModel):
     second_instance: Optional[ExtractDataSecondInstanceOutput] = None
 
 
+class StatusSolicitacaoItemOutput(StatusSolicitacaoOutput):
+    """Modelo de saída para o status de uma solicitação na consulta de várias solicitações."""
+    numero_solicitacao: str
+
+
+class StatusSolicitacaoLoteOutput(BaseModel):
+    """Modelo de saída para a consulta do status de várias solicitações."""
+    solicitacoes: list[StatusSolicitacaoItemOutput]
+    nao_encontradas: list[str]
+
+
+class AlteracaoProcessoOutput(BaseModel):
+    """Modelo de saída para as movimentações novas de uma instância em uma captura monitorada."""
+    instancia: str
+    capturado_em: str
+    movimentacoes: list[dict]
+
+
+class AlteracoesProcessoOutput(BaseModel):
+    """Modelo de saída para as alterações de um processo monitorado."""
+    numero_processo: str
+    sigla_tribunal: str
+    alteracoes: list[AlteracaoProcessoOutput]
+
+
+class AgendamentoOutput(BaseModel):
+    """Modelo de saída para um processo do monitoramento agendado."""
+    numero_processo: str
+    sigla_tribunal: str
+    intervalo_segundos: int
+    prioridade: int
+    callback_url: Optional[str] = None
+    proxima_captura: Optional[str] = None
+
+
+class AgendamentoLoteOutput(BaseModel):
+    """Modelo de saída para a inclusão de processos no monitoramento agendado."""
+    agendados: int
+
+
 class BaseError(BaseModel):
     """Modelo base para representar erros."""
     error: str
@@ -141,6 +201,41 @@ class ConsultaProcessoResponses(DefaultResponses):
         }
 
 
+class ConsultaProcessoLoteResponses(DefaultResponses):
+    """Respostas para a consulta de um lote de processos."""
+
+    @classmethod
+    def _status_200(cls):
+        """Resposta para o código de status 200 (OK) para a consulta de um lote de processos."""
+        return {
+            200: {
+                "model": ConsultaProcessoLoteOutput,
+                "description": "Processos válidos do lote enviados para a fila",
+                "content": {
+                    "application/json": {
+                        "example": {
+                            "solicitacoes": [
+                                {
+                                    "indice": 0,
+                                    "numero_processo": "0710802-55.2018.8.02.0001",
+                                    "sigla_tribunal": "TJAL",
+                                    "numero_solicitacao": "6fa125e6-e590-43c5-9de2-79d79695e24d"
+                                }
+                            ],
+                            "erros": [
+                                {
+                                    "indice": 1,
+                                    "message": "numero_processo '123' não é compatível com o padrão "
+                                               "NNNNNNN-DD.AAAA.J.TR.OOOO"
+                                }
+                            ]
+                        }
+                    }
+                },
+            }
+        }
+
+
 class StatusSolicitacaoResponses(DefaultResponses):
     """Respostas para a consulta de status de solicitação."""
 
@@ -292,3 +387,104 @@ class StatusSolicitacaoResponses(DefaultResponses):
                 },
             }
         }
+
+
+class StatusSolicitacaoLoteResponses(DefaultResponses):
+    """Respostas para a consulta do status de várias solicitações."""
+
+    @classmethod
+    def _status_200(cls):
+        """Resposta para o código de status 200 (OK) para a consulta do status de várias solicitações."""
+        return {
+            200: {
+                "model": StatusSolicitacaoLoteOutput,
+                "description": "Status das solicitações encontradas",
+                "content": {
+                    "application/json": {
+                        "example": {
+                            "solicitacoes": [
+                                {
+                                    "numero_solicitacao": "6fa125e6-e590-43c5-9de2-79d79695e24d",
+                                    "numero_processo": "0113546-72.2018.8.02.0001",
+                                    "sigla_tribunal": "TJAL",
+                                    "status": "Na Fila"
+                                }
+                            ],
+                            "nao_encontradas": ["d00bc000-0f0d-0d00-0cdf-000b00d00000"]
+                        }
+                    }
+                }
+            }
+        }
+
+
+class AlteracoesProcessoResponses(DefaultResponses):
+    """Respostas para a consulta das alterações de um processo monitorado."""
+
+    @classmethod
+    def _status_200(cls):
+        """Resposta para o código de status 200 (OK) para a consulta das alterações de um processo."""
+        return {
+            200: {
+                "model": AlteracoesProcessoOutput,
+                "description": "Movimentações novas registradas nas capturas monitoradas",
+                "content": {
+                    "application/json": {
+                        "example": {
+                            "numero_processo": "0113546-72.2018.8.02.0001",
+                            "sigla_tribunal": "TJAL",
+                            "alteracoes": [
+                                {
+                                    "instancia": "first_instance",
+                                    "capturado_em": "2023-08-10T12:00:00+00:00",
+                                    "movimentacoes": StatusSolicitacaoResponses.processo_exemplo[
+                                        "first_instance"]["lista_movimentacoes"][:1]
+                                }
+                            ]
+                        }
+                    }
+                }
+            }
+        }
+
+
+class AgendamentoResponses(DefaultResponses):
+    """Respostas para a consulta de um processo do monitoramento agendado."""
+
+    @classmethod
+    def _status_200(cls):
+        """Resposta para o código de status 200 (OK) para a consulta de um processo agendado."""
+        return {
+            200: {
+                "model": AgendamentoOutput,
+                "description": "Processo agendado",
+                "content": {
+                    "application/json": {
+                        "example": {
+                            "numero_processo": "0113546-72.2018.8.02.0001",
+                            "sigla_tribunal": "TJAL",
+                            "intervalo_segundos": 86400,
+                            "prioridade": 0,
+                            "proxima_captura": "2023-08-11T03:12:45+00:00"
+                        }
+                    }
+                }
+            }
+        }
+
+    @classmethod
+    def _status_404(cls):
+        """Resposta para o código de status 404 (Not Found) para a consulta de um processo agendado."""
+        return {
+            404: {
+                "model": BaseError,
+                "description": "Processo não agendado",
+                "content": {
+                    "application/json": {
+                        "example": {
+                            "detail": "Processo não agendado"
+                        }
+                    }
+                },
+            }
+        }
@@ -0,0 +1,151 @@
+from asyncio import create_task, shield, sleep
+from logging import getLogger
+from uuid import uuid4
+
+from decouple import config
+
+from crawler.default.main import CapturaParcial
+from database.codec import codificar, decodificar
+from database.service import AsyncRedisConnection
+
+logger = getLogger(__name__)
+
+
+class ResultadoCache:
+    """
+    Cache dos dados capturados de um processo, indexado por sigla do tribunal e número do processo.
+
+    Além de guardar os resultados por um tempo configurável, coalesce capturas simultâneas do mesmo
+    processo (single-flight): no mesmo processo Python, as chamadas concorrentes aguardam a mesma task;
+    entre processos, um lock no Redis garante que apenas um worker capture, enquanto os demais aguardam
+    o resultado ser gravado no cache.
+
+    :ivar ttl: Tempo, em segundos, que um resultado com dados permanece no cache.
+    :ivar ttl_negativo: Tempo, em segundos, que um resultado sem dados permanece no cache.
+    :ivar ttl_lock: Tempo máximo, em segundos, que uma captura em andamento mantém o lock.
+    :ivar intervalo_espera: Intervalo, em segundos, entre as verificações do cache enquanto outro worker captura.
+    :ivar redis: Conexão assíncrona com o Redis.
+    """
+
+    # Capturas em andamento neste processo, indexadas pela chave do cache
+    _em_andamento = {}
+
+    def __init__(self, redis=None):
+        """
+        Lê as configurações do cache.
+
+        :param redis: Conexão assíncrona com o Redis. Cria uma AsyncRedisConnection se não informada.
+        """
+        self.ttl = config("CACHE_TTL_SEGUNDOS", default=3600, cast=int)
+        self.ttl_negativo = config("CACHE_TTL_NEGATIVO_SEGUNDOS", default=60, cast=int)
+        self.ttl_lock = config("CACHE_TTL_LOCK_SEGUNDOS", default=300, cast=int)
+        self.intervalo_espera = config("CACHE_INTERVALO_ESPERA", default=0.5, cast=float)
+        self.redis = redis or AsyncRedisConnection()
+
+    @staticmethod
+    def chave(sigla_tribunal, numero_processo):
+        """
+        Monta a chave do cache para um processo.
+
+        :param sigla_tribunal: Sigla do tribunal.
+        :param numero_processo: Número do processo.
+        :return: Chave do cache no Redis.
+        """
+        return f"cache:{sigla_tribunal.upper()}:{numero_processo}"
+
+    async def get(self, sigla_tribunal, numero_processo):
+        """
+        Obtém o resultado em cache de um processo.
+
+        :param sigla_tribunal: Sigla do tribunal.
+        :param numero_processo: Número do processo.
+        :return: Tupla (encontrado, dados). dados é None quando a última captura não encontrou o processo.
+        """
+        valor = await self.redis.get_data(self.chave(sigla_tribunal, numero_processo))
+        if valor is None:
+            return False, None
+        return True, decodificar(valor)
+
+    async def get_many(self, processos):
+        """
+        Obtém os resultados em cache de vários processos com um único MGET.
+
+        :param processos: Lista de tuplas (sigla do tribunal, número do processo).
+        :return: Lista de tuplas (encontrado, dados), na mesma ordem dos processos.
+        """
+        valores = await self.redis.get_many([self.chave(sigla, numero) for sigla, numero in processos])
+        return [(False, None) if valor is None else (True, decodificar(valor)) for valor in valores]
+
+    async def set(self, sigla_tribunal, numero_processo, dados):
+        """
+        Grava o resultado de uma captura no cache.
+
+        :param sigla_tribunal: Sigla do tribunal.
+        :param numero_processo: Número do processo.
+        :param dados: Dados capturados, ou None se o processo não foi encontrado.
+        """
+        await self.redis.set_data(
+            key=self.chave(sigla_tribunal, numero_processo),
+            value=codificar(dados),
+            ex=self.ttl if dados else self.ttl_negativo
+        )
+
+    async def obter_ou_capturar(self, sigla_tribunal, numero_processo, capturar):
+        """
+        Devolve o resultado em cache do processo ou, se não houver, executa a captura uma única vez,
+        compartilhando o resultado com todas as chamadas simultâneas para o mesmo processo.
+
+        :param sigla_tribunal: Sigla do tribunal.
+        :param numero_processo: Número do processo.
+        :param capturar: Função sem argumentos que devolve a corotina de captura dos dados.
+        :return: Dados capturados, ou None se o processo não foi encontrado.
+        """
+        chave = self.chave(sigla_tribunal, numero_processo)
+
+        encontrado, dados = await self.get(sigla_tribunal, numero_processo)
+        if encontrado:
+            logger.info(f"Resultado em cache para o processo {numero_processo}")
+            return dados
+
+        task = self._em_andamento.get(chave)
+        if task is None:
+            task = create_task(self._capturar_com_lock(sigla_tribunal, numero_processo, capturar))
+            self._em_andamento[chave] = task
+            task.add_done_callback(lambda _: self._em_andamento.pop(chave, None))
+        else:
+            logger.info(f"Aguardando captura em andamento do processo {numero_processo}")
+
+        # A task é compartilhada: o cancelamento de uma das chamadas não cancela a captura das demais
+        return await shield(task)
+
+    async def _capturar_com_lock(self, sigla_tribunal, numero_processo, capturar):
+        """
+        Executa a captura sob o lock do Redis. Se outro worker já estiver capturando o mesmo processo,
+        aguarda o resultado dele no cache; se o lock for liberado sem resultado, tenta capturar novamente.
+        Resultados parciais (CapturaParcial) são devolvidos sem serem gravados no cache.
+
+        :param sigla_tribunal: Sigla do tribunal.
+        :param numero_processo: Número do processo.
+        :param capturar: Função sem argumentos que devolve a corotina de captura dos dados.
+        :return: Dados capturados, ou None se o processo não foi encontrado.
+        """
+        chave_lock = f"lock:{self.chave(sigla_tribunal, numero_processo)}"
+        token = str(uuid4())
+
+        while not await self.redis.set_data(key=chave_lock, value=token, ex=self.ttl_lock, nx=True):
+            await sleep(self.intervalo_espera)
+            encontrado, dados = await self.get(sigla_tribunal, numero_processo)
+            if encontrado:
+                return dados
+
+        try:
+            dados = await capturar()
+            if isinstance(dados, CapturaParcial):
+                # Uma das instâncias falhou: o resultado não é gravado, e a próxima consulta captura novamente
+                logger.info(f"Resultado parcial do processo {numero_processo} não gravado no cache")
+            else:
+                await self.set(sigla_tribunal, numero_processo, dados)
+            return dados
+        finally:
+            # Remove o lock apenas se ainda for deste worker (pode ter expirado e sido obtido por outro)
+            await self.redis.delete_if_value(chave_lock, token)
@@ -0,0 +1,205 @@
+from atexit import register
+from contextlib import contextmanager
+from contextvars import ContextVar
+from copy import copy
+from datetime import datetime, timezone
+from json import dumps
+from logging import Filter, Formatter, StreamHandler, WARNING, getLogger
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from os import getpid
+from pathlib import Path
+from queue import Full, Queue
+from random import random
+from socket import gethostname
+from zlib import crc32
+
+from decouple import config
+
+# ID da solicitação em processamento na task atual, incluído nos registros de log
+solicitacao_atual = ContextVar("solicitacao_atual", default=None)
+
+# Arquivo de log padrão, um por processo: os workers do uvicorn e os workers da fila não podem rotacionar o mesmo
+# arquivo, pois as rotações simultâneas perdem ou sobrescrevem registros
+ARQUIVO_PADRAO = "logs/{host}-{pid}.txt"
+
+# Listener e handler da configuração ativa do processo (None enquanto o log não for configurado)
+_listener = None
+_handler_fila = None
+
+
+@contextmanager
+def contexto_solicitacao(solicitacao_id):
+    """
+    Associa os registros de log emitidos no bloco (e nas tasks criadas nele) a uma solicitação.
+
+    :param solicitacao_id: ID da solicitação.
+    """
+    token = solicitacao_atual.set(solicitacao_id)
+    try:
+        yield
+    finally:
+        solicitacao_atual.reset(token)
+
+
+class FiltroContexto(Filter):
+    """Inclui no registro o ID da solicitação em processamento, lido no contexto de quem emitiu o log."""
+
+    def filter(self, record):
+        record.solicitacao_id = solicitacao_atual.get()
+        return True
+
+
+class FiltroAmostragem(Filter):
+    """
+    Descarta parte dos registros abaixo de WARNING dos loggers do caminho crítico (por padrão, os crawlers).
+
+    A amostragem é feita por solicitação: os registros de uma solicitação amostrada são todos mantidos, para
+    que o seu fluxo possa ser seguido no log. Registros sem solicitação são amostrados individualmente.
+
+    :ivar taxa: Fração dos registros mantidos, entre 0 e 1.
+    :ivar prefixos: Prefixos dos nomes dos loggers amostrados.
+    """
+
+    def __init__(self, taxa, prefixos):
+        """
+        Inicializa o filtro de amostragem.
+
+        :param taxa: Fração dos registros mantidos, entre 0 e 1.
+        :param prefixos: Prefixos dos nomes dos loggers amostrados.
+        """
+        super().__init__()
+        self.taxa = taxa
+        self.prefixos = tuple(prefixos)
+
+    def filter(self, record):
+        if self.taxa >= 1 or record.levelno >= WARNING or not record.name.startswith(self.prefixos):
+            return True
+        solicitacao_id = getattr(record, "solicitacao_id", None)
+        if solicitacao_id:
+            return crc32(str(solicitacao_id).encode()) % 10000 < self.taxa * 10000
+        return random() < self.taxa
+
+
+class FormatadorJson(Formatter):
+    """Formata cada registro como um objeto JSON em uma linha."""
+
+    def format(self, record):
+        dados = {
+            "horario": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensagem": record.getMessage(),
+            "solicitacao_id": getattr(record, "solicitacao_id", None),
+            "pid": record.process,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            dados["excecao"] = record.exc_text
+        return dumps(dados, ensure_ascii=False, default=str)
+
+
+class FilaHandler(QueueHandler):
+    """
+    QueueHandler que apenas enfileira os registros, sem formatá-los, deixando a formatação em JSON e a escrita
+    para a thread do QueueListener. Com a fila cheia, o registro é descartado em vez de bloquear o event loop.
+
+    :ivar descartados: Número de registros descartados com a fila cheia.
+    """
+
+    def __init__(self, fila):
+        super().__init__(fila)
+        self.descartados = 0
+
+    def prepare(self, record):
+        """
+        Copia o registro com a mensagem já interpolada e a exceção convertida em texto, pois os argumentos e o
+        traceback podem ser alterados antes da escrita.
+
+        :param record: Registro de log.
+        :return: Cópia do registro pronta para a fila.
+        """
+        record = copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self.descartados += 1
+
+
+def _criar_handler(arquivo):
+    """
+    Cria o handler de escrita usado pelo QueueListener.
+
+    :param arquivo: Caminho do arquivo de log, com os campos opcionais {pid} e {host} para que cada processo
+                    escreva e rotacione o próprio arquivo. Vazio para escrever na saída de erro.
+    :return: Handler com o formatador JSON.
+    """
+    if arquivo:
+        caminho = Path(arquivo.format(pid=getpid(), host=gethostname()))
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            caminho,
+            maxBytes=config("LOG_TAMANHO_MAXIMO", default=10 * 1024 * 1024, cast=int),
+            backupCount=config("LOG_ARQUIVOS", default=5, cast=int),
+            encoding="utf-8",
+            delay=True
+        )
+    else:
+        handler = StreamHandler()
+    handler.setFormatter(FormatadorJson())
+    return handler
+
+
+def configurar_log(nivel=None, arquivo=None):
+    """
+    Configura o log do processo uma única vez: os loggers apenas enfileiram os registros (FilaHandler) e uma
+    thread (QueueListener) os formata em JSON e os escreve, com rotação por tamanho, fora do event loop.
+
+    :param nivel: Nível mínimo do log. Usa LOG_NIVEL se não informado.
+    :param arquivo: Caminho do arquivo de log. Usa LOG_ARQUIVO se não informado.
+    :return: QueueListener da configuração ativa.
+    """
+    global _listener, _handler_fila
+    if _listener is not None:
+        return _listener
+
+    if arquivo is None:
+        arquivo = config("LOG_ARQUIVO", default=ARQUIVO_PADRAO)
+    fila = Queue(maxsize=config("LOG_FILA_MAXIMO", default=10000, cast=int))
+
+    _handler_fila = FilaHandler(fila)
+    _handler_fila.addFilter(FiltroContexto())
+    _handler_fila.addFilter(FiltroAmostragem(
+        taxa=config("LOG_AMOSTRAGEM", default=0.1, cast=float),
+        prefixos=config("LOG_AMOSTRAGEM_LOGGERS", default="crawler",
+                        cast=lambda valor: [prefixo.strip() for prefixo in valor.split(",") if prefixo.strip()])
+    ))
+
+    raiz = getLogger()
+    raiz.setLevel(nivel or config("LOG_NIVEL", default="INFO").upper())
+    raiz.addHandler(_handler_fila)
+
+    _listener = QueueListener(fila, _criar_handler(arquivo), respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+@register
+def encerrar_log():
+    """Escreve os registros pendentes e remove a configuração do log do processo."""
+    global _listener, _handler_fila
+    if _listener is None:
+        return
+    _listener.stop()
+    getLogger().removeHandler(_handler_fila)
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = _handler_fila = None
@@ -0,0 +1,146 @@
+from json import JSONDecodeError, loads
+from logging import getLogger
+from uuid import uuid4
+
+from decouple import config
+from pydantic import ValidationError
+
+from api.exceptions import InvalidParameterError
+from api.schemas.input import ConsultaProcessoInput
+from api.services.process_handler import montar_resultado
+
+logger = getLogger(__name__)
+
+# Content-types aceitos para o envio do lote em NDJSON (um processo por linha)
+CONTENT_TYPES_NDJSON = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def ler_lote(corpo, content_type=None):
+    """
+    Lê o corpo de uma requisição de lote, que pode ser uma lista JSON ou um NDJSON com um processo por linha.
+
+    :param corpo: Corpo da requisição, em bytes.
+    :param content_type: Content-type da requisição.
+    :return: Lista com os itens do lote, ainda não validados.
+    :raises InvalidParameterError: Se o corpo não puder ser lido ou exceder o tamanho máximo do lote.
+    """
+    tamanho_maximo = config("LOTE_TAMANHO_MAXIMO", default=10000, cast=int)
+
+    if (content_type or "").split(";")[0].strip().lower() in CONTENT_TYPES_NDJSON:
+        itens = []
+        for numero_linha, linha in enumerate(corpo.splitlines(), start=1):
+            if not linha.strip():
+                continue
+            try:
+                itens.append(loads(linha))
+            except JSONDecodeError:
+                raise InvalidParameterError(f"Linha {numero_linha} do lote não é um JSON válido")
+    else:
+        try:
+            itens = loads(corpo)
+        except JSONDecodeError:
+            raise InvalidParameterError("O lote deve ser uma lista JSON ou um NDJSON com um processo por linha")
+        if not isinstance(itens, list):
+            raise InvalidParameterError("O lote deve ser uma lista JSON ou um NDJSON com um processo por linha")
+
+    if not itens:
+        raise InvalidParameterError("O lote não contém processos")
+    if len(itens) > tamanho_maximo:
+        raise InvalidParameterError(f"O lote contém {len(itens)} processos, o máximo é {tamanho_maximo}")
+    return itens
+
+
+def validar_lote(itens):
+    """
+    Valida todos os itens do lote, sem interromper a validação no primeiro item inválido.
+
+    :param itens: Lista com os itens do lote.
+    :return: Tupla (válidos, erros): a lista de tuplas (índice, ConsultaProcessoInput) dos itens válidos e a
+             lista de erros, com o índice e a mensagem de cada item inválido.
+    """
+    validos = []
+    erros = []
+    for indice, item in enumerate(itens):
+        if not isinstance(item, dict):
+            erros.append({"indice": indice, "message": "Item do lote deve ser um objeto JSON"})
+            continue
+        try:
+            validos.append((indice, ConsultaProcessoInput.model_validate(item)))
+        except InvalidParameterError as e:
+            erros.append({"indice": indice, "message": str(e)})
+        except ValidationError as e:
+            erros.append({"indice": indice, "message": "; ".join(
+                f"{'.'.join(map(str, erro['loc']))}: {erro['msg']}" for erro in e.errors()
+            )})
+    return validos, erros
+
+
+def registro_na_fila(processo):
+    """
+    Monta o registro de uma solicitação enviada para a fila.
+
+    :param processo: ConsultaProcessoInput validado.
+    :return: Dicionário com o registro da solicitação.
+    """
+    registro = {
+        "numero_processo": processo.numero_processo,
+        "sigla_tribunal": processo.sigla_tribunal,
+        "status": "Na Fila"
+    }
+    if processo.callback_url:
+        registro["callback_url"] = processo.callback_url
+    if processo.monitorar:
+        registro["monitorar"] = True
+    return registro
+
+
+def registro_em_cache(processo, dados_capturados):
+    """
+    Monta o registro de uma solicitação respondida com o resultado em cache, já encerrada.
+
+    :param processo: ConsultaProcessoInput validado.
+    :param dados_capturados: Dados do processo em cache, ou None se a última captura não o encontrou.
+    :return: Dicionário com o registro da solicitação, com o status final e o resultado.
+    """
+    registro = registro_na_fila(processo)
+    registro["status"], registro["resultado"] = montar_resultado(dados_capturados)
+    return registro
+
+
+async def registrar_lote(registros, fila, cache, processos):
+    """
+    Registra as solicitações de um lote de processos já validados.
+
+    Os resultados em cache são consultados com um único MGET, todos os registros das solicitações são gravados
+    em um único pipeline e as solicitações sem resultado em cache são enviadas juntas para a fila.
+
+    :param registros: RegistroSolicitacao com os registros das solicitações.
+    :param fila: RedisQueue que recebe as solicitações.
+    :param cache: ResultadoCache com os resultados das capturas recentes.
+    :param processos: Lista de ConsultaProcessoInput validados.
+    :return: Lista com o número da solicitação de cada processo, na mesma ordem.
+    """
+    resultados_cache = await cache.get_many([(p.sigla_tribunal, p.numero_processo) for p in processos])
+
+    solicitacoes = {}
+    na_fila = []
+    solicitacoes_ids = []
+    for processo, (encontrado, dados_capturados) in zip(processos, resultados_cache):
+        solicitacao_id = str(uuid4())
+        solicitacoes_ids.append(solicitacao_id)
+
+        # Solicitações com callback ou monitoramento passam pela fila, para que o worker notifique o cliente
+        # ou capture as movimentações novas
+        if encontrado and not processo.callback_url and not processo.monitorar:
+            # Processo capturado recentemente, a solicitação já é gravada com o resultado final
+            solicitacoes[solicitacao_id] = registro_em_cache(processo, dados_capturados)
+            continue
+
+        solicitacoes[solicitacao_id] = registro_na_fila(processo)
+        na_fila.append(solicitacao_id)
+
+    await registros.criar(solicitacoes)
+    await fila.enqueue_many(na_fila)
+
+    logger.info(f"Lote de {len(processos)} processos registrado, {len(na_fila)} enviados para a fila")
+    return solicitacoes_ids
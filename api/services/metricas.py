@@ -0,0 +1,118 @@
+from contextlib import contextmanager
+from os import environ
+from pathlib import Path
+from time import perf_counter, time
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest, \
+    start_http_server
+from prometheus_client.multiprocess import MultiProcessCollector
+
+# Diretório do modo multiprocesso do prometheus_client, em que cada processo grava as próprias métricas. Com vários
+# workers do uvicorn, o /metrics da API soma as métricas de todos eles, em vez de devolver as do worker que atendeu
+# a requisição. Lido do ambiente, e não do .env, pois é a variável lida pelo próprio prometheus_client.
+DIRETORIO_MULTIPROCESSO = environ.get("PROMETHEUS_MULTIPROC_DIR")
+if DIRETORIO_MULTIPROCESSO:
+    # Os arquivos das métricas sem labels são criados na definição das métricas, logo abaixo
+    Path(DIRETORIO_MULTIPROCESSO).mkdir(parents=True, exist_ok=True)
+
+# Limites dos buckets, em segundos, das etapas de uma captura
+BUCKETS_ETAPA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# Limites dos buckets, em segundos, da espera na fila, que pode chegar a horas com a fila acumulada
+BUCKETS_FILA = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 1800, 3600, 7200)
+
+ESPERA_FILA = Histogram(
+    "jusbrasil_fila_espera_segundos",
+    "Tempo entre a entrada da solicitação na fila e o início do processamento pelo worker.",
+    buckets=BUCKETS_FILA
+)
+
+DURACAO_ETAPA = Histogram(
+    "jusbrasil_etapa_duracao_segundos",
+    "Duração de cada etapa da captura: busca, consulta e extracao (por instância), validacao e gravacao.",
+    ["etapa", "tribunal", "instancia"],
+    buckets=BUCKETS_ETAPA
+)
+
+ESPERA_LIMITADOR = Histogram(
+    "jusbrasil_limitador_espera_segundos",
+    "Tempo de espera das requisições aos tribunais pelo limitador de requisições.",
+    ["tribunal"],
+    buckets=BUCKETS_ETAPA
+)
+
+SOLICITACOES_ENCERRADAS = Counter(
+    "jusbrasil_solicitacoes_encerradas",
+    "Solicitações encerradas, pelo status final.",
+    ["tribunal", "status"]
+)
+
+FALHAS_PROCESSAMENTO = Counter(
+    "jusbrasil_falhas_processamento",
+    "Exceções no processamento das solicitações pelo worker, que serão reentregues.",
+    ["erro"]
+)
+
+
+@contextmanager
+def medir(etapa, tribunal, instancia=""):
+    """
+    Registra a duração do bloco no histograma de etapas, inclusive quando o bloco lança uma exceção.
+
+    Uso::
+
+        with medir("consulta", "TJAL", "primeira"):
+            ...  # requisição ao tribunal
+
+    :param etapa: Nome da etapa (busca, consulta, extracao, validacao ou gravacao).
+    :param tribunal: Sigla do tribunal.
+    :param instancia: Instância do tribunal ("primeira" ou "segunda"), vazia nas etapas da solicitação.
+    """
+    inicio = perf_counter()
+    try:
+        yield
+    finally:
+        DURACAO_ETAPA.labels(etapa=etapa, tribunal=tribunal or "", instancia=instancia).observe(perf_counter() - inicio)
+
+
+def registrar_espera_fila(mensagem_id, agora=None):
+    """
+    Registra a espera de uma mensagem na fila, a partir do horário em milissegundos do ID da mensagem no stream.
+
+    :param mensagem_id: ID da mensagem no stream (por exemplo, "1700000000000-0").
+    :param agora: Timestamp atual (usado nos testes). Usa o horário do sistema se não informado.
+    :return: Tempo de espera, em segundos, ou None se o ID não tiver o formato do stream.
+    """
+    if isinstance(mensagem_id, bytes):
+        mensagem_id = mensagem_id.decode()
+    try:
+        enfileirado_em = int(str(mensagem_id).split("-")[0]) / 1000
+    except ValueError:
+        return None
+    espera = max((agora or time()) - enfileirado_em, 0)
+    ESPERA_FILA.observe(espera)
+    return espera
+
+
+def gerar_metricas():
+    """
+    Gera as métricas no formato texto do Prometheus: as de todos os processos no modo multiprocesso
+    (PROMETHEUS_MULTIPROC_DIR), ou apenas as do processo atual.
+
+    :return: Tupla (conteúdo em bytes, content type).
+    """
+    if DIRETORIO_MULTIPROCESSO:
+        registro = CollectorRegistry()
+        MultiProcessCollector(registro, path=DIRETORIO_MULTIPROCESSO)
+        return generate_latest(registro), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def expor_metricas(porta):
+    """
+    Expõe as métricas do processo em um servidor HTTP próprio, para os processos sem API (worker).
+
+    :param porta: Porta do servidor de métricas (0 ou None para não expor).
+    """
+    if porta:
+        start_http_server(porta)
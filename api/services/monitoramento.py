@@ -0,0 +1,123 @@
+from datetime import datetime, timezone
+from json import dumps, loads
+from logging import getLogger
+
+from decouple import config
+
+from crawler.default.data_extractor import impressao_movimentacao
+from database.service import AsyncRedisConnection
+
+logger = getLogger(__name__)
+
+# Instâncias acompanhadas no monitoramento, como nos dados capturados pelos tribunais
+INSTANCIAS = ("first_instance", "second_instance")
+
+
+class MonitoramentoProcesso:
+    """
+    Monitoramento das movimentações de um processo entre capturas sucessivas.
+
+    Guarda a impressão digital da movimentação mais recente de cada instância, para que a próxima captura leia
+    apenas as movimentações novas, e registra as movimentações novas de cada captura (o delta), que podem ser
+    consultadas a partir de uma data.
+
+    :ivar max_alteracoes: Número máximo de alterações guardadas por processo.
+    :ivar redis: Conexão assíncrona com o Redis.
+    """
+
+    def __init__(self, redis=None):
+        """
+        Lê as configurações do monitoramento.
+
+        :param redis: Conexão assíncrona com o Redis. Cria uma AsyncRedisConnection se não informada.
+        """
+        self.max_alteracoes = config("MONITORAMENTO_MAX_ALTERACOES", default=1000, cast=int)
+        self.redis = redis or AsyncRedisConnection(decode_responses=True)
+
+    @staticmethod
+    def chave(sigla_tribunal, numero_processo):
+        """
+        Monta o sufixo das chaves do monitoramento de um processo.
+
+        :param sigla_tribunal: Sigla do tribunal.
+        :param numero_processo: Número do processo.
+        :return: Sufixo das chaves no Redis.
+        """
+        return f"{sigla_tribunal.upper()}:{numero_processo}"
+
+    async def obter_impressoes(self, sigla_tribunal, numero_processo):
+        """
+        Obtém a impressão digital da movimentação mais recente já capturada de cada instância do processo.
+
+        :param sigla_tribunal: Sigla do tribunal.
+        :param numero_processo: Número do processo.
+        :return: Dicionário com a impressão de cada instância já capturada (vazio se o processo nunca foi monitorado).
+        """
+        self.redis.check_redis_client()
+        impressoes = await self.redis.redis_client.hgetall(
+            f"monitoramento:{self.chave(sigla_tribunal, numero_processo)}"
+        )
+        return {instancia: impressoes[instancia] for instancia in INSTANCIAS if impressoes.get(instancia)}
+
+    async def registrar(self, sigla_tribunal, numero_processo, dados_capturados):
+        """
+        Registra as movimentações novas de uma captura e atualiza as impressões digitais do processo.
+
+        :param sigla_tribunal: Sigla do tribunal.
+        :param numero_processo: Número do processo.
+        :param dados_capturados: Dados capturados com apenas as movimentações novas de cada instância.
+        :return: Lista com as alterações registradas, uma por instância com movimentações novas.
+        """
+        chave = self.chave(sigla_tribunal, numero_processo)
+        agora = datetime.now(timezone.utc)
+
+        impressoes = {}
+        alteracoes = []
+        for instancia in INSTANCIAS:
+            movimentacoes = ((dados_capturados or {}).get(instancia) or {}).get("lista_movimentacoes") or []
+            if not movimentacoes:
+                continue
+            # As movimentações são listadas da mais recente para a mais antiga
+            impressoes[instancia] = impressao_movimentacao(movimentacoes[0])
+            alteracoes.append({
+                "instancia": instancia,
+                "capturado_em": agora.isoformat(),
+                "movimentacoes": movimentacoes
+            })
+
+        if not alteracoes:
+            return []
+
+        self.redis.check_redis_client()
+        async with self.redis.redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(f"monitoramento:{chave}", mapping=impressoes)
+            pipe.zadd(f"alteracoes:{chave}", {
+                dumps(alteracao, ensure_ascii=False): agora.timestamp() for alteracao in alteracoes
+            })
+            # Mantém apenas as alterações mais recentes do processo
+            pipe.zremrangebyrank(f"alteracoes:{chave}", 0, -self.max_alteracoes - 1)
+            await pipe.execute()
+
+        logger.info(f"{sum(len(a['movimentacoes']) for a in alteracoes)} movimentações novas registradas "
+                    f"para o processo {numero_processo}")
+        return alteracoes
+
+    async def alteracoes_desde(self, sigla_tribunal, numero_processo, desde=None):
+        """
+        Obtém as alterações registradas para o processo a partir de uma data.
+
+        :param sigla_tribunal: Sigla do tribunal.
+        :param numero_processo: Número do processo.
+        :param desde: Data a partir da qual (exclusive) as alterações são devolvidas (None para todas).
+        :return: Lista de alterações, da mais antiga para a mais recente.
+        """
+        if desde is not None and desde.tzinfo is None:
+            desde = desde.replace(tzinfo=timezone.utc)
+
+        self.redis.check_redis_client()
+        alteracoes = await self.redis.redis_client.zrangebyscore(
+            f"alteracoes:{self.chave(sigla_tribunal, numero_processo)}",
+            f"({desde.timestamp()}" if desde is not None else "-inf",
+            "+inf"
+        )
+        return [loads(alteracao) for alteracao in alteracoes]
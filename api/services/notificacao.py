@@ -0,0 +1,328 @@
+from asyncio import CancelledError, Event, Queue, TimeoutError, create_task, sleep, wait, wait_for
+from contextlib import asynccontextmanager
+from json import dumps
+from logging import getLogger
+from socket import AF_INET
+from time import monotonic
+
+from aiohttp.abc import AbstractResolver
+from aiohttp.resolver import DefaultResolver
+from decouple import config
+
+from api.exceptions import DestinoInternoError, InvalidParameterError
+from api.schemas.input import endereco_interno, valida_url_callback
+from api.services.metricas import SOLICITACOES_ENCERRADAS, medir
+from crawler.default.http_client import HttpClient
+from database.codec import decodificar
+from database.service import AsyncRedisConnection
+
+logger = getLogger(__name__)
+
+# Status em que a solicitação ainda não foi encerrada
+STATUS_EM_ANDAMENTO = ("Na Fila", "Em processamento")
+
+# Callbacks em envio, mantidos referenciados até terminarem
+callbacks_pendentes = set()
+
+
+def canal_status(solicitacao_id):
+    """
+    Monta o canal do Redis em que as mudanças de status de uma solicitação são publicadas.
+
+    :param solicitacao_id: ID da solicitação.
+    :return: Nome do canal.
+    """
+    return f"status:{solicitacao_id}"
+
+
+def status_final(registro):
+    """
+    Verifica se o registro de uma solicitação corresponde a um status final (dados capturados ou erro).
+
+    :param registro: Registro da solicitação, já convertido para dicionário.
+    :return: True se a solicitação foi encerrada.
+    """
+    return registro.get("status") not in STATUS_EM_ANDAMENTO
+
+
+async def atualizar_status(registros, solicitacao_id, status, resultado=None):
+    """
+    Altera o status de uma solicitação e avisa os clientes que a acompanham. A mensagem publicada traz apenas
+    o novo status, e não o registro completo, pois é recebida por todos os processos da API.
+
+    :param registros: RegistroSolicitacao com os registros das solicitações.
+    :param solicitacao_id: ID da solicitação.
+    :param status: Novo status da solicitação.
+    :param resultado: Dados capturados validados, nas solicitações encerradas com dados.
+    :return: Registro da solicitação visível ao cliente.
+    """
+    registro = await registros.atualizar(solicitacao_id, status, resultado)
+    await registros.redis.publish_data(canal_status(solicitacao_id), status)
+    return registro
+
+
+class ResolvedorExterno(AbstractResolver):
+    """
+    Classe ResolvedorExterno é o resolvedor de DNS do conector usado nos callbacks. Recusa os hosts que
+    resolvem para um endereço de rede interna, verificando os mesmos endereços usados na conexão, de modo que
+    uma nova resolução do host (DNS rebinding) não escape da verificação.
+    """
+
+    def __init__(self):
+        """Cria o resolvedor padrão do aiohttp, que faz a resolução, com o event loop em execução."""
+        self._resolvedor = DefaultResolver()
+
+    async def resolve(self, host, port=0, family=AF_INET):
+        """
+        Resolve o host, recusando-o se algum dos endereços for de rede interna.
+
+        :param host: Nome do host.
+        :param port: Porta da conexão.
+        :param family: Família de endereços.
+        :return: Endereços do host, no formato do aiohttp.
+        :raises DestinoInternoError: Se algum endereço do host for de rede interna.
+        """
+        enderecos = await self._resolvedor.resolve(host, port, family)
+        for endereco in enderecos:
+            if endereco_interno(endereco["host"]):
+                raise DestinoInternoError(f"Host {host} resolve para o endereço de rede interna {endereco['host']}")
+        return enderecos
+
+    async def close(self):
+        """Encerra o resolvedor padrão."""
+        await self._resolvedor.close()
+
+
+# Sessão HTTP dos callbacks, separada da usada nos tribunais, com o resolvedor que recusa a rede interna
+http_client_callbacks = HttpClient(fabrica_resolvedor=ResolvedorExterno)
+
+
+async def enviar_callback(callback_url, solicitacao_id, registro, http_client=None):
+    """
+    Envia o registro final de uma solicitação para a URL de callback informada pelo cliente.
+
+    Falhas de conexão e respostas 5xx são repetidas com backoff. Uma falha no callback é apenas registrada
+    no log, sem alterar o resultado da solicitação. URLs para a rede interna não são chamadas, seja pelo
+    endereço ou pelo nome na URL, seja pelos endereços obtidos na resolução do host (ResolvedorExterno), e
+    redirecionamentos não são seguidos.
+
+    :param callback_url: URL que recebe o POST com o resultado.
+    :param solicitacao_id: ID da solicitação.
+    :param registro: Registro final da solicitação visível ao cliente.
+    :param http_client: HttpClient que fornece a sessão HTTP. Usa a sessão dos callbacks se não informado.
+    :return: True se o callback foi entregue.
+    """
+    http_client = http_client or http_client_callbacks
+    max_tentativas = config("CALLBACK_MAX_TENTATIVAS", default=3, cast=int)
+    timeout = config("CALLBACK_TIMEOUT", default=10, cast=float)
+    corpo = {"numero_solicitacao": solicitacao_id, **registro}
+
+    try:
+        # Endereços na própria URL não passam pelo resolvedor
+        valida_url_callback(callback_url)
+    except InvalidParameterError as e:
+        logger.error(f"Callback da solicitação {solicitacao_id} recusado: {e}")
+        return False
+
+    for tentativa in range(1, max_tentativas + 1):
+        try:
+            session = await http_client.get_session()
+            async with session.post(callback_url, json=corpo, timeout=timeout, allow_redirects=False) as response:
+                if response.status < 500:
+                    logger.info(f"Callback da solicitação {solicitacao_id} enviado, status {response.status}")
+                    return response.status < 400
+                erro = f"status {response.status}"
+        except Exception as e:
+            if isinstance(getattr(e, "os_error", None), DestinoInternoError):
+                logger.error(f"Callback da solicitação {solicitacao_id} recusado: {e.os_error}")
+                return False
+            erro = repr(e)
+
+        if tentativa < max_tentativas:
+            await sleep(http_client.backoff(tentativa))
+
+    logger.error(f"Callback da solicitação {solicitacao_id} para {callback_url} falhou após "
+                 f"{max_tentativas} tentativas: {erro}")
+    return False
+
+
+def agendar_callback(callback_url, solicitacao_id, registro):
+    """
+    Envia o callback em uma task própria, para que as novas tentativas não ocupem o consumidor da fila.
+
+    :param callback_url: URL que recebe o POST com o resultado.
+    :param solicitacao_id: ID da solicitação.
+    :param registro: Registro final da solicitação visível ao cliente.
+    :return: Task do envio.
+    """
+    task = create_task(enviar_callback(callback_url, solicitacao_id, registro))
+    callbacks_pendentes.add(task)
+    task.add_done_callback(callbacks_pendentes.discard)
+    return task
+
+
+async def aguardar_callbacks(timeout=None):
+    """
+    Aguarda os callbacks em envio, no encerramento do processo. Os que não terminarem no prazo são cancelados.
+
+    :param timeout: Tempo máximo de espera, em segundos (None para aguardar todos).
+    """
+    if not callbacks_pendentes:
+        return
+    _, pendentes = await wait(set(callbacks_pendentes), timeout=timeout)
+    for task in pendentes:
+        task.cancel()
+    if pendentes:
+        logger.warning(f"{len(pendentes)} callbacks cancelados no encerramento")
+
+
+async def finalizar_solicitacao(registros, solicitacao_id, status, resultado=None, callback_url=None,
+                                sigla_tribunal=None):
+    """
+    Grava o status final de uma solicitação, publica a mudança de status e agenda o callback, se houver.
+    A duração da gravação e o status final são registrados nas métricas do tribunal.
+
+    :param registros: RegistroSolicitacao com os registros das solicitações.
+    :param solicitacao_id: ID da solicitação.
+    :param status: Status final da solicitação.
+    :param resultado: Dados capturados validados, nas solicitações encerradas com dados.
+    :param callback_url: URL de callback informada na consulta (None para não notificar).
+    :param sigla_tribunal: Sigla do tribunal da solicitação, usada nas métricas.
+    """
+    with medir("gravacao", sigla_tribunal):
+        registro = await atualizar_status(registros, solicitacao_id, status, resultado)
+    SOLICITACOES_ENCERRADAS.labels(tribunal=sigla_tribunal or "", status=status).inc()
+    if callback_url:
+        agendar_callback(callback_url, solicitacao_id, registro)
+
+
+class OuvinteStatus:
+    """
+    Classe OuvinteStatus recebe, em uma única conexão pub/sub por processo, os avisos de mudança de status
+    publicados pelos workers e os distribui para os clientes que acompanham cada solicitação.
+
+    :ivar redis: Conexão assíncrona com o Redis.
+    :ivar assinantes: Filas dos clientes, indexadas pelo ID da solicitação.
+    """
+
+    def __init__(self, redis=None):
+        """
+        Inicializa o ouvinte sem assinantes. A conexão pub/sub é aberta na primeira assinatura.
+
+        :param redis: Conexão assíncrona com o Redis. Cria uma AsyncRedisConnection se não informada.
+        """
+        self.redis = redis or AsyncRedisConnection()
+        self.assinantes = {}
+        self._task = None
+        self._pronto = Event()
+
+    async def start(self):
+        """Inicia a task que escuta os canais de status, aguardando a assinatura ser confirmada."""
+        if self._task is None or self._task.done():
+            self._pronto.clear()
+            self._task = create_task(self._escutar())
+        await self._pronto.wait()
+
+    async def close(self):
+        """Encerra a task que escuta os canais de status."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except CancelledError:
+                pass
+        self._task = None
+
+    @asynccontextmanager
+    async def assinar(self, solicitacao_id):
+        """
+        Registra um cliente interessado nas mudanças de status de uma solicitação.
+
+        Uso::
+
+            async with ouvinte.assinar(solicitacao_id) as fila:
+                valor = await fila.get()
+
+        :param solicitacao_id: ID da solicitação.
+        """
+        await self.start()
+        fila = Queue()
+        self.assinantes.setdefault(solicitacao_id, set()).add(fila)
+        try:
+            yield fila
+        finally:
+            filas = self.assinantes.get(solicitacao_id, set())
+            filas.discard(fila)
+            if not filas:
+                self.assinantes.pop(solicitacao_id, None)
+
+    async def _escutar(self):
+        """Escuta os canais de status e repassa cada mensagem às filas dos clientes, reconectando em caso de erro."""
+        while True:
+            try:
+                self.redis.check_redis_client()
+                async with self.redis.redis_client.pubsub() as pubsub:
+                    await pubsub.psubscribe(canal_status("*"))
+                    self._pronto.set()
+                    async for mensagem in pubsub.listen():
+                        if mensagem["type"] != "pmessage":
+                            continue
+                        canal = mensagem["channel"]
+                        canal = canal.decode() if isinstance(canal, bytes) else canal
+                        for fila in list(self.assinantes.get(canal.split(":", 1)[1], ())):
+                            fila.put_nowait(mensagem["data"])
+            except CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro ao escutar os canais de status: {e!r}")
+                await sleep(1)
+
+
+async def eventos_status(registros, ouvinte, solicitacao_id, timeout=None, intervalo_keepalive=None):
+    """
+    Gera os eventos (Server-Sent Events) com o status de uma solicitação: o status atual e cada mudança
+    seguinte, até a solicitação ser encerrada ou o tempo máximo da conexão terminar.
+
+    :param registros: RegistroSolicitacao com os registros das solicitações.
+    :param ouvinte: OuvinteStatus que recebe as mudanças de status.
+    :param solicitacao_id: ID da solicitação.
+    :param timeout: Tempo máximo, em segundos, da conexão. Usa SSE_TIMEOUT se não informado.
+    :param intervalo_keepalive: Intervalo, em segundos, entre os comentários que mantêm a conexão aberta.
+    :return: Gerador assíncrono com os eventos já formatados.
+    """
+    timeout = timeout or config("SSE_TIMEOUT", default=300, cast=float)
+    intervalo_keepalive = intervalo_keepalive or config("SSE_INTERVALO_KEEPALIVE", default=15, cast=float)
+    fim = monotonic() + timeout
+
+    # A assinatura é feita antes da leitura do status atual para não perder uma mudança entre as duas
+    async with ouvinte.assinar(solicitacao_id) as fila:
+        valor = await registros.obter_registro(solicitacao_id)
+        if valor is None:
+            yield "event: erro\ndata: Solicitação não encontrada\n\n"
+            return
+
+        while True:
+            registro = decodificar(valor)
+            yield f"event: status\ndata: {dumps(registro)}\n\n"
+            if status_final(registro):
+                return
+
+            notificado = False
+            while not notificado:
+                restante = fim - monotonic()
+                if restante <= 0:
+                    return
+                try:
+                    await wait_for(fila.get(), timeout=min(intervalo_keepalive, restante))
+                    notificado = True
+                except TimeoutError:
+                    yield ": keep-alive\n\n"
+
+            # A notificação traz apenas o novo status: o registro é lido novamente, uma única vez para as
+            # notificações acumuladas
+            while not fila.empty():
+                fila.get_nowait()
+            valor = await registros.obter_registro(solicitacao_id)
+            if valor is None:
+                yield "event: erro\ndata: Solicitação não encontrada\n\n"
+                return
@@ -1,82 +1,185 @@
-from logging import basicConfig, getLogger, INFO
-from importlib import import_module
-from json import dumps, loads
+from logging import getLogger
+
+from aiohttp import ClientError
+from pydantic import ValidationError
+
+from api.exceptions import InvalidParameterError, TribunalIndisponivelError, TribunalInexistenteError
 from api.schemas.output import StatusSolicitacaoOutput
-from database.service import RedisConnection
+from api.services.cache import ResultadoCache
+from api.services.metricas import medir
+from api.services.monitoramento import MonitoramentoProcesso
+from api.services.notificacao import atualizar_status, finalizar_solicitacao
+from crawler.default.main import CapturaParcial
+from crawler.registry import tribunais
+from database.solicitacao import RegistroSolicitacao, STATUS_CONCLUIDO
 
-# Configurando o log
-basicConfig(filename='app.txt',
-            level=INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = getLogger(__name__)
 
 
 async def process_request(solicitacao_id: str):
     """
     Função assíncrona responsável por processar uma solicitação de captura de dados de um processo jurídico.
-    Captura os dados com base no ID de solicitação, atualiza o status da solicitação e importa o módulo de captura
-    correspondente ao tribunal, finalizando com a atualização do banco de dados.
+    Captura os dados com base no ID de solicitação, atualiza o status da solicitação e captura os dados com o
+    crawler do tribunal, finalizando com a atualização do banco de dados.
 
     :param solicitacao_id: ID da solicitação a ser processada.
     """
 
     # Obtendo dados da solicitação do banco de dados
-    redis = RedisConnection()
-    dados_solicitacao = redis.get_data(solicitacao_id)
-    dict_dados_solicitacao = loads(dados_solicitacao)
+    registros = RegistroSolicitacao()
+    dict_dados_solicitacao = await registros.obter(solicitacao_id)
+    if dict_dados_solicitacao is None:
+        # Registro expirado ou removido antes do processamento
+        logger.error(f"Solicitação {solicitacao_id} não encontrada")
+        return
 
     numero_processo = dict_dados_solicitacao.get("numero_processo")
     sigla_tribunal = dict_dados_solicitacao.get("sigla_tribunal")
+    callback_url = dict_dados_solicitacao.get("callback_url")
+    monitorar = dict_dados_solicitacao.get("monitorar", False)
 
     logger.info("Dados capturados, iniciando processo de captura")
 
-    # Atualizando o status da solicitação para "Em processamento"
-
-    redis.set_data(key=solicitacao_id, value=dumps({
-        "numero_processo": numero_processo,
-        "sigla_tribunal": sigla_tribunal,
-        "status": "Em processamento"
-    }))
+    # Atualizando o status da solicitação para "Em processamento". Apenas o status e o horário da etapa são
+    # alterados, mantendo a URL de callback para uma reentrega.
+    await atualizar_status(registros, solicitacao_id, "Em processamento")
 
     try:
-        # Importando o módulo específico do tribunal
-        module = import_module(f"crawler.{sigla_tribunal.lower()}.main")
-
-        if not module:
-            raise Exception("Module import error")
-    except Exception as e:
+        # Obtendo o crawler do tribunal, criado uma única vez por processo
+        tj = tribunais.obter(sigla_tribunal)
+    except TribunalInexistenteError as e:
         logger.error(f"Error processing request processo: {numero_processo}| tribunal: {sigla_tribunal}: {e}")
 
-        redis.set_data(key=solicitacao_id, value=dumps({
-            "numero_processo": numero_processo,
-            "sigla_tribunal": sigla_tribunal,
-            "status": f"Erro tribunal inexistente"
-        }))
+        await finalizar_solicitacao(registros, solicitacao_id, "Erro tribunal inexistente", callback_url=callback_url,
+                                    sigla_tribunal=sigla_tribunal)
 
         return
 
-    # Obtendo a classe correspondente ao tribunal
-    tj = getattr(module, sigla_tribunal.upper())
+    try:
+        if monitorar:
+            # Monitoramento: captura apenas as movimentações novas desde a última captura e registra o delta
+            dados_capturados = await capturar_alteracoes(tj, sigla_tribunal, numero_processo)
+        else:
+            # Capturando os dados do processo, reaproveitando o cache ou uma captura em andamento do mesmo processo
+            cache = ResultadoCache()
+            dados_capturados = await cache.obter_ou_capturar(
+                sigla_tribunal=sigla_tribunal,
+                numero_processo=numero_processo,
+                capturar=lambda: capturar_validado(tj, numero_processo)
+            )
+
+        await salvar_resultado(registros, solicitacao_id, dados_capturados, callback_url, sigla_tribunal)
+    except (TribunalIndisponivelError, InvalidParameterError, ClientError, ValidationError) as e:
+        # Erros que se repetiriam em uma nova entrega: encerra a solicitação sem aguardar o visibility timeout
+        status = status_erro_captura(e)
+        logger.error(f"{status} para o processo {numero_processo}: {e!r}")
+
+        await finalizar_solicitacao(registros, solicitacao_id, status, callback_url=callback_url,
+                                    sigla_tribunal=sigla_tribunal)
+
+
+def status_erro_captura(erro):
+    """
+    Obtém o status de encerramento de uma captura que falhou com um erro que não se resolve com uma nova entrega.
 
-    # Capturando os dados do processo
-    dados_capturados = await tj().capturar_dados(numero_processo=dict_dados_solicitacao.get("numero_processo"))
+    :param erro: Exceção lançada pela captura.
+    :return: Status de erro da solicitação.
+    """
+    if isinstance(erro, TribunalIndisponivelError):
+        # Circuito do tribunal aberto
+        return "Erro - tribunal indisponível"
+    if isinstance(erro, InvalidParameterError):
+        # Número do processo incompatível com o tribunal (J.TR de outro tribunal)
+        return "Erro - número do processo inválido para o tribunal"
+    if isinstance(erro, ValidationError):
+        # Página do tribunal com dados fora do formato esperado
+        return "Erro - dados capturados inválidos"
+    # Falha de conexão ou status de erro do tribunal após as novas tentativas do HttpClient
+    return "Erro - falha na consulta ao tribunal"
+
+
+async def capturar_validado(tj, numero_processo):
+    """
+    Captura os dados do processo e os valida antes de serem gravados no cache, para que dados inválidos não
+    sejam reaproveitados pelas próximas consultas do processo.
 
+    :param tj: Crawler do tribunal.
+    :param numero_processo: Número do processo.
+    :return: Dados capturados validados, ou None se nada foi encontrado.
+    :raises ValidationError: Se os dados capturados não forem compatíveis com StatusSolicitacaoOutput.
+    """
+    dados_capturados = await tj.capturar_dados(numero_processo=numero_processo)
     if not dados_capturados:
-        logger.info("Encerrado - Nenhum dado capturado")
+        return dados_capturados
 
-        redis.set_data(key=solicitacao_id, value=dumps({
-            "numero_processo": numero_processo,
-            "sigla_tribunal": sigla_tribunal,
-            "status": f"Encerrado - Nenhum dado capturado"
-        }))
+    validados = validar_dados(dados_capturados)
+    # Mantém a indicação de resultado parcial, que não é gravado no cache
+    return CapturaParcial(validados) if isinstance(dados_capturados, CapturaParcial) else validados
 
-        return
+
+async def capturar_alteracoes(tj, sigla_tribunal, numero_processo):
+    """
+    Captura o processo lendo apenas as movimentações posteriores à última captura monitorada e registra as
+    movimentações novas. O cache de resultados não é usado, pois o monitoramento precisa dos dados atuais.
+
+    :param tj: Crawler do tribunal.
+    :param sigla_tribunal: Sigla do tribunal.
+    :param numero_processo: Número do processo.
+    :return: Dados capturados, com apenas as movimentações novas em lista_movimentacoes.
+    """
+    monitoramento = MonitoramentoProcesso()
+    impressoes = await monitoramento.obter_impressoes(sigla_tribunal, numero_processo)
+
+    dados_capturados = await tj.capturar_dados(numero_processo=numero_processo, movimentacoes_conhecidas=impressoes)
+
+    await monitoramento.registrar(sigla_tribunal, numero_processo, dados_capturados)
+    return dados_capturados
+
+
+async def salvar_resultado(registros, solicitacao_id, dados_capturados, callback_url=None, sigla_tribunal=None):
+    """
+    Grava o resultado final de uma solicitação: os dados capturados ou o status de encerramento sem dados.
+    A mudança de status é publicada e, se houver, a URL de callback é chamada com o resultado.
+
+    :param registros: RegistroSolicitacao com os registros das solicitações.
+    :param solicitacao_id: ID da solicitação.
+    :param dados_capturados: Dados capturados do processo, ou None se nada foi encontrado.
+    :param callback_url: URL de callback informada na consulta (None para não notificar).
+    :param sigla_tribunal: Sigla do tribunal da solicitação, usada nas métricas.
+    """
+    with medir("validacao", sigla_tribunal):
+        status, resultado = montar_resultado(dados_capturados)
+    await finalizar_solicitacao(registros, solicitacao_id, status, resultado, callback_url, sigla_tribunal)
+
+    if dados_capturados:
+        logger.info(f"Dados atualizados no banco para a solicitação {solicitacao_id}")
+
+
+def montar_resultado(dados_capturados):
+    """
+    Monta o encerramento de uma solicitação: os dados capturados validados ou o status de encerramento sem dados.
+
+    :param dados_capturados: Dados capturados do processo, ou None se nada foi encontrado.
+    :return: Tupla (status, resultado), com o resultado None quando nada foi capturado.
+    :raises ValidationError: Se os dados não forem compatíveis com StatusSolicitacaoOutput.
+    """
+    if not dados_capturados:
+        logger.info("Encerrado - Nenhum dado capturado")
+
+        return "Encerrado - Nenhum dado capturado", None
 
     logger.info("Dados capturados, encerrando solicitação.")
 
-    # Atualizando o banco de dados com os dados capturados
-    redis.set_data(
-        key=solicitacao_id,
-        value=dumps(StatusSolicitacaoOutput.model_validate(dados_capturados).model_dump(exclude_none=True))
-    )
-    logger.info(f"Dados atualizados no banco para a solicitação {solicitacao_id}")
+    # Validando os dados capturados antes de gravá-los no banco
+    return STATUS_CONCLUIDO, validar_dados(dados_capturados)
+
+
+def validar_dados(dados_capturados):
+    """
+    Valida os dados capturados de um processo com StatusSolicitacaoOutput.
+
+    :param dados_capturados: Dados capturados do processo.
+    :return: Dados validados, sem os campos nulos.
+    :raises ValidationError: Se os dados não forem compatíveis com StatusSolicitacaoOutput.
+    """
+    return StatusSolicitacaoOutput.model_validate(dados_capturados).model_dump(exclude_none=True)
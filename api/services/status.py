@@ -0,0 +1,60 @@
+from logging import getLogger
+
+from database.codec import para_json
+from database.solicitacao import STATUS_CONCLUIDO
+
+logger = getLogger(__name__)
+
+# Campos mantidos na projeção compacta do status
+CAMPOS_COMPACTOS = ("numero_solicitacao", "numero_processo", "sigla_tribunal", "status")
+
+
+def status_json(registro):
+    """
+    Monta o JSON do status de uma solicitação a partir do registro gravado no Redis.
+
+    O registro final já é validado com StatusSolicitacaoOutput ao ser gravado (process_handler.montar_resultado),
+    e o registro visível ao cliente não tem campos internos (RegistroSolicitacao.obter_registro), então o JSON
+    gravado é devolvido sem ser desserializado nem validado novamente.
+
+    :param registro: Registro da solicitação visível ao cliente (RegistroSolicitacao.obter_registro).
+    :return: JSON do status da solicitação, em bytes.
+    """
+    return para_json(registro)
+
+
+async def consultar_status_lote(registros, numeros_solicitacao, status=None, compacto=False):
+    """
+    Obtém o status de várias solicitações em um único pipeline. Na consulta compacta, os resultados não são lidos.
+
+    :param registros: RegistroSolicitacao com os registros das solicitações.
+    :param numeros_solicitacao: Lista com os números das solicitações.
+    :param status: Lista de status; se informada, apenas as solicitações com um destes status são devolvidas.
+    :param compacto: Se verdadeiro, omite os dados capturados (first_instance e second_instance).
+    :return: Tupla (solicitações, não encontradas): a lista com o registro de cada solicitação encontrada,
+             acrescido do numero_solicitacao, e a lista com os números das solicitações inexistentes.
+    """
+    # Remove números repetidos mantendo a ordem da requisição
+    numeros_solicitacao = list(dict.fromkeys(numeros_solicitacao))
+    registros_solicitacoes = await registros.obter_many(numeros_solicitacao, com_resultado=not compacto)
+
+    solicitacoes = []
+    nao_encontradas = []
+    for numero_solicitacao, registro in zip(numeros_solicitacao, registros_solicitacoes):
+        if registro is None:
+            nao_encontradas.append(numero_solicitacao)
+            continue
+
+        resultado = registro.pop("resultado", None) or {}
+        solicitacao = {"numero_solicitacao": numero_solicitacao, **registro, **resultado}
+        solicitacao.setdefault("status", STATUS_CONCLUIDO)
+
+        if status and solicitacao["status"] not in status:
+            continue
+        if compacto:
+            solicitacao = {campo: solicitacao[campo] for campo in CAMPOS_COMPACTOS if campo in solicitacao}
+        solicitacoes.append(solicitacao)
+
+    logger.info(f"Status de {len(numeros_solicitacao)} solicitações consultado, "
+                f"{len(nao_encontradas)} não encontradas")
+    return solicitacoes, nao_encontradas
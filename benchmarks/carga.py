@@ -0,0 +1,286 @@
+from argparse import ArgumentParser
+from collections import Counter
+from json import dumps, loads
+from pathlib import Path
+from random import choice, randrange
+from statistics import mean, quantiles
+from time import monotonic
+import asyncio
+import sys
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from api.services.notificacao import STATUS_EM_ANDAMENTO
+
+# Código J.TR de cada tribunal no número do processo
+CODIGOS_TRIBUNAIS = {"TJAL": "8.02", "TJCE": "8.06"}
+
+# Formas de acompanhar as solicitações até o encerramento
+ACOMPANHAMENTOS = ("eventos", "polling", "nenhum")
+
+
+def percentis(amostras):
+    """
+    Resume as latências medidas.
+
+    :param amostras: Lista com as latências, em segundos.
+    :return: Dicionário com quantidade, media_ms, p50_ms, p95_ms, p99_ms e max_ms (vazio sem amostras).
+    """
+    if not amostras:
+        return {}
+    cortes = quantiles(amostras, n=100, method="inclusive") if len(amostras) > 1 else amostras * 99
+    return {
+        "quantidade": len(amostras),
+        "media_ms": mean(amostras) * 1000,
+        "p50_ms": cortes[49] * 1000,
+        "p95_ms": cortes[94] * 1000,
+        "p99_ms": cortes[98] * 1000,
+        "max_ms": max(amostras) * 1000,
+    }
+
+
+class GeradorCarga:
+    """
+    Classe GeradorCarga envia consultas de processos à API em uma taxa fixa (carga aberta: o envio não espera as
+    respostas anteriores) e acompanha cada solicitação até o encerramento.
+
+    :ivar url_api: URL base da API.
+    :ivar taxa_por_minuto: Número de consultas enviadas por minuto.
+    :ivar duracao: Tempo, em segundos, de envio das consultas.
+    :ivar siglas: Siglas dos tribunais consultados, escolhidas aleatoriamente.
+    :ivar acompanhamento: "eventos" (SSE), "polling" (consulta do status) ou "nenhum".
+    :ivar processos: Número de processos distintos consultados (0 para um processo novo em cada consulta).
+    :ivar timeout: Tempo máximo, em segundos, de acompanhamento de uma solicitação.
+    :ivar intervalo_polling: Intervalo, em segundos, entre as consultas do status no modo "polling".
+    :ivar concorrencia: Número máximo de solicitações em andamento no gerador.
+    """
+
+    def __init__(self, url_api, taxa_por_minuto, duracao, siglas=("TJAL", "TJCE"), acompanhamento="eventos",
+                 processos=0, timeout=300, intervalo_polling=1.0, concorrencia=5000):
+        self.url_api = url_api.rstrip("/")
+        self.taxa_por_minuto = taxa_por_minuto
+        self.duracao = duracao
+        self.siglas = tuple(siglas)
+        self.acompanhamento = acompanhamento
+        self.processos = processos
+        self.timeout = timeout
+        self.intervalo_polling = intervalo_polling
+        self.concorrencia = concorrencia
+        self._envio = []
+        self._encerramento = []
+        self._status = Counter()
+        self._erros = Counter()
+        self._atrasadas = 0
+
+    def numero_processo(self, sigla):
+        """
+        Gera um número de processo no padrão NNNNNNN-DD.AAAA.J.TR.OOOO do tribunal.
+
+        :param sigla: Sigla do tribunal.
+        :return: Número do processo.
+        """
+        sequencial = randrange(self.processos) if self.processos else randrange(10_000_000)
+        return f"{sequencial:07d}-{sequencial % 97:02d}.2024.{CODIGOS_TRIBUNAIS[sigla]}.0001"
+
+    async def executar(self):
+        """
+        Envia as consultas durante a duração configurada e aguarda o acompanhamento de todas.
+
+        :return: Relatório da execução (ver relatorio).
+        """
+        intervalo = 60 / self.taxa_por_minuto
+        total = int(self.duracao / intervalo)
+        vagas = asyncio.Semaphore(self.concorrencia)
+        connector = TCPConnector(limit=self.concorrencia)
+
+        async with ClientSession(connector=connector, timeout=ClientTimeout(total=self.timeout)) as session:
+            inicio = monotonic()
+            tarefas = []
+            for indice in range(total):
+                espera = inicio + indice * intervalo - monotonic()
+                if espera > 0:
+                    await asyncio.sleep(espera)
+                elif espera < -intervalo:
+                    # O gerador não conseguiu manter a taxa (gerador ou conexões saturados)
+                    self._atrasadas += 1
+                await vagas.acquire()
+                tarefa = asyncio.create_task(self._solicitacao(session))
+                tarefa.add_done_callback(lambda _: vagas.release())
+                tarefas.append(tarefa)
+            envio_concluido = monotonic() - inicio
+            await asyncio.gather(*tarefas)
+            duracao_total = monotonic() - inicio
+
+        return self.relatorio(total, envio_concluido, duracao_total)
+
+    async def _solicitacao(self, session):
+        """
+        Envia uma consulta e, conforme o acompanhamento configurado, aguarda o encerramento da solicitação.
+
+        :param session: ClientSession do gerador.
+        """
+        sigla = choice(self.siglas)
+        inicio = monotonic()
+        try:
+            async with session.post(f"{self.url_api}/consulta-processo", json={
+                "numero_processo": self.numero_processo(sigla), "sigla_tribunal": sigla
+            }) as resposta:
+                if resposta.status != 200:
+                    self._erros[f"HTTP {resposta.status}"] += 1
+                    return
+                numero_solicitacao = (await resposta.json())["numero_solicitacao"]
+            self._envio.append(monotonic() - inicio)
+
+            if self.acompanhamento == "nenhum":
+                return
+            if self.acompanhamento == "eventos":
+                status = await self._acompanhar_eventos(session, numero_solicitacao)
+            else:
+                status = await self._acompanhar_polling(session, numero_solicitacao)
+        except Exception as e:
+            self._erros[type(e).__name__] += 1
+            return
+
+        self._status[status] += 1
+        if status is not None:
+            self._encerramento.append(monotonic() - inicio)
+
+    async def _acompanhar_eventos(self, session, numero_solicitacao):
+        """
+        Acompanha a solicitação pelos Server-Sent Events até o encerramento.
+
+        :param session: ClientSession do gerador.
+        :param numero_solicitacao: ID da solicitação.
+        :return: Status final, ou None se a conexão terminar antes do encerramento.
+        """
+        async with session.get(f"{self.url_api}/status-solicitacao/{numero_solicitacao}/eventos") as resposta:
+            async for linha in resposta.content:
+                if linha.startswith(b"data: "):
+                    status = self._status_final(loads(linha[6:]))
+                    if status:
+                        return status
+        return None
+
+    async def _acompanhar_polling(self, session, numero_solicitacao):
+        """
+        Consulta o status da solicitação periodicamente até o encerramento.
+
+        :param session: ClientSession do gerador.
+        :param numero_solicitacao: ID da solicitação.
+        :return: Status final, ou None se o tempo máximo terminar antes do encerramento.
+        """
+        fim = monotonic() + self.timeout
+        while monotonic() < fim:
+            async with session.get(f"{self.url_api}/status-solicitacao/{numero_solicitacao}") as resposta:
+                if resposta.status == 200:
+                    status = self._status_final(await resposta.json())
+                    if status:
+                        return status
+            await asyncio.sleep(self.intervalo_polling)
+        return None
+
+    @staticmethod
+    def _status_final(registro):
+        """
+        Obtém o status de um registro encerrado. Os registros encerrados com dados não têm o campo status.
+
+        :param registro: Registro da solicitação.
+        :return: Status final, ou None se a solicitação ainda estiver em andamento.
+        """
+        status = registro.get("status")
+        if status in STATUS_EM_ANDAMENTO:
+            return None
+        return status or "Concluído"
+
+    def relatorio(self, total, envio_concluido, duracao_total):
+        """
+        Monta o relatório da execução.
+
+        :param total: Número de consultas enviadas.
+        :param envio_concluido: Tempo, em segundos, até o envio da última consulta.
+        :param duracao_total: Tempo, em segundos, até o encerramento de todas as solicitações.
+        :return: Dicionário com as contagens, o throughput e as latências de envio e de encerramento.
+        """
+        return {
+            "enviadas": total,
+            "aceitas": len(self._envio),
+            "encerradas": sum(quantidade for status, quantidade in self._status.items() if status is not None),
+            "sem_encerramento": self._status.get(None, 0),
+            "erros": dict(self._erros),
+            "status": {status: quantidade for status, quantidade in self._status.items() if status is not None},
+            "envios_atrasados": self._atrasadas,
+            "duracao_s": duracao_total,
+            "taxa_envio_por_minuto": total / envio_concluido * 60 if envio_concluido else 0.0,
+            "throughput_encerradas_por_minuto": len(self._encerramento) / duracao_total * 60 if duracao_total else 0.0,
+            "latencia_envio": percentis(self._envio),
+            "latencia_encerramento": percentis(self._encerramento),
+        }
+
+
+def formatar(relatorio):
+    """
+    Formata o relatório para exibição no terminal.
+
+    :param relatorio: Relatório da execução.
+    :return: Texto do relatório.
+    """
+    linhas = [
+        f"Enviadas: {relatorio['enviadas']}  aceitas: {relatorio['aceitas']}  encerradas: {relatorio['encerradas']}  "
+        f"sem encerramento: {relatorio['sem_encerramento']}  envios atrasados: {relatorio['envios_atrasados']}",
+        f"Taxa de envio: {relatorio['taxa_envio_por_minuto']:.0f}/min  "
+        f"throughput: {relatorio['throughput_encerradas_por_minuto']:.0f} encerradas/min  "
+        f"duração: {relatorio['duracao_s']:.1f}s",
+    ]
+    for nome, chave in (("envio (POST)", "latencia_envio"), ("encerramento", "latencia_encerramento")):
+        latencia = relatorio[chave]
+        if latencia:
+            linhas.append(f"Latência {nome}: p50 {latencia['p50_ms']:.1f} ms  p95 {latencia['p95_ms']:.1f} ms  "
+                          f"p99 {latencia['p99_ms']:.1f} ms  máx {latencia['max_ms']:.1f} ms")
+    for status, quantidade in sorted(relatorio["status"].items()):
+        linhas.append(f"  {status}: {quantidade}")
+    for erro, quantidade in sorted(relatorio["erros"].items()):
+        linhas.append(f"  erro {erro}: {quantidade}")
+    return "\n".join(linhas)
+
+
+def main(argumentos=None):
+    """
+    Executa o gerador de carga contra a API e exibe o relatório.
+
+    :param argumentos: Argumentos da linha de comando (usa sys.argv se não informados).
+    :return: Código de saída: 1 se houver erros ou solicitações sem encerramento, 0 caso contrário.
+    """
+    parser = ArgumentParser(description="Gerador de carga da API de consulta de processos.")
+    parser.add_argument("--url", default="http://localhost:8000", help="URL base da API.")
+    parser.add_argument("--taxa", type=float, default=1000, help="Consultas enviadas por minuto.")
+    parser.add_argument("--duracao", type=float, default=60, help="Tempo de envio, em segundos.")
+    parser.add_argument("--tribunais", nargs="+", choices=tuple(CODIGOS_TRIBUNAIS), default=("TJAL", "TJCE"))
+    parser.add_argument("--acompanhamento", choices=ACOMPANHAMENTOS, default="eventos",
+                        help="Forma de aguardar o encerramento das solicitações.")
+    parser.add_argument("--processos", type=int, default=0,
+                        help="Número de processos distintos (0 para um processo novo em cada consulta).")
+    parser.add_argument("--timeout", type=float, default=300, help="Tempo máximo de cada solicitação, em segundos.")
+    parser.add_argument("--concorrencia", type=int, default=5000, help="Solicitações em andamento no gerador.")
+    parser.add_argument("--saida", type=Path, help="Arquivo JSON do relatório.")
+    argumentos = parser.parse_args(argumentos)
+
+    gerador = GeradorCarga(
+        url_api=argumentos.url,
+        taxa_por_minuto=argumentos.taxa,
+        duracao=argumentos.duracao,
+        siglas=argumentos.tribunais,
+        acompanhamento=argumentos.acompanhamento,
+        processos=argumentos.processos,
+        timeout=argumentos.timeout,
+        concorrencia=argumentos.concorrencia
+    )
+    relatorio = asyncio.run(gerador.executar())
+    print(formatar(relatorio))
+    if argumentos.saida:
+        argumentos.saida.parent.mkdir(parents=True, exist_ok=True)
+        argumentos.saida.write_text(dumps(relatorio, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 1 if relatorio["erros"] or relatorio["sem_encerramento"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
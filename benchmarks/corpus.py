@@ -0,0 +1,52 @@
+from pathlib import Path
+from re import DOTALL, compile
+
+# Páginas reais do e-SAJ usadas como base do corpus (as mesmas dos testes do DataExtractor)
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "unit" / "crawler" / "default" / "fixtures"
+
+# Tabela de movimentações de cada instância nas páginas de base
+TABELAS = {
+    "primeira": ("primeira_instancia.html", "tabelaTodasMovimentacoes"),
+    "segunda": ("segunda_instancia.html", "tabelaUltimasMovimentacoes"),
+}
+
+# Número de movimentações de cada tamanho de página (None mantém a página original)
+TAMANHOS = {"pequena": None, "media": 200, "grande": 5000}
+
+LINHA = compile(r"<tr\b.*?</tr>", DOTALL)
+
+
+def gerar_pagina(instancia, tamanho):
+    """
+    Gera uma página de processo do e-SAJ com o número de movimentações do tamanho informado, repetindo as
+    movimentações da página de base. O tamanho das páginas reais varia principalmente com as movimentações.
+
+    :param instancia: Instância do tribunal ("primeira" ou "segunda").
+    :param tamanho: Tamanho da página ("pequena", "media" ou "grande").
+    :return: HTML da página.
+    :raises KeyError: Se a instância ou o tamanho não existirem.
+    """
+    arquivo, tabela = TABELAS[instancia]
+    quantidade = TAMANHOS[tamanho]
+    html = (FIXTURES / arquivo).read_text(encoding="utf-8")
+    if quantidade is None:
+        return html
+
+    inicio = html.index(">", html.index(f'id="{tabela}"')) + 1
+    fim = html.index("</tbody>", inicio)
+    linhas = LINHA.findall(html, inicio, fim)
+    movimentacoes = "\n".join(linhas[indice % len(linhas)] for indice in range(quantidade))
+    return f"{html[:inicio]}\n{movimentacoes}\n{html[fim:]}"
+
+
+def gerar_corpus():
+    """
+    Gera as páginas de todas as instâncias e tamanhos.
+
+    :return: Dicionário {(instância, tamanho): HTML}.
+    """
+    return {
+        (instancia, tamanho): gerar_pagina(instancia, tamanho)
+        for instancia in TABELAS
+        for tamanho in TAMANHOS
+    }
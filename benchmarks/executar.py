@@ -0,0 +1,281 @@
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from json import dumps, loads
+from os import environ
+from pathlib import Path
+from platform import platform, python_version
+from statistics import mean, median, quantiles
+from subprocess import run
+from time import perf_counter
+from uuid import uuid4
+import asyncio
+import sys
+
+from aiohttp import web
+from pydantic import VERSION as versao_pydantic
+
+from api.schemas.output import StatusSolicitacaoOutput
+from api.services.process_handler import process_request
+from benchmarks.corpus import TAMANHOS, gerar_corpus, gerar_pagina
+from benchmarks.mock_tj import criar_app
+from crawler.default.data_extractor import EXTRATORES, PARSER_HTML_PADRAO, criar_extrator
+from crawler.default.executor import extracao_executor
+from crawler.default.http_client import http_client
+from crawler.registry import tribunais
+from crawler.tjal.main import TJAL
+from database.service import AsyncRedisConnection
+from database.solicitacao import RegistroSolicitacao
+
+# Diretório padrão dos resultados, um arquivo JSON por execução
+RESULTADOS = Path(__file__).resolve().parent / "resultados"
+
+# Campos extraídos das páginas, os mesmos das instâncias dos crawlers
+CAMPOS = {
+    "classe": "classeProcesso",
+    "area": "areaProcesso",
+    "assunto": "assuntoProcesso",
+    "data_distribuicao": "dataHoraDistribuicaoProcesso",
+    "juiz": "juizProcesso",
+    "valor_acao": "valorAcaoProcesso",
+    "partes_processo": "tableTodasPartes",
+    "lista_movimentacoes": "tabelaTodasMovimentacoes"
+}
+
+# Redução das repetições nas páginas grandes, que levam dezenas de vezes mais tempo
+DIVISOR_REPETICOES = {"pequena": 1, "media": 4, "grande": 20}
+
+
+def estatisticas(amostras, tamanho_bytes=None):
+    """
+    Resume os tempos medidos de uma operação.
+
+    :param amostras: Lista com a duração, em segundos, de cada repetição.
+    :param tamanho_bytes: Tamanho da entrada processada em cada repetição, para calcular o throughput em MB/s.
+    :return: Dicionário com repeticoes, media_ms, p50_ms, p95_ms, min_ms, ops_s e, se informado, mb_s.
+    """
+    p95 = quantiles(amostras, n=20, method="inclusive")[-1] if len(amostras) > 1 else amostras[0]
+    resultado = {
+        "repeticoes": len(amostras),
+        "media_ms": mean(amostras) * 1000,
+        "p50_ms": median(amostras) * 1000,
+        "p95_ms": p95 * 1000,
+        "min_ms": min(amostras) * 1000,
+        "ops_s": len(amostras) / sum(amostras) if sum(amostras) else 0.0,
+    }
+    if tamanho_bytes:
+        resultado["mb_s"] = tamanho_bytes / mean(amostras) / 1_000_000 if mean(amostras) else 0.0
+    return resultado
+
+
+def medir(funcao, repeticoes, aquecimento=1):
+    """
+    Executa uma função várias vezes, descartando as primeiras execuções de aquecimento.
+
+    :param funcao: Função sem argumentos.
+    :param repeticoes: Número de execuções medidas.
+    :param aquecimento: Número de execuções não medidas antes da medição.
+    :return: Lista com a duração, em segundos, de cada execução medida.
+    """
+    for _ in range(aquecimento):
+        funcao()
+    amostras = []
+    for _ in range(repeticoes):
+        inicio = perf_counter()
+        funcao()
+        amostras.append(perf_counter() - inicio)
+    return amostras
+
+
+def benchmark_extracao(repeticoes):
+    """
+    Mede o DataExtractor.extract de cada backend de análise de HTML sobre todas as páginas do corpus.
+
+    :param repeticoes: Número de execuções medidas nas páginas pequenas.
+    :return: Dicionário {nome: estatísticas}.
+    """
+    resultados = {}
+    for (instancia, tamanho), html in gerar_corpus().items():
+        for parser in EXTRATORES:
+            amostras = medir(lambda: criar_extrator(html, parser).extract(CAMPOS),
+                             max(repeticoes // DIVISOR_REPETICOES[tamanho], 1))
+            resultados[f"extracao/{parser}/{instancia}/{tamanho}"] = estatisticas(amostras, len(html.encode()))
+    return resultados
+
+
+def benchmark_validacao(repeticoes):
+    """
+    Mede a validação (model_validate) e a serialização (model_dump) do StatusSolicitacaoOutput com os dados
+    extraídos das páginas de cada tamanho, como em process_handler.montar_resultado.
+
+    :param repeticoes: Número de execuções medidas nas páginas pequenas.
+    :return: Dicionário {nome: estatísticas}.
+    """
+    resultados = {}
+    for tamanho in TAMANHOS:
+        dados = {
+            "first_instance": criar_extrator(gerar_pagina("primeira", tamanho), "lxml").extract(CAMPOS),
+            "second_instance": criar_extrator(gerar_pagina("segunda", tamanho), "lxml").extract(CAMPOS),
+        }
+        quantidade = max(repeticoes // DIVISOR_REPETICOES[tamanho], 1)
+        validado = StatusSolicitacaoOutput.model_validate(dados)
+
+        resultados[f"validacao/validate/{tamanho}"] = estatisticas(
+            medir(lambda: StatusSolicitacaoOutput.model_validate(dados), quantidade)
+        )
+        resultados[f"validacao/dump/{tamanho}"] = estatisticas(
+            medir(lambda: validado.model_dump(exclude_none=True), quantidade)
+        )
+    return resultados
+
+
+async def benchmark_pipeline(repeticoes, tamanho="media"):
+    """
+    Mede a latência do process_request de ponta a ponta (Redis, crawler do TJAL, extração e gravação do
+    resultado) contra o servidor local que imita o e-SAJ. Requer um Redis acessível pelo REDIS_URL.
+
+    Cada repetição consulta um número de processo diferente, para que o cache de resultados não seja usado.
+
+    :param repeticoes: Número de solicitações medidas.
+    :param tamanho: Tamanho das páginas servidas ("pequena", "media" ou "grande").
+    :return: Dicionário {nome: estatísticas}, vazio se o Redis não estiver acessível.
+    """
+    runner = web.AppRunner(criar_app(tamanho))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    porta = runner.addresses[0][1]
+
+    # As configurações são lidas na criação do crawler e do limitador, recriados em seguida
+    environ["URL_BASE_TJAL"] = f"http://127.0.0.1:{porta}"
+    environ.setdefault("LIMITE_REQUISICOES_POR_SEGUNDO", "100000")
+    environ.setdefault("LIMITE_RAJADA", "100000")
+    environ.setdefault("LIMITE_EM_ANDAMENTO", "1000")
+
+    registros = RegistroSolicitacao()
+    try:
+        registros.redis.check_redis_client()
+        await registros.redis.redis_client.ping()
+    except Exception as e:
+        print(f"Benchmark do pipeline ignorado, Redis indisponível: {e!r}", file=sys.stderr)
+        await runner.cleanup()
+        return {}
+
+    # Recria o crawler com a URL do servidor local
+    tribunais.registrar("TJAL", TJAL)
+    await http_client.start()
+    extracao_executor.start()
+    try:
+        amostras = []
+        for indice in range(repeticoes + 1):
+            solicitacao_id = str(uuid4())
+            numero_processo = f"{uuid4().int % 10_000_000:07d}-00.2024.8.02.0001"
+            await registros.criar({solicitacao_id: {
+                "numero_processo": numero_processo, "sigla_tribunal": "TJAL", "status": "Na Fila"
+            }})
+
+            inicio = perf_counter()
+            await process_request(solicitacao_id)
+            # A primeira solicitação é o aquecimento (conexões, pool de extração)
+            if indice:
+                amostras.append(perf_counter() - inicio)
+    finally:
+        await http_client.close()
+        extracao_executor.close()
+        await AsyncRedisConnection.close()
+        await runner.cleanup()
+
+    return {f"pipeline/{tamanho}": estatisticas(amostras)}
+
+
+def metadados():
+    """
+    Identifica o ambiente da execução, para que os resultados possam ser comparados ao longo do tempo.
+
+    :return: Dicionário com a data, o commit, as versões e as configurações que afetam os tempos.
+    """
+    try:
+        commit = run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        commit = None
+
+    return {
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": python_version(),
+        "pydantic": versao_pydantic,
+        "plataforma": platform(),
+        "parser_html": environ.get("PARSER_HTML", PARSER_HTML_PADRAO),
+        "extracao_executor": environ.get("EXTRACAO_EXECUTOR", "process"),
+    }
+
+
+def comparar(base, atual, limite=0.1):
+    """
+    Compara a mediana (p50) de cada medição presente nas duas execuções.
+
+    :param base: Resultados da execução de referência (conteúdo do arquivo JSON).
+    :param atual: Resultados da execução atual.
+    :param limite: Aumento relativo da mediana considerado regressão (0.1 = 10%).
+    :return: Tupla (linhas do relatório, nomes das medições com regressão).
+    """
+    linhas = [f"{'medição':<45} {'base p50 ms':>12} {'atual p50 ms':>13} {'variação':>9}"]
+    regressoes = []
+    for nome in sorted(set(base["resultados"]) & set(atual["resultados"])):
+        anterior = base["resultados"][nome]["p50_ms"]
+        novo = atual["resultados"][nome]["p50_ms"]
+        variacao = (novo - anterior) / anterior if anterior else 0.0
+        marcador = ""
+        if variacao > limite:
+            regressoes.append(nome)
+            marcador = "  <- regressão"
+        linhas.append(f"{nome:<45} {anterior:>12.3f} {novo:>13.3f} {variacao:>+8.1%}{marcador}")
+    return linhas, regressoes
+
+
+def main(argumentos=None):
+    """
+    Executa os benchmarks e grava os resultados em JSON, ou compara duas execuções gravadas.
+
+    :param argumentos: Argumentos da linha de comando (usa sys.argv se não informados).
+    :return: Código de saída: 1 se a comparação encontrar regressões, 0 caso contrário.
+    """
+    parser = ArgumentParser(description="Benchmarks da extração e do pipeline de captura.")
+    parser.add_argument("--repeticoes", type=int, default=50, help="Execuções medidas nas páginas pequenas.")
+    parser.add_argument("--apenas", nargs="+", choices=("extracao", "validacao", "pipeline"),
+                        default=("extracao", "validacao"), help="Grupos de benchmarks executados.")
+    parser.add_argument("--tamanho-pipeline", choices=tuple(TAMANHOS), default="media",
+                        help="Tamanho das páginas servidas no benchmark do pipeline.")
+    parser.add_argument("--saida", type=Path, help="Arquivo JSON dos resultados.")
+    parser.add_argument("--comparar", nargs=2, type=Path, metavar=("BASE", "ATUAL"),
+                        help="Compara dois arquivos de resultados em vez de executar os benchmarks.")
+    parser.add_argument("--limite", type=float, default=0.1, help="Aumento do p50 considerado regressão.")
+    argumentos = parser.parse_args(argumentos)
+
+    if argumentos.comparar:
+        base, atual = (loads(arquivo.read_text(encoding="utf-8")) for arquivo in argumentos.comparar)
+        linhas, regressoes = comparar(base, atual, argumentos.limite)
+        print("\n".join(linhas))
+        return 1 if regressoes else 0
+
+    resultados = {}
+    if "extracao" in argumentos.apenas:
+        resultados.update(benchmark_extracao(argumentos.repeticoes))
+    if "validacao" in argumentos.apenas:
+        resultados.update(benchmark_validacao(argumentos.repeticoes))
+    if "pipeline" in argumentos.apenas:
+        resultados.update(asyncio.run(benchmark_pipeline(argumentos.repeticoes, argumentos.tamanho_pipeline)))
+
+    for nome, resultado in resultados.items():
+        throughput = f" {resultado['mb_s']:8.1f} MB/s" if "mb_s" in resultado else ""
+        print(f"{nome:<45} p50 {resultado['p50_ms']:10.3f} ms  p95 {resultado['p95_ms']:10.3f} ms  "
+              f"{resultado['ops_s']:10.1f} ops/s{throughput}")
+
+    saida = argumentos.saida or RESULTADOS / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(dumps({"metadados": metadados(), "resultados": resultados}, indent=2), encoding="utf-8")
+    print(f"Resultados gravados em {saida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
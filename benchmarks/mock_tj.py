@@ -0,0 +1,133 @@
+from argparse import ArgumentParser
+from asyncio import sleep
+from random import random, uniform
+from zlib import crc32
+
+from aiohttp import web
+
+from benchmarks.corpus import TAMANHOS, gerar_pagina
+
+# Resposta da busca da segunda instância com o código do processo, como no e-SAJ
+BUSCA_SEGUNDA_INSTANCIA = '<html><body><input type="hidden" id="processoSelecionado" value="{codigo}"></body></html>'
+
+# Resposta do e-SAJ para um processo inexistente
+NAO_ENCONTRADO = "<html><body><td id='mensagemRetorno'>Não existem informações disponíveis para os parâmetros " \
+                 "informados.</td></body></html>"
+
+
+def criar_app(tamanho="media", latencia=0.0, variacao=0.0, erro=0.0, nao_encontrado=0.0):
+    """
+    Cria um servidor local que imita as rotas do e-SAJ usadas pelos crawlers, para medir o pipeline e testar a
+    carga sem acessar os tribunais. Os processos são encontrados com as páginas do corpus do tamanho informado.
+
+    :param tamanho: Tamanho das páginas de processo ("pequena", "media" ou "grande").
+    :param latencia: Tempo médio, em segundos, de cada resposta.
+    :param variacao: Variação relativa da latência (0.5 = entre 50% e 150% da latência).
+    :param erro: Fração das requisições respondidas com 503.
+    :param nao_encontrado: Fração dos números de processo tratados como inexistentes.
+    :return: Aplicação aiohttp.
+    """
+    app = web.Application(middlewares=[simular_condicoes])
+    app["paginas"] = {instancia: gerar_pagina(instancia, tamanho) for instancia in ("primeira", "segunda")}
+    app["latencia"] = latencia
+    app["variacao"] = variacao
+    app["erro"] = erro
+    app["nao_encontrado"] = nao_encontrado
+    app.add_routes([
+        web.get("/cpopg/search.do", buscar_primeira_instancia),
+        web.get("/cpopg/show.do", consultar_primeira_instancia),
+        web.get("/cposg5/search.do", buscar_segunda_instancia),
+        web.get("/cposg5/show.do", consultar_segunda_instancia),
+    ])
+    return app
+
+
+@web.middleware
+async def simular_condicoes(request, handler):
+    """Aplica a latência e a taxa de erros configuradas a todas as rotas."""
+    latencia = request.app["latencia"]
+    if latencia:
+        variacao = request.app["variacao"]
+        await sleep(latencia * uniform(1 - variacao, 1 + variacao))
+    if random() < request.app["erro"]:
+        raise web.HTTPServiceUnavailable()
+    return await handler(request)
+
+
+def _codigo(numero_processo):
+    """
+    Monta um código de processo estável a partir do número do processo.
+
+    :param numero_processo: Número do processo.
+    :return: Código do processo.
+    """
+    return "".join(caractere for caractere in numero_processo if caractere.isdigit())[:12] or "0"
+
+
+def _inexistente(request, numero_processo):
+    """
+    Indica se o processo deve ser tratado como inexistente. A escolha depende apenas do número, para que as
+    duas instâncias e as novas tentativas tenham a mesma resposta.
+
+    :param request: Requisição recebida.
+    :param numero_processo: Número do processo.
+    :return: True se o processo não deve ser encontrado.
+    """
+    return crc32(numero_processo.encode()) % 10000 < request.app["nao_encontrado"] * 10000
+
+
+async def buscar_primeira_instancia(request):
+    """Redireciona a busca para a página do processo, como a primeira instância do e-SAJ."""
+    numero_processo = request.query.get("dadosConsulta.valorConsultaNuUnificado", "")
+    if _inexistente(request, numero_processo):
+        return web.Response(text=NAO_ENCONTRADO, content_type="text/html")
+    raise web.HTTPFound(
+        f"/cpopg/show.do?processo.codigo={_codigo(numero_processo)}&processo.foro=1&processo.numero={numero_processo}"
+    )
+
+
+async def consultar_primeira_instancia(request):
+    """Devolve a página de primeira instância do processo."""
+    return web.Response(text=request.app["paginas"]["primeira"], content_type="text/html")
+
+
+async def buscar_segunda_instancia(request):
+    """Devolve a busca da segunda instância, com o código do processo selecionado."""
+    numero_processo = request.query.get("dePesquisaNuUnificado", "")
+    if _inexistente(request, numero_processo):
+        return web.Response(text=NAO_ENCONTRADO, content_type="text/html")
+    return web.Response(text=BUSCA_SEGUNDA_INSTANCIA.format(codigo=_codigo(numero_processo)), content_type="text/html")
+
+
+async def consultar_segunda_instancia(request):
+    """Devolve a página de segunda instância do processo."""
+    return web.Response(text=request.app["paginas"]["segunda"], content_type="text/html")
+
+
+def main(argumentos=None):
+    """
+    Executa o servidor local do e-SAJ. Os crawlers passam a usá-lo com URL_BASE_TJAL e URL_BASE_TJCE
+    apontando para o endereço do servidor.
+
+    :param argumentos: Argumentos da linha de comando (usa sys.argv se não informados).
+    """
+    parser = ArgumentParser(description="Servidor local que imita o e-SAJ para testes de carga.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--porta", type=int, default=8080)
+    parser.add_argument("--tamanho", choices=tuple(TAMANHOS), default="media", help="Tamanho das páginas.")
+    parser.add_argument("--latencia", type=float, default=0.2, help="Latência média das respostas, em segundos.")
+    parser.add_argument("--variacao", type=float, default=0.5, help="Variação relativa da latência.")
+    parser.add_argument("--erro", type=float, default=0.0, help="Fração das respostas com 503.")
+    parser.add_argument("--nao-encontrado", type=float, default=0.0, help="Fração dos processos inexistentes.")
+    argumentos = parser.parse_args(argumentos)
+
+    web.run_app(
+        criar_app(argumentos.tamanho, argumentos.latencia, argumentos.variacao, argumentos.erro,
+                  argumentos.nao_encontrado),
+        host=argumentos.host,
+        port=argumentos.porta
+    )
+
+
+if __name__ == "__main__":
+    main()
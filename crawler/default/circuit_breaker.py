@@ -0,0 +1,106 @@
+from logging import getLogger
+from time import monotonic
+
+from decouple import config
+
+from api.exceptions import TribunalIndisponivelError
+
+logger = getLogger(__name__)
+
+
+class DisjuntorTribunal:
+    """
+    Classe DisjuntorTribunal implementa um circuit breaker para as requisições a um tribunal.
+
+    Após um número de falhas consecutivas o circuito abre e todas as requisições ao tribunal falham
+    imediatamente. Passado o tempo de espera, uma única requisição de teste é liberada (meio aberto):
+    se tiver sucesso o circuito fecha, caso contrário volta a abrir.
+
+    :ivar chave: Identificador do tribunal (por exemplo, o código do TJ).
+    :ivar limite_falhas: Número de falhas consecutivas que abre o circuito.
+    :ivar tempo_aberto: Tempo, em segundos, que o circuito permanece aberto.
+    :ivar falhas: Número de falhas consecutivas registradas.
+    :ivar aberto_em: Momento (monotonic) em que o circuito abriu, ou None se estiver fechado.
+    """
+
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    MEIO_ABERTO = "meio aberto"
+
+    # Disjuntores do processo, indexados pela chave do tribunal
+    _disjuntores = {}
+
+    def __init__(self, chave):
+        """
+        Lê as configurações do disjuntor.
+
+        :param chave: Identificador do tribunal.
+        """
+        self.chave = chave
+        self.limite_falhas = config("DISJUNTOR_LIMITE_FALHAS", default=5, cast=int)
+        self.tempo_aberto = config("DISJUNTOR_TEMPO_ABERTO", default=30, cast=float)
+        self.falhas = 0
+        self.aberto_em = None
+        self._teste_em_andamento = False
+
+    @classmethod
+    def obter(cls, chave):
+        """
+        Obtém o disjuntor do tribunal, compartilhado por todas as consultas do processo.
+
+        :param chave: Identificador do tribunal.
+        :return: DisjuntorTribunal do tribunal.
+        """
+        if chave not in cls._disjuntores:
+            cls._disjuntores[chave] = cls(chave)
+        return cls._disjuntores[chave]
+
+    @property
+    def estado(self):
+        """
+        Estado atual do circuito.
+
+        :return: FECHADO, ABERTO ou MEIO_ABERTO.
+        """
+        if self.aberto_em is None:
+            return self.FECHADO
+        if monotonic() - self.aberto_em < self.tempo_aberto:
+            return self.ABERTO
+        return self.MEIO_ABERTO
+
+    def verificar(self):
+        """
+        Verifica se uma requisição ao tribunal pode ser feita.
+
+        :raises TribunalIndisponivelError: Se o circuito estiver aberto, ou meio aberto com um teste em andamento.
+        """
+        estado = self.estado
+        if estado == self.FECHADO:
+            return
+        if estado == self.MEIO_ABERTO and not self._teste_em_andamento:
+            self._teste_em_andamento = True
+            return
+        raise TribunalIndisponivelError(f"Tribunal {self.chave} indisponível, circuito aberto após falhas consecutivas")
+
+    def registrar_sucesso(self):
+        """Registra uma requisição bem-sucedida, fechando o circuito."""
+        if self.aberto_em is not None:
+            logger.info(f"Circuito do tribunal {self.chave} fechado")
+        self.falhas = 0
+        self.aberto_em = None
+        self._teste_em_andamento = False
+
+    def registrar_falha(self):
+        """Registra uma requisição que falhou, abrindo o circuito ao atingir o limite de falhas."""
+        self.falhas += 1
+        self._teste_em_andamento = False
+        if self.aberto_em is not None or self.falhas >= self.limite_falhas:
+            logger.error(f"Circuito do tribunal {self.chave} aberto após {self.falhas} falhas consecutivas")
+            self.aberto_em = monotonic()
+
+    def liberar_teste(self):
+        """
+        Libera a requisição de teste do circuito meio aberto sem registrar resultado, quando ela termina sem
+        resposta do tribunal (cancelada ou interrompida por outro erro). A próxima requisição faz um novo teste.
+        """
+        self._teste_em_andamento = False
@@ -1,4 +1,25 @@
+import re
+from hashlib import sha1
+from html import escape
+from io import BytesIO
+from json import dumps
+
 from bs4 import BeautifulSoup
+from decouple import config
+from lxml.etree import Element, ParserError, XMLSyntaxError, iterparse, strip_elements
+from lxml.html import document_fromstring
+
+from api.exceptions import InvalidParameterError
+
+
+def impressao_movimentacao(movimentacao):
+    """
+    Calcula a impressão digital de uma movimentação, usada para reconhecer movimentações já capturadas.
+
+    :param movimentacao: Dicionário da movimentação, como retornado pelos extratores.
+    :return: Hash hexadecimal da movimentação.
+    """
+    return sha1(dumps(movimentacao, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
 
 
 class DataExtractor:
@@ -28,37 +49,77 @@ class DataExtractor:
         except AttributeError:
             return None
 
-    def find_table_data(self, table_id):
+    def find_table_data(self, table_id, movimentacao_conhecida=None):
         """
         Encontra e retorna os dados de uma tabela com o ID fornecido.
 
         :param table_id: ID da tabela HTML.
+        :param movimentacao_conhecida: Impressão digital da movimentação mais recente já capturada. Se informada,
+                                       as movimentações são lidas apenas até ela (exclusive).
         :return: Dados da tabela encontrada ou redireciona para outra tabela dependendo da ID.
         """
         # Inicializa a lista que conterá os dados da tabela.
         table_data = []
 
         # Procura a tabela pelo ID especificado, com lógica específica se o 'Partes' estiver presente no ID.
-        table = self.soup.find('table', {'id': table_id}) \
-            if 'Partes' in table_id \
-            else self.soup.find('tbody', {'id': table_id})
+        table = self._encontrar_tabela(table_id)
 
         # Se a tabela for encontrada, processa as linhas.
-        if table:
-            rows = table.find_all('tr')
-            table_data = [
-                self._capturar_texto_partes(row) if 'Partes' in table_id else self._capturar_movimentacoes(row)
-                for row in rows
-            ]
+        if table is not None:
+            rows = self._linhas_tabela(table)
+            if 'Partes' in table_id:
+                table_data = [self._capturar_texto_partes(row) for row in rows]
+            else:
+                table_data = self._capturar_movimentacoes_novas(rows, movimentacao_conhecida)
 
         # Se a tabela não for encontrada, redireciona para outra tabela com base no ID.
-        if not table and 'tableTodasPartes' == table_id:
+        if table is None and 'tableTodasPartes' == table_id:
             return self.find_table_data(table_id="tablePartesPrincipais")
-        elif not table and 'tabelaTodasMovimentacoes' == table_id:
-            return self.find_table_data(table_id='tabelaUltimasMovimentacoes')
+        elif table is None and 'tabelaTodasMovimentacoes' == table_id:
+            return self.find_table_data(table_id='tabelaUltimasMovimentacoes',
+                                        movimentacao_conhecida=movimentacao_conhecida)
 
         return table_data
 
+    def _capturar_movimentacoes_novas(self, rows, movimentacao_conhecida=None):
+        """
+        Captura as movimentações das linhas da tabela, da mais recente para a mais antiga, parando ao chegar
+        na movimentação já conhecida.
+
+        :param rows: Linhas (tr) da tabela de movimentações.
+        :param movimentacao_conhecida: Impressão digital da movimentação mais recente já capturada (None para
+                                       capturar todas).
+        :return: Lista de movimentações anteriores à conhecida.
+        """
+        movimentacoes = []
+        for row in rows:
+            movimentacao = self._capturar_movimentacoes(row)
+            if movimentacao_conhecida and impressao_movimentacao(movimentacao) == movimentacao_conhecida:
+                break
+            movimentacoes.append(movimentacao)
+        return movimentacoes
+
+    def _encontrar_tabela(self, table_id):
+        """
+        Encontra a tabela com o ID fornecido: uma tag table para as partes, ou uma tag tbody para as movimentações.
+
+        :param table_id: ID da tabela HTML.
+        :return: Objeto BeautifulSoup da tabela ou None se não for encontrada.
+        """
+        return self.soup.find('table', {'id': table_id}) \
+            if 'Partes' in table_id \
+            else self.soup.find('tbody', {'id': table_id})
+
+    @staticmethod
+    def _linhas_tabela(table):
+        """
+        Retorna todas as linhas de uma tabela.
+
+        :param table: Objeto BeautifulSoup da tabela.
+        :return: Lista de linhas (tr) da tabela.
+        """
+        return table.find_all('tr')
+
     @staticmethod
     def _capturar_texto_partes(row):
         """
@@ -139,15 +200,410 @@ class DataExtractor:
             return titulo_movimentacao, descricao_movimentacao
         return titulo_movimentacao, None
 
-    def extract(self, fields):
+    def extract(self, fields, movimentacao_conhecida=None):
         """
         Extrai os dados especificados dos campos fornecidos e retorna como um dicionário.
 
         :param fields: Dicionário contendo os nomes dos campos e os IDs de tag correspondentes.
+        :param movimentacao_conhecida: Impressão digital da movimentação mais recente já capturada. Se informada,
+                                       apenas as movimentações novas são extraídas.
         :return: Dicionário contendo os dados extraídos.
         """
         return {
             field_name: self.find_text(tag_id) if tag_id not in ["tableTodasPartes", "tabelaTodasMovimentacoes"]
+            else self.find_table_data(tag_id, movimentacao_conhecida) if tag_id == "tabelaTodasMovimentacoes"
             else self.find_table_data(tag_id)
             for field_name, tag_id in fields.items()
         }
+
+
+class LxmlDataExtractor(DataExtractor):
+    """
+    Classe LxmlDataExtractor extrai as mesmas informações de DataExtractor usando o parser lxml.
+
+    O documento é analisado pelo lxml (em C) e um índice de IDs é montado em uma única passagem, de modo que
+    cada campo é localizado sem percorrer a árvore novamente. O texto extraído é o mesmo de DataExtractor, inclusive
+    com CR, NUL e seções CDATA. Em HTML malformado a árvore montada pode ser diferente, pois o lxml fecha as tags
+    implicitamente como os navegadores e o html.parser não: um <td> ou <tr> sem fechamento termina no próximo <td>
+    ou <tr>, e um <p> termina no próximo <p>, enquanto no html.parser o conteúdo seguinte fica dentro deles. Um </p>
+    sem abertura também é ignorado pelo lxml, mas separa o texto ao redor em dois trechos no html.parser.
+
+    :param html: String HTML da qual os dados serão extraídos.
+    """
+
+    # Tags cujo conteúdo não é considerado texto pelo BeautifulSoup
+    TAGS_SEM_TEXTO = ('script', 'style', 'template')
+
+    # O lxml troca CR por LF e NUL por U+FFFD no texto, e descarta as seções CDATA, enquanto o html.parser mantém
+    # os três. CR e NUL são trocados por não-caracteres Unicode antes da análise e restaurados ao ler o texto, e as
+    # seções CDATA viram texto escapado dentro de TAG_CDATA. Tags com CR ou NUL são mantidas, pois nelas o CR separa
+    # os atributos.
+    TAG_CDATA = 'x-cdata'
+    PADRAO_PREPARACAO = re.compile(r'<!\[CDATA\[(.*?)\]\]>|(<[!/?a-zA-Z][^>]*[\r\x00][^>]*>)|[\r\x00]+', re.S)
+    SUBSTITUTOS = str.maketrans("\r\x00", "\ufdd0\ufdd1")
+    RESTAURADOS = str.maketrans("\ufdd0\ufdd1", "\r\x00")
+
+    def __init__(self, html):
+        """
+        Analisa o HTML com o lxml e monta o índice de IDs do documento.
+
+        :param html: String HTML da qual os dados serão extraídos.
+        """
+        html = self._preparar_html(html)
+        try:
+            self.root = document_fromstring(html)
+        except ValueError:
+            # Strings com declaração de encoding precisam ser analisadas como bytes
+            self.root = document_fromstring(html.encode('utf-8'))
+        except ParserError:
+            # Documento vazio: nenhum campo será encontrado
+            self.root = Element('html')
+
+        # Remove o conteúdo de scripts e estilos, mantendo o texto que vem depois deles
+        strip_elements(self.root, *self.TAGS_SEM_TEXTO, with_tail=False)
+
+        # Índice com o primeiro elemento de cada ID, montado em uma única passagem pelo documento
+        self.ids = {}
+        for element in self.root.xpath('//*[@id]'):
+            self.ids.setdefault(element.get('id'), element)
+
+    @classmethod
+    def _preparar_html(cls, html):
+        """
+        Prepara o HTML para o lxml, preservando o CR, o NUL e as seções CDATA como o html.parser.
+
+        :param html: String HTML da qual os dados serão extraídos.
+        :return: String HTML preparada.
+        """
+        def substituir(match):
+            cdata, tag = match.groups()
+            if cdata is not None:
+                # Para o BeautifulSoup a seção CDATA é um nó de texto próprio, separado do texto ao redor
+                return f"<{cls.TAG_CDATA}>{escape(cdata, quote=False).translate(cls.SUBSTITUTOS)}</{cls.TAG_CDATA}>"
+            if tag is not None:
+                return tag
+            return match.group(0).translate(cls.SUBSTITUTOS)
+
+        return cls.PADRAO_PREPARACAO.sub(substituir, html)
+
+    def find_text(self, tag_id):
+        """
+        Encontra e retorna o texto de uma tag com o ID fornecido.
+
+        :param tag_id: ID da tag HTML.
+        :return: Texto encontrado ou None se a tag não for encontrada.
+        """
+        element = self.ids.get(tag_id)
+        if element is None:
+            return None
+        return self._texto(element)
+
+    def _encontrar_tabela(self, table_id):
+        """
+        Encontra a tabela com o ID fornecido: uma tag table para as partes, ou uma tag tbody para as movimentações.
+
+        :param table_id: ID da tabela HTML.
+        :return: Elemento lxml da tabela ou None se não for encontrada.
+        """
+        tag = 'table' if 'Partes' in table_id else 'tbody'
+        element = self.ids.get(table_id)
+        if element is None or element.tag == tag:
+            return element
+
+        # O primeiro elemento com o ID não é da tag esperada, procura o primeiro que seja
+        return next((item for item in self.root.iter(tag) if item.get('id') == table_id), None)
+
+    @staticmethod
+    def _linhas_tabela(table):
+        """
+        Retorna todas as linhas de uma tabela.
+
+        :param table: Elemento lxml da tabela.
+        :return: Lista de linhas (tr) da tabela.
+        """
+        return list(table.iterdescendants('tr'))
+
+    @classmethod
+    def _capturar_texto_partes(cls, row):
+        """
+        Captura informações de texto de partes a partir de uma linha de tabela.
+
+        :param row: Elemento lxml representando uma linha de tabela.
+        :return: Dicionário contendo informações sobre o tipo de parte, o nome da parte (se não for um advogado)
+                 e a defesa (se for um advogado).
+        """
+        # Encontra o tipo da parte (por exemplo, Reclamante, Reclamado) na célula com a classe 'label'.
+        tipo_parte = cls._texto(cls._encontrar_por_classe(row, 'td', 'label'))
+
+        # Encontra o conteúdo da parte na célula com a classe 'nomeParteEAdvogado'.
+        conteudo_parte = cls._encontrar_por_classe(row, 'td', 'nomeParteEAdvogado')
+
+        # Se a parte não for um advogado, captura o nome diretamente.
+        nao_advogado = cls._texto(cls._proximo_no(conteudo_parte))
+
+        # Se a parte for um advogado, captura os detalhes do advogado, como nome e inscrição.
+        advogados = {
+            cls._texto(span): cls._texto(cls._proximo_irmao(span))
+            for span in conteudo_parte.iterdescendants('span')
+        }
+
+        return {
+            tipo_parte: nao_advogado,
+            "Defesa": advogados
+        }
+
+    def _capturar_movimentacoes(self, row):
+        """
+        Captura informações de movimentações a partir de uma linha de tabela.
+
+        :param row: Elemento lxml representando uma linha de tabela.
+        :return: Dicionário contendo informações sobre a movimentação.
+        """
+        # Tenta encontrar a data da movimentação.
+        data = self._encontrar_por_classe(row, 'td', 'dataMovimentacao')
+        if data is None:
+            data = self._encontrar_por_classe(row, 'td', 'dataMovimentacaoProcesso')
+        data_movimentacao = self._texto(data)
+
+        # Encontra a célula da tabela que contém os detalhes da movimentação.
+        movimentacao = self._encontrar_por_classe(row, 'td', 'descricaoMovimentacao')
+        if movimentacao is None:
+            movimentacao = self._encontrar_por_classe(row, 'td', 'descricaoMovimentacaoProcesso')
+
+        # Extrai o título e a descrição da movimentação.
+        titulo_movimentacao, descricao_movimentacao = self._capturar_dados_movimentacoes(movimentacao)
+
+        return {
+            "Data": data_movimentacao,
+            "Movimento": {
+                "titulo_movimentacao": titulo_movimentacao,
+                "descricao_movimentacao": descricao_movimentacao
+            }
+        }
+
+    @classmethod
+    def _capturar_dados_movimentacoes(cls, movimentacao):
+        """
+        Captura detalhes das movimentações, como título e descrição.
+
+        :param movimentacao: Elemento lxml representando a célula da tabela com os dados de movimentação.
+        :return: Título e descrição da movimentação.
+        """
+        # Divide o texto da célula em título e descrição, assim como DataExtractor faz com o separador "|||".
+        titulo_movimentacao, separador, descricao_movimentacao = cls._texto(
+            movimentacao, separator="|||"
+        ).partition("|||")
+
+        if separador:
+            return titulo_movimentacao, descricao_movimentacao
+        return titulo_movimentacao, None
+
+    @classmethod
+    def _texto(cls, node, separator=""):
+        """
+        Reproduz o get_text(strip=True) do BeautifulSoup para um elemento ou um nó de texto.
+
+        :param node: Elemento lxml, string (nó de texto) ou comentário.
+        :param separator: Separador usado entre os textos encontrados.
+        :return: Texto encontrado, sem espaços nas extremidades de cada trecho.
+        :raises AttributeError: Se o nó não existir, assim como no BeautifulSoup.
+        """
+        if node is None:
+            raise AttributeError("'NoneType' object has no attribute 'get_text'")
+        if isinstance(node, str):
+            return node.translate(cls.RESTAURADOS).strip()
+        if not isinstance(node.tag, str):
+            # Comentários não possuem texto para o BeautifulSoup
+            return ""
+        textos = (texto.translate(cls.RESTAURADOS).strip() for texto in node.itertext())
+        return separator.join(texto for texto in textos if texto)
+
+    @staticmethod
+    def _encontrar_por_classe(element, tag, classe):
+        """
+        Encontra o primeiro descendente com a tag e a classe fornecidas, como o find(tag, class_=classe).
+
+        :param element: Elemento lxml onde a busca será feita.
+        :param tag: Nome da tag procurada.
+        :param classe: Classe CSS procurada.
+        :return: Elemento encontrado ou None.
+        """
+        for item in element.iterdescendants(tag):
+            classes = item.get('class')
+            if classes is not None and (classe in classes.split() or classes == classe):
+                return item
+        return None
+
+    @staticmethod
+    def _proximo_no(element):
+        """
+        Reproduz o atributo next do BeautifulSoup: o nó que vem logo após a abertura da tag no documento.
+
+        :param element: Elemento lxml.
+        :return: String (nó de texto), elemento, comentário ou None.
+        """
+        if element.text is not None:
+            return element.text
+        if len(element):
+            return element[0]
+
+        # Elemento vazio: o próximo nó é o que vem depois dele ou de um de seus ancestrais
+        while element is not None:
+            if element.tail is not None:
+                return element.tail
+            proximo = element.getnext()
+            if proximo is not None:
+                return proximo
+            element = element.getparent()
+        return None
+
+    @staticmethod
+    def _proximo_irmao(element):
+        """
+        Reproduz o atributo next_sibling do BeautifulSoup.
+
+        :param element: Elemento lxml.
+        :return: String (texto após o elemento), próximo elemento irmão ou None.
+        """
+        if element.tail is not None:
+            return element.tail
+        return element.getnext()
+
+
+class StreamingDataExtractor(LxmlDataExtractor):
+    """
+    Classe StreamingDataExtractor extrai as mesmas informações de LxmlDataExtractor sem montar a árvore completa,
+    com as mesmas diferenças em relação ao html.parser em HTML malformado.
+
+    O HTML é lido de forma incremental (iterparse): apenas os elementos com os IDs solicitados, e os seus
+    ancestrais, são mantidos; o conteúdo dos demais elementos é descartado assim que termina de ser lido. A leitura
+    é interrompida assim que todos os campos solicitados forem encontrados, reduzindo a memória e o processamento
+    em páginas grandes.
+
+    :param html: String HTML da qual os dados serão extraídos.
+    """
+
+    # Tabelas usadas quando a tabela principal não existe na página, como em DataExtractor.find_table_data
+    TABELAS_ALTERNATIVAS = {
+        "tableTodasPartes": "tablePartesPrincipais",
+        "tabelaTodasMovimentacoes": "tabelaUltimasMovimentacoes",
+    }
+
+    def __init__(self, html):
+        """
+        Armazena o HTML; a leitura é feita em extract, quando os IDs necessários são conhecidos.
+
+        :param html: String HTML da qual os dados serão extraídos.
+        """
+        self.html = html
+        self.ids = {}
+        self.elementos = {}
+
+    def extract(self, fields, movimentacao_conhecida=None):
+        """
+        Lê apenas as partes do HTML necessárias para os campos fornecidos e extrai os dados.
+
+        :param fields: Dicionário contendo os nomes dos campos e os IDs de tag correspondentes.
+        :param movimentacao_conhecida: Impressão digital da movimentação mais recente já capturada. Se informada,
+                                       apenas as movimentações novas são extraídas.
+        :return: Dicionário contendo os dados extraídos.
+        """
+        self._ler_elementos(fields.values())
+        return super().extract(fields, movimentacao_conhecida)
+
+    def _encontrar_tabela(self, table_id):
+        """
+        Encontra a tabela com o ID fornecido entre os elementos lidos.
+
+        :param table_id: ID da tabela HTML.
+        :return: Elemento lxml da tabela ou None se não for encontrada.
+        """
+        tag = self._tag_tabela(table_id)
+        return next((element for element in self.elementos.get(table_id, []) if element.tag == tag), None)
+
+    @staticmethod
+    def _tag_tabela(table_id):
+        """
+        Retorna a tag esperada de uma tabela: table para as partes e tbody para as movimentações.
+
+        :param table_id: ID da tabela HTML.
+        :return: Nome da tag.
+        """
+        return 'table' if 'Partes' in table_id else 'tbody'
+
+    def _ler_elementos(self, tag_ids):
+        """
+        Lê o HTML de forma incremental, guardando os elementos com os IDs fornecidos (e as tabelas alternativas)
+        até que todos tenham sido encontrados.
+
+        :param tag_ids: IDs das tags HTML necessárias.
+        """
+        tag_ids = set(tag_ids)
+        alternativas = {self.TABELAS_ALTERNATIVAS[tag_id] for tag_id in tag_ids & self.TABELAS_ALTERNATIVAS.keys()}
+        buscados = tag_ids | alternativas
+        pendentes = set(tag_ids)
+        protegidos = set()
+        profundidade = 0
+
+        self.elementos = {}
+        try:
+            html = BytesIO(self._preparar_html(self.html).encode('utf-8'))
+            for evento, element in iterparse(html, events=('start', 'end'), html=True, encoding='utf-8',
+                                             remove_comments=False):
+                tag_id = element.get('id')
+
+                if evento == 'start':
+                    if tag_id in buscados:
+                        profundidade += 1
+                        self.elementos.setdefault(tag_id, []).append(element)
+                    continue
+
+                if tag_id in buscados:
+                    profundidade -= 1
+                    # Mantém os ancestrais, usados para localizar o nó seguinte a um elemento vazio
+                    protegidos.update(element.iterancestors())
+                    if tag_id in pendentes and (tag_id not in self.TABELAS_ALTERNATIVAS
+                                                or element.tag == self._tag_tabela(tag_id)):
+                        pendentes.discard(tag_id)
+                    if not pendentes:
+                        break
+                elif profundidade == 0 and element not in protegidos:
+                    # Descarta o conteúdo de elementos que não serão usados
+                    element.clear(keep_tail=True)
+        except XMLSyntaxError:
+            # Documento vazio: nenhum campo será encontrado
+            pass
+
+        for elements in self.elementos.values():
+            for element in elements:
+                strip_elements(element, *self.TAGS_SEM_TEXTO, with_tail=False)
+        self.ids = {tag_id: elements[0] for tag_id, elements in self.elementos.items()}
+
+
+# Backends de análise de HTML disponíveis, selecionados pela variável de ambiente PARSER_HTML
+EXTRATORES = {
+    "html.parser": DataExtractor,
+    "lxml": LxmlDataExtractor,
+    "streaming": StreamingDataExtractor,
+}
+
+# Backend usado quando PARSER_HTML não é definida. Os backends em lxml montam uma árvore diferente em HTML malformado,
+# o que mudaria a saída e as impressões digitais das movimentações já capturadas.
+PARSER_HTML_PADRAO = "html.parser"
+
+
+def criar_extrator(html, parser=None):
+    """
+    Cria o extrator de dados com o backend de análise de HTML configurado.
+
+    :param html: String HTML da qual os dados serão extraídos.
+    :param parser: Nome do backend ("lxml", "streaming" ou "html.parser"). Usa PARSER_HTML se não informado.
+    :return: Instância de DataExtractor ou de uma de suas subclasses.
+    :raises InvalidParameterError: Se o backend informado não existir.
+    """
+    parser = parser or config("PARSER_HTML", default=PARSER_HTML_PADRAO)
+    try:
+        extrator = EXTRATORES[parser]
+    except KeyError:
+        raise InvalidParameterError(f"Parser HTML '{parser}' não suportado, use um de {list(EXTRATORES)}")
+    return extrator(html)
@@ -0,0 +1,103 @@
+from asyncio import get_running_loop
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from logging import getLogger
+from multiprocessing import get_context
+from os import cpu_count
+
+from decouple import config
+
+from api.exceptions import InvalidParameterError
+
+logger = getLogger(__name__)
+
+
+class ExtracaoExecutor:
+    """
+    Classe ExtracaoExecutor executa a extração dos dados do HTML fora do event loop.
+
+    Por padrão usa um ProcessPoolExecutor limitado, para que a análise de páginas grandes não bloqueie as
+    demais corotinas e seja distribuída entre os núcleos. Também pode usar um pool de threads ou executar
+    no próprio event loop (útil em testes e depuração).
+
+    :ivar tipo: Tipo de executor: "process", "thread" ou "inline".
+    :ivar max_workers: Número máximo de processos ou threads do pool.
+    :ivar executor: Pool em uso, ou None se ainda não foi iniciado.
+    """
+
+    TIPOS = ("process", "thread", "inline")
+
+    def __init__(self, tipo=None, max_workers=None):
+        """
+        Lê as configurações do executor.
+
+        :param tipo: Tipo de executor. Usa EXTRACAO_EXECUTOR se não informado.
+        :param max_workers: Tamanho do pool. Usa EXTRACAO_WORKERS (ou o número de CPUs) se não informado.
+        :raises InvalidParameterError: Se o tipo de executor não existir.
+        """
+        self.tipo = tipo or config("EXTRACAO_EXECUTOR", default="process")
+        if self.tipo not in self.TIPOS:
+            raise InvalidParameterError(f"Executor de extração '{self.tipo}' não suportado, use um de {self.TIPOS}")
+        self.max_workers = max_workers or config("EXTRACAO_WORKERS", default=cpu_count() or 1, cast=int)
+        self.executor = None
+
+    def start(self):
+        """
+        Cria o pool de execução, caso ainda não exista.
+
+        :return: Pool de execução, ou None no modo "inline".
+        """
+        if self.executor is None and self.tipo != "inline":
+            if self.tipo == "process":
+                # spawn evita herdar threads e conexões abertas do processo pai
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=get_context("spawn"))
+            else:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="extracao")
+            logger.info(f"Executor de extração '{self.tipo}' iniciado com {self.max_workers} workers")
+        return self.executor
+
+    def close(self):
+        """Encerra o pool de execução, aguardando as extrações em andamento."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            logger.info("Executor de extração encerrado")
+        self.executor = None
+
+    async def run(self, func, *args):
+        """
+        Executa a função no pool e aguarda o resultado sem bloquear o event loop.
+
+        :param func: Função a ser executada. No modo "process" deve ser importável (definida no nível de módulo
+                     ou como método estático) e receber apenas argumentos serializáveis.
+        :param args: Argumentos posicionais da função.
+        :return: Resultado da função.
+        :raises BrokenProcessPool: Se o processo da extração morrer também na nova tentativa.
+        """
+        if self.tipo == "inline":
+            return func(*args)
+
+        for tentativa in (1, 2):
+            executor = self.start()
+            try:
+                return await get_running_loop().run_in_executor(executor, func, *args)
+            except BrokenProcessPool:
+                # Um processo do pool morreu (falta de memória ou falha no parser) e o pool não aceita mais
+                # tarefas: é substituído por um novo, e a extração é repetida uma única vez
+                self._descartar(executor)
+                if tentativa == 2:
+                    raise
+                logger.error("Pool de extração quebrado por um processo encerrado, recriando o pool")
+
+    def _descartar(self, executor):
+        """
+        Descarta um pool quebrado, para que a próxima extração crie um novo.
+
+        :param executor: Pool quebrado. Se já tiver sido substituído por outra extração, o pool atual é mantido.
+        """
+        if self.executor is executor:
+            self.executor = None
+        executor.shutdown(wait=False)
+
+
+# Instância compartilhada pelo processo, encerrada junto com o worker.
+extracao_executor = ExtracaoExecutor()
@@ -0,0 +1,185 @@
+from asyncio import TimeoutError, sleep
+from contextlib import nullcontext
+from logging import getLogger
+from random import uniform
+from typing import NamedTuple
+
+from aiohttp import ClientError, ClientResponseError, ClientSession, ClientTimeout, TCPConnector
+from decouple import config
+from multidict import CIMultiDict
+
+logger = getLogger(__name__)
+
+# Status HTTP que indicam uma falha transitória do tribunal, repetidos com backoff
+STATUS_RETENTAVEIS = {429, 500, 502, 503, 504}
+
+
+class RespostaHttp(NamedTuple):
+    """
+    Resposta de uma requisição HTTP já lida por completo, após a conexão ser devolvida ao pool.
+
+    :ivar status: Código de status HTTP.
+    :ivar headers: Cabeçalhos da resposta.
+    :ivar texto: Corpo da resposta decodificado.
+    """
+    status: int
+    headers: CIMultiDict
+    texto: str
+
+
+class HttpClient:
+    """
+    Classe HttpClient gerencia uma única ClientSession compartilhada por todo o processo.
+
+    A sessão mantém as conexões abertas (keep-alive), limita o número de conexões por host,
+    guarda em cache as resoluções de DNS e aplica os timeouts configurados, evitando que cada
+    consulta aos TJs pague novamente os handshakes TCP/TLS.
+
+    :ivar limite_conexoes: Número máximo de conexões simultâneas do processo.
+    :ivar limite_conexoes_por_host: Número máximo de conexões simultâneas por host.
+    :ivar ttl_cache_dns: Tempo, em segundos, que uma resolução de DNS fica em cache.
+    :ivar keepalive_timeout: Tempo, em segundos, que uma conexão ociosa é mantida aberta.
+    :ivar timeout: Timeouts aplicados às requisições.
+    :ivar max_tentativas: Número máximo de tentativas de uma requisição GET com falha transitória.
+    :ivar backoff_base: Espera, em segundos, antes da segunda tentativa, dobrada a cada nova tentativa.
+    :ivar backoff_maximo: Espera máxima, em segundos, entre duas tentativas.
+    :ivar fabrica_resolvedor: Função sem argumentos que cria o resolvedor de DNS do conector, ou None para o
+                              resolvedor padrão do aiohttp.
+    :ivar session: ClientSession compartilhada, ou None se ainda não foi iniciada.
+    """
+
+    def __init__(self, fabrica_resolvedor=None):
+        """
+        Lê as configurações do pool de conexões a partir das variáveis de ambiente.
+
+        :param fabrica_resolvedor: Função sem argumentos que cria o resolvedor de DNS do conector, chamada com o
+                                   event loop em execução. Usa o resolvedor padrão do aiohttp se não informada.
+        """
+        self.limite_conexoes = config("HTTP_LIMITE_CONEXOES", default=100, cast=int)
+        self.limite_conexoes_por_host = config("HTTP_LIMITE_CONEXOES_POR_HOST", default=20, cast=int)
+        self.ttl_cache_dns = config("HTTP_TTL_CACHE_DNS", default=300, cast=int)
+        self.keepalive_timeout = config("HTTP_KEEPALIVE_TIMEOUT", default=30, cast=float)
+        self.timeout = ClientTimeout(
+            total=config("HTTP_TIMEOUT_TOTAL", default=60, cast=float),
+            connect=config("HTTP_TIMEOUT_CONEXAO", default=10, cast=float),
+            sock_read=config("HTTP_TIMEOUT_LEITURA", default=30, cast=float),
+        )
+        self.max_tentativas = config("HTTP_MAX_TENTATIVAS", default=3, cast=int)
+        self.backoff_base = config("HTTP_BACKOFF_BASE", default=0.5, cast=float)
+        self.backoff_maximo = config("HTTP_BACKOFF_MAXIMO", default=10, cast=float)
+        self.fabrica_resolvedor = fabrica_resolvedor
+        self.session = None
+
+    async def start(self):
+        """
+        Cria o conector e a ClientSession compartilhada, caso ainda não existam.
+
+        :return: ClientSession compartilhada.
+        """
+        if self.session is None or self.session.closed:
+            connector = TCPConnector(
+                limit=self.limite_conexoes,
+                limit_per_host=self.limite_conexoes_por_host,
+                ttl_dns_cache=self.ttl_cache_dns,
+                keepalive_timeout=self.keepalive_timeout,
+                resolver=self.fabrica_resolvedor() if self.fabrica_resolvedor is not None else None,
+            )
+            self.session = ClientSession(connector=connector, timeout=self.timeout)
+            logger.info("Sessão HTTP compartilhada iniciada")
+        return self.session
+
+    async def close(self):
+        """Fecha a ClientSession compartilhada e libera as conexões abertas."""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+            logger.info("Sessão HTTP compartilhada encerrada")
+        self.session = None
+
+    async def get_session(self):
+        """
+        Obtém a ClientSession compartilhada, iniciando-a se necessário.
+
+        :return: ClientSession compartilhada.
+        """
+        return await self.start()
+
+    async def get(self, url, params=None, allow_redirects=True, limitador=None, disjuntor=None):
+        """
+        Realiza uma requisição GET, repetindo-a com backoff exponencial e jitter em caso de erro de conexão,
+        timeout ou status transitório (429 e 5xx).
+
+        Cada tentativa passa pelo limitador do tribunal. O resultado final (sucesso ou tentativas esgotadas)
+        é registrado no disjuntor, que interrompe as requisições ao tribunal após falhas consecutivas.
+
+        :param url: URL da requisição.
+        :param params: Parâmetros da query string.
+        :param allow_redirects: Indica se os redirecionamentos devem ser seguidos.
+        :param limitador: LimitadorTribunal que controla o ritmo das requisições (None para não limitar).
+        :param disjuntor: DisjuntorTribunal do tribunal (None para não usar circuit breaker).
+        :return: RespostaHttp com o status, os cabeçalhos e o corpo da resposta.
+        :raises TribunalIndisponivelError: Se o circuito do tribunal estiver aberto.
+        :raises ClientError: Se todas as tentativas falharem por erro de conexão ou status transitório.
+        :raises TimeoutError: Se todas as tentativas falharem por timeout.
+        """
+        if disjuntor is not None:
+            disjuntor.verificar()
+
+        try:
+            for tentativa in range(1, self.max_tentativas + 1):
+                try:
+                    resposta = await self._get(url, params, allow_redirects, limitador)
+                except (ClientError, TimeoutError) as e:
+                    if tentativa == self.max_tentativas:
+                        logger.error(f"Requisição a {url} falhou após {tentativa} tentativas: {e!r}")
+                        if disjuntor is not None:
+                            disjuntor.registrar_falha()
+                        raise
+                    espera = self.backoff(tentativa)
+                    logger.warning(f"Tentativa {tentativa} de requisição a {url} falhou ({e!r}), "
+                                   f"nova tentativa em {espera:.2f}s")
+                    await sleep(espera)
+                else:
+                    if disjuntor is not None:
+                        disjuntor.registrar_sucesso()
+                    return resposta
+        except BaseException:
+            # Cancelamento ou erro fora da requisição (no limitador, por exemplo): sem resultado a registrar, mas a
+            # requisição de teste do circuito meio aberto precisa ser liberada
+            if disjuntor is not None:
+                disjuntor.liberar_teste()
+            raise
+
+    async def _get(self, url, params, allow_redirects, limitador):
+        """
+        Realiza uma única tentativa da requisição GET e lê o corpo da resposta.
+
+        :param url: URL da requisição.
+        :param params: Parâmetros da query string.
+        :param allow_redirects: Indica se os redirecionamentos devem ser seguidos.
+        :param limitador: LimitadorTribunal que controla o ritmo das requisições (None para não limitar).
+        :return: RespostaHttp com o status, os cabeçalhos e o corpo da resposta.
+        :raises ClientResponseError: Se o status da resposta for transitório.
+        """
+        session = await self.get_session()
+        async with limitador.reservar() if limitador is not None else nullcontext():
+            async with session.get(url, params=params, allow_redirects=allow_redirects) as response:
+                if response.status in STATUS_RETENTAVEIS:
+                    raise ClientResponseError(
+                        response.request_info, response.history, status=response.status, message=response.reason
+                    )
+                return RespostaHttp(status=response.status, headers=CIMultiDict(response.headers),
+                                    texto=await response.text())
+
+    def backoff(self, tentativa):
+        """
+        Calcula a espera antes da próxima tentativa (backoff exponencial com full jitter). Usado também nas novas
+        tentativas dos callbacks.
+
+        :param tentativa: Número da tentativa que falhou, começando em 1.
+        :return: Espera, em segundos.
+        """
+        return uniform(0, min(self.backoff_maximo, self.backoff_base * 2 ** (tentativa - 1)))
+
+
+# Instância compartilhada pelo processo, iniciada e encerrada junto com a aplicação.
+http_client = HttpClient()
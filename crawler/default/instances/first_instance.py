@@ -1,43 +1,61 @@
-from logging import basicConfig, getLogger, INFO
+from logging import getLogger
 from re import search
-from aiohttp import ClientSession
 from api.exceptions import InvalidParameterError
-from crawler.default.data_extractor import DataExtractor
+from api.services.metricas import medir
+from crawler.default.data_extractor import criar_extrator
+from crawler.default.executor import extracao_executor
+from crawler.default.http_client import http_client as http_client_compartilhado
+from crawler.default.snapshot import armazem_snapshots
 
-# Configurando o log
-basicConfig(filename='app.txt',
-            level=INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = getLogger(__name__)
 
 
 class FirstInstance:
-    def __init__(self, codigo_tj, url_base):
+    def __init__(self, codigo_tj, url_base, http_client=None, executor=None, limitador=None, disjuntor=None,
+                 sigla=None, snapshots=None):
         """
         Inicializa a classe FirstInstance.
 
         :param codigo_tj: Código de identificação do Tribunal de Justiça.
         :param url_base: URL base para as consultas HTTP.
+        :param http_client: HttpClient que fornece a sessão HTTP compartilhada. Usa o do processo se não informado.
+        :param executor: ExtracaoExecutor que executa a extração do HTML. Usa o do processo se não informado.
+        :param limitador: LimitadorTribunal que controla o ritmo das requisições ao tribunal (None para não limitar).
+        :param disjuntor: DisjuntorTribunal que interrompe as requisições ao tribunal após falhas consecutivas.
+        :param sigla: Sigla do tribunal, usada nas métricas. Usa o código do TJ se não informada.
+        :param snapshots: ArmazemSnapshots que guarda as páginas capturadas. Usa o do processo se não informado.
         """
         self.url_base = url_base
         self.codigo_tj = codigo_tj
-
-    async def capturar_dados(self, numero_processo):
+        self.http_client = http_client or http_client_compartilhado
+        self.executor = executor or extracao_executor
+        self.limitador = limitador
+        self.disjuntor = disjuntor
+        self.sigla = sigla or codigo_tj
+        self.snapshots = snapshots or armazem_snapshots
+
+    async def capturar_dados(self, numero_processo, movimentacao_conhecida=None):
         """
         Método público para iniciar a captura de dados da primeira instância.
         Realiza a busca, consulta, e extração dos dados relacionados ao número do processo fornecido.
 
         :param numero_processo: Número do processo a ser capturado.
+        :param movimentacao_conhecida: Impressão digital da movimentação mais recente já capturada. Se informada,
+                                       apenas as movimentações novas são extraídas.
         :return: Dados extraídos do processo.
         """
         logger.info("Iniciando captura dados primeira instancia")
-        processo_codigo = await self._capturar_numero_processo_codigo(numero_processo=numero_processo)
+        with medir("busca", self.sigla, "primeira"):
+            processo_codigo = await self._capturar_numero_processo_codigo(numero_processo=numero_processo)
         if not processo_codigo:
             logger.info("Número de processo não encontrado")
             return None
-        html = await self._consultar_processo(processo_codigo=processo_codigo, numero_processo=numero_processo)
+        with medir("consulta", self.sigla, "primeira"):
+            html = await self._consultar_processo(processo_codigo=processo_codigo, numero_processo=numero_processo)
+        await self.snapshots.salvar(html, self.sigla, "primeira", numero_processo)
         logger.info("Extraindo dados primeira instancia")
-        return self._extrair_dados(html=html)
+        with medir("extracao", self.sigla, "primeira"):
+            return await self.executor.run(self._extrair_dados, html, movimentacao_conhecida)
 
     async def _capturar_numero_processo_codigo(self, numero_processo):
         """
@@ -58,29 +76,28 @@ class FirstInstance:
                         f"o código da sigla do TJ '{self.codigo_tj}' sejam compatíveis."
             )
 
-        async with ClientSession() as client:
-            response = await client.get(
-                url=f"{self.url_base}/cpopg/search.do?"
-                    f"conversationId=&"
-                    f"cbPesquisa=NUMPROC&"
-                    f"numeroDigitoAnoUnificado={numero_digito_ano_unificado[:-1]}&"
-                    f"foro_numero_unificado={foro_numero_unificado[1:]}&"
-                    f"dadosConsulta.valorConsultaNuUnificado={numero_processo}&"
-                    f"dadosConsulta.valorConsultaNuUnificado=UNIFICADO&"
-                    f"dadosConsulta.valorConsulta=&"
-                    f"dadosConsulta.tipoNuProcesso=UNIFICADO",
-                allow_redirects=False,
-            )
-
-            try:
-                processo_codigo = search(r'(?<=processo.codigo=)(.*?)(?=&)', response.headers.get('location', "")).group()
-            except AttributeError:
-                text = await response.text()
-                if 'Não existem informações disponíveis' in text:
-                    return None
-                else:
-                    logger.error("Situação inesperada na execução")
-                    return None
+        response = await self.http_client.get(
+            url=f"{self.url_base}/cpopg/search.do?"
+                f"conversationId=&"
+                f"cbPesquisa=NUMPROC&"
+                f"numeroDigitoAnoUnificado={numero_digito_ano_unificado[:-1]}&"
+                f"foro_numero_unificado={foro_numero_unificado[1:]}&"
+                f"dadosConsulta.valorConsultaNuUnificado={numero_processo}&"
+                f"dadosConsulta.valorConsultaNuUnificado=UNIFICADO&"
+                f"dadosConsulta.valorConsulta=&"
+                f"dadosConsulta.tipoNuProcesso=UNIFICADO",
+            allow_redirects=False,
+            limitador=self.limitador,
+            disjuntor=self.disjuntor,
+        )
+        try:
+            processo_codigo = search(r'(?<=processo.codigo=)(.*?)(?=&)', response.headers.get('location', "")).group()
+        except AttributeError:
+            if 'Não existem informações disponíveis' in response.texto:
+                return None
+            else:
+                logger.error("Situação inesperada na execução")
+                return None
 
         return processo_codigo
 
@@ -93,24 +110,26 @@ class FirstInstance:
         :param numero_processo: Número do processo.
         :return: Conteúdo HTML da página do processo.
         """
-        async with ClientSession() as client:
-            response = await client.get(
-                url=f"{self.url_base}/cpopg/show.do",
-                params={
-                    "processo.codigo": processo_codigo,
-                    "processo.foro": "1",
-                    "processo.numero": numero_processo
-                }
-            )
-            return await response.text()
+        response = await self.http_client.get(
+            url=f"{self.url_base}/cpopg/show.do",
+            params={
+                "processo.codigo": processo_codigo,
+                "processo.foro": "1",
+                "processo.numero": numero_processo
+            },
+            limitador=self.limitador,
+            disjuntor=self.disjuntor,
+        )
+        return response.texto
 
     @staticmethod
-    def _extrair_dados(html):
+    def _extrair_dados(html, movimentacao_conhecida=None):
         """
         Método privado para extrair os dados do conteúdo HTML fornecido.
-        Utiliza a classe DataExtractor para extrair informações específicas.
+        Utiliza o DataExtractor do backend configurado para extrair informações específicas.
 
         :param html: Conteúdo HTML da página do processo.
+        :param movimentacao_conhecida: Impressão digital da movimentação mais recente já capturada.
         :return: Dicionário contendo dados extraídos.
         """
         # Definindo os campos a serem extraídos
@@ -125,8 +144,8 @@ class FirstInstance:
             "lista_movimentacoes": "tabelaTodasMovimentacoes"
         }
 
-        # Utilizando o DataExtractor para fazer a extração
-        extractor = DataExtractor(html)
-        dados_extraidos = extractor.extract(fields_to_extract)
+        # Utilizando o DataExtractor do backend configurado para fazer a extração
+        extractor = criar_extrator(html)
+        dados_extraidos = extractor.extract(fields_to_extract, movimentacao_conhecida)
 
         return dados_extraidos
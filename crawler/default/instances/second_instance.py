@@ -1,42 +1,56 @@
-from logging import basicConfig, getLogger, INFO
+from logging import getLogger
 
 from re import search
 
-from aiohttp import ClientSession
-
 from api.exceptions import InvalidParameterError
-from crawler.default.data_extractor import DataExtractor
+from api.services.metricas import medir
+from crawler.default.data_extractor import criar_extrator
+from crawler.default.executor import extracao_executor
+from crawler.default.http_client import http_client as http_client_compartilhado
+from crawler.default.snapshot import armazem_snapshots
 
-# Configurando o log básico com detalhes como nome do arquivo, nível e formato.
-basicConfig(filename='app.txt',
-            level=INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = getLogger(__name__)
 
 
 class SecondInstance:
-    def __init__(self, codigo_tj, url_base):
+    def __init__(self, codigo_tj, url_base, http_client=None, executor=None, limitador=None, disjuntor=None,
+                 sigla=None, snapshots=None):
         """
         Inicializa a classe SecondInstance para extrair dados de uma segunda instância judicial.
 
         :param codigo_tj: Código da instância judicial.
         :param url_base: URL base para a consulta do processo.
+        :param http_client: HttpClient que fornece a sessão HTTP compartilhada. Usa o do processo se não informado.
+        :param executor: ExtracaoExecutor que executa a extração do HTML. Usa o do processo se não informado.
+        :param limitador: LimitadorTribunal que controla o ritmo das requisições ao tribunal (None para não limitar).
+        :param disjuntor: DisjuntorTribunal que interrompe as requisições ao tribunal após falhas consecutivas.
+        :param sigla: Sigla do tribunal, usada nas métricas. Usa o código do TJ se não informada.
+        :param snapshots: ArmazemSnapshots que guarda as páginas capturadas. Usa o do processo se não informado.
         """
         self.url_base = url_base
         self.codigo_tj = codigo_tj
-
-    async def capturar_dados(self, numero_processo):
+        self.http_client = http_client or http_client_compartilhado
+        self.executor = executor or extracao_executor
+        self.limitador = limitador
+        self.disjuntor = disjuntor
+        self.sigla = sigla or codigo_tj
+        self.snapshots = snapshots or armazem_snapshots
+
+    async def capturar_dados(self, numero_processo, movimentacao_conhecida=None):
         """
         Inicia o processo de captura de dados da segunda instância.
 
         :param numero_processo: Número do processo judicial a ser consultado.
+        :param movimentacao_conhecida: Impressão digital da movimentação mais recente já capturada. Se informada,
+                                       apenas as movimentações novas são extraídas.
         :return: Dicionário contendo os dados extraídos ou None se as informações não estiverem disponíveis.
         """
         # Log da iniciação da captura dos dados.
         logger.info("Iniciando captura dados segunda instancia")
 
         # Captura o código do processo.
-        processo_codigo = await self._capturar_numero_processo_codigo(numero_processo=numero_processo)
+        with medir("busca", self.sigla, "segunda"):
+            processo_codigo = await self._capturar_numero_processo_codigo(numero_processo=numero_processo)
 
         # Se o código do processo não for encontrado, registra uma mensagem e retorna None.
         if not processo_codigo:
@@ -44,13 +58,18 @@ class SecondInstance:
             return None
 
         # Consulta os detalhes do processo usando o código capturado.
-        html = await self._consultar_processo(processo_codigo=processo_codigo)
+        with medir("consulta", self.sigla, "segunda"):
+            html = await self._consultar_processo(processo_codigo=processo_codigo)
+
+        # Guarda a página para reprocessamento, se habilitado.
+        await self.snapshots.salvar(html, self.sigla, "segunda", numero_processo)
 
         # Log da extração dos dados.
         logger.info("Extraindo dados segunda instancia")
 
-        # Extração dos dados e retorno.
-        return self._extrair_dados(html=html)
+        # Extração dos dados fora do event loop e retorno.
+        with medir("extracao", self.sigla, "segunda"):
+            return await self.executor.run(self._extrair_dados, html, movimentacao_conhecida)
 
     async def _capturar_numero_processo_codigo(self, numero_processo):
         """
@@ -70,31 +89,31 @@ class SecondInstance:
                         f"o código da sigla do TJ '{self.codigo_tj}' sejam compatíveis."
             )
 
-        # Criando um cliente assíncrono para fazer a requisição HTTP.
-        async with ClientSession() as client:
-            response = await client.get(
-                url=f"{self.url_base}/cposg5/search.do?"
-                    f"conversationId=&"
-                    f"paginaConsulta=0&"
-                    f"cbPesquisa=NUMPROC&"
-                    f"numeroDigitoAnoUnificado={numero_digito_ano_unificado[:-1]}&"
-                    f"foroNumeroUnificado={foro_numero_unificado[1:]}&"
-                    f"dePesquisaNuUnificado={numero_processo}&"
-                    f"dePesquisaNuUnificado=UNIFICADO&"
-                    f"dePesquisa=&"
-                    f"tipoNuProcesso=UNIFICADO"
-            )
-            html = await response.text()
-            # Usando expressão regular para extrair o código do processo.
-            try:
-                processo_codigo = search(r'(?<=id=\"processoSelecionado\"\svalue=\")(.*?)(?=")', html).group()
-            except AttributeError:
-                text = await response.text()
-                if 'Não existem informações disponíveis' in text:
-                    return None
-                else:
-                    logger.error("Situação inesperada na execução")
-                    return None
+        # Realizando a requisição pela sessão HTTP compartilhada, com novas tentativas em falhas transitórias.
+        response = await self.http_client.get(
+            url=f"{self.url_base}/cposg5/search.do?"
+                f"conversationId=&"
+                f"paginaConsulta=0&"
+                f"cbPesquisa=NUMPROC&"
+                f"numeroDigitoAnoUnificado={numero_digito_ano_unificado[:-1]}&"
+                f"foroNumeroUnificado={foro_numero_unificado[1:]}&"
+                f"dePesquisaNuUnificado={numero_processo}&"
+                f"dePesquisaNuUnificado=UNIFICADO&"
+                f"dePesquisa=&"
+                f"tipoNuProcesso=UNIFICADO",
+            limitador=self.limitador,
+            disjuntor=self.disjuntor,
+        )
+        html = response.texto
+        # Usando expressão regular para extrair o código do processo.
+        try:
+            processo_codigo = search(r'(?<=id=\"processoSelecionado\"\svalue=\")(.*?)(?=")', html).group()
+        except AttributeError:
+            if 'Não existem informações disponíveis' in html:
+                return None
+            else:
+                logger.error("Situação inesperada na execução")
+                return None
 
         return processo_codigo
 
@@ -106,21 +125,23 @@ class SecondInstance:
         :return: Conteúdo HTML do processo.
         """
         # Realiza uma solicitação HTTP para obter os detalhes do processo.
-        async with ClientSession() as client:
-            response = await client.get(
-                url=f"{self.url_base}/cposg5/show.do",
-                params={
-                    "processo.codigo": processo_codigo,
-                }
-            )
-            return await response.text()
+        response = await self.http_client.get(
+            url=f"{self.url_base}/cposg5/show.do",
+            params={
+                "processo.codigo": processo_codigo,
+            },
+            limitador=self.limitador,
+            disjuntor=self.disjuntor,
+        )
+        return response.texto
 
     @staticmethod
-    def _extrair_dados(html):
+    def _extrair_dados(html, movimentacao_conhecida=None):
         """
         Extrai os dados de interesse do HTML do processo judicial.
 
         :param html: Conteúdo HTML do processo.
+        :param movimentacao_conhecida: Impressão digital da movimentação mais recente já capturada.
         :return: Dicionário contendo os dados extraídos.
         """
         # Definição dos campos a serem extraídos.
@@ -136,8 +157,8 @@ class SecondInstance:
         }
 
         # Inicialização do extrator de dados.
-        extractor = DataExtractor(html)
+        extractor = criar_extrator(html)
 
         # Extração dos dados e retorno.
-        dados_extraidos = extractor.extract(fields_to_extract)
+        dados_extraidos = extractor.extract(fields_to_extract, movimentacao_conhecida)
         return dados_extraidos
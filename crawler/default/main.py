@@ -1,3 +1,20 @@
+from asyncio import gather, wait_for
+from logging import getLogger
+
+from decouple import config
+
+from crawler.default.http_client import http_client as http_client_compartilhado
+
+logger = getLogger(__name__)
+
+
+class CapturaParcial(dict):
+    """
+    Dados capturados em que uma das instâncias falhou. São devolvidos normalmente, mas não devem ser gravados no
+    cache, para que a falha temporária de uma instância não seja guardada como ausência de dados.
+    """
+
+
 class DefaultTJ:
     """
     Classe DefaultTJ representa uma estrutura básica para um Tribunal de Justiça.
@@ -5,36 +22,119 @@ class DefaultTJ:
 
     :param first_instance: Objeto responsável por gerenciar a primeira instância do tribunal.
     :param second_instance: Objeto responsável por gerenciar a segunda instância do tribunal.
+    :param http_client: HttpClient compartilhado, repassado às instâncias do tribunal.
+    :param limitador: LimitadorTribunal compartilhado pelas instâncias do tribunal (None para não limitar).
+    :param disjuntor: DisjuntorTribunal compartilhado pelas instâncias do tribunal (None para não usar).
+    :param captura_concorrente: Indica se as duas instâncias são capturadas ao mesmo tempo.
+    :param timeout_instancia: Tempo máximo, em segundos, para a captura de cada instância (None para sem limite).
     """
 
-    def __init__(self):
+    def __init__(self, http_client=None):
         """
         Inicializa a classe DefaultTJ com instâncias nulas para as primeiras e segundas instâncias do tribunal.
         Esses atributos devem ser definidos pelas classes derivadas que representam tribunais específicos.
+
+        :param http_client: HttpClient que fornece a sessão HTTP compartilhada. Usa o do processo se não informado.
         """
+        self.http_client = http_client or http_client_compartilhado
         self.first_instance = None
         self.second_instance = None
+        self.limitador = None
+        self.disjuntor = None
+        self.captura_concorrente = config("CAPTURA_CONCORRENTE", default=True, cast=bool)
+        self.timeout_instancia = config("TIMEOUT_CAPTURA_INSTANCIA", default=None,
+                                        cast=lambda valor: float(valor) if valor else None)
 
-    async def capturar_dados(self, numero_processo):
+    async def capturar_dados(self, numero_processo, movimentacoes_conhecidas=None):
         """
         Método assíncrono para capturar dados tanto da primeira quanto da segunda instância do tribunal,
         usando o número do processo fornecido.
 
+        No modo concorrente as duas instâncias são consultadas ao mesmo tempo. Em ambos os modos, a falha
+        ou o timeout de uma instância não impede o retorno dos dados da outra, devolvidos em uma CapturaParcial.
+
         :param numero_processo: O número do processo para o qual os dados devem ser capturados.
-        :return: Um dicionário contendo os dados capturados para as duas instâncias do tribunal.
-                 Retorna None para uma instância se os dados não forem encontrados.
+        :param movimentacoes_conhecidas: Dicionário com a impressão digital da movimentação mais recente já
+                                         capturada de cada instância ("first_instance" e "second_instance").
+                                         Se informado, apenas as movimentações novas são extraídas.
+        :return: Um dicionário contendo os dados capturados para as duas instâncias do tribunal, ou uma
+                 CapturaParcial se uma das instâncias falhou. Retorna None para uma instância se os dados não
+                 forem encontrados, e None se nenhuma instância tiver dados.
+        :raises Exception: Se nenhuma instância tiver dados e alguma falhar, a exceção da instância que falhou
+                           (a da primeira, se as duas falharem) é relançada.
         """
-        # Captura os dados da primeira instância usando o número do processo
-        first_instance_data = await self.first_instance.capturar_dados(numero_processo=numero_processo)
+        movimentacoes_conhecidas = movimentacoes_conhecidas or {}
+
+        if self.captura_concorrente:
+            # Captura os dados das duas instâncias ao mesmo tempo
+            first_instance_data, second_instance_data = await gather(
+                self._capturar_instancia(self.first_instance, "primeira", numero_processo,
+                                         movimentacoes_conhecidas.get("first_instance")),
+                self._capturar_instancia(self.second_instance, "segunda", numero_processo,
+                                         movimentacoes_conhecidas.get("second_instance")),
+                return_exceptions=True
+            )
+        else:
+            # Captura os dados da primeira e, em seguida, da segunda instância
+            first_instance_data = await self._capturar_instancia_com_erro(
+                self.first_instance, "primeira", numero_processo, movimentacoes_conhecidas.get("first_instance")
+            )
+            second_instance_data = await self._capturar_instancia_com_erro(
+                self.second_instance, "segunda", numero_processo, movimentacoes_conhecidas.get("second_instance")
+            )
 
-        # Captura os dados da segunda instância usando o número do processo
-        second_instance_data = await self.second_instance.capturar_dados(numero_processo=numero_processo)
+        falhas = [dados for dados in (first_instance_data, second_instance_data) if isinstance(dados, BaseException)]
+        first_instance_data = None if isinstance(first_instance_data, BaseException) else first_instance_data
+        second_instance_data = None if isinstance(second_instance_data, BaseException) else second_instance_data
 
         if not first_instance_data and not second_instance_data:
+            # Sem dados por causa de uma falha, e não porque o processo não existe: relança a falha para que
+            # não seja registrada como "nenhum dado capturado"
+            if falhas:
+                raise falhas[0]
             return None
 
         # Compila os dados capturados em um dicionário e retorna
-        return {
+        dados = {
             "first_instance": first_instance_data if first_instance_data else None,
             "second_instance": second_instance_data if second_instance_data else None
         }
+        return CapturaParcial(dados) if falhas else dados
+
+    async def _capturar_instancia(self, instancia, nome_instancia, numero_processo, movimentacao_conhecida=None):
+        """
+        Captura os dados de uma instância respeitando o timeout configurado.
+
+        :param instancia: Objeto da instância (FirstInstance ou SecondInstance).
+        :param nome_instancia: Nome da instância, usado nos logs.
+        :param numero_processo: O número do processo a ser capturado.
+        :param movimentacao_conhecida: Impressão digital da movimentação mais recente já capturada da instância.
+        :return: Dados capturados da instância.
+        :raises Exception: Qualquer erro ocorrido na captura, inclusive TimeoutError.
+        """
+        try:
+            return await wait_for(
+                instancia.capturar_dados(numero_processo=numero_processo,
+                                         movimentacao_conhecida=movimentacao_conhecida),
+                timeout=self.timeout_instancia
+            )
+        except Exception as e:
+            logger.error(f"Erro na captura da {nome_instancia} instância do processo {numero_processo}: {e!r}")
+            raise
+
+    async def _capturar_instancia_com_erro(self, instancia, nome_instancia, numero_processo,
+                                           movimentacao_conhecida=None):
+        """
+        Captura os dados de uma instância devolvendo a exceção em vez de lançá-la, como o gather faz no modo
+        concorrente.
+
+        :param instancia: Objeto da instância (FirstInstance ou SecondInstance).
+        :param nome_instancia: Nome da instância, usado nos logs.
+        :param numero_processo: O número do processo a ser capturado.
+        :param movimentacao_conhecida: Impressão digital da movimentação mais recente já capturada da instância.
+        :return: Dados capturados da instância ou a exceção ocorrida.
+        """
+        try:
+            return await self._capturar_instancia(instancia, nome_instancia, numero_processo, movimentacao_conhecida)
+        except Exception as e:
+            return e
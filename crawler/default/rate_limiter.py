@@ -0,0 +1,205 @@
+from asyncio import sleep
+from contextlib import asynccontextmanager
+from logging import getLogger
+from time import monotonic
+from uuid import uuid4
+
+from decouple import config
+
+from api.services.metricas import ESPERA_LIMITADOR
+from database.service import AsyncRedisConnection
+
+logger = getLogger(__name__)
+
+# Token bucket: repõe os tokens de acordo com o tempo decorrido e consome um, se houver.
+# Retorna o tempo de espera, em milissegundos, até existir um token (0 quando o token foi consumido).
+SCRIPT_TOKEN_BUCKET = """
+local taxa = tonumber(ARGV[1])
+local capacidade = tonumber(ARGV[2])
+local tempo = redis.call('TIME')
+local agora = tonumber(tempo[1]) * 1000 + math.floor(tonumber(tempo[2]) / 1000)
+
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+local atualizado_em = tonumber(redis.call('HGET', KEYS[1], 'atualizado_em'))
+if tokens == nil then
+    tokens = capacidade
+    atualizado_em = agora
+end
+
+tokens = math.min(capacidade, tokens + (agora - atualizado_em) * taxa / 1000)
+
+local espera = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    espera = math.ceil((1 - tokens) * 1000 / taxa)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'atualizado_em', agora)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacidade * 1000 / taxa) + 1000)
+return espera
+"""
+
+# Semáforo distribuído: cada requisição em andamento é uma reserva com validade em um sorted set.
+# Reservas vencidas (de processos que morreram) são descartadas antes de verificar o limite.
+SCRIPT_SEMAFORO = """
+local limite = tonumber(ARGV[1])
+local validade_ms = tonumber(ARGV[2])
+local tempo = redis.call('TIME')
+local agora = tonumber(tempo[1]) * 1000 + math.floor(tonumber(tempo[2]) / 1000)
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', agora)
+if redis.call('ZCARD', KEYS[1]) < limite then
+    redis.call('ZADD', KEYS[1], agora + validade_ms, ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], validade_ms)
+    return 1
+end
+return 0
+"""
+
+
+class LimitadorTribunal:
+    """
+    Classe LimitadorTribunal controla o ritmo e a concorrência das requisições feitas a um tribunal.
+
+    Combina um token bucket (requisições por segundo, com rajada máxima) e um limite de requisições em
+    andamento. O estado fica no Redis, sendo compartilhado por todos os processos da API e dos workers.
+    O tempo de espera por uma liberação é acumulado no Redis como métrica.
+
+    :ivar chave: Identificador do tribunal nas chaves do Redis (por exemplo, o código do TJ).
+    :ivar taxa: Número de requisições por segundo permitidas.
+    :ivar capacidade: Número máximo de requisições em uma rajada.
+    :ivar max_em_andamento: Número máximo de requisições simultâneas ao tribunal.
+    :ivar validade_reserva: Tempo, em segundos, após o qual uma reserva não liberada é descartada.
+    :ivar redis: Conexão assíncrona com o Redis.
+    """
+
+    def __init__(self, chave, sigla=None, redis=None):
+        """
+        Lê as configurações do limitador. Cada configuração pode ser definida para um tribunal específico,
+        com o sufixo da sigla (por exemplo, LIMITE_REQUISICOES_POR_SEGUNDO_TJAL), ou para todos os tribunais.
+
+        :param chave: Identificador do tribunal nas chaves do Redis.
+        :param sigla: Sigla do tribunal, usada como sufixo das configurações específicas e nas métricas.
+        :param redis: Conexão assíncrona com o Redis. Cria uma AsyncRedisConnection se não informada.
+        :raises ValueError: Se a taxa não for positiva, ou a rajada ou o limite de requisições em andamento
+            forem menores que 1, configurações com as quais nenhuma requisição seria liberada.
+        """
+        self.chave = chave
+        self.sigla = sigla or chave
+        self.taxa = self._config("LIMITE_REQUISICOES_POR_SEGUNDO", sigla, 5)
+        self.capacidade = self._config("LIMITE_RAJADA", sigla, 10)
+        self.max_em_andamento = int(self._config("LIMITE_EM_ANDAMENTO", sigla, 10))
+        self.validade_reserva = self._config("LIMITE_VALIDADE_RESERVA", sigla, 120)
+        # O token bucket divide pela taxa, e sem ao menos um token ou uma vaga as requisições esperariam para sempre
+        if self.taxa <= 0:
+            raise ValueError(f"LIMITE_REQUISICOES_POR_SEGUNDO do tribunal {self.sigla} deve ser maior que 0, "
+                             f"recebido {self.taxa}")
+        if self.capacidade < 1:
+            raise ValueError(f"LIMITE_RAJADA do tribunal {self.sigla} deve ser ao menos 1, recebido {self.capacidade}")
+        if self.max_em_andamento < 1:
+            raise ValueError(f"LIMITE_EM_ANDAMENTO do tribunal {self.sigla} deve ser ao menos 1, "
+                             f"recebido {self.max_em_andamento}")
+        self.redis = redis or AsyncRedisConnection(decode_responses=True)
+        self._script_token_bucket = None
+        self._script_semaforo = None
+
+    @staticmethod
+    def _config(nome, sigla, default):
+        """
+        Lê uma configuração do tribunal, usando a configuração geral quando não houver uma específica.
+
+        :param nome: Nome da configuração.
+        :param sigla: Sigla do tribunal.
+        :param default: Valor padrão da configuração geral.
+        :return: Valor da configuração.
+        """
+        geral = config(nome, default=default, cast=float)
+        if not sigla:
+            return geral
+        return config(f"{nome}_{sigla.upper()}", default=geral, cast=float)
+
+    def _registrar_scripts(self):
+        """Registra os scripts Lua no cliente Redis, caso ainda não tenham sido registrados."""
+        if self._script_token_bucket is None:
+            self.redis.check_redis_client()
+            self._script_token_bucket = self.redis.redis_client.register_script(SCRIPT_TOKEN_BUCKET)
+            self._script_semaforo = self.redis.redis_client.register_script(SCRIPT_SEMAFORO)
+
+    @asynccontextmanager
+    async def reservar(self):
+        """
+        Aguarda até que o tribunal aceite mais uma requisição e mantém a reserva enquanto o bloco executa.
+
+        Uso::
+
+            async with limitador.reservar():
+                ...  # requisição HTTP ao tribunal
+        """
+        self._registrar_scripts()
+        inicio = monotonic()
+        reserva = str(uuid4())
+
+        await self._aguardar_vaga(reserva)
+        try:
+            await self._aguardar_token()
+            await self._registrar_espera(monotonic() - inicio)
+            yield
+        finally:
+            await self.redis.redis_client.zrem(f"limite:{self.chave}:em_andamento", reserva)
+
+    async def _aguardar_vaga(self, reserva):
+        """
+        Aguarda até existir vaga entre as requisições em andamento e reserva uma delas.
+
+        :param reserva: Identificador da reserva no sorted set de requisições em andamento.
+        """
+        intervalo = 0.01
+        while not await self._script_semaforo(
+                keys=[f"limite:{self.chave}:em_andamento"],
+                args=[self.max_em_andamento, int(self.validade_reserva * 1000), reserva]
+        ):
+            await sleep(intervalo)
+            intervalo = min(intervalo * 2, 0.1)
+
+    async def _aguardar_token(self):
+        """Aguarda até existir um token no bucket do tribunal e o consome."""
+        while True:
+            espera_ms = await self._script_token_bucket(
+                keys=[f"limite:{self.chave}:tokens"], args=[self.taxa, self.capacidade]
+            )
+            if not espera_ms:
+                return
+            await sleep(int(espera_ms) / 1000)
+
+    async def _registrar_espera(self, espera):
+        """
+        Acumula no Redis o tempo de espera de uma requisição até ser liberada e o registra no histograma do
+        processo.
+
+        :param espera: Tempo de espera, em segundos.
+        """
+        ESPERA_LIMITADOR.labels(tribunal=self.sigla).observe(espera)
+        if espera > 0.1:
+            logger.info(f"Requisição ao tribunal {self.chave} aguardou {espera:.3f}s pelo limitador")
+        async with self.redis.redis_client.pipeline(transaction=False) as pipe:
+            pipe.hincrby(f"limite:{self.chave}:metricas", "requisicoes", 1)
+            pipe.hincrbyfloat(f"limite:{self.chave}:metricas", "espera_total_segundos", espera)
+            await pipe.execute()
+
+    async def metricas(self):
+        """
+        Obtém as métricas de espera acumuladas e o número de requisições em andamento do tribunal.
+
+        :return: Dicionário com requisicoes, espera_total_segundos, espera_media_segundos e em_andamento.
+        """
+        self.redis.check_redis_client()
+        dados = await self.redis.redis_client.hgetall(f"limite:{self.chave}:metricas")
+        requisicoes = int(dados.get("requisicoes", 0))
+        espera_total = float(dados.get("espera_total_segundos", 0))
+        return {
+            "requisicoes": requisicoes,
+            "espera_total_segundos": espera_total,
+            "espera_media_segundos": espera_total / requisicoes if requisicoes else 0.0,
+            "em_andamento": await self.redis.redis_client.zcard(f"limite:{self.chave}:em_andamento"),
+        }
@@ -0,0 +1,180 @@
+from datetime import datetime, timezone
+from gzip import compress as gzip_compress, decompress as gzip_decompress
+from hashlib import sha256
+from json import dumps, loads
+from logging import getLogger
+from os import replace
+from pathlib import Path
+from uuid import uuid4
+import asyncio
+
+from decouple import config
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependência opcional
+    zstandard = None
+
+logger = getLogger(__name__)
+
+# Extensões dos objetos gravados, conforme a compressão disponível na gravação
+EXTENSAO_ZSTD = ".html.zst"
+EXTENSAO_GZIP = ".html.gz"
+
+
+class ArmazemSnapshots:
+    """
+    Classe ArmazemSnapshots guarda as páginas show.do capturadas, para que a extração possa ser refeita sem
+    consultar os tribunais.
+
+    Cada página é gravada comprimida (zstd, ou gzip sem a biblioteca zstandard) e endereçada pelo SHA-256 do
+    seu conteúdo, em objetos/<2 primeiros caracteres>/<hash>.html.zst, de modo que páginas idênticas são
+    gravadas uma única vez. Cada captura acrescenta uma linha ao índice do dia (indice/AAAAMMDD.jsonl) com o
+    tribunal, a instância, o número do processo e o hash da página.
+
+    :ivar diretorio: Diretório dos snapshots, ou None se a gravação estiver desabilitada.
+    """
+
+    def __init__(self, diretorio=None):
+        """
+        Inicializa o armazém.
+
+        :param diretorio: Diretório dos snapshots. Usa SNAPSHOT_DIRETORIO se não informado (vazio desabilita).
+        """
+        diretorio = diretorio if diretorio is not None else config("SNAPSHOT_DIRETORIO", default="")
+        self.diretorio = Path(diretorio) if diretorio else None
+
+    @property
+    def habilitado(self):
+        """Indica se as páginas capturadas devem ser gravadas."""
+        return self.diretorio is not None
+
+    def _caminho(self, hash_html, extensao):
+        """
+        Monta o caminho do objeto de uma página.
+
+        :param hash_html: SHA-256 do conteúdo da página.
+        :param extensao: Extensão do objeto (EXTENSAO_ZSTD ou EXTENSAO_GZIP).
+        :return: Caminho do objeto.
+        """
+        return self.diretorio / "objetos" / hash_html[:2] / f"{hash_html}{extensao}"
+
+    def gravar(self, html, sigla, instancia, numero_processo, agora=None):
+        """
+        Grava a página, caso ainda não exista, e registra a captura no índice do dia.
+
+        :param html: Conteúdo HTML da página.
+        :param sigla: Sigla do tribunal.
+        :param instancia: Instância da página ("primeira" ou "segunda").
+        :param numero_processo: Número do processo.
+        :param agora: Data e hora da captura (usada nos testes). Usa o horário do sistema se não informada.
+        :return: SHA-256 do conteúdo da página.
+        """
+        conteudo = html.encode("utf-8")
+        hash_html = sha256(conteudo).hexdigest()
+
+        if not self._existente(hash_html):
+            if zstandard is not None:
+                caminho = self._caminho(hash_html, EXTENSAO_ZSTD)
+                conteudo = zstandard.ZstdCompressor().compress(conteudo)
+            else:
+                caminho = self._caminho(hash_html, EXTENSAO_GZIP)
+                conteudo = gzip_compress(conteudo)
+            caminho.parent.mkdir(parents=True, exist_ok=True)
+            # Grava em um arquivo temporário e o renomeia, para que outro processo nunca leia um objeto incompleto.
+            # O nome é único por gravação, pois as threads do mesmo processo podem gravar a mesma página ao mesmo tempo
+            temporario = caminho.with_name(f"{caminho.name}.{uuid4().hex}.tmp")
+            try:
+                temporario.write_bytes(conteudo)
+                replace(temporario, caminho)
+            finally:
+                temporario.unlink(missing_ok=True)
+
+        agora = agora or datetime.now(timezone.utc)
+        indice = self.diretorio / "indice" / f"{agora:%Y%m%d}.jsonl"
+        indice.parent.mkdir(parents=True, exist_ok=True)
+        linha = dumps({
+            "capturado_em": agora.isoformat(timespec="seconds"),
+            "sigla_tribunal": sigla,
+            "instancia": instancia,
+            "numero_processo": numero_processo,
+            "hash": hash_html,
+        }, ensure_ascii=False)
+        # Cada captura é uma única escrita em modo append, para que os workers possam compartilhar o índice
+        with open(indice, "a", encoding="utf-8") as arquivo:
+            arquivo.write(linha + "\n")
+        return hash_html
+
+    async def salvar(self, html, sigla, instancia, numero_processo):
+        """
+        Grava a página fora do event loop, se a gravação estiver habilitada. Falhas são registradas no log sem
+        interromper a captura.
+
+        :param html: Conteúdo HTML da página.
+        :param sigla: Sigla do tribunal.
+        :param instancia: Instância da página ("primeira" ou "segunda").
+        :param numero_processo: Número do processo.
+        :return: SHA-256 do conteúdo da página, ou None se não foi gravada.
+        """
+        if not self.habilitado:
+            return None
+        try:
+            return await asyncio.to_thread(self.gravar, html, sigla, instancia, numero_processo)
+        except Exception as e:
+            logger.error(f"Erro ao gravar o snapshot do processo {numero_processo}: {e!r}")
+            return None
+
+    def _existente(self, hash_html):
+        """
+        Procura o objeto de uma página em qualquer uma das compressões.
+
+        :param hash_html: SHA-256 do conteúdo da página.
+        :return: Caminho do objeto, ou None se não existir.
+        """
+        for extensao in (EXTENSAO_ZSTD, EXTENSAO_GZIP):
+            caminho = self._caminho(hash_html, extensao)
+            if caminho.exists():
+                return caminho
+        return None
+
+    def ler(self, hash_html):
+        """
+        Lê o conteúdo de uma página gravada.
+
+        :param hash_html: SHA-256 do conteúdo da página.
+        :return: Conteúdo HTML da página.
+        :raises FileNotFoundError: Se a página não estiver gravada.
+        :raises ValueError: Se a página estiver comprimida com zstd e a biblioteca zstandard não estiver instalada.
+        """
+        caminho = self._existente(hash_html)
+        if caminho is None:
+            raise FileNotFoundError(f"Snapshot {hash_html} não encontrado em {self.diretorio}")
+        conteudo = caminho.read_bytes()
+        if caminho.name.endswith(EXTENSAO_ZSTD):
+            if zstandard is None:
+                raise ValueError("Snapshot comprimido com zstd, mas a biblioteca zstandard não está instalada")
+            return zstandard.ZstdDecompressor().decompress(conteudo).decode("utf-8")
+        return gzip_decompress(conteudo).decode("utf-8")
+
+    def capturas(self):
+        """
+        Lê todas as capturas registradas nos índices, em ordem cronológica.
+
+        :return: Iterador de dicionários com capturado_em, sigla_tribunal, instancia, numero_processo e hash.
+        """
+        if not self.habilitado:
+            return
+        for indice in sorted((self.diretorio / "indice").glob("*.jsonl")):
+            with open(indice, encoding="utf-8") as arquivo:
+                for linha in arquivo:
+                    if not linha.strip():
+                        continue
+                    try:
+                        yield loads(linha)
+                    except ValueError:
+                        # Linha incompleta, de uma gravação interrompida
+                        logger.warning(f"Linha inválida ignorada no índice {indice.name}")
+
+
+# Armazém compartilhado pelo processo, configurado pelas variáveis de ambiente
+armazem_snapshots = ArmazemSnapshots()
@@ -0,0 +1,82 @@
+from logging import getLogger
+from typing import get_args
+
+from api.exceptions import TribunalInexistenteError
+from api.schemas.input import SIGLAS_TRIBUNAIS_DISPONIVEIS
+from crawler.tjal.main import TJAL
+from crawler.tjce.main import TJCE
+
+logger = getLogger(__name__)
+
+
+class RegistroTribunais:
+    """
+    Classe RegistroTribunais resolve a classe do crawler de cada tribunal e mantém uma única instância por
+    tribunal, reaproveitada por todas as solicitações do processo.
+
+    As instâncias dos tribunais não guardam estado entre as capturas (apenas as configurações, o HttpClient,
+    o limitador e o disjuntor compartilhados), então podem ser usadas por várias capturas simultâneas. Um novo
+    tribunal é adicionado com registrar, sem importações dinâmicas durante o processamento.
+
+    :ivar classes: Dicionário com a classe do crawler de cada sigla.
+    """
+
+    def __init__(self, classes=None, http_client=None):
+        """
+        Inicializa o registro com os tribunais disponíveis.
+
+        :param classes: Dicionário {sigla: classe}. Usa os tribunais do projeto se não informado.
+        :param http_client: HttpClient injetado nos crawlers. Usa o do processo se não informado.
+        :raises TribunalInexistenteError: Se alguma sigla não estiver em SIGLAS_TRIBUNAIS_DISPONIVEIS.
+        """
+        self.classes = {}
+        self.http_client = http_client
+        self._instancias = {}
+        for sigla, classe in (classes or {"TJAL": TJAL, "TJCE": TJCE}).items():
+            self.registrar(sigla, classe)
+
+    def registrar(self, sigla, classe):
+        """
+        Registra a classe do crawler de um tribunal, descartando a instância anterior da sigla.
+
+        :param sigla: Sigla do tribunal, que deve estar em SIGLAS_TRIBUNAIS_DISPONIVEIS.
+        :param classe: Classe do crawler, derivada de DefaultTJ.
+        :raises TribunalInexistenteError: Se a sigla não estiver em SIGLAS_TRIBUNAIS_DISPONIVEIS.
+        """
+        sigla = sigla.upper()
+        if sigla not in get_args(SIGLAS_TRIBUNAIS_DISPONIVEIS):
+            raise TribunalInexistenteError(f"Tribunal {sigla} não está entre os tribunais disponíveis")
+        self.classes[sigla] = classe
+        self._instancias.pop(sigla, None)
+
+    def obter(self, sigla):
+        """
+        Obtém o crawler do tribunal, criando-o na primeira chamada.
+
+        :param sigla: Sigla do tribunal.
+        :return: Instância do crawler do tribunal.
+        :raises TribunalInexistenteError: Se não houver crawler registrado para a sigla.
+        """
+        sigla = (sigla or "").upper()
+        instancia = self._instancias.get(sigla)
+        if instancia is None:
+            classe = self.classes.get(sigla)
+            if classe is None:
+                raise TribunalInexistenteError(f"Nenhum crawler registrado para o tribunal {sigla}")
+            instancia = self._instancias[sigla] = classe(http_client=self.http_client)
+        return instancia
+
+    def iniciar(self):
+        """
+        Cria os crawlers de todos os tribunais disponíveis, para que erros de configuração (como uma URL base
+        ausente) apareçam na inicialização, e não na primeira solicitação.
+
+        :raises TribunalInexistenteError: Se algum tribunal disponível não tiver crawler registrado.
+        """
+        for sigla in get_args(SIGLAS_TRIBUNAIS_DISPONIVEIS):
+            self.obter(sigla)
+        logger.info(f"Crawlers iniciados: {', '.join(self._instancias)}")
+
+
+# Registro compartilhado pelo processo
+tribunais = RegistroTribunais()
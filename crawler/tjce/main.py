@@ -1,7 +1,9 @@
 from decouple import config
 from crawler.default.instances.first_instance import FirstInstance
 from crawler.default.instances.second_instance import SecondInstance
+from crawler.default.circuit_breaker import DisjuntorTribunal
 from crawler.default.main import DefaultTJ
+from crawler.default.rate_limiter import LimitadorTribunal
 
 
 class TJCE(DefaultTJ):
@@ -13,14 +15,18 @@ class TJCE(DefaultTJ):
     :param codigo_tj: Código associado ao TJCE.
     :param first_instance: Instância responsável por gerenciar a primeira instância do tribunal.
     :param second_instance: Instância responsável por gerenciar a segunda instância do tribunal.
+    :param limitador: Limitador de requisições ao tribunal, compartilhado pelas duas instâncias.
+    :param disjuntor: Circuit breaker do tribunal, compartilhado por todas as consultas ao TJCE do processo.
     """
 
-    def __init__(self):
+    def __init__(self, http_client=None):
         """
         Inicializa a classe TJCE com suas configurações e instâncias.
+
+        :param http_client: HttpClient compartilhado injetado nas instâncias. Usa o do processo se não informado.
         """
         # Chamada ao construtor da classe pai
-        super().__init__()
+        super().__init__(http_client=http_client)
 
         # Configurando a URL base através de uma variável de ambiente
         self.url_base = config("URL_BASE_TJCE")
@@ -28,8 +34,20 @@ class TJCE(DefaultTJ):
         # Código específico do TJCE
         self.codigo_tj = "8.06"
 
+        # Limitador de requisições ao TJCE, compartilhado com os demais processos através do Redis
+        self.limitador = LimitadorTribunal(chave=self.codigo_tj, sigla="TJCE")
+
+        # Circuit breaker do TJCE, interrompe as consultas após falhas consecutivas do tribunal
+        self.disjuntor = DisjuntorTribunal.obter(self.codigo_tj)
+
         # Cria a primeira instância com o código e a URL base
-        self.first_instance = FirstInstance(codigo_tj=self.codigo_tj, url_base=self.url_base)
+        self.first_instance = FirstInstance(
+            codigo_tj=self.codigo_tj, url_base=self.url_base, http_client=self.http_client,
+            limitador=self.limitador, disjuntor=self.disjuntor, sigla="TJCE"
+        )
 
         # Cria a segunda instância com o código e a URL base
-        self.second_instance = SecondInstance(codigo_tj=self.codigo_tj, url_base=self.url_base)
+        self.second_instance = SecondInstance(
+            codigo_tj=self.codigo_tj, url_base=self.url_base, http_client=self.http_client,
+            limitador=self.limitador, disjuntor=self.disjuntor, sigla="TJCE"
+        )
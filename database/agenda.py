@@ -0,0 +1,150 @@
+from json import dumps, loads
+from random import uniform
+from time import time
+
+from database.service import AsyncRedisConnection
+
+
+class AgendaMonitoramento:
+    """
+    Classe para gerenciar a agenda de processos monitorados no Redis.
+
+    A configuração de cada processo (intervalo entre capturas, prioridade e URL de callback) fica no hash
+    agenda:processos, e a data da próxima captura de cada processo fica no sorted set agenda:proximas:<TJ>,
+    um por tribunal, de modo que a agenda sobrevive à reinicialização do scheduler.
+
+    :ivar redis: Conexão assíncrona com o Redis.
+    """
+
+    def __init__(self, redis=None):
+        """
+        Inicializa a agenda.
+
+        :param redis: Conexão assíncrona com o Redis. Cria uma AsyncRedisConnection se não informada.
+        """
+        self.redis = redis or AsyncRedisConnection(decode_responses=True)
+
+    @staticmethod
+    def chave(sigla_tribunal, numero_processo):
+        """
+        Monta o identificador de um processo na agenda.
+
+        :param sigla_tribunal: Sigla do tribunal.
+        :param numero_processo: Número do processo.
+        :return: Identificador do processo.
+        """
+        return f"{sigla_tribunal.upper()}:{numero_processo}"
+
+    @staticmethod
+    def chave_proximas(sigla_tribunal):
+        """
+        Monta a chave do sorted set com as próximas capturas de um tribunal.
+
+        :param sigla_tribunal: Sigla do tribunal.
+        :return: Chave no Redis.
+        """
+        return f"agenda:proximas:{sigla_tribunal.upper()}"
+
+    async def agendar(self, processos, agora=None):
+        """
+        Inclui ou atualiza processos na agenda em um único pipeline.
+
+        A primeira captura de um processo novo é sorteada dentro do seu intervalo, espalhando ao longo do dia as
+        capturas de uma carteira incluída de uma só vez. Processos já agendados mantêm a próxima captura.
+
+        :param processos: Lista de dicionários com numero_processo, sigla_tribunal, intervalo_segundos, prioridade
+                          e callback_url.
+        :param agora: Timestamp atual (usado nos testes). Usa o horário do sistema se não informado.
+        """
+        if not processos:
+            return
+        agora = agora or time()
+        self.redis.check_redis_client()
+        async with self.redis.redis_client.pipeline(transaction=False) as pipe:
+            for processo in processos:
+                chave = self.chave(processo["sigla_tribunal"], processo["numero_processo"])
+                pipe.hset("agenda:processos", chave, dumps(processo))
+                pipe.zadd(self.chave_proximas(processo["sigla_tribunal"]),
+                          {chave: agora + uniform(0, processo["intervalo_segundos"])}, nx=True)
+            await pipe.execute()
+
+    async def obter(self, sigla_tribunal, numero_processo):
+        """
+        Obtém a configuração e a próxima captura de um processo agendado.
+
+        :param sigla_tribunal: Sigla do tribunal.
+        :param numero_processo: Número do processo.
+        :return: Dicionário do processo com proxima_captura (timestamp), ou None se não estiver agendado.
+        """
+        chave = self.chave(sigla_tribunal, numero_processo)
+        self.redis.check_redis_client()
+        processo = await self.redis.redis_client.hget("agenda:processos", chave)
+        if processo is None:
+            return None
+        proxima_captura = await self.redis.redis_client.zscore(self.chave_proximas(sigla_tribunal), chave)
+        return {**loads(processo), "proxima_captura": proxima_captura}
+
+    async def remover(self, sigla_tribunal, numero_processo):
+        """
+        Remove um processo da agenda.
+
+        :param sigla_tribunal: Sigla do tribunal.
+        :param numero_processo: Número do processo.
+        :return: True se o processo estava agendado.
+        """
+        chave = self.chave(sigla_tribunal, numero_processo)
+        self.redis.check_redis_client()
+        async with self.redis.redis_client.pipeline(transaction=True) as pipe:
+            pipe.hdel("agenda:processos", chave)
+            pipe.zrem(self.chave_proximas(sigla_tribunal), chave)
+            removidos, _ = await pipe.execute()
+        return bool(removidos)
+
+    async def vencidos(self, sigla_tribunal, quantidade, agora=None, janela=10):
+        """
+        Obtém os processos do tribunal cuja próxima captura já venceu, priorizando os de maior prioridade e,
+        entre eles, os vencidos há mais tempo.
+
+        :param sigla_tribunal: Sigla do tribunal.
+        :param quantidade: Número máximo de processos devolvidos.
+        :param agora: Timestamp atual (usado nos testes). Usa o horário do sistema se não informado.
+        :param janela: Quantos vencidos, em múltiplos de quantidade, são considerados na ordenação por prioridade.
+        :return: Lista de dicionários dos processos, na ordem em que devem ser capturados.
+        """
+        if quantidade < 1:
+            return []
+        agora = agora or time()
+        self.redis.check_redis_client()
+        chaves = await self.redis.redis_client.zrangebyscore(
+            self.chave_proximas(sigla_tribunal), "-inf", agora, start=0, num=quantidade * janela, withscores=True
+        )
+        if not chaves:
+            return []
+
+        configuracoes = await self.redis.redis_client.hmget("agenda:processos", [chave for chave, _ in chaves])
+        processos = [
+            {**loads(configuracao), "proxima_captura": proxima_captura}
+            for (_, proxima_captura), configuracao in zip(chaves, configuracoes)
+            if configuracao is not None
+        ]
+        processos.sort(key=lambda processo: (-processo.get("prioridade", 0), processo["proxima_captura"]))
+        return processos[:quantidade]
+
+    async def reagendar(self, processos, agora=None):
+        """
+        Agenda a próxima captura dos processos enviados para a fila, um intervalo após o horário atual.
+
+        :param processos: Lista de dicionários dos processos capturados.
+        :param agora: Timestamp atual (usado nos testes). Usa o horário do sistema se não informado.
+        """
+        if not processos:
+            return
+        agora = agora or time()
+        self.redis.check_redis_client()
+        async with self.redis.redis_client.pipeline(transaction=False) as pipe:
+            for processo in processos:
+                chave = self.chave(processo["sigla_tribunal"], processo["numero_processo"])
+                # xx: não recoloca na agenda um processo removido enquanto a captura era enviada
+                pipe.zadd(self.chave_proximas(processo["sigla_tribunal"]),
+                          {chave: agora + processo["intervalo_segundos"]}, xx=True)
+            await pipe.execute()
@@ -0,0 +1,177 @@
+from json import dumps, loads
+
+from decouple import config
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependência opcional
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependência opcional
+    zstandard = None
+
+# Primeiro byte dos valores gravados pelo codec. Nunca inicia um JSON, então os valores gravados antes do codec
+# (JSON puro) continuam sendo lidos.
+MARCADOR = b"\x00"
+
+# Identificadores dos formatos no segundo byte do valor, que é a versão do formato gravado
+FORMATOS = {"json": 1, "orjson": 2, "msgpack": 3}
+
+# Bit do segundo byte que indica que o conteúdo está comprimido com zstd
+BIT_ZSTD = 0x80
+
+
+def _serializar(formato, objeto):
+    """
+    Serializa um objeto no formato informado.
+
+    :param formato: Nome do formato (json, orjson ou msgpack).
+    :param objeto: Objeto serializável em JSON.
+    :return: Objeto serializado, em bytes.
+    """
+    if formato == "orjson":
+        return orjson.dumps(objeto)
+    if formato == "msgpack":
+        return msgpack.packb(objeto, use_bin_type=True)
+    return dumps(objeto, ensure_ascii=False).encode("utf-8")
+
+
+def _desserializar(formato, conteudo):
+    """
+    Desserializa um conteúdo gravado no formato informado.
+
+    :param formato: Identificador do formato (valor de FORMATOS).
+    :param conteudo: Conteúdo serializado, em bytes.
+    :return: Objeto desserializado.
+    :raises ValueError: Se o formato for desconhecido ou a biblioteca do formato não estiver instalada.
+    """
+    if formato == FORMATOS["orjson"]:
+        return orjson.loads(conteudo) if orjson else loads(conteudo)
+    if formato == FORMATOS["msgpack"]:
+        if msgpack is None:
+            raise ValueError("Valor gravado em msgpack, mas a biblioteca msgpack não está instalada")
+        return msgpack.unpackb(conteudo, raw=False)
+    if formato == FORMATOS["json"]:
+        return loads(conteudo)
+    raise ValueError(f"Formato de valor desconhecido: {formato}")
+
+
+class Codec:
+    """
+    Codec dos registros gravados no Redis (solicitações e cache de resultados).
+
+    Cada valor é gravado com um cabeçalho de dois bytes: o MARCADOR e a versão do formato, que identifica o
+    serializador (json, orjson ou msgpack) e se o conteúdo foi comprimido com zstd. Assim, a configuração pode
+    ser alterada sem invalidar os valores já gravados, e os valores em JSON puro gravados antes do codec
+    continuam sendo lidos.
+
+    :ivar formato: Serializador usado na gravação.
+    :ivar compressao: Indica se os valores grandes são comprimidos com zstd na gravação.
+    :ivar compressao_minimo: Tamanho mínimo, em bytes, do valor serializado para que seja comprimido.
+    """
+
+    def __init__(self, formato=None, compressao=None, compressao_minimo=None):
+        """
+        Lê as configurações do codec, usando o JSON da biblioteca padrão quando o serializador ou o zstd
+        configurados não estiverem instalados.
+
+        :param formato: Serializador (json, orjson ou msgpack). Usa REDIS_CODEC se não informado.
+        :param compressao: Se True, comprime com zstd. Usa REDIS_COMPRESSAO se não informado.
+        :param compressao_minimo: Tamanho mínimo para comprimir. Usa REDIS_COMPRESSAO_MINIMO se não informado.
+        :raises ValueError: Se o serializador for desconhecido.
+        """
+        formato = formato or config("REDIS_CODEC", default="orjson")
+        if formato not in FORMATOS:
+            raise ValueError(f"Codec desconhecido: {formato}. Opções: {', '.join(FORMATOS)}")
+        if (formato == "orjson" and orjson is None) or (formato == "msgpack" and msgpack is None):
+            formato = "json"
+        self.formato = formato
+
+        if compressao is None:
+            compressao = config("REDIS_COMPRESSAO", default=True, cast=bool)
+        self.compressao = compressao and zstandard is not None
+        self.compressao_minimo = compressao_minimo if compressao_minimo is not None else \
+            config("REDIS_COMPRESSAO_MINIMO", default=1024, cast=int)
+
+    def codificar(self, objeto):
+        """
+        Serializa um objeto para gravação no Redis.
+
+        :param objeto: Objeto serializável em JSON.
+        :return: Valor com o cabeçalho do formato, em bytes.
+        """
+        versao = FORMATOS[self.formato]
+        conteudo = _serializar(self.formato, objeto)
+        if self.compressao and len(conteudo) >= self.compressao_minimo:
+            conteudo = zstandard.ZstdCompressor().compress(conteudo)
+            versao |= BIT_ZSTD
+        return MARCADOR + bytes([versao]) + conteudo
+
+    @staticmethod
+    def _abrir(valor):
+        """
+        Separa o formato e o conteúdo, já descomprimido, de um valor lido do Redis.
+
+        :param valor: Valor lido do Redis (bytes ou str).
+        :return: Tupla (formato, conteúdo), com o formato None para os valores em JSON puro.
+        :raises ValueError: Se o valor estiver comprimido e a biblioteca zstandard não estiver instalada.
+        """
+        if isinstance(valor, str):
+            valor = valor.encode("utf-8")
+        if not valor.startswith(MARCADOR):
+            return None, valor
+
+        versao = valor[1]
+        conteudo = valor[2:]
+        if versao & BIT_ZSTD:
+            if zstandard is None:
+                raise ValueError("Valor comprimido com zstd, mas a biblioteca zstandard não está instalada")
+            conteudo = zstandard.ZstdDecompressor().decompress(conteudo)
+        return versao & ~BIT_ZSTD, conteudo
+
+    @classmethod
+    def decodificar(cls, valor):
+        """
+        Desserializa um valor lido do Redis, em qualquer versão do formato ou em JSON puro.
+
+        :param valor: Valor lido do Redis (bytes ou str), ou None.
+        :return: Objeto desserializado, ou None se o valor for None.
+        :raises ValueError: Se o valor usar um formato ou compressão indisponível.
+        """
+        if valor is None:
+            return None
+        formato, conteudo = cls._abrir(valor)
+        if formato is None:
+            return loads(conteudo)
+        return _desserializar(formato, conteudo)
+
+    @classmethod
+    def para_json(cls, valor):
+        """
+        Obtém o JSON de um valor lido do Redis. Nos formatos json e orjson, o conteúdo gravado já é o JSON e é
+        devolvido sem ser desserializado.
+
+        :param valor: Valor lido do Redis (bytes ou str), ou None.
+        :return: JSON do valor, em bytes, ou None se o valor for None.
+        :raises ValueError: Se o valor usar um formato ou compressão indisponível.
+        """
+        if valor is None:
+            return None
+        formato, conteudo = cls._abrir(valor)
+        if formato in (None, FORMATOS["json"], FORMATOS["orjson"]):
+            return conteudo
+        return _serializar("orjson" if orjson else "json", _desserializar(formato, conteudo))
+
+
+# Codec compartilhado pelo processo, configurado pelas variáveis de ambiente
+codec = Codec()
+codificar = codec.codificar
+decodificar = Codec.decodificar
+para_json = Codec.para_json
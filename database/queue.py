@@ -0,0 +1,143 @@
+from decouple import config
+from redis.exceptions import ResponseError
+
+from database.service import AsyncRedisConnection
+
+
+class RedisQueue:
+    """
+    Classe para gerenciar a fila de solicitações sobre um Redis Stream com consumer group.
+
+    Cada mensagem só é removida da fila depois de confirmada (ack) pelo worker que a processou.
+    Mensagens entregues e não confirmadas dentro do visibility timeout são reentregues a outro
+    consumidor, até o limite de entregas configurado.
+
+    :ivar stream: Nome do stream que armazena as solicitações.
+    :ivar grupo: Nome do consumer group dos workers.
+    :ivar visibility_timeout: Tempo, em segundos, sem confirmação para que uma mensagem seja reentregue.
+    :ivar max_entregas: Número máximo de entregas de uma mensagem antes de ser descartada.
+    :ivar redis_client: Cliente assíncrono, do pool compartilhado, para a conexão com o servidor Redis.
+    """
+
+    def __init__(self):
+        """Lê as configurações da fila e inicializa o cliente como None."""
+        self.stream = config("FILA_STREAM", default="fila:solicitacoes")
+        self.grupo = config("FILA_GRUPO", default="workers")
+        self.visibility_timeout = config("FILA_VISIBILITY_TIMEOUT", default=300, cast=int)
+        self.max_entregas = config("FILA_MAX_ENTREGAS", default=3, cast=int)
+        self.redis_client = None
+
+    def check_redis_client(self):
+        """
+        Obtém o cliente Redis a partir do pool de conexões compartilhado do processo.
+
+        :raises ConnectionError: Se houver um erro de conexão com o Redis.
+        """
+        if self.redis_client is None:
+            conexao = AsyncRedisConnection(decode_responses=True)
+            conexao.check_redis_client()
+            self.redis_client = conexao.redis_client
+
+    async def criar_grupo(self):
+        """Cria o stream e o consumer group, caso ainda não existam."""
+        self.check_redis_client()
+        try:
+            await self.redis_client.xgroup_create(self.stream, self.grupo, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def enqueue(self, solicitacao_id):
+        """
+        Adiciona uma solicitação à fila.
+
+        :param solicitacao_id: ID da solicitação a ser processada.
+        :return: ID da mensagem no stream.
+        """
+        self.check_redis_client()
+        return await self.redis_client.xadd(self.stream, {"solicitacao_id": solicitacao_id})
+
+    async def enqueue_many(self, solicitacoes_ids):
+        """
+        Adiciona várias solicitações à fila em um único pipeline.
+
+        :param solicitacoes_ids: IDs das solicitações a serem processadas.
+        :return: Lista com os IDs das mensagens no stream, na mesma ordem.
+        """
+        if not solicitacoes_ids:
+            return []
+        self.check_redis_client()
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for solicitacao_id in solicitacoes_ids:
+                pipe.xadd(self.stream, {"solicitacao_id": solicitacao_id})
+            return await pipe.execute()
+
+    async def consume(self, consumidor, quantidade=1, bloqueio_ms=5000):
+        """
+        Lê novas mensagens da fila para o consumidor informado, aguardando até bloqueio_ms se estiver vazia.
+
+        :param consumidor: Nome do consumidor dentro do consumer group.
+        :param quantidade: Número máximo de mensagens a serem lidas.
+        :param bloqueio_ms: Tempo máximo, em milissegundos, de espera por novas mensagens.
+        :return: Lista de tuplas (id da mensagem, id da solicitação).
+        """
+        self.check_redis_client()
+        resposta = await self.redis_client.xreadgroup(
+            self.grupo, consumidor, {self.stream: ">"}, count=quantidade, block=bloqueio_ms
+        )
+        return [
+            (mensagem_id, campos.get("solicitacao_id"))
+            for _, mensagens in resposta or []
+            for mensagem_id, campos in mensagens
+        ]
+
+    async def ack(self, mensagem_id):
+        """
+        Confirma o processamento de uma mensagem, removendo-a da fila.
+
+        :param mensagem_id: ID da mensagem no stream.
+        """
+        self.check_redis_client()
+        await self.redis_client.xack(self.stream, self.grupo, mensagem_id)
+        await self.redis_client.xdel(self.stream, mensagem_id)
+
+    async def heartbeat(self, consumidor, mensagem_id):
+        """
+        Renova a posse de uma mensagem em processamento, evitando que seja reentregue por exceder o
+        visibility timeout. Não incrementa o contador de entregas.
+
+        :param consumidor: Nome do consumidor que está processando a mensagem.
+        :param mensagem_id: ID da mensagem no stream.
+        """
+        self.check_redis_client()
+        await self.redis_client.xclaim(
+            self.stream, self.grupo, consumidor, min_idle_time=0, message_ids=[mensagem_id], justid=True
+        )
+
+    async def reclaim(self, consumidor, quantidade=10):
+        """
+        Assume as mensagens pendentes há mais tempo que o visibility timeout, de consumidores que
+        travaram ou morreram.
+
+        :param consumidor: Nome do consumidor que assumirá as mensagens.
+        :param quantidade: Número máximo de mensagens a serem assumidas.
+        :return: Lista de tuplas (id da mensagem, id da solicitação, número de entregas).
+        """
+        self.check_redis_client()
+        resposta = await self.redis_client.xautoclaim(
+            self.stream, self.grupo, consumidor,
+            min_idle_time=self.visibility_timeout * 1000, start_id="0-0", count=quantidade
+        )
+        mensagens = resposta[1]
+
+        recuperadas = []
+        for mensagem_id, campos in mensagens:
+            # Mensagens removidas do stream enquanto pendentes voltam sem campos
+            if not campos:
+                continue
+            pendente = await self.redis_client.xpending_range(
+                self.stream, self.grupo, min=mensagem_id, max=mensagem_id, count=1
+            )
+            entregas = pendente[0]["times_delivered"] if pendente else 1
+            recuperadas.append((mensagem_id, campos.get("solicitacao_id"), entregas))
+        return recuperadas
@@ -1,8 +1,25 @@
 from socket import gaierror
 from decouple import config
 from redis import StrictRedis
+from redis.asyncio import ConnectionPool as AsyncConnectionPool, StrictRedis as AsyncStrictRedis
 from redis.exceptions import ConnectionError
 
+# Remove a chave apenas se ela ainda tiver o valor informado (liberação de um lock pelo próprio dono)
+SCRIPT_REMOVER_SE_IGUAL = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Renova a expiração da chave apenas se ela ainda tiver o valor informado (renovação de um lock pelo próprio dono)
+SCRIPT_EXPIRAR_SE_IGUAL = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
 
 class RedisConnection:
     """
@@ -53,3 +70,158 @@ class RedisConnection:
         self.check_redis_client()
         self.redis_client.set(key, value)
 
+
+class AsyncRedisConnection:
+    """
+    Classe para gerenciar a conexão assíncrona (redis.asyncio) com um servidor Redis.
+
+    Expõe a mesma interface de RedisConnection, sem bloquear o event loop, e operações com várias
+    chaves em uma única ida ao servidor. Todas as instâncias com a mesma URL compartilham o mesmo
+    pool de conexões do processo.
+
+    :ivar redis_url: URL para a conexão com o servidor Redis.
+    :ivar decode_responses: Indica se as respostas do Redis devem ser decodificadas para str.
+    :ivar redis_client: Cliente assíncrono para a conexão com o servidor Redis.
+    """
+
+    # Pools de conexões compartilhados pelo processo, indexados por (URL, decode_responses)
+    _pools = {}
+
+    def __init__(self, decode_responses=False):
+        """
+        Inicializa a URL do Redis e o cliente como None.
+
+        :param decode_responses: Indica se as respostas do Redis devem ser decodificadas para str.
+        """
+        self.redis_url = config("REDIS_URL", "redis://localhost:6379")
+        self.decode_responses = decode_responses
+        self.redis_client = None
+        self._scripts = {}
+
+    def check_redis_client(self):
+        """
+        Obtém o cliente Redis, usando o pool de conexões compartilhado e criando-o se ainda não existir.
+
+        :raises ConnectionError: Se houver um erro de conexão com o Redis.
+        """
+        if self.redis_client is None:
+            chave_pool = (self.redis_url, self.decode_responses)
+            try:
+                if chave_pool not in self._pools:
+                    self._pools[chave_pool] = AsyncConnectionPool.from_url(
+                        self.redis_url,
+                        decode_responses=self.decode_responses,
+                        max_connections=config("REDIS_MAX_CONEXOES", default=50, cast=int)
+                    )
+                self.redis_client = AsyncStrictRedis(connection_pool=self._pools[chave_pool])
+            except (OSError, gaierror):
+                raise ConnectionError("Redis offline")
+
+    async def get_data(self, key):
+        """
+        Obtém dados associados a uma chave no Redis.
+
+        :param key: Chave para buscar no Redis.
+        :return: Dados associados à chave, ou None se a chave não existir.
+        """
+        self.check_redis_client()
+        return await self.redis_client.get(key)
+
+    async def set_data(self, key, value, ex=None, nx=False):
+        """
+        Define um valor para uma chave no Redis.
+
+        :param key: Chave para definir no Redis.
+        :param value: Valor para definir para a chave.
+        :param ex: Tempo de expiração da chave, em segundos (None para não expirar).
+        :param nx: Se True, só define o valor caso a chave ainda não exista.
+        :return: True se o valor foi definido, None se nx=True e a chave já existia.
+        """
+        self.check_redis_client()
+        return await self.redis_client.set(key, value, ex=ex, nx=nx)
+
+    async def publish_data(self, channel, value):
+        """
+        Publica uma mensagem em um canal do Redis (pub/sub).
+
+        :param channel: Canal em que a mensagem será publicada.
+        :param value: Mensagem a ser publicada.
+        :return: Número de assinantes que receberam a mensagem.
+        """
+        self.check_redis_client()
+        return await self.redis_client.publish(channel, value)
+
+    async def delete_data(self, *keys):
+        """
+        Remove uma ou mais chaves do Redis.
+
+        :param keys: Chaves a serem removidas.
+        """
+        self.check_redis_client()
+        await self.redis_client.delete(*keys)
+
+    def _script(self, codigo):
+        """
+        Obtém o script Lua registrado no cliente, executado com EVALSHA, registrando-o na primeira chamada.
+
+        :param codigo: Código do script.
+        :return: Script registrado.
+        """
+        self.check_redis_client()
+        if codigo not in self._scripts:
+            self._scripts[codigo] = self.redis_client.register_script(codigo)
+        return self._scripts[codigo]
+
+    async def delete_if_value(self, key, value):
+        """
+        Remove a chave de forma atômica, apenas se ela ainda tiver o valor informado.
+
+        :param key: Chave a ser removida.
+        :param value: Valor esperado da chave.
+        :return: True se a chave foi removida.
+        """
+        return bool(await self._script(SCRIPT_REMOVER_SE_IGUAL)(keys=[key], args=[value]))
+
+    async def expire_if_value(self, key, value, ex):
+        """
+        Renova a expiração da chave de forma atômica, apenas se ela ainda tiver o valor informado.
+
+        :param key: Chave a ser renovada.
+        :param value: Valor esperado da chave.
+        :param ex: Novo tempo de expiração, em segundos.
+        :return: True se a expiração foi renovada.
+        """
+        return bool(await self._script(SCRIPT_EXPIRAR_SE_IGUAL)(keys=[key], args=[value, int(ex * 1000)]))
+
+    async def get_many(self, keys):
+        """
+        Obtém os dados associados a várias chaves com um único MGET.
+
+        :param keys: Lista de chaves para buscar no Redis.
+        :return: Lista com os dados de cada chave, na mesma ordem, com None para chaves inexistentes.
+        """
+        if not keys:
+            return []
+        self.check_redis_client()
+        return await self.redis_client.mget(keys)
+
+    async def set_many(self, mapping):
+        """
+        Define os valores de várias chaves em um único pipeline.
+
+        :param mapping: Dicionário com as chaves e os valores a serem definidos.
+        """
+        if not mapping:
+            return
+        self.check_redis_client()
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value)
+            await pipe.execute()
+
+    @classmethod
+    async def close(cls):
+        """Desconecta e descarta os pools de conexões compartilhados do processo."""
+        for pool in cls._pools.values():
+            await pool.disconnect()
+        cls._pools.clear()
@@ -0,0 +1,308 @@
+from time import time
+
+from decouple import config
+
+from database.codec import codificar, decodificar
+from database.service import AsyncRedisConnection
+
+# Status das solicitações encerradas com dados capturados
+STATUS_CONCLUIDO = "Concluído"
+
+# Campos do status visível ao cliente enquanto a solicitação não tem resultado
+CAMPOS_STATUS = ("numero_processo", "sigla_tribunal", "status")
+
+# Campos de metadados do hash de cada solicitação, lidos sem o resultado
+CAMPOS_METADADOS = CAMPOS_STATUS + ("callback_url", "monitorar", "criado_em", "em_processamento_em", "finalizado_em")
+
+# Campo do horário de cada etapa, pelo status da solicitação. Os demais status encerram a solicitação.
+CAMPOS_ETAPA = {"Na Fila": "criado_em", "Em processamento": "em_processamento_em"}
+
+# Retenção padrão, em segundos, do registro em cada situação (configurável em SOLICITACAO_TTL_<SITUAÇÃO>)
+RETENCAO_PADRAO = {"NA_FILA": 172800, "EM_PROCESSAMENTO": 86400, "CONCLUIDO": 604800, "ERRO": 86400}
+
+# Sorted set com as solicitações encerradas a arquivar, pela data em que vence a retenção
+CHAVE_ARQUIVAMENTO = "solicitacoes:arquivamento"
+
+
+def _campo_etapa(status):
+    """
+    Obtém o campo com o horário da etapa correspondente a um status.
+
+    :param status: Status da solicitação.
+    :return: Nome do campo no hash.
+    """
+    return CAMPOS_ETAPA.get(status, "finalizado_em")
+
+
+def situacao_retencao(status):
+    """
+    Obtém a situação de uma solicitação usada na política de retenção.
+
+    :param status: Status da solicitação.
+    :return: NA_FILA, EM_PROCESSAMENTO, ERRO ou CONCLUIDO (encerrada com ou sem dados).
+    """
+    if status == "Na Fila":
+        return "NA_FILA"
+    if status == "Em processamento":
+        return "EM_PROCESSAMENTO"
+    if status.startswith("Erro"):
+        return "ERRO"
+    return "CONCLUIDO"
+
+
+def _ler_metadados(valores):
+    """
+    Converte os valores lidos do hash (HMGET de CAMPOS_METADADOS) em um dicionário.
+
+    :param valores: Lista com o valor de cada campo de CAMPOS_METADADOS, na mesma ordem.
+    :return: Dicionário apenas com os campos existentes.
+    """
+    metadados = {}
+    for campo, valor in zip(CAMPOS_METADADOS, valores):
+        if valor is None:
+            continue
+        valor = valor.decode("utf-8") if isinstance(valor, bytes) else valor
+        if campo == "monitorar":
+            valor = valor == "1"
+        elif campo.endswith("_em"):
+            valor = float(valor)
+        metadados[campo] = valor
+    return metadados
+
+
+def _converter_legado(valor):
+    """
+    Converte o registro de uma solicitação gravado no formato anterior (um único valor com o registro inteiro).
+
+    :param valor: Valor lido da chave da solicitação.
+    :return: Tupla (metadados, resultado), com o resultado None se a solicitação não tem dados capturados.
+    """
+    registro = decodificar(valor)
+    metadados = {campo: registro[campo] for campo in CAMPOS_METADADOS if campo in registro}
+    if "status" in registro:
+        return metadados, None
+    resultado = {campo: valor for campo, valor in registro.items() if campo not in CAMPOS_METADADOS}
+    return {**metadados, "status": STATUS_CONCLUIDO}, resultado
+
+
+class RegistroSolicitacao:
+    """
+    Classe para gerenciar os registros das solicitações de consulta no Redis.
+
+    Cada solicitação é um hash solicitacao:<id> com os metadados (numero_processo, sigla_tribunal, status,
+    callback_url e monitorar), o horário de cada etapa (criado_em, em_processamento_em e finalizado_em) e, nas
+    solicitações encerradas com dados, o resultado codificado (database.codec) no campo resultado. Uma mudança de
+    status altera apenas os campos da etapa, e a leitura dos metadados não transfere o resultado. As solicitações
+    gravadas no formato anterior, com o registro inteiro na chave <id>, continuam sendo lidas.
+
+    Cada gravação renova a expiração do hash conforme a retenção da situação da solicitação (na fila, em
+    processamento, concluída ou com erro). Com o arquivamento habilitado (ARQUIVO_DIRETORIO), as solicitações
+    encerradas também são incluídas em CHAVE_ARQUIVAMENTO, e a expiração recebe uma margem para que o zelador
+    (zelador.py) as arquive em disco antes de o Redis removê-las.
+
+    :ivar retencao: Retenção, em segundos, do registro em cada situação.
+    :ivar arquivar: Indica se as solicitações encerradas são arquivadas ao vencer a retenção.
+    :ivar margem_arquivamento: Tempo, em segundos, que o registro permanece no Redis após vencer a retenção,
+                               aguardando o arquivamento.
+    :ivar redis: Conexão assíncrona com o Redis.
+    """
+
+    def __init__(self, redis=None):
+        """
+        Lê as configurações do registro.
+
+        :param redis: Conexão assíncrona com o Redis. Cria uma AsyncRedisConnection se não informada.
+        """
+        self.retencao = {
+            situacao: config(f"SOLICITACAO_TTL_{situacao}", default=padrao, cast=int)
+            for situacao, padrao in RETENCAO_PADRAO.items()
+        }
+        self.arquivar = bool(config("ARQUIVO_DIRETORIO", default=""))
+        self.margem_arquivamento = config("ARQUIVO_MARGEM_SEGUNDOS", default=3600, cast=int)
+        self.redis = redis or AsyncRedisConnection()
+
+    @staticmethod
+    def chave(solicitacao_id):
+        """
+        Monta a chave do hash de uma solicitação.
+
+        :param solicitacao_id: ID da solicitação.
+        :return: Chave no Redis.
+        """
+        return f"solicitacao:{solicitacao_id}"
+
+    def _expirar(self, pipe, solicitacao_id, status, agora):
+        """
+        Inclui no pipeline a expiração do registro conforme a retenção do status e, nas solicitações encerradas
+        com o arquivamento habilitado, a inclusão na lista de arquivamento.
+
+        :param pipe: Pipeline do Redis.
+        :param solicitacao_id: ID da solicitação.
+        :param status: Status gravado.
+        :param agora: Timestamp da gravação.
+        """
+        retencao = self.retencao[situacao_retencao(status)]
+        if self.arquivar and status not in CAMPOS_ETAPA:
+            pipe.zadd(CHAVE_ARQUIVAMENTO, {solicitacao_id: agora + retencao})
+            retencao += self.margem_arquivamento
+        pipe.expire(self.chave(solicitacao_id), retencao)
+
+    async def criar(self, solicitacoes):
+        """
+        Grava o registro de novas solicitações em um único pipeline.
+
+        :param solicitacoes: Dicionário com o ID e o registro de cada solicitação: numero_processo, sigla_tribunal,
+                             status e, opcionalmente, callback_url, monitorar e resultado (dados capturados, nas
+                             solicitações já encerradas com o resultado em cache).
+        """
+        if not solicitacoes:
+            return
+        agora = time()
+        self.redis.check_redis_client()
+        async with self.redis.redis_client.pipeline(transaction=False) as pipe:
+            for solicitacao_id, registro in solicitacoes.items():
+                campos = {campo: valor for campo, valor in registro.items() if valor is not None}
+                if campos.pop("monitorar", False):
+                    campos["monitorar"] = 1
+                if "resultado" in campos:
+                    campos["resultado"] = codificar(campos["resultado"])
+                campos["criado_em"] = agora
+                campos[_campo_etapa(campos["status"])] = agora
+
+                pipe.hset(self.chave(solicitacao_id), mapping=campos)
+                self._expirar(pipe, solicitacao_id, campos["status"], agora)
+            await pipe.execute()
+
+    async def atualizar(self, solicitacao_id, status, resultado=None):
+        """
+        Altera o status de uma solicitação, registrando o horário da etapa e, se houver, o resultado.
+
+        :param solicitacao_id: ID da solicitação.
+        :param status: Novo status da solicitação.
+        :param resultado: Dados capturados validados, nas solicitações encerradas com dados.
+        :return: Registro da solicitação visível ao cliente: o resultado, ou o número do processo, a sigla do
+                 tribunal e o status.
+        """
+        agora = time()
+        campos = {"status": status, _campo_etapa(status): agora}
+        if resultado is not None:
+            campos["resultado"] = codificar(resultado)
+
+        chave = self.chave(solicitacao_id)
+        self.redis.check_redis_client()
+        async with self.redis.redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(chave, mapping=campos)
+            self._expirar(pipe, solicitacao_id, status, agora)
+            pipe.hmget(chave, CAMPOS_STATUS)
+            *_, valores = await pipe.execute()
+
+        if resultado is not None:
+            return resultado
+        return {campo: valor for campo, valor in _ler_metadados(valores).items() if campo in CAMPOS_STATUS}
+
+    async def obter(self, solicitacao_id, com_resultado=False):
+        """
+        Obtém os metadados de uma solicitação.
+
+        :param solicitacao_id: ID da solicitação.
+        :param com_resultado: Se True, inclui os dados capturados no campo resultado.
+        :return: Dicionário com os metadados, ou None se a solicitação não existir.
+        """
+        return (await self.obter_many([solicitacao_id], com_resultado))[0]
+
+    async def obter_many(self, solicitacoes_ids, com_resultado=False):
+        """
+        Obtém os metadados de várias solicitações em um único pipeline, sem transferir os resultados quando
+        com_resultado é False.
+
+        :param solicitacoes_ids: Lista com os IDs das solicitações.
+        :param com_resultado: Se True, inclui os dados capturados no campo resultado.
+        :return: Lista com os metadados de cada solicitação, na mesma ordem, com None para as inexistentes.
+        """
+        if not solicitacoes_ids:
+            return []
+        campos = CAMPOS_METADADOS + ("resultado",) if com_resultado else CAMPOS_METADADOS
+
+        self.redis.check_redis_client()
+        async with self.redis.redis_client.pipeline(transaction=False) as pipe:
+            for solicitacao_id in solicitacoes_ids:
+                pipe.hmget(self.chave(solicitacao_id), campos)
+            linhas = await pipe.execute()
+
+        solicitacoes = []
+        for valores in linhas:
+            if all(valor is None for valor in valores):
+                solicitacoes.append(None)
+                continue
+            solicitacao = _ler_metadados(valores)
+            if com_resultado and valores[-1] is not None:
+                solicitacao["resultado"] = decodificar(valores[-1])
+            solicitacoes.append(solicitacao)
+
+        # Solicitações gravadas no formato anterior
+        legados = [i for i, solicitacao in enumerate(solicitacoes) if solicitacao is None]
+        if legados:
+            valores = await self.redis.get_many([solicitacoes_ids[i] for i in legados])
+            for i, valor in zip(legados, valores):
+                if valor is None:
+                    continue
+                metadados, resultado = _converter_legado(valor)
+                if com_resultado and resultado is not None:
+                    metadados["resultado"] = resultado
+                solicitacoes[i] = metadados
+        return solicitacoes
+
+    async def obter_registro(self, solicitacao_id):
+        """
+        Obtém o registro da solicitação visível ao cliente, codificado, sem decodificar o resultado gravado.
+
+        :param solicitacao_id: ID da solicitação.
+        :return: Resultado gravado ou, se não houver, o número do processo, a sigla do tribunal e o status
+                 codificados (database.codec); None se a solicitação não existir.
+        """
+        self.redis.check_redis_client()
+        *valores, resultado = await self.redis.redis_client.hmget(
+            self.chave(solicitacao_id), CAMPOS_STATUS + ("resultado",)
+        )
+        if resultado is not None:
+            return resultado
+        if any(valor is not None for valor in valores):
+            return codificar(_ler_metadados(valores))
+
+        # Solicitação gravada no formato anterior, que guardava os campos internos (callback_url e monitorar) no
+        # mesmo valor: apenas os campos visíveis ao cliente são devolvidos
+        valor = await self.redis.get_data(solicitacao_id)
+        if valor is None:
+            return None
+        metadados, resultado = _converter_legado(valor)
+        if resultado is not None:
+            return codificar(resultado)
+        return codificar({campo: metadados[campo] for campo in CAMPOS_STATUS if campo in metadados})
+
+    async def vencidas(self, quantidade, agora=None):
+        """
+        Obtém as solicitações encerradas cuja retenção venceu, a arquivar.
+
+        :param quantidade: Número máximo de solicitações devolvidas.
+        :param agora: Timestamp atual (usado nos testes). Usa o horário do sistema se não informado.
+        :return: Lista com os IDs das solicitações, das vencidas há mais tempo para as mais recentes.
+        """
+        self.redis.check_redis_client()
+        solicitacoes_ids = await self.redis.redis_client.zrangebyscore(
+            CHAVE_ARQUIVAMENTO, "-inf", agora or time(), start=0, num=quantidade
+        )
+        return [s.decode("utf-8") if isinstance(s, bytes) else s for s in solicitacoes_ids]
+
+    async def remover(self, solicitacoes_ids):
+        """
+        Remove do Redis os registros de solicitações já arquivadas.
+
+        :param solicitacoes_ids: Lista com os IDs das solicitações.
+        """
+        if not solicitacoes_ids:
+            return
+        self.redis.check_redis_client()
+        async with self.redis.redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(*[self.chave(solicitacao_id) for solicitacao_id in solicitacoes_ids])
+            pipe.zrem(CHAVE_ARQUIVAMENTO, *solicitacoes_ids)
+            await pipe.execute()
@@ -1,22 +1,30 @@
-from logging import basicConfig, getLogger, DEBUG
-from json import dumps, loads
+from datetime import datetime, timezone
+from logging import getLogger
 from uuid import uuid4
-import asyncio
 
-from fastapi import FastAPI, Depends
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi import FastAPI, Depends, Request
+from fastapi.responses import RedirectResponse, JSONResponse, StreamingResponse, Response
 
 from api.exceptions import InvalidParameterError
-from api.schemas.input import ConsultaProcessoInput, StatusSolicitacaoInput
+from api.schemas.input import ConsultaProcessoInput, StatusSolicitacaoInput, StatusSolicitacaoLoteInput, \
+    AlteracoesProcessoInput, AgendamentoInput, ProcessoInput
 from api.schemas.output import StatusSolicitacaoOutput, ConsultaProcessoOutput, ConsultaProcessoResponses, \
-    StatusSolicitacaoResponses
-from api.services.process_handler import process_request
-from database.service import RedisConnection
-
-# Configuração de log
-basicConfig(filename='app.txt',
-            level=DEBUG,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    StatusSolicitacaoResponses, ConsultaProcessoLoteOutput, ConsultaProcessoLoteResponses, \
+    StatusSolicitacaoLoteOutput, StatusSolicitacaoLoteResponses, AlteracoesProcessoOutput, \
+    AlteracoesProcessoResponses, AgendamentoOutput, AgendamentoLoteOutput, AgendamentoResponses
+from api.services.cache import ResultadoCache
+from api.services.monitoramento import MonitoramentoProcesso
+from api.services.log import configurar_log
+from api.services.lote import ler_lote, validar_lote, registrar_lote, registro_na_fila, registro_em_cache
+from api.services.metricas import gerar_metricas
+from api.services.notificacao import OuvinteStatus, eventos_status
+from api.services.status import consultar_status_lote, status_json
+from crawler.default.http_client import http_client
+from database.agenda import AgendaMonitoramento
+from database.queue import RedisQueue
+from database.service import AsyncRedisConnection
+from database.solicitacao import RegistroSolicitacao
+
 logger = getLogger(__name__)
 
 # Inicialização do FastAPI
@@ -27,7 +35,32 @@ app = FastAPI(
     redoc_url=None
 )
 
-redis = RedisConnection()
+redis = AsyncRedisConnection()
+fila = RedisQueue()
+cache = ResultadoCache(redis=redis)
+registros = RegistroSolicitacao(redis=redis)
+ouvinte_status = OuvinteStatus(redis=redis)
+monitoramento = MonitoramentoProcesso()
+agenda = AgendaMonitoramento()
+
+
+@app.on_event("startup")
+async def startup():
+    """
+    Configura o log e inicia os recursos compartilhados pelo processo, como a sessão HTTP usada pelos crawlers.
+    """
+    configurar_log()
+    await http_client.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """
+    Libera os recursos compartilhados pelo processo ao encerrar a aplicação.
+    """
+    await ouvinte_status.close()
+    await http_client.close()
+    await AsyncRedisConnection.close()
 
 
 @app.get("/", include_in_schema=False)
@@ -39,6 +72,15 @@ def read_root():
     return RedirectResponse(url="/docs")
 
 
+@app.get("/metrics", include_in_schema=False)
+def metricas():
+    """
+    Expõe as métricas do processo da API no formato do Prometheus.
+    """
+    conteudo, media_type = gerar_metricas()
+    return Response(content=conteudo, media_type=media_type)
+
+
 @app.exception_handler(InvalidParameterError)
 def handle_invalid_parameter_error(request, exc):
     """
@@ -58,18 +100,27 @@ async def consulta_processo(payload: ConsultaProcessoInput):
     # Cria um número de solicitação
     solicitacao_id = str(uuid4())
 
+    response = {"numero_solicitacao": solicitacao_id}
+
+    # Se o processo foi capturado recentemente, responde com o resultado em cache sem passar pela fila.
+    # Solicitações com callback ou monitoramento passam pela fila, para que o worker notifique o cliente ou
+    # capture as movimentações novas.
+    encontrado, dados_capturados = (False, None) if payload.callback_url or payload.monitorar else \
+        await cache.get(payload.sigla_tribunal, payload.numero_processo)
+    if encontrado:
+        logger.info("Solicitação recebida, resultado obtido do cache")
+        await registros.criar({solicitacao_id: registro_em_cache(payload, dados_capturados)})
+        return JSONResponse(
+            content=ConsultaProcessoOutput.model_validate(response).model_dump(),
+            status_code=200
+        )
+
     # Armazena os detalhes da consulta no banco de dados (ex. Redis)
     logger.info("Solicitação recebida, dados salvos no banco")
-    redis.set_data(key=solicitacao_id, value=dumps({
-        "numero_processo": payload.numero_processo,
-        "sigla_tribunal": payload.sigla_tribunal,
-        "status": "Na Fila"
-    }))
-
-    response = {"numero_solicitacao": solicitacao_id}
+    await registros.criar({solicitacao_id: registro_na_fila(payload)})
 
-    # Inicia tarefa assíncrona para processar a solicitação
-    asyncio.create_task(process_request(solicitacao_id))
+    # Envia a solicitação para a fila, que será consumida pelos workers
+    await fila.enqueue(solicitacao_id)
 
     return JSONResponse(
         content=ConsultaProcessoOutput.model_validate(response).model_dump(),
@@ -77,6 +128,50 @@ async def consulta_processo(payload: ConsultaProcessoInput):
     )
 
 
+@app.post("/consulta-processo/lote",
+          response_model=ConsultaProcessoLoteOutput,
+          responses=ConsultaProcessoLoteResponses.responses(),
+          openapi_extra={
+              "requestBody": {
+                  "required": True,
+                  "content": {
+                      "application/json": {"schema": {
+                          "type": "array", "items": ConsultaProcessoInput.model_json_schema()
+                      }},
+                      "application/x-ndjson": {"schema": {"type": "string"}},
+                  },
+              }
+          })
+async def consulta_processo_lote(request: Request):
+    """
+    Recebe um lote de processos, como lista JSON ou NDJSON (um processo por linha), e coloca os processos
+    válidos na fila para processamento. Os itens inválidos são devolvidos em "erros", com o índice no lote.
+    """
+    itens = ler_lote(await request.body(), request.headers.get("content-type"))
+    validos, erros = validar_lote(itens)
+
+    solicitacoes_ids = await registrar_lote(registros, fila, cache, [processo for _, processo in validos])
+
+    response = {
+        "solicitacoes": [
+            {
+                "indice": indice,
+                "numero_processo": processo.numero_processo,
+                "sigla_tribunal": processo.sigla_tribunal,
+                "numero_solicitacao": solicitacao_id
+            }
+            for (indice, processo), solicitacao_id in zip(validos, solicitacoes_ids)
+        ],
+        "erros": erros
+    }
+    logger.info(f"Lote recebido com {len(validos)} processos válidos e {len(erros)} inválidos")
+
+    return JSONResponse(
+        content=ConsultaProcessoLoteOutput.model_validate(response).model_dump(),
+        status_code=200
+    )
+
+
 @app.get("/status-solicitacao/{numero_solicitacao}",
          response_model=StatusSolicitacaoOutput,
          responses=StatusSolicitacaoResponses.responses())
@@ -84,15 +179,116 @@ async def status_solicitacao(payload: StatusSolicitacaoInput = Depends()):
     """
     Recupera o status de uma solicitação de consulta de processo.
     """
-    dados_solicitacao = redis.get_data(payload.numero_solicitacao)
+    dados_solicitacao = await registros.obter_registro(payload.numero_solicitacao)
     # Verifica se o número da solicitação existe
     if dados_solicitacao is None:
         logger.info(f"Solicitação {payload.numero_solicitacao} não encontrada")
         return JSONResponse({"error": "Solicitação não encontrada"}, status_code=404)
 
-    response = loads(dados_solicitacao)
+    # O registro já foi validado ao ser gravado, então o JSON gravado é devolvido diretamente
+    return Response(content=status_json(dados_solicitacao), media_type="application/json", status_code=200)
+
+
+@app.get("/status-solicitacao/{numero_solicitacao}/eventos",
+         responses=StatusSolicitacaoResponses.responses(),
+         response_class=StreamingResponse)
+async def status_solicitacao_eventos(payload: StatusSolicitacaoInput = Depends()):
+    """
+    Acompanha o status de uma solicitação via Server-Sent Events: envia o status atual e cada mudança seguinte,
+    encerrando a conexão quando a solicitação termina. Evita a consulta repetida de /status-solicitacao.
+    """
+    if await registros.obter(payload.numero_solicitacao) is None:
+        logger.info(f"Solicitação {payload.numero_solicitacao} não encontrada")
+        return JSONResponse({"error": "Solicitação não encontrada"}, status_code=404)
+
+    return StreamingResponse(
+        eventos_status(registros, ouvinte_status, payload.numero_solicitacao),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/status-solicitacao/lote",
+          response_model=StatusSolicitacaoLoteOutput,
+          responses=StatusSolicitacaoLoteResponses.responses())
+async def status_solicitacao_lote(payload: StatusSolicitacaoLoteInput):
+    """
+    Recupera o status de várias solicitações de uma só vez, opcionalmente filtrando pelo status e omitindo os
+    dados capturados (compacto).
+    """
+    solicitacoes, nao_encontradas = await consultar_status_lote(
+        registros, payload.numeros_solicitacao, status=payload.status, compacto=payload.compacto
+    )
+
+    return JSONResponse(
+        content=StatusSolicitacaoLoteOutput.model_validate({
+            "solicitacoes": solicitacoes,
+            "nao_encontradas": nao_encontradas
+        }).model_dump(exclude_none=True),
+        status_code=200
+    )
+
+
+@app.get("/processos/{sigla_tribunal}/{numero_processo}/alteracoes",
+         response_model=AlteracoesProcessoOutput,
+         responses=AlteracoesProcessoResponses.responses())
+async def alteracoes_processo(payload: AlteracoesProcessoInput = Depends()):
+    """
+    Recupera as movimentações novas de um processo monitorado, registradas a cada captura com "monitorar",
+    opcionalmente apenas as capturadas após a data informada em "desde".
+    """
+    alteracoes = await monitoramento.alteracoes_desde(payload.sigla_tribunal, payload.numero_processo, payload.desde)
 
     return JSONResponse(
-        content=StatusSolicitacaoOutput.model_validate(response).model_dump(exclude_none=True),
+        content=AlteracoesProcessoOutput.model_validate({
+            "numero_processo": payload.numero_processo,
+            "sigla_tribunal": payload.sigla_tribunal,
+            "alteracoes": alteracoes
+        }).model_dump(),
         status_code=200
     )
+
+
+@app.post("/monitoramento", response_model=AgendamentoLoteOutput)
+async def monitoramento_agendar(payload: list[AgendamentoInput]):
+    """
+    Inclui ou atualiza processos no monitoramento agendado. Cada processo é capturado periodicamente, no
+    intervalo informado, pelo scheduler, dentro do orçamento diário de capturas do tribunal.
+    """
+    await agenda.agendar([processo.model_dump() for processo in payload])
+    logger.info(f"{len(payload)} processos incluídos no monitoramento agendado")
+
+    return JSONResponse(
+        content=AgendamentoLoteOutput.model_validate({"agendados": len(payload)}).model_dump(),
+        status_code=200
+    )
+
+
+@app.get("/monitoramento/{sigla_tribunal}/{numero_processo}",
+         response_model=AgendamentoOutput,
+         responses=AgendamentoResponses.responses())
+async def monitoramento_consultar(payload: ProcessoInput = Depends()):
+    """
+    Recupera a configuração e a próxima captura de um processo do monitoramento agendado.
+    """
+    processo = await agenda.obter(payload.sigla_tribunal, payload.numero_processo)
+    if processo is None:
+        return JSONResponse({"error": "Processo não agendado"}, status_code=404)
+
+    if processo["proxima_captura"] is not None:
+        processo["proxima_captura"] = datetime.fromtimestamp(processo["proxima_captura"], timezone.utc).isoformat()
+
+    return JSONResponse(
+        content=AgendamentoOutput.model_validate(processo).model_dump(exclude_none=True),
+        status_code=200
+    )
+
+
+@app.delete("/monitoramento/{sigla_tribunal}/{numero_processo}", status_code=204)
+async def monitoramento_remover(payload: ProcessoInput = Depends()):
+    """
+    Remove um processo do monitoramento agendado.
+    """
+    if not await agenda.remover(payload.sigla_tribunal, payload.numero_processo):
+        return JSONResponse({"error": "Processo não agendado"}, status_code=404)
+    return Response(status_code=204)
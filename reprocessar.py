@@ -0,0 +1,154 @@
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from json import dumps
+from logging import getLogger
+from multiprocessing import get_context
+from os import cpu_count, environ
+from pathlib import Path
+import sys
+
+from api.services.log import configurar_log
+from crawler.default.data_extractor import EXTRATORES
+from crawler.default.instances.first_instance import FirstInstance
+from crawler.default.instances.second_instance import SecondInstance
+from crawler.default.snapshot import ArmazemSnapshots
+
+logger = getLogger(__name__)
+
+# Extração usada em cada instância, a mesma da captura
+EXTRACOES = {"primeira": FirstInstance._extrair_dados, "segunda": SecondInstance._extrair_dados}
+
+
+def reextrair(diretorio, pagina):
+    """
+    Lê e extrai uma página gravada. Executada nos processos do pool, por isso recebe apenas o diretório e o
+    hash, e a página é lida do disco pelo próprio processo.
+
+    :param diretorio: Diretório dos snapshots.
+    :param pagina: Tupla (SHA-256 do conteúdo, instância da página).
+    :return: Tupla (dados extraídos, None), ou (None, descrição do erro) se a página não pôde ser extraída.
+    """
+    hash_html, instancia = pagina
+    try:
+        return EXTRACOES[instancia](ArmazemSnapshots(diretorio).ler(hash_html)), None
+    except Exception as e:
+        return None, repr(e)
+
+
+class Reprocessador:
+    """
+    Classe Reprocessador refaz a extração dos dados a partir dos snapshots gravados, sem consultar os tribunais.
+
+    Considera apenas a captura mais recente de cada processo e instância, e extrai uma única vez cada página
+    distinta (mesmo hash e instância), distribuindo as extrações entre os processos do pool.
+
+    :ivar armazem: ArmazemSnapshots com as páginas gravadas.
+    :ivar workers: Número de processos do pool.
+    """
+
+    def __init__(self, armazem, workers=None):
+        """
+        Inicializa o reprocessador.
+
+        :param armazem: ArmazemSnapshots com as páginas gravadas.
+        :param workers: Número de processos do pool. Usa o número de CPUs se não informado.
+        """
+        self.armazem = armazem
+        self.workers = workers or cpu_count() or 1
+
+    def selecionar(self, siglas=None, instancias=None):
+        """
+        Seleciona a captura mais recente de cada processo e instância nos índices.
+
+        :param siglas: Siglas dos tribunais reprocessados (todos se não informadas).
+        :param instancias: Instâncias reprocessadas (todas se não informadas).
+        :return: Lista das capturas selecionadas.
+        """
+        selecionadas = {}
+        for captura in self.armazem.capturas():
+            if siglas and captura["sigla_tribunal"] not in siglas:
+                continue
+            if instancias and captura["instancia"] not in instancias:
+                continue
+            # Os índices são lidos em ordem cronológica, a última captura de cada processo prevalece
+            selecionadas[captura["sigla_tribunal"], captura["instancia"], captura["numero_processo"]] = captura
+        return list(selecionadas.values())
+
+    def executar(self, saida, siglas=None, instancias=None):
+        """
+        Extrai as páginas selecionadas e grava os dados de cada captura em JSON Lines.
+
+        :param saida: Caminho do arquivo de saída.
+        :param siglas: Siglas dos tribunais reprocessados (todos se não informadas).
+        :param instancias: Instâncias reprocessadas (todas se não informadas).
+        :return: Dicionário com o número de capturas, de páginas distintas extraídas e de erros.
+        """
+        capturas = self.selecionar(siglas, instancias)
+        paginas = list(dict.fromkeys((captura["hash"], captura["instancia"]) for captura in capturas))
+        logger.info(f"Reprocessando {len(capturas)} capturas ({len(paginas)} páginas distintas)")
+
+        dados = {}
+        erros = 0
+        # Lotes de páginas por tarefa reduzem o custo de comunicação com o pool nas páginas pequenas
+        lote = max(len(paginas) // (self.workers * 4), 1)
+        # spawn evita herdar threads e conexões abertas do processo pai, como no ExtracaoExecutor
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(paginas)) or 1,
+                                 mp_context=get_context("spawn")) as executor:
+            resultados = executor.map(partial(reextrair, str(self.armazem.diretorio)), paginas, chunksize=lote)
+            for pagina, (dados_pagina, erro) in zip(paginas, resultados):
+                if erro:
+                    erros += 1
+                    logger.error(f"Erro ao reprocessar o snapshot {pagina[0]}: {erro}")
+                else:
+                    dados[pagina] = dados_pagina
+
+        saida = Path(saida)
+        saida.parent.mkdir(parents=True, exist_ok=True)
+        with open(saida, "w", encoding="utf-8") as arquivo:
+            for captura in capturas:
+                pagina = (captura["hash"], captura["instancia"])
+                if pagina in dados:
+                    arquivo.write(dumps({**captura, "dados": dados[pagina]}, ensure_ascii=False) + "\n")
+
+        return {"capturas": len(capturas), "paginas": len(paginas), "erros": erros}
+
+
+def main(argumentos=None):
+    """
+    Reprocessa os snapshots gravados e exibe o resumo.
+
+    :param argumentos: Argumentos da linha de comando (usa sys.argv se não informados).
+    :return: Código de saída: 1 se alguma página não pôde ser reprocessada, 0 caso contrário.
+    """
+    parser = ArgumentParser(description="Refaz a extração dos dados a partir dos snapshots gravados.")
+    parser.add_argument("--diretorio", help="Diretório dos snapshots. Usa SNAPSHOT_DIRETORIO se não informado.")
+    parser.add_argument("--saida", type=Path, default=Path("reprocessamento.jsonl"),
+                        help="Arquivo JSON Lines com os dados extraídos.")
+    parser.add_argument("--tribunais", nargs="+", help="Siglas dos tribunais reprocessados.")
+    parser.add_argument("--instancias", nargs="+", choices=tuple(EXTRACOES), help="Instâncias reprocessadas.")
+    parser.add_argument("--workers", type=int, help="Processos de extração (padrão: número de CPUs).")
+    parser.add_argument("--parser", choices=tuple(EXTRATORES),
+                        help="Backend de análise do HTML (padrão: PARSER_HTML).")
+    argumentos = parser.parse_args(argumentos)
+
+    configurar_log(arquivo="")
+    if argumentos.parser:
+        # Lido pelos processos do pool, que herdam as variáveis de ambiente
+        environ["PARSER_HTML"] = argumentos.parser
+
+    armazem = ArmazemSnapshots(argumentos.diretorio)
+    if not armazem.habilitado:
+        print("Informe o diretório dos snapshots (--diretorio ou SNAPSHOT_DIRETORIO).", file=sys.stderr)
+        return 1
+
+    resumo = Reprocessador(armazem, argumentos.workers).executar(
+        argumentos.saida, argumentos.tribunais, argumentos.instancias
+    )
+    print(f"{resumo['capturas']} capturas reprocessadas ({resumo['paginas']} páginas distintas, "
+          f"{resumo['erros']} erros) em {argumentos.saida}")
+    return 1 if resumo["erros"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
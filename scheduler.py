@@ -0,0 +1,163 @@
+from logging import getLogger
+from signal import SIGINT, SIGTERM
+from time import time
+from typing import get_args
+from uuid import uuid4
+import asyncio
+
+from decouple import config
+
+from api.services.log import configurar_log
+from api.schemas.input import ConsultaProcessoInput, SIGLAS_TRIBUNAIS_DISPONIVEIS
+from api.services.cache import ResultadoCache
+from api.services.lote import registrar_lote
+from database.agenda import AgendaMonitoramento
+from database.queue import RedisQueue
+from database.service import AsyncRedisConnection
+from database.solicitacao import RegistroSolicitacao
+
+logger = getLogger(__name__)
+
+
+class Scheduler:
+    """
+    Classe Scheduler envia para a fila as capturas dos processos monitorados cuja próxima captura venceu.
+
+    A cada ciclo, cada tribunal recebe uma parte do seu orçamento diário de capturas, de modo que as capturas
+    são distribuídas ao longo do dia sem exceder o orçamento. As solicitações criadas seguem o mesmo caminho de
+    uma consulta com "monitorar" (registro, fila e process_request no worker). Apenas um scheduler por vez
+    envia capturas, garantido por um lock de liderança no Redis.
+
+    :ivar agenda: Agenda de processos monitorados.
+    :ivar fila: Fila de solicitações.
+    :ivar intervalo: Tempo, em segundos, entre dois ciclos.
+    :ivar siglas: Siglas dos tribunais atendidos.
+    :ivar nome: Identificador deste scheduler no lock de liderança.
+    """
+
+    def __init__(self, agenda=None, fila=None, intervalo=None):
+        """
+        Inicializa o scheduler.
+
+        :param agenda: Agenda de processos monitorados. Cria uma AgendaMonitoramento se não informada.
+        :param fila: Fila de solicitações. Cria uma RedisQueue se não informada.
+        :param intervalo: Tempo, em segundos, entre dois ciclos. Usa AGENDA_INTERVALO se não informado.
+        """
+        self.agenda = agenda or AgendaMonitoramento()
+        self.fila = fila or RedisQueue()
+        self.redis = AsyncRedisConnection()
+        self.cache = ResultadoCache(redis=self.redis)
+        self.registros = RegistroSolicitacao(redis=self.redis)
+        self.intervalo = intervalo or config("AGENDA_INTERVALO", default=10, cast=float)
+        self.siglas = get_args(SIGLAS_TRIBUNAIS_DISPONIVEIS)
+        self.nome = str(uuid4())
+        self._saldo = {}
+        self._parar = asyncio.Event()
+
+    def parar(self):
+        """Sinaliza ao scheduler que deve encerrar após o ciclo em andamento."""
+        logger.info("Encerrando scheduler")
+        self._parar.set()
+
+    @staticmethod
+    def orcamento_diario(sigla_tribunal):
+        """
+        Lê o número máximo de capturas agendadas por dia do tribunal, usando a configuração geral quando não
+        houver uma específica (por exemplo, AGENDA_ORCAMENTO_DIARIO_TJAL).
+
+        :param sigla_tribunal: Sigla do tribunal.
+        :return: Número de capturas por dia.
+        """
+        geral = config("AGENDA_ORCAMENTO_DIARIO", default=50000, cast=float)
+        return config(f"AGENDA_ORCAMENTO_DIARIO_{sigla_tribunal.upper()}", default=geral, cast=float)
+
+    async def run(self):
+        """Executa os ciclos do scheduler até ser encerrado."""
+        await self.fila.criar_grupo()
+        logger.info(f"Scheduler {self.nome} iniciado")
+        try:
+            while not self._parar.is_set():
+                try:
+                    if await self._liderar():
+                        await self.executar_ciclo()
+                except Exception as e:
+                    logger.error(f"Erro no ciclo do scheduler: {e!r}")
+
+                try:
+                    await asyncio.wait_for(self._parar.wait(), timeout=self.intervalo)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await AsyncRedisConnection.close()
+
+    async def _liderar(self):
+        """
+        Obtém ou renova o lock de liderança, para que apenas um scheduler envie as capturas.
+
+        :return: True se este scheduler é o líder.
+        """
+        validade = int(self.intervalo * 3) + 1
+        if await self.redis.set_data(key="agenda:lider", value=self.nome, ex=validade, nx=True):
+            return True
+        # Renova o lock apenas se ainda for deste scheduler, de forma atômica, para não tomar a liderança de outro
+        # scheduler que o obteve após a expiração
+        return await self.redis.expire_if_value("agenda:lider", self.nome, validade)
+
+    def _quantidade_ciclo(self, sigla_tribunal):
+        """
+        Acumula a parte do orçamento diário do tribunal correspondente a um ciclo e devolve quantas capturas
+        podem ser enviadas agora. O saldo não acumula além de um ciclo, evitando rajadas após períodos ociosos.
+
+        :param sigla_tribunal: Sigla do tribunal.
+        :return: Número de capturas que podem ser enviadas no ciclo.
+        """
+        por_ciclo = self.orcamento_diario(sigla_tribunal) * self.intervalo / 86400
+        # Arredonda para que a soma das frações (0.1 + 0.1 + ...) não fique logo abaixo do inteiro
+        saldo = round(min(self._saldo.get(sigla_tribunal, 0) + por_ciclo, max(por_ciclo, 1)), 9)
+        self._saldo[sigla_tribunal] = saldo
+        return int(saldo)
+
+    async def executar_ciclo(self, agora=None):
+        """
+        Envia para a fila as capturas vencidas de cada tribunal, dentro da parte do orçamento do ciclo, e
+        agenda a próxima captura desses processos.
+
+        :param agora: Timestamp atual (usado nos testes). Usa o horário do sistema se não informado.
+        :return: Dicionário com o número de capturas enviadas por tribunal.
+        """
+        agora = agora or time()
+        enviados = {}
+        for sigla_tribunal in self.siglas:
+            processos = await self.agenda.vencidos(sigla_tribunal, self._quantidade_ciclo(sigla_tribunal), agora)
+            if not processos:
+                continue
+
+            await registrar_lote(self.registros, self.fila, self.cache, [
+                ConsultaProcessoInput(
+                    numero_processo=processo["numero_processo"],
+                    sigla_tribunal=processo["sigla_tribunal"],
+                    callback_url=processo.get("callback_url"),
+                    monitorar=True
+                )
+                for processo in processos
+            ])
+            await self.agenda.reagendar(processos, agora)
+
+            self._saldo[sigla_tribunal] -= len(processos)
+            enviados[sigla_tribunal] = len(processos)
+            logger.info(f"{len(processos)} capturas agendadas do {sigla_tribunal} enviadas para a fila")
+        return enviados
+
+
+async def main():
+    """Executa o scheduler até receber SIGINT ou SIGTERM."""
+    configurar_log()
+    scheduler = Scheduler()
+    loop = asyncio.get_running_loop()
+    for sinal in (SIGINT, SIGTERM):
+        loop.add_signal_handler(sinal, scheduler.parar)
+    await scheduler.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -89,6 +89,81 @@ def coverage(c):
     c.run("coverage run --omit=./tests/* -m pytest && coverage report")
 
 
+@task(help={
+    "repeticoes": "Execuções medidas nas páginas pequenas (padrão 50).",
+    "pipeline": "Inclui o process_request de ponta a ponta contra o servidor local do e-SAJ (requer Redis).",
+    "saida": "Arquivo JSON dos resultados (padrão benchmarks/resultados/<data>.json).",
+})
+def benchmark(c, repeticoes=50, pipeline=False, saida=None):
+    """
+    Executa os benchmarks e grava os resultados em JSON.
+    Mede a extração do HTML, a validação do resultado e, opcionalmente, o pipeline completo, para comparação
+    com execuções anteriores.
+
+    :param c: Uma instância de contexto fornecida pela biblioteca invoke.
+    :param repeticoes: Número de execuções medidas nas páginas pequenas.
+    :param pipeline: Se True, inclui o benchmark do pipeline completo.
+    :param saida: Caminho do arquivo JSON dos resultados.
+    """
+    grupos = "extracao validacao pipeline" if pipeline else "extracao validacao"
+    comando = f"python -m benchmarks.executar --repeticoes {repeticoes} --apenas {grupos}"
+    if saida:
+        comando += f" --saida {saida}"
+    c.run(comando)
+
+
+@task(help={"base": "Resultados de referência.", "atual": "Resultados a comparar.",
+            "limite": "Aumento do p50 considerado regressão (padrão 0.1)."})
+def comparar_benchmark(c, base, atual, limite=0.1):
+    """
+    Compara duas execuções dos benchmarks e falha se a mediana de alguma medição aumentar além do limite.
+
+    :param c: Uma instância de contexto fornecida pela biblioteca invoke.
+    :param base: Arquivo JSON dos resultados de referência.
+    :param atual: Arquivo JSON dos resultados a comparar.
+    :param limite: Aumento relativo da mediana considerado regressão.
+    """
+    c.run(f"python -m benchmarks.executar --comparar {base} {atual} --limite {limite}")
+
+
+@task(help={"url": "URL base da API (padrão http://localhost:8000).", "taxa": "Consultas por minuto (padrão 1000).",
+            "duracao": "Tempo de envio em segundos (padrão 60).", "saida": "Arquivo JSON do relatório."})
+def carga(c, url="http://localhost:8000", taxa=1000, duracao=60, saida=None):
+    """
+    Executa o teste de carga contra a API e exibe as latências de envio e de encerramento das solicitações.
+
+    :param c: Uma instância de contexto fornecida pela biblioteca invoke.
+    :param url: URL base da API.
+    :param taxa: Número de consultas enviadas por minuto.
+    :param duracao: Tempo, em segundos, de envio das consultas.
+    :param saida: Caminho do arquivo JSON do relatório.
+    """
+    comando = f"python -m benchmarks.carga --url {url} --taxa {taxa} --duracao {duracao}"
+    if saida:
+        comando += f" --saida {saida}"
+    c.run(comando)
+
+
+@task(help={"diretorio": "Diretório dos snapshots (padrão SNAPSHOT_DIRETORIO).",
+            "saida": "Arquivo JSON Lines dos dados extraídos (padrão reprocessamento.jsonl).",
+            "workers": "Processos de extração (padrão: número de CPUs)."})
+def reprocessar(c, diretorio=None, saida="reprocessamento.jsonl", workers=None):
+    """
+    Extrai novamente os dados das páginas guardadas nos snapshots, sem consultar os tribunais.
+
+    :param c: Uma instância de contexto fornecida pela biblioteca invoke.
+    :param diretorio: Diretório dos snapshots.
+    :param saida: Caminho do arquivo JSON Lines dos dados extraídos.
+    :param workers: Número de processos de extração.
+    """
+    comando = f"python reprocessar.py --saida {saida}"
+    if diretorio:
+        comando += f" --diretorio {diretorio}"
+    if workers:
+        comando += f" --workers {workers}"
+    c.run(comando)
+
+
 @task
 def all_tests(c):
     """
@@ -1,6 +1,6 @@
 import pytest
 from api.exceptions import InvalidParameterError
-from api.schemas.input import ConsultaProcessoInput, StatusSolicitacaoInput
+from api.schemas.input import ConsultaProcessoInput, StatusSolicitacaoInput, StatusSolicitacaoLoteInput
 
 
 # Testes para o modelo ConsultaProcessoInput
@@ -43,6 +43,43 @@ def test_invalid_sigla_tribunal():
         ConsultaProcessoInput(**input_data)
 
 
+def test_valid_callback_url():
+    input_data = {
+        "numero_processo": "1234567-89.2023.8.01.2345",
+        "sigla_tribunal": "TJAL",
+        "callback_url": "https://cliente.com/retorno"
+    }
+    consulta = ConsultaProcessoInput(**input_data)
+    assert consulta.callback_url == input_data["callback_url"]
+
+
+@pytest.mark.parametrize("callback_url", [
+    "http://127.0.0.1:8000/retorno", "http://169.254.169.254/latest/meta-data", "http://10.0.0.5/retorno",
+    "http://[::1]/retorno", "http://[::ffff:127.0.0.1]/retorno", "http://localhost/retorno",
+    "http://api.localhost/retorno", "http://0.0.0.0/retorno"
+])
+def test_invalid_callback_url_rede_interna(callback_url):
+    input_data = {
+        "numero_processo": "1234567-89.2023.8.01.2345",
+        "sigla_tribunal": "TJAL",
+        "callback_url": callback_url
+    }
+    with pytest.raises(InvalidParameterError) as exc:
+        ConsultaProcessoInput(**input_data)
+    assert "rede interna" in str(exc.value)
+
+
+def test_invalid_callback_url_host_redis(monkeypatch):
+    monkeypatch.setenv("REDIS_URL", "redis://redis-interno:6379")
+    input_data = {
+        "numero_processo": "1234567-89.2023.8.01.2345",
+        "sigla_tribunal": "TJAL",
+        "callback_url": "http://redis-interno:6379/"
+    }
+    with pytest.raises(InvalidParameterError):
+        ConsultaProcessoInput(**input_data)
+
+
 # Testes para o modelo StatusSolicitacaoInput
 
 def test_valid_numero_solicitacao():
@@ -60,3 +97,24 @@ def test_invalid_numero_solicitacao():
     with pytest.raises(InvalidParameterError) as exc:
         StatusSolicitacaoInput(**input_data)
     assert "não é compatível com o formato UUID" in str(exc.value)
+
+
+# Testes para o modelo StatusSolicitacaoLoteInput
+
+def test_valid_numeros_solicitacao():
+    input_data = {
+        "numeros_solicitacao": ["550e8400-e29b-41d4-a716-446655440000", "d00bc000-0f0d-0d00-0cdf-000b00d00000"],
+        "status": ["Na Fila"]
+    }
+    status = StatusSolicitacaoLoteInput(**input_data)
+    assert status.numeros_solicitacao == input_data["numeros_solicitacao"]
+    assert status.compacto is False
+
+
+def test_invalid_numeros_solicitacao():
+    input_data = {
+        "numeros_solicitacao": ["550e8400-e29b-41d4-a716-446655440000", "12345"]
+    }
+    with pytest.raises(InvalidParameterError) as exc:
+        StatusSolicitacaoLoteInput(**input_data)
+    assert "'12345' não é compatível com o formato UUID" in str(exc.value)
@@ -0,0 +1,167 @@
+from asyncio import CancelledError, create_task, gather, sleep
+
+import pytest
+from unittest.mock import AsyncMock
+
+from api.services.cache import ResultadoCache
+from crawler.default.main import CapturaParcial
+from database.codec import codificar
+
+
+class RedisEmMemoria:
+    """Substituto simples da AsyncRedisConnection para os testes do cache."""
+
+    def __init__(self):
+        self.dados = {}
+
+    async def get_data(self, key):
+        return self.dados.get(key)
+
+    async def set_data(self, key, value, ex=None, nx=False):
+        if nx and key in self.dados:
+            return None
+        self.dados[key] = value
+        return True
+
+    async def delete_data(self, *keys):
+        for key in keys:
+            self.dados.pop(key, None)
+
+    async def get_many(self, keys):
+        return [self.dados.get(key) for key in keys]
+
+    async def delete_if_value(self, key, value):
+        if self.dados.get(key) != value:
+            return False
+        del self.dados[key]
+        return True
+
+
+def criar_cache():
+    cache = ResultadoCache(redis=RedisEmMemoria())
+    cache.intervalo_espera = 0.01
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_get_sem_resultado():
+    cache = criar_cache()
+
+    assert await cache.get("TJAL", "123") == (False, None)
+
+
+@pytest.mark.asyncio
+async def test_get_many():
+    cache = criar_cache()
+    await cache.set("TJAL", "123", {"classe": "A"})
+    await cache.set("TJCE", "456", None)
+
+    assert await cache.get_many([("TJAL", "123"), ("TJAL", "789"), ("TJCE", "456")]) == [
+        (True, {"classe": "A"}), (False, None), (True, None)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_obter_ou_capturar_usa_cache():
+    cache = criar_cache()
+    await cache.set("TJAL", "123", {"classe": "A"})
+    capturar = AsyncMock()
+
+    assert await cache.obter_ou_capturar("TJAL", "123", capturar) == {"classe": "A"}
+    capturar.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_obter_ou_capturar_grava_resultado():
+    cache = criar_cache()
+    capturar = AsyncMock(return_value={"classe": "A"})
+
+    assert await cache.obter_ou_capturar("tjal", "123", capturar) == {"classe": "A"}
+    assert cache.redis.dados["cache:TJAL:123"] == codificar({"classe": "A"})
+    assert "lock:cache:TJAL:123" not in cache.redis.dados
+
+
+@pytest.mark.asyncio
+async def test_obter_ou_capturar_nao_grava_resultado_parcial():
+    cache = criar_cache()
+    parcial = CapturaParcial({"first_instance": {"classe": "A"}, "second_instance": None})
+    capturar = AsyncMock(return_value=parcial)
+
+    assert await cache.obter_ou_capturar("TJAL", "123", capturar) == parcial
+    assert "cache:TJAL:123" not in cache.redis.dados
+    assert "lock:cache:TJAL:123" not in cache.redis.dados
+
+
+@pytest.mark.asyncio
+async def test_obter_ou_capturar_coalesce_chamadas_simultaneas():
+    cache = criar_cache()
+    chamadas = []
+
+    async def capturar():
+        chamadas.append(1)
+        await sleep(0.05)
+        return {"classe": "A"}
+
+    resultados = await gather(*(cache.obter_ou_capturar("TJAL", "123", capturar) for _ in range(5)))
+
+    assert resultados == [{"classe": "A"}] * 5
+    assert len(chamadas) == 1
+
+
+@pytest.mark.asyncio
+async def test_obter_ou_capturar_aguarda_lock_de_outro_worker():
+    cache = criar_cache()
+    cache.redis.dados["lock:cache:TJAL:123"] = "outro_worker"
+    capturar = AsyncMock()
+
+    async def outro_worker():
+        await sleep(0.05)
+        await cache.set("TJAL", "123", {"classe": "B"})
+
+    resultado, _ = await gather(cache.obter_ou_capturar("TJAL", "123", capturar), outro_worker())
+
+    assert resultado == {"classe": "B"}
+    capturar.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_obter_ou_capturar_libera_lock_em_erro():
+    cache = criar_cache()
+
+    with pytest.raises(ValueError):
+        await cache.obter_ou_capturar("TJAL", "123", AsyncMock(side_effect=ValueError("Erro")))
+
+    assert cache.redis.dados == {}
+
+
+@pytest.mark.asyncio
+async def test_obter_ou_capturar_cancelamento_nao_afeta_outras_chamadas():
+    cache = criar_cache()
+
+    async def capturar():
+        await sleep(0.05)
+        return {"classe": "A"}
+
+    primeira = create_task(cache.obter_ou_capturar("TJAL", "123", capturar))
+    await sleep(0.01)
+    segunda = create_task(cache.obter_ou_capturar("TJAL", "123", capturar))
+    await sleep(0.01)
+    primeira.cancel()
+
+    assert await segunda == {"classe": "A"}
+    with pytest.raises(CancelledError):
+        await primeira
+
+
+@pytest.mark.asyncio
+async def test_obter_ou_capturar_nao_remove_lock_de_outro_worker():
+    cache = criar_cache()
+
+    async def capturar():
+        # O lock expirou durante a captura e foi obtido por outro worker
+        cache.redis.dados["lock:cache:TJAL:123"] = "outro_worker"
+        return {"classe": "A"}
+
+    await cache.obter_ou_capturar("TJAL", "123", capturar)
+
+    assert cache.redis.dados["lock:cache:TJAL:123"] == "outro_worker"
@@ -0,0 +1,110 @@
+import json
+from os import getpid
+from socket import gethostname
+from logging import INFO, WARNING, LogRecord, getLogger
+from queue import Queue
+
+import pytest
+
+from api.services import log
+from api.services.log import FilaHandler, FiltroAmostragem, FiltroContexto, FormatadorJson, configurar_log, \
+    contexto_solicitacao, encerrar_log
+
+
+def criar_registro(nome="crawler.default.instances.first_instance", nivel=INFO, mensagem="Mensagem %s",
+                   args=("teste",), exc_info=None):
+    return LogRecord(nome, nivel, __file__, 1, mensagem, args, exc_info)
+
+
+def test_filtro_contexto_inclui_solicitacao():
+    registro = criar_registro()
+
+    with contexto_solicitacao("id_solicitacao"):
+        FiltroContexto().filter(registro)
+
+    assert registro.solicitacao_id == "id_solicitacao"
+    assert log.solicitacao_atual.get() is None
+
+
+def test_filtro_amostragem_mantem_avisos_e_outros_loggers():
+    filtro = FiltroAmostragem(taxa=0, prefixos=["crawler"])
+
+    assert filtro.filter(criar_registro(nivel=WARNING))
+    assert filtro.filter(criar_registro(nome="api.services.process_handler"))
+    assert not filtro.filter(criar_registro())
+
+
+def test_filtro_amostragem_por_solicitacao():
+    filtro = FiltroAmostragem(taxa=0.5, prefixos=["crawler"])
+
+    for solicitacao_id in (f"id-{indice}" for indice in range(20)):
+        decisoes = set()
+        for _ in range(5):
+            registro = criar_registro()
+            registro.solicitacao_id = solicitacao_id
+            decisoes.add(filtro.filter(registro))
+        # Todos os registros de uma solicitação têm a mesma decisão
+        assert len(decisoes) == 1
+
+
+def test_formatador_json():
+    try:
+        raise ValueError("falha")
+    except ValueError as e:
+        registro = criar_registro(exc_info=(type(e), e, e.__traceback__))
+    registro.solicitacao_id = "id_solicitacao"
+
+    dados = json.loads(FormatadorJson().format(registro))
+
+    assert dados["mensagem"] == "Mensagem teste"
+    assert dados["nivel"] == "INFO"
+    assert dados["solicitacao_id"] == "id_solicitacao"
+    assert "ValueError: falha" in dados["excecao"]
+
+
+def test_fila_handler_descarta_com_fila_cheia():
+    fila = Queue(maxsize=1)
+    handler = FilaHandler(fila)
+
+    handler.handle(criar_registro())
+    handler.handle(criar_registro())
+
+    registro = fila.get_nowait()
+    assert registro.getMessage() == "Mensagem teste"
+    assert registro.args is None
+    assert handler.descartados == 1
+
+
+@pytest.fixture
+def log_configurado(tmp_path):
+    nivel = getLogger().level
+    configurar_log(nivel="INFO", arquivo=str(tmp_path / "logs" / "app-{pid}.txt"))
+    yield tmp_path / "logs"
+    encerrar_log()
+    getLogger().setLevel(nivel)
+
+
+def test_configurar_log_escreve_json(log_configurado):
+    with contexto_solicitacao("id_solicitacao"):
+        getLogger("api.services.process_handler").info("Dados capturados")
+    encerrar_log()
+
+    arquivos = list(log_configurado.iterdir())
+    assert len(arquivos) == 1
+    linha = json.loads(arquivos[0].read_text(encoding="utf-8").splitlines()[-1])
+    assert linha["mensagem"] == "Dados capturados"
+    assert linha["solicitacao_id"] == "id_solicitacao"
+
+
+def test_configurar_log_uma_unica_vez(log_configurado):
+    assert configurar_log() is configurar_log()
+
+
+def test_arquivo_padrao_por_processo(tmp_path, monkeypatch):
+    """Testa se o arquivo padrão é separado por host e processo, para que as rotações não concorram."""
+    monkeypatch.chdir(tmp_path)
+
+    handler = log._criar_handler(log.ARQUIVO_PADRAO)
+    handler.close()
+
+    assert handler.baseFilename == str(tmp_path / "logs" / f"{gethostname()}-{getpid()}.txt")
@@ -0,0 +1,108 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from api.exceptions import InvalidParameterError
+from api.schemas.input import ConsultaProcessoInput
+from api.services.lote import ler_lote, validar_lote, registrar_lote
+
+PROCESSO_TJAL = {"numero_processo": "0710802-55.2018.8.02.0001", "sigla_tribunal": "TJAL"}
+PROCESSO_TJCE = {"numero_processo": "0070337-91.2008.8.06.0001", "sigla_tribunal": "TJCE"}
+
+
+def test_ler_lote_lista_json():
+    assert ler_lote(b'[{"numero_processo": "1"}, {"numero_processo": "2"}]') == [
+        {"numero_processo": "1"}, {"numero_processo": "2"}
+    ]
+
+
+def test_ler_lote_ndjson():
+    corpo = b'{"numero_processo": "1"}\n\n{"numero_processo": "2"}\n'
+
+    assert ler_lote(corpo, "application/x-ndjson; charset=utf-8") == [
+        {"numero_processo": "1"}, {"numero_processo": "2"}
+    ]
+
+
+def test_ler_lote_ndjson_linha_invalida():
+    with pytest.raises(InvalidParameterError, match="Linha 2"):
+        ler_lote(b'{"numero_processo": "1"}\n{invalido', "application/x-ndjson")
+
+
+@pytest.mark.parametrize("corpo", [b'{"numero_processo": "1"}', b"invalido", b"[]"])
+def test_ler_lote_invalido(corpo):
+    with pytest.raises(InvalidParameterError):
+        ler_lote(corpo, "application/json")
+
+
+def test_ler_lote_tamanho_maximo():
+    with patch("api.services.lote.config", return_value=2):
+        with pytest.raises(InvalidParameterError, match="máximo é 2"):
+            ler_lote(b"[{}, {}, {}]")
+
+
+def test_validar_lote():
+    validos, erros = validar_lote([
+        PROCESSO_TJAL,
+        {"numero_processo": "123", "sigla_tribunal": "TJAL"},
+        {"numero_processo": "0710802-55.2018.8.02.0001", "sigla_tribunal": "TJSP"},
+        "0710802-55.2018.8.02.0001",
+        PROCESSO_TJCE,
+    ])
+
+    assert [(indice, processo.model_dump(exclude_defaults=True)) for indice, processo in validos] == [
+        (0, PROCESSO_TJAL), (4, PROCESSO_TJCE)
+    ]
+    assert [erro["indice"] for erro in erros] == [1, 2, 3]
+    assert "NNNNNNN-DD.AAAA.J.TR.OOOO" in erros[0]["message"]
+    assert erros[1]["message"].startswith("sigla_tribunal")
+
+
+def test_validar_lote_numero_processo_nao_texto():
+    validos, erros = validar_lote([
+        {"numero_processo": None, "sigla_tribunal": "TJAL"},
+        {"numero_processo": 7108025520188020001, "sigla_tribunal": "TJAL"},
+        PROCESSO_TJCE,
+    ])
+
+    assert [indice for indice, _ in validos] == [2]
+    assert [erro["indice"] for erro in erros] == [0, 1]
+    assert all("NNNNNNN-DD.AAAA.J.TR.OOOO" in erro["message"] for erro in erros)
+
+
+@pytest.mark.asyncio
+async def test_registrar_lote():
+    registros = AsyncMock()
+    fila = AsyncMock()
+    cache = AsyncMock()
+    # O primeiro processo está em cache sem dados, o segundo precisa ser capturado
+    cache.get_many.return_value = [(True, None), (False, None)]
+
+    processos = [ConsultaProcessoInput.model_validate(PROCESSO_TJAL),
+                 ConsultaProcessoInput.model_validate(PROCESSO_TJCE)]
+    solicitacoes_ids = await registrar_lote(registros, fila, cache, processos)
+
+    cache.get_many.assert_called_once_with([("TJAL", PROCESSO_TJAL["numero_processo"]),
+                                            ("TJCE", PROCESSO_TJCE["numero_processo"])])
+    solicitacoes = registros.criar.call_args.args[0]
+    assert list(solicitacoes) == solicitacoes_ids
+    assert solicitacoes[solicitacoes_ids[0]] == {
+        **PROCESSO_TJAL, "status": "Encerrado - Nenhum dado capturado", "resultado": None
+    }
+    assert solicitacoes[solicitacoes_ids[1]] == {**PROCESSO_TJCE, "status": "Na Fila"}
+    fila.enqueue_many.assert_called_once_with([solicitacoes_ids[1]])
+
+
+@pytest.mark.asyncio
+async def test_registrar_lote_com_callback_passa_pela_fila():
+    registros = AsyncMock()
+    fila = AsyncMock()
+    cache = AsyncMock()
+    cache.get_many.return_value = [(True, None)]
+
+    processo = ConsultaProcessoInput.model_validate({**PROCESSO_TJAL, "callback_url": "https://cliente.com/retorno"})
+    solicitacoes_ids = await registrar_lote(registros, fila, cache, [processo])
+
+    assert registros.criar.call_args.args[0][solicitacoes_ids[0]] == {
+        **PROCESSO_TJAL, "status": "Na Fila", "callback_url": "https://cliente.com/retorno"
+    }
+    fila.enqueue_many.assert_called_once_with(solicitacoes_ids)
@@ -0,0 +1,66 @@
+from os import environ
+from subprocess import run
+import sys
+
+import pytest
+from prometheus_client import REGISTRY
+
+from api.services.metricas import medir, registrar_espera_fila, gerar_metricas
+
+
+def amostra(nome, **labels):
+    """Lê o valor atual de uma amostra do registro do Prometheus (0 se ainda não existir)."""
+    return REGISTRY.get_sample_value(nome, labels) or 0
+
+
+def test_medir_registra_duracao():
+    labels = {"etapa": "consulta", "tribunal": "TJAL", "instancia": "primeira"}
+    antes = amostra("jusbrasil_etapa_duracao_segundos_count", **labels)
+
+    with medir("consulta", "TJAL", "primeira"):
+        pass
+
+    assert amostra("jusbrasil_etapa_duracao_segundos_count", **labels) == antes + 1
+
+
+def test_medir_registra_duracao_com_excecao():
+    labels = {"etapa": "validacao", "tribunal": "TJCE", "instancia": ""}
+    antes = amostra("jusbrasil_etapa_duracao_segundos_count", **labels)
+
+    with pytest.raises(ValueError):
+        with medir("validacao", "TJCE"):
+            raise ValueError()
+
+    assert amostra("jusbrasil_etapa_duracao_segundos_count", **labels) == antes + 1
+
+
+def test_registrar_espera_fila():
+    antes = amostra("jusbrasil_fila_espera_segundos_count")
+
+    assert registrar_espera_fila("1700000000000-0", agora=1700000002.5) == 2.5
+    assert registrar_espera_fila(b"1700000000000-1", agora=1699999999) == 0
+    assert registrar_espera_fila("invalido") is None
+
+    assert amostra("jusbrasil_fila_espera_segundos_count") == antes + 2
+
+
+def test_gerar_metricas():
+    conteudo, media_type = gerar_metricas()
+
+    assert b"jusbrasil_etapa_duracao_segundos" in conteudo
+    assert media_type.startswith("text/plain")
+
+
+def test_gerar_metricas_multiprocesso(tmp_path):
+    """Testa se, no modo multiprocesso, as métricas de todos os processos são somadas."""
+    ambiente = {**environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path / "metricas")}
+    incrementar = "from api.services.metricas import SOLICITACOES_ENCERRADAS; " \
+                  "SOLICITACOES_ENCERRADAS.labels(tribunal='TJAL', status='Concluído').inc()"
+    for _ in range(2):
+        run([sys.executable, "-c", incrementar], env=ambiente, check=True)
+
+    saida = run([sys.executable, "-c", "from api.services.metricas import gerar_metricas; "
+                                       "print(gerar_metricas()[0].decode())"],
+                env=ambiente, check=True, capture_output=True, text=True).stdout
+
+    assert 'jusbrasil_solicitacoes_encerradas_total{status="Concluído",tribunal="TJAL"} 2.0' in saida
@@ -0,0 +1,77 @@
+from datetime import datetime, timezone
+from json import dumps, loads
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from api.services.monitoramento import MonitoramentoProcesso
+from crawler.default.data_extractor import impressao_movimentacao
+
+MOVIMENTACOES = [
+    {"Data": "10/08/2023", "Movimento": {"titulo_movimentacao": "Ato Emitido", "descricao_movimentacao": None}},
+    {"Data": "09/08/2023", "Movimento": {"titulo_movimentacao": "Conclusos", "descricao_movimentacao": None}},
+]
+
+
+def criar_monitoramento():
+    redis = MagicMock()
+    redis.redis_client = MagicMock()
+    redis.redis_client.hgetall = AsyncMock()
+    redis.redis_client.zrangebyscore = AsyncMock()
+    pipe = MagicMock(execute=AsyncMock())
+    redis.redis_client.pipeline.return_value.__aenter__.return_value = pipe
+    return MonitoramentoProcesso(redis=redis), pipe
+
+
+@pytest.mark.asyncio
+async def test_obter_impressoes():
+    monitoramento, _ = criar_monitoramento()
+    monitoramento.redis.redis_client.hgetall.return_value = {"first_instance": "abc", "outro": "x"}
+
+    assert await monitoramento.obter_impressoes("tjal", "123") == {"first_instance": "abc"}
+    monitoramento.redis.redis_client.hgetall.assert_called_once_with("monitoramento:TJAL:123")
+
+
+@pytest.mark.asyncio
+async def test_registrar():
+    monitoramento, pipe = criar_monitoramento()
+
+    alteracoes = await monitoramento.registrar("TJAL", "123", {
+        "first_instance": {"classe": "Penal", "lista_movimentacoes": MOVIMENTACOES},
+        "second_instance": {"classe": "Penal", "lista_movimentacoes": []},
+    })
+
+    assert [alteracao["instancia"] for alteracao in alteracoes] == ["first_instance"]
+    assert alteracoes[0]["movimentacoes"] == MOVIMENTACOES
+    # A impressão guardada é a da movimentação mais recente
+    pipe.hset.assert_called_once_with("monitoramento:TJAL:123",
+                                      mapping={"first_instance": impressao_movimentacao(MOVIMENTACOES[0])})
+    chave, membros = pipe.zadd.call_args.args
+    assert chave == "alteracoes:TJAL:123"
+    assert [loads(membro) for membro in membros] == alteracoes
+    pipe.zremrangebyrank.assert_called_once_with("alteracoes:TJAL:123", 0, -monitoramento.max_alteracoes - 1)
+
+
+@pytest.mark.asyncio
+async def test_registrar_sem_movimentacoes_novas():
+    monitoramento, pipe = criar_monitoramento()
+
+    assert await monitoramento.registrar("TJAL", "123", {"first_instance": {"lista_movimentacoes": []}}) == []
+    assert await monitoramento.registrar("TJAL", "123", None) == []
+    pipe.execute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_alteracoes_desde():
+    monitoramento, _ = criar_monitoramento()
+    alteracao = {"instancia": "first_instance", "capturado_em": "2023-08-10T12:00:00+00:00",
+                 "movimentacoes": MOVIMENTACOES}
+    monitoramento.redis.redis_client.zrangebyscore.return_value = [dumps(alteracao)]
+
+    desde = datetime(2023, 8, 10, 11, 0)
+    assert await monitoramento.alteracoes_desde("TJAL", "123", desde) == [alteracao]
+
+    # Datas sem fuso são consideradas UTC e o limite é exclusivo
+    monitoramento.redis.redis_client.zrangebyscore.assert_called_once_with(
+        "alteracoes:TJAL:123", f"({desde.replace(tzinfo=timezone.utc).timestamp()}", "+inf"
+    )
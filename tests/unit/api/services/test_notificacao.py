@@ -0,0 +1,263 @@
+from asyncio import Event, Queue, create_task, sleep
+from contextlib import asynccontextmanager
+from json import dumps, loads
+from socket import AF_INET
+
+import pytest
+from aiohttp import web
+from aiohttp.abc import AbstractResolver
+from aiohttp.test_utils import TestServer
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from api.exceptions import DestinoInternoError
+from api.services.notificacao import ResolvedorExterno, agendar_callback, aguardar_callbacks, atualizar_status, \
+    callbacks_pendentes, enviar_callback, eventos_status, status_final
+from crawler.default.http_client import HttpClient
+from database.codec import codificar
+
+NA_FILA = dumps({"numero_processo": "1", "sigla_tribunal": "TJAL", "status": "Na Fila"})
+EM_PROCESSAMENTO = dumps({"numero_processo": "1", "sigla_tribunal": "TJAL", "status": "Em processamento"})
+CONCLUIDO = dumps({"first_instance": {"classe": "Penal"}})
+
+
+class ResolvedorFixo(AbstractResolver):
+    """Resolvedor que devolve sempre o mesmo endereço, simulando o DNS do host do callback."""
+
+    def __init__(self, endereco="127.0.0.1"):
+        self.endereco = endereco
+
+    async def resolve(self, host, port=0, family=AF_INET):
+        return [{"hostname": host, "host": self.endereco, "port": port, "family": family, "proto": 0, "flags": 0}]
+
+    async def close(self):
+        pass
+
+
+def criar_resolvedor_externo(endereco):
+    """Cria um ResolvedorExterno cujo DNS devolve o endereço informado."""
+    resolvedor = ResolvedorExterno()
+    resolvedor._resolvedor = ResolvedorFixo(endereco)
+    return resolvedor
+
+
+class OuvinteFalso:
+    """Substituto do OuvinteStatus que entrega as mensagens publicadas diretamente na fila do assinante."""
+
+    def __init__(self):
+        self.fila = None
+
+    @asynccontextmanager
+    async def assinar(self, solicitacao_id):
+        self.fila = Queue()
+        yield self.fila
+
+
+def test_status_final():
+    assert not status_final({"status": "Na Fila"})
+    assert not status_final({"status": "Em processamento"})
+    assert status_final({"status": "Erro tribunal inexistente"})
+    assert status_final({"first_instance": {}})
+
+
+@pytest.mark.asyncio
+async def test_atualizar_status():
+    registros = AsyncMock()
+    registros.atualizar.return_value = loads(EM_PROCESSAMENTO)
+
+    registro = await atualizar_status(registros, "id", "Em processamento")
+
+    assert registro == loads(EM_PROCESSAMENTO)
+    registros.atualizar.assert_called_once_with("id", "Em processamento", None)
+    # Apenas o novo status é publicado, e não o registro completo
+    registros.redis.publish_data.assert_called_once_with("status:id", "Em processamento")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("endereco", ["127.0.0.1", "10.0.0.5", "169.254.169.254", "::1"])
+async def test_resolvedor_externo_recusa_rede_interna(endereco):
+    with pytest.raises(DestinoInternoError, match=endereco):
+        await criar_resolvedor_externo(endereco).resolve("cliente.com", 80)
+
+
+@pytest.mark.asyncio
+async def test_resolvedor_externo_aceita_endereco_publico():
+    enderecos = await criar_resolvedor_externo("8.8.8.8").resolve("cliente.com", 80)
+
+    assert [endereco["host"] for endereco in enderecos] == ["8.8.8.8"]
+
+
+@pytest.mark.asyncio
+async def test_enviar_callback():
+    recebidos = []
+
+    async def handler(request):
+        recebidos.append(await request.json())
+        # A primeira chamada falha e é repetida
+        return web.Response(status=503 if len(recebidos) == 1 else 200)
+
+    app = web.Application()
+    app.router.add_post("/retorno", handler)
+    # O host do callback resolve para o servidor de teste
+    http_client = HttpClient(fabrica_resolvedor=ResolvedorFixo)
+    http_client.backoff_base = 0
+
+    async with TestServer(app) as servidor:
+        try:
+            entregue = await enviar_callback(f"http://cliente.test:{servidor.port}/retorno", "id",
+                                             loads(CONCLUIDO), http_client)
+        finally:
+            await http_client.close()
+
+    assert entregue
+    assert recebidos[-1] == {"numero_solicitacao": "id", "first_instance": {"classe": "Penal"}}
+    assert len(recebidos) == 2
+
+
+@pytest.mark.asyncio
+async def test_enviar_callback_falha_nao_lanca_erro():
+    http_client = MagicMock()
+    http_client.get_session = AsyncMock(side_effect=OSError("sem conexão"))
+    http_client.backoff.return_value = 0
+
+    assert not await enviar_callback("https://cliente.com/retorno", "id", loads(CONCLUIDO), http_client)
+    assert http_client.get_session.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_enviar_callback_recusa_endereco_interno_na_url():
+    http_client = MagicMock()
+    http_client.get_session = AsyncMock()
+
+    assert not await enviar_callback("http://127.0.0.1:1/retorno", "id", loads(CONCLUIDO), http_client)
+    http_client.get_session.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_enviar_callback_recusa_host_que_resolve_para_rede_interna(caplog):
+    recebidos = []
+
+    async def handler(request):
+        recebidos.append(await request.json())
+        return web.Response(status=200)
+
+    app = web.Application()
+    app.router.add_post("/retorno", handler)
+    # O DNS do host aponta para a rede interna no momento do envio (DNS rebinding)
+    http_client = HttpClient(fabrica_resolvedor=lambda: criar_resolvedor_externo("127.0.0.1"))
+
+    async with TestServer(app) as servidor:
+        try:
+            entregue = await enviar_callback(f"http://cliente.test:{servidor.port}/retorno", "id",
+                                             loads(CONCLUIDO), http_client)
+        finally:
+            await http_client.close()
+
+    assert not entregue
+    assert recebidos == []
+    assert "resolve para o endereço de rede interna 127.0.0.1" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_agendar_callback_nao_bloqueia():
+    liberar = Event()
+
+    async def enviar(*args):
+        await liberar.wait()
+        return True
+
+    with patch("api.services.notificacao.enviar_callback", enviar):
+        task = agendar_callback("https://cliente.com/retorno", "id", loads(CONCLUIDO))
+        await sleep(0)
+        assert task in callbacks_pendentes and not task.done()
+
+        liberar.set()
+        await aguardar_callbacks(timeout=1)
+
+    assert task.result()
+    assert task not in callbacks_pendentes
+
+
+@pytest.mark.asyncio
+async def test_aguardar_callbacks_cancela_apos_timeout():
+    async def enviar(*args):
+        await sleep(10)
+
+    with patch("api.services.notificacao.enviar_callback", enviar):
+        task = agendar_callback("https://cliente.com/retorno", "id", loads(CONCLUIDO))
+        await aguardar_callbacks(timeout=0.01)
+        await sleep(0)
+
+    assert task.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_eventos_status_ate_encerrar():
+    registros = AsyncMock()
+    # O registro é lido novamente a cada aviso de mudança de status
+    registros.obter_registro.side_effect = [codificar(loads(NA_FILA)), codificar(loads(EM_PROCESSAMENTO)),
+                                            codificar(loads(CONCLUIDO))]
+    ouvinte = OuvinteFalso()
+
+    eventos = []
+
+    async def consumir():
+        async for evento in eventos_status(registros, ouvinte, "id", timeout=5, intervalo_keepalive=5):
+            eventos.append(evento)
+
+    task = create_task(consumir())
+    await sleep(0.01)
+    ouvinte.fila.put_nowait("Em processamento")
+    await sleep(0.01)
+    ouvinte.fila.put_nowait("Concluído")
+    await task
+
+    assert eventos == [
+        f"event: status\ndata: {NA_FILA}\n\n",
+        f"event: status\ndata: {EM_PROCESSAMENTO}\n\n",
+        f"event: status\ndata: {CONCLUIDO}\n\n",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_eventos_status_le_registro_uma_vez_para_avisos_acumulados():
+    registros = AsyncMock()
+    registros.obter_registro.side_effect = [codificar(loads(NA_FILA)), codificar(loads(CONCLUIDO))]
+    ouvinte = OuvinteFalso()
+
+    eventos = []
+
+    async def consumir():
+        async for evento in eventos_status(registros, ouvinte, "id", timeout=5, intervalo_keepalive=5):
+            eventos.append(evento)
+
+    task = create_task(consumir())
+    await sleep(0.01)
+    ouvinte.fila.put_nowait("Em processamento")
+    ouvinte.fila.put_nowait("Concluído")
+    await task
+
+    assert eventos == [f"event: status\ndata: {NA_FILA}\n\n", f"event: status\ndata: {CONCLUIDO}\n\n"]
+    assert registros.obter_registro.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_eventos_status_keepalive_e_timeout():
+    registros = AsyncMock()
+    # Registro gravado no formato anterior, em JSON puro
+    registros.obter_registro.return_value = NA_FILA
+
+    eventos = [evento async for evento in eventos_status(registros, OuvinteFalso(), "id", timeout=0.05,
+                                                         intervalo_keepalive=0.02)]
+
+    assert eventos[0] == f"event: status\ndata: {NA_FILA}\n\n"
+    assert ": keep-alive\n\n" in eventos
+
+
+@pytest.mark.asyncio
+async def test_eventos_status_nao_encontrada():
+    registros = AsyncMock()
+    registros.obter_registro.return_value = None
+
+    eventos = [evento async for evento in eventos_status(registros, OuvinteFalso(), "id", timeout=1)]
+
+    assert eventos == ["event: erro\ndata: Solicitação não encontrada\n\n"]
@@ -1,22 +1,31 @@
-from json import dumps, JSONDecodeError
-
 import pytest
 from unittest.mock import MagicMock, patch, AsyncMock, call
 
-from api.services.process_handler import process_request
+from aiohttp import ClientConnectionError
+
+from api.exceptions import InvalidParameterError, TribunalIndisponivelError, TribunalInexistenteError
+from api.services.process_handler import capturar_validado, process_request
+from crawler.default.main import CapturaParcial
+
+
+def criar_registros(solicitacao):
+    """Cria um RegistroSolicitacao simulado que devolve a solicitação informada."""
+    registros = AsyncMock()
+    registros.obter.return_value = solicitacao
+    registros.atualizar.side_effect = lambda solicitacao_id, status, resultado=None: resultado or {"status": status}
+    return registros
 
 
 @pytest.mark.asyncio
 async def test_process_request():
-    # Mock RedisConnection
-    mock_redis = MagicMock()
-    mock_redis.get_data.return_value = '{"numero_processo": "1234", "sigla_tribunal": "TJAL"}'
+    # Mock RegistroSolicitacao
+    mock_registros = criar_registros({"numero_processo": "1234", "sigla_tribunal": "TJAL", "status": "Na Fila"})
 
-    # Mocking import_module
+    # Mock do registro de tribunais
     mock_tjal_instance = MagicMock()
     mock_tjal_instance.capturar_dados = AsyncMock(return_value={"some_data": "value"})
-    mock_module = MagicMock()
-    mock_module.TJAL.return_value = mock_tjal_instance
+    mock_tribunais = MagicMock()
+    mock_tribunais.obter.return_value = mock_tjal_instance
 
     mock_model_validate = MagicMock()
 
@@ -25,52 +34,166 @@ async def test_process_request():
     mock_output = MagicMock()
     mock_output.model_validate.return_value = mock_model_validate
 
-    with patch('api.services.process_handler.RedisConnection', return_value=mock_redis), \
-            patch('api.services.process_handler.import_module', return_value=mock_module), \
+    # Mock ResultadoCache sem resultado armazenado, executando a captura
+    async def obter_ou_capturar(sigla_tribunal, numero_processo, capturar):
+        return await capturar()
+
+    mock_cache = MagicMock()
+    mock_cache.obter_ou_capturar = AsyncMock(side_effect=obter_ou_capturar)
+
+    with patch('api.services.process_handler.RegistroSolicitacao', return_value=mock_registros), \
+            patch('api.services.process_handler.ResultadoCache', return_value=mock_cache), \
+            patch('api.services.process_handler.tribunais', mock_tribunais), \
             patch('api.schemas.output.StatusSolicitacaoOutput', return_value=mock_output):
         await process_request("test_solicitacao_id")
 
+        mock_tribunais.obter.assert_called_once_with("TJAL")
+        mock_tjal_instance.capturar_dados.assert_called_once_with(numero_processo="1234")
+
 
 @pytest.mark.asyncio
 async def test_process_request_redis_failure():
-    # Mock RedisConnection para simular uma falha
-    mock_redis = MagicMock()
-    mock_redis.get_data.side_effect = Exception("Redis error")
+    # Mock RegistroSolicitacao para simular uma falha
+    mock_registros = AsyncMock()
+    mock_registros.obter.side_effect = Exception("Redis error")
 
-    with patch('api.services.process_handler.RedisConnection', return_value=mock_redis):
+    with patch('api.services.process_handler.RegistroSolicitacao', return_value=mock_registros):
         with pytest.raises(Exception, match="Redis error"):
             await process_request("test_solicitacao_id")
 
 
 @pytest.mark.asyncio
 async def test_process_request_import_failure():
-    mock_redis = MagicMock()
-    mock_redis.get_data.return_value = '{"numero_processo": "1234", "sigla_tribunal": "UNKNOWN"}'
+    mock_registros = criar_registros({"numero_processo": "1234", "sigla_tribunal": "UNKNOWN", "status": "Na Fila"})
+
+    mock_tribunais = MagicMock()
+    mock_tribunais.obter.side_effect = TribunalInexistenteError()
 
-    with patch('api.services.process_handler.RedisConnection', return_value=mock_redis), \
-            patch('api.services.process_handler.import_module', return_value=None):
+    with patch('api.services.process_handler.RegistroSolicitacao', return_value=mock_registros), \
+            patch('api.services.process_handler.tribunais', mock_tribunais):
         await process_request("test_solicitacao_id")
 
-        calls = [call(key="test_solicitacao_id",
-                      value=dumps({
-                          "numero_processo": "1234",
-                          "sigla_tribunal": "UNKNOWN",
-                          "status": "Em processamento"})),
-                 call(key="test_solicitacao_id",
-                      value=dumps({
-                          "numero_processo": "1234",
-                          "sigla_tribunal": "UNKNOWN",
-                          "status": "Erro tribunal inexistente"}))]
+        calls = [call("test_solicitacao_id", "Em processamento", None),
+                 call("test_solicitacao_id", "Erro tribunal inexistente", None)]
 
-        mock_redis.set_data.assert_has_calls(calls)
+        mock_registros.atualizar.assert_has_calls(calls)
 
 
 @pytest.mark.asyncio
-async def test_solicitacao_com_dados_invalidos_no_redis():
-    # Dados inválidos no Redis
-    mock_redis = MagicMock()
-    mock_redis.get_data.return_value = 'Dados inválidos'
-
-    with patch('api.services.process_handler.RedisConnection', return_value=mock_redis):
-        with pytest.raises(JSONDecodeError, match=r"Expecting value: line 1 column 1 \(char 0\)"):
-            await process_request("id_solicitacao_teste")
+async def test_process_request_solicitacao_inexistente():
+    # Registro expirado antes do processamento
+    mock_registros = criar_registros(None)
+
+    with patch('api.services.process_handler.RegistroSolicitacao', return_value=mock_registros), \
+            patch('api.services.process_handler.tribunais') as mock_tribunais:
+        await process_request("id_solicitacao_teste")
+
+    mock_tribunais.obter.assert_not_called()
+    mock_registros.atualizar.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_process_request_tribunal_indisponivel():
+    mock_registros = criar_registros({"numero_processo": "1234", "sigla_tribunal": "TJAL", "status": "Na Fila"})
+
+    # Circuito do tribunal aberto durante a captura
+    mock_cache = MagicMock()
+    mock_cache.obter_ou_capturar = AsyncMock(side_effect=TribunalIndisponivelError())
+
+    with patch('api.services.process_handler.RegistroSolicitacao', return_value=mock_registros), \
+            patch('api.services.process_handler.ResultadoCache', return_value=mock_cache), \
+            patch('api.services.process_handler.tribunais'):
+        await process_request("test_solicitacao_id")
+
+        mock_registros.atualizar.assert_called_with("test_solicitacao_id", "Erro - tribunal indisponível", None)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("erro, status", [
+    (InvalidParameterError(), "Erro - número do processo inválido para o tribunal"),
+    (ClientConnectionError(), "Erro - falha na consulta ao tribunal"),
+])
+async def test_process_request_erro_definitivo_encerra_sem_reentrega(erro, status):
+    mock_registros = criar_registros({"numero_processo": "1234", "sigla_tribunal": "TJAL", "status": "Na Fila"})
+
+    # Erros que se repetiriam em uma nova entrega não são propagados ao worker
+    mock_cache = MagicMock()
+    mock_cache.obter_ou_capturar = AsyncMock(side_effect=erro)
+
+    with patch('api.services.process_handler.RegistroSolicitacao', return_value=mock_registros), \
+            patch('api.services.process_handler.ResultadoCache', return_value=mock_cache), \
+            patch('api.services.process_handler.tribunais'):
+        await process_request("test_solicitacao_id")
+
+        mock_registros.atualizar.assert_called_with("test_solicitacao_id", status, None)
+
+
+@pytest.mark.asyncio
+async def test_process_request_dados_invalidos_encerra_sem_gravar_cache():
+    mock_registros = criar_registros({"numero_processo": "1234", "sigla_tribunal": "TJAL", "status": "Na Fila"})
+
+    # Dados da primeira instância sem os campos obrigatórios
+    mock_tjal_instance = MagicMock()
+    mock_tjal_instance.capturar_dados = AsyncMock(return_value={"first_instance": {"classe": "Penal"}})
+    mock_tribunais = MagicMock()
+    mock_tribunais.obter.return_value = mock_tjal_instance
+
+    gravados = []
+
+    async def obter_ou_capturar(sigla_tribunal, numero_processo, capturar):
+        dados = await capturar()
+        gravados.append(dados)
+        return dados
+
+    mock_cache = MagicMock()
+    mock_cache.obter_ou_capturar = AsyncMock(side_effect=obter_ou_capturar)
+
+    with patch('api.services.process_handler.RegistroSolicitacao', return_value=mock_registros), \
+            patch('api.services.process_handler.ResultadoCache', return_value=mock_cache), \
+            patch('api.services.process_handler.tribunais', mock_tribunais):
+        await process_request("test_solicitacao_id")
+
+    # A validação falha antes da gravação no cache, e a solicitação é encerrada sem ser reentregue
+    assert gravados == []
+    mock_registros.atualizar.assert_called_with("test_solicitacao_id", "Erro - dados capturados inválidos", None)
+
+
+@pytest.mark.asyncio
+async def test_capturar_validado_mantem_resultado_parcial():
+    dados = {"first_instance": None, "second_instance": None}
+    tj = MagicMock(capturar_dados=AsyncMock(return_value=CapturaParcial(dados)))
+
+    with patch('api.services.process_handler.validar_dados', return_value={"validado": True}):
+        resultado = await capturar_validado(tj, "1234")
+
+    assert resultado == {"validado": True}
+    assert isinstance(resultado, CapturaParcial)
+
+
+@pytest.mark.asyncio
+async def test_process_request_monitorar():
+    mock_registros = criar_registros(
+        {"numero_processo": "1234", "sigla_tribunal": "TJAL", "status": "Na Fila", "monitorar": True}
+    )
+
+    mock_tjal_instance = MagicMock()
+    mock_tjal_instance.capturar_dados = AsyncMock(return_value=None)
+    mock_tribunais = MagicMock()
+    mock_tribunais.obter.return_value = mock_tjal_instance
+
+    mock_monitoramento = MagicMock()
+    mock_monitoramento.obter_impressoes = AsyncMock(return_value={"first_instance": "abc"})
+    mock_monitoramento.registrar = AsyncMock()
+
+    with patch('api.services.process_handler.RegistroSolicitacao', return_value=mock_registros), \
+            patch('api.services.process_handler.ResultadoCache') as mock_cache, \
+            patch('api.services.process_handler.MonitoramentoProcesso', return_value=mock_monitoramento), \
+            patch('api.services.process_handler.tribunais', mock_tribunais):
+        await process_request("test_solicitacao_id")
+
+    # O monitoramento não usa o cache e informa as movimentações já conhecidas
+    mock_cache.assert_not_called()
+    mock_tjal_instance.capturar_dados.assert_called_once_with(
+        numero_processo="1234", movimentacoes_conhecidas={"first_instance": "abc"}
+    )
+    mock_monitoramento.registrar.assert_called_once_with("TJAL", "1234", None)
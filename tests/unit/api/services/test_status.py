@@ -0,0 +1,72 @@
+from copy import deepcopy
+from json import loads
+
+import pytest
+from unittest.mock import AsyncMock
+
+from api.services.status import consultar_status_lote, status_json
+from database.codec import Codec
+
+REGISTROS = {
+    "a": {"numero_processo": "1", "sigla_tribunal": "TJAL", "status": "Na Fila"},
+    "b": {"numero_processo": "2", "sigla_tribunal": "TJCE", "status": "Concluído",
+          "resultado": {"first_instance": {"classe": "Penal"}}},
+    "c": None,
+}
+
+
+def obter_many(solicitacoes_ids, com_resultado=False):
+    """Simula RegistroSolicitacao.obter_many, devolvendo o resultado apenas quando solicitado."""
+    solicitacoes = []
+    for solicitacao_id in solicitacoes_ids:
+        registro = deepcopy(REGISTROS.get(solicitacao_id))
+        if registro is not None and not com_resultado:
+            registro.pop("resultado", None)
+        solicitacoes.append(registro)
+    return solicitacoes
+
+
+def criar_registros():
+    registros = AsyncMock()
+    registros.obter_many.side_effect = obter_many
+    return registros
+
+
+@pytest.mark.asyncio
+async def test_consultar_status_lote():
+    registros = criar_registros()
+
+    solicitacoes, nao_encontradas = await consultar_status_lote(registros, ["a", "b", "c", "a"])
+
+    registros.obter_many.assert_called_once_with(["a", "b", "c"], com_resultado=True)
+    assert solicitacoes == [
+        {"numero_solicitacao": "a", "numero_processo": "1", "sigla_tribunal": "TJAL", "status": "Na Fila"},
+        {"numero_solicitacao": "b", "numero_processo": "2", "sigla_tribunal": "TJCE", "status": "Concluído",
+         "first_instance": {"classe": "Penal"}},
+    ]
+    assert nao_encontradas == ["c"]
+
+
+@pytest.mark.asyncio
+async def test_consultar_status_lote_filtro_e_compacto():
+    registros = criar_registros()
+
+    solicitacoes, nao_encontradas = await consultar_status_lote(
+        registros, ["a", "b", "c"], status=["Concluído"], compacto=True
+    )
+
+    # A consulta compacta não lê os resultados
+    registros.obter_many.assert_called_once_with(["a", "b", "c"], com_resultado=False)
+    assert solicitacoes == [
+        {"numero_solicitacao": "b", "numero_processo": "2", "sigla_tribunal": "TJCE", "status": "Concluído"}
+    ]
+    assert nao_encontradas == ["c"]
+
+
+@pytest.mark.parametrize("formato", ["json", "orjson", "msgpack"])
+def test_status_json_registro_final(formato):
+    """Testa se o JSON do registro final é devolvido como gravado, em qualquer formato do codec."""
+    registro = {"first_instance": {"classe": "Penal", "area": "Criminal"}}
+    valor = Codec(formato=formato, compressao=True, compressao_minimo=0).codificar(registro)
+
+    assert loads(status_json(valor)) == registro
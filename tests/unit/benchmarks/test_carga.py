@@ -0,0 +1,74 @@
+import json
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from api.schemas.input import ConsultaProcessoInput
+from benchmarks.carga import GeradorCarga, formatar, percentis
+
+
+def criar_api():
+    """Cria uma API simulada que aceita as consultas e encerra as solicitações no primeiro evento."""
+    async def consulta_processo(request):
+        dados = await request.json()
+        ConsultaProcessoInput.model_validate(dados)
+        return web.json_response({"numero_solicitacao": dados["numero_processo"]})
+
+    async def eventos(request):
+        resposta = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resposta.prepare(request)
+        await resposta.write(b'event: status\ndata: {"status": "Em processamento"}\n\n')
+        await resposta.write(b'event: status\ndata: {"first_instance": {}}\n\n')
+        return resposta
+
+    app = web.Application()
+    app.add_routes([
+        web.post("/consulta-processo", consulta_processo),
+        web.get("/status-solicitacao/{numero_solicitacao}/eventos", eventos),
+    ])
+    return app
+
+
+def test_percentis():
+    resultado = percentis([index / 1000 for index in range(1, 101)])
+
+    assert resultado["quantidade"] == 100
+    assert resultado["p50_ms"] == pytest.approx(50.5)
+    assert resultado["p99_ms"] == pytest.approx(99.01)
+    assert resultado["max_ms"] == pytest.approx(100)
+    assert percentis([]) == {}
+
+
+def test_numero_processo_valido():
+    gerador = GeradorCarga("http://api", taxa_por_minuto=60, duracao=1, processos=3)
+
+    for sigla in ("TJAL", "TJCE"):
+        numero_processo = gerador.numero_processo(sigla)
+        ConsultaProcessoInput(numero_processo=numero_processo, sigla_tribunal=sigla)
+        assert int(numero_processo[:7]) < 3
+
+
+def test_status_final():
+    assert GeradorCarga._status_final({"status": "Na Fila"}) is None
+    assert GeradorCarga._status_final({"status": "Erro tribunal inexistente"}) == "Erro tribunal inexistente"
+    assert GeradorCarga._status_final({"first_instance": {}}) == "Concluído"
+
+
+@pytest.mark.asyncio
+async def test_executar_acompanha_solicitacoes_ate_o_encerramento():
+    servidor = TestServer(criar_api())
+    await servidor.start_server()
+    try:
+        gerador = GeradorCarga(str(servidor.make_url("")), taxa_por_minuto=6000, duracao=0.1)
+        relatorio = await gerador.executar()
+    finally:
+        await servidor.close()
+
+    assert relatorio["enviadas"] == 10
+    assert relatorio["encerradas"] == 10
+    assert relatorio["status"] == {"Concluído": 10}
+    assert relatorio["erros"] == {}
+    assert relatorio["latencia_encerramento"]["quantidade"] == 10
+    assert "p99" in formatar(relatorio)
+    json.dumps(relatorio)
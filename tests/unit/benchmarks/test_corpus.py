@@ -0,0 +1,20 @@
+import pytest
+
+from benchmarks.corpus import gerar_pagina
+from crawler.default.data_extractor import criar_extrator
+
+CAMPOS = {"classe": "classeProcesso", "lista_movimentacoes": "tabelaTodasMovimentacoes"}
+
+
+@pytest.mark.parametrize("instancia", ["primeira", "segunda"])
+def test_gerar_pagina_com_movimentacoes_do_tamanho(instancia):
+    dados = criar_extrator(gerar_pagina(instancia, "media"), "lxml").extract(CAMPOS)
+
+    assert len(dados["lista_movimentacoes"]) == 200
+    assert dados["classe"]
+
+
+def test_gerar_pagina_pequena_mantem_original():
+    pequena = gerar_pagina("primeira", "pequena")
+
+    assert len(pequena) < len(gerar_pagina("primeira", "media")) < len(gerar_pagina("primeira", "grande"))
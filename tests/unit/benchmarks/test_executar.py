@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from benchmarks.executar import comparar, estatisticas, main, medir, metadados
+
+
+def criar_resultados(**medianas):
+    return {"metadados": {}, "resultados": {nome: {"p50_ms": valor} for nome, valor in medianas.items()}}
+
+
+def test_estatisticas():
+    resultado = estatisticas([0.001, 0.002, 0.003, 0.004], tamanho_bytes=1_000_000)
+
+    assert resultado["repeticoes"] == 4
+    assert resultado["p50_ms"] == pytest.approx(2.5)
+    assert resultado["min_ms"] == pytest.approx(1)
+    assert resultado["ops_s"] == pytest.approx(400)
+    assert resultado["mb_s"] == pytest.approx(400)
+
+
+def test_medir_descarta_aquecimento():
+    chamadas = []
+
+    amostras = medir(lambda: chamadas.append(1), repeticoes=3, aquecimento=2)
+
+    assert len(amostras) == 3
+    assert len(chamadas) == 5
+
+
+def test_comparar_aponta_regressoes():
+    base = criar_resultados(extracao=10.0, validacao=1.0, removida=5.0)
+    atual = criar_resultados(extracao=12.0, validacao=1.05)
+
+    linhas, regressoes = comparar(base, atual, limite=0.1)
+
+    assert regressoes == ["extracao"]
+    assert len(linhas) == 3
+
+
+def test_main_comparar_retorna_erro_com_regressao(tmp_path):
+    base = tmp_path / "base.json"
+    atual = tmp_path / "atual.json"
+    base.write_text(json.dumps(criar_resultados(extracao=10.0)))
+    atual.write_text(json.dumps(criar_resultados(extracao=20.0)))
+
+    assert main(["--comparar", str(base), str(atual)]) == 1
+    assert main(["--comparar", str(base), str(base)]) == 0
+
+
+def test_main_grava_resultados(tmp_path):
+    saida = tmp_path / "resultados.json"
+
+    assert main(["--repeticoes", "1", "--apenas", "validacao", "--saida", str(saida)]) == 0
+
+    dados = json.loads(saida.read_text())
+    assert "validacao/validate/pequena" in dados["resultados"]
+    assert dados["metadados"]["python"]
+
+
+def test_metadados_reportam_parser_padrao(monkeypatch):
+    monkeypatch.delenv("PARSER_HTML", raising=False)
+
+    assert metadados()["parser_html"] == "html.parser"
@@ -0,0 +1,51 @@
+import pytest
+from aiohttp.test_utils import TestServer
+
+from benchmarks.mock_tj import criar_app
+from crawler.default.executor import ExtracaoExecutor
+from crawler.default.http_client import HttpClient
+from crawler.default.instances.first_instance import FirstInstance
+from crawler.default.instances.second_instance import SecondInstance
+
+
+@pytest.mark.asyncio
+async def test_instancias_capturam_do_servidor_local():
+    servidor = TestServer(criar_app("pequena"))
+    await servidor.start_server()
+    http_client = HttpClient()
+    await http_client.start()
+    try:
+        url_base = str(servidor.make_url("")).rstrip("/")
+        argumentos = {"codigo_tj": "8.02", "url_base": url_base, "http_client": http_client,
+                      "executor": ExtracaoExecutor(tipo="inline")}
+
+        primeira = await FirstInstance(**argumentos).capturar_dados("0710802-55.2018.8.02.0001")
+        segunda = await SecondInstance(**argumentos).capturar_dados("0710802-55.2018.8.02.0001")
+    finally:
+        await http_client.close()
+        await servidor.close()
+
+    assert primeira["classe"]
+    assert len(primeira["lista_movimentacoes"]) == 4
+    assert len(segunda["lista_movimentacoes"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_servidor_local_simula_erros_e_processos_inexistentes():
+    servidor = TestServer(criar_app("pequena", erro=1.0))
+    await servidor.start_server()
+    servidor_inexistentes = TestServer(criar_app("pequena", nao_encontrado=1.0))
+    await servidor_inexistentes.start_server()
+    http_client = HttpClient()
+    await http_client.start()
+    try:
+        async with http_client.session.get(servidor.make_url("/cpopg/show.do")) as resposta:
+            assert resposta.status == 503
+
+        instancia = FirstInstance(codigo_tj="8.02", url_base=str(servidor_inexistentes.make_url("")).rstrip("/"),
+                                  http_client=http_client, executor=ExtracaoExecutor(tipo="inline"))
+        assert await instancia.capturar_dados("0710802-55.2018.8.02.0001") is None
+    finally:
+        await http_client.close()
+        await servidor.close()
+        await servidor_inexistentes.close()
@@ -1,19 +1,70 @@
 import pytest
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
+from prometheus_client import REGISTRY
+from crawler.default.executor import ExtracaoExecutor
+from crawler.default.http_client import RespostaHttp
 from crawler.default.instances.first_instance import FirstInstance
+from crawler.default.snapshot import ArmazemSnapshots
 
 
 @pytest.mark.asyncio
 async def test_capturar_dados_success():
-    instance = FirstInstance(codigo_tj="TJ", url_base="http://example.com")
+    mock_response = RespostaHttp(status=302, headers={'location': 'some_location?processo.codigo=123&'},
+                                 texto='Sample Text')
 
-    with patch("crawler.default.data_extractor.DataExtractor.extract", return_value={"classe": "Teste"}), \
-         patch("crawler.default.instances.first_instance.ClientSession") as mock_session:
-        mock_response = AsyncMock()
-        mock_response.headers = {'location': 'some_location?processo.codigo=123&'}
-        mock_response.text.return_value = 'Sample Text'
-        mock_session.return_value.__aenter__.return_value.get.return_value = mock_response
+    mock_http_client = MagicMock()
+    mock_http_client.get = AsyncMock(return_value=mock_response)
 
+    instance = FirstInstance(codigo_tj="TJ", url_base="http://example.com", http_client=mock_http_client,
+                             executor=ExtracaoExecutor(tipo="inline"))
+
+    with patch("crawler.default.data_extractor.DataExtractor.extract", return_value={"classe": "Teste"}):
         result = await instance.capturar_dados(numero_processo="123TJ456")
 
         assert result == {"classe": "Teste"}
+        assert mock_http_client.get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_capturar_dados_registra_etapas():
+    mock_response = RespostaHttp(status=302, headers={'location': 'some_location?processo.codigo=123&'},
+                                 texto='Sample Text')
+
+    mock_http_client = MagicMock()
+    mock_http_client.get = AsyncMock(return_value=mock_response)
+
+    instance = FirstInstance(codigo_tj="TJ", url_base="http://example.com", http_client=mock_http_client,
+                             executor=ExtracaoExecutor(tipo="inline"), sigla="TJAL")
+
+    def contagem(etapa):
+        return REGISTRY.get_sample_value("jusbrasil_etapa_duracao_segundos_count",
+                                         {"etapa": etapa, "tribunal": "TJAL", "instancia": "primeira"}) or 0
+
+    antes = {etapa: contagem(etapa) for etapa in ("busca", "consulta", "extracao")}
+
+    with patch("crawler.default.data_extractor.DataExtractor.extract", return_value={"classe": "Teste"}):
+        await instance.capturar_dados(numero_processo="123TJ456")
+
+    assert {etapa: contagem(etapa) for etapa in antes} == {etapa: valor + 1 for etapa, valor in antes.items()}
+
+
+@pytest.mark.asyncio
+async def test_capturar_dados_grava_snapshot(tmp_path):
+    mock_response = RespostaHttp(status=302, headers={'location': 'some_location?processo.codigo=123&'},
+                                 texto='Sample Text')
+
+    mock_http_client = MagicMock()
+    mock_http_client.get = AsyncMock(return_value=mock_response)
+    snapshots = ArmazemSnapshots(tmp_path)
+
+    instance = FirstInstance(codigo_tj="TJ", url_base="http://example.com", http_client=mock_http_client,
+                             executor=ExtracaoExecutor(tipo="inline"), sigla="TJAL", snapshots=snapshots)
+
+    with patch("crawler.default.data_extractor.DataExtractor.extract", return_value={"classe": "Teste"}):
+        await instance.capturar_dados(numero_processo="123TJ456")
+
+    captura, = snapshots.capturas()
+    assert captura["sigla_tribunal"] == "TJAL"
+    assert captura["instancia"] == "primeira"
+    assert captura["numero_processo"] == "123TJ456"
+    assert snapshots.ler(captura["hash"]) == "Sample Text"
@@ -1,11 +1,11 @@
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock
 from api.exceptions import InvalidParameterError
+from crawler.default.http_client import RespostaHttp
 from crawler.default.instances.second_instance import SecondInstance
 
-# Mock para a resposta do ClientSession
-mock_response = AsyncMock()
-mock_response.text.return_value = 'Sample Text'
+# Resposta devolvida pelo HttpClient compartilhado
+mock_response = RespostaHttp(status=200, headers={}, texto='Sample Text')
 
 
 @pytest.mark.asyncio
@@ -17,12 +17,41 @@ async def test_capturar_numero_processo_codigo_invalid():
 
 
 @pytest.mark.asyncio
-@patch('crawler.default.instances.second_instance.ClientSession')
-async def test_consultar_processo(mock_session):
-    mock_session.return_value.__aenter__.return_value.get.return_value = mock_response
+async def test_consultar_processo():
+    mock_http_client = MagicMock()
+    mock_http_client.get = AsyncMock(return_value=mock_response)
 
-    instance = SecondInstance("TJ", "http://example.com")
+    instance = SecondInstance("TJ", "http://example.com", http_client=mock_http_client)
+
+    result = await instance._consultar_processo("789")
+
+    assert result == "Sample Text"
+
+
+@pytest.mark.asyncio
+async def test_consultar_processo_com_limitador_e_disjuntor():
+    mock_http_client = MagicMock()
+    mock_http_client.get = AsyncMock(return_value=mock_response)
+    mock_limitador = MagicMock()
+    mock_disjuntor = MagicMock()
+
+    instance = SecondInstance("TJ", "http://example.com", http_client=mock_http_client, limitador=mock_limitador,
+                              disjuntor=mock_disjuntor)
 
     result = await instance._consultar_processo("789")
 
     assert result == "Sample Text"
+    assert mock_http_client.get.call_args.kwargs["limitador"] is mock_limitador
+    assert mock_http_client.get.call_args.kwargs["disjuntor"] is mock_disjuntor
+
+
+@pytest.mark.asyncio
+async def test_capturar_numero_processo_codigo_inexistente():
+    mock_http_client = MagicMock()
+    mock_http_client.get = AsyncMock(return_value=RespostaHttp(
+        status=200, headers={}, texto='Não existem informações disponíveis para os parâmetros informados.'
+    ))
+
+    instance = SecondInstance("TJ", "http://example.com", http_client=mock_http_client)
+
+    assert await instance._capturar_numero_processo_codigo("123TJ456") is None
@@ -0,0 +1,73 @@
+from unittest.mock import patch
+
+import pytest
+
+from api.exceptions import TribunalIndisponivelError
+from crawler.default.circuit_breaker import DisjuntorTribunal
+
+
+def criar_disjuntor():
+    disjuntor = DisjuntorTribunal("8.02")
+    disjuntor.limite_falhas = 3
+    disjuntor.tempo_aberto = 30
+    return disjuntor
+
+
+def test_circuito_abre_apos_falhas_consecutivas():
+    disjuntor = criar_disjuntor()
+
+    for _ in range(2):
+        disjuntor.registrar_falha()
+        disjuntor.verificar()
+
+    disjuntor.registrar_falha()
+
+    assert disjuntor.estado == DisjuntorTribunal.ABERTO
+    with pytest.raises(TribunalIndisponivelError):
+        disjuntor.verificar()
+
+
+def test_sucesso_zera_falhas():
+    disjuntor = criar_disjuntor()
+
+    disjuntor.registrar_falha()
+    disjuntor.registrar_falha()
+    disjuntor.registrar_sucesso()
+    disjuntor.registrar_falha()
+
+    assert disjuntor.estado == DisjuntorTribunal.FECHADO
+
+
+def test_meio_aberto_libera_uma_tentativa():
+    disjuntor = criar_disjuntor()
+    for _ in range(3):
+        disjuntor.registrar_falha()
+
+    with patch("crawler.default.circuit_breaker.monotonic", return_value=disjuntor.aberto_em + 31):
+        assert disjuntor.estado == DisjuntorTribunal.MEIO_ABERTO
+        disjuntor.verificar()
+        # Apenas uma requisição de teste é liberada enquanto o circuito está meio aberto
+        with pytest.raises(TribunalIndisponivelError):
+            disjuntor.verificar()
+
+        disjuntor.registrar_sucesso()
+
+    assert disjuntor.estado == DisjuntorTribunal.FECHADO
+    disjuntor.verificar()
+
+
+def test_meio_aberto_volta_a_abrir_com_falha():
+    disjuntor = criar_disjuntor()
+    for _ in range(3):
+        disjuntor.registrar_falha()
+
+    with patch("crawler.default.circuit_breaker.monotonic", return_value=disjuntor.aberto_em + 31):
+        disjuntor.verificar()
+        disjuntor.registrar_falha()
+
+        assert disjuntor.estado == DisjuntorTribunal.ABERTO
+
+
+def test_obter_compartilha_disjuntor_do_tribunal():
+    assert DisjuntorTribunal.obter("teste") is DisjuntorTribunal.obter("teste")
+    assert DisjuntorTribunal.obter("teste") is not DisjuntorTribunal.obter("outro")
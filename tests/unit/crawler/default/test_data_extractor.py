@@ -1,6 +1,12 @@
+from json import dumps
+from pathlib import Path
 from unittest.mock import patch, Mock
 
-from crawler.default.data_extractor import DataExtractor
+import pytest
+
+from api.exceptions import InvalidParameterError
+from crawler.default.data_extractor import DataExtractor, LxmlDataExtractor, StreamingDataExtractor, criar_extrator, \
+    impressao_movimentacao
 
 html_sample = """
 <html>
@@ -108,3 +114,175 @@ def test_find_table_data_with_mock():
         }]
 
         assert table_data_movimentacoes == expected_data_movimentacoes
+
+
+# Corpus de páginas usado para garantir que todos os backends produzem a mesma saída, incluindo páginas com quebras
+# de linha CRLF e HTML malformado. As páginas são lidas em bytes para manter as quebras de linha originais.
+FIXTURES = sorted((Path(__file__).parent / "fixtures").glob("*.html"))
+
+CAMPOS = {
+    "classe": "classeProcesso",
+    "area": "areaProcesso",
+    "assunto": "assuntoProcesso",
+    "data_distribuicao": "dataHoraDistribuicaoProcesso",
+    "juiz": "juizProcesso",
+    "valor_acao": "valorAcaoProcesso",
+    "partes_processo": "tableTodasPartes",
+    "lista_movimentacoes": "tabelaTodasMovimentacoes"
+}
+
+
+@pytest.mark.parametrize("extrator", [LxmlDataExtractor, StreamingDataExtractor])
+@pytest.mark.parametrize("fixture", FIXTURES + [None], ids=[path.stem for path in FIXTURES] + ["html_sample"])
+def test_paridade_com_html_parser(fixture, extrator):
+    html = fixture.read_bytes().decode("utf-8") if fixture else html_sample
+
+    esperado = DataExtractor(html).extract(CAMPOS)
+    resultado = extrator(html).extract(CAMPOS)
+
+    assert dumps(resultado, ensure_ascii=False) == dumps(esperado, ensure_ascii=False)
+
+
+@pytest.mark.parametrize("extrator", [LxmlDataExtractor, StreamingDataExtractor])
+@pytest.mark.parametrize("html", [
+    '<div id="classeProcesso">a\rb\r\nc</div>',
+    '<div id="classeProcesso">a\x00b</div>',
+    '<div id="classeProcesso">a<![CDATA[x < y & z]]>b</div>',
+    '<div\r\nid="classeProcesso"\r\nclass="x">a</div>',
+], ids=["cr", "nul", "cdata", "cr_na_tag"])
+def test_paridade_texto(html, extrator):
+    esperado = DataExtractor(html).extract(CAMPOS)
+    resultado = extrator(html).extract(CAMPOS)
+
+    assert dumps(resultado, ensure_ascii=False) == dumps(esperado, ensure_ascii=False)
+
+
+# Diferenças conhecidas em HTML malformado: o lxml fecha as tags implicitamente, o html.parser não
+DIFERENCAS_CONHECIDAS = {
+    "td_sem_fechamento": (
+        '<table id="tableTodasPartes"><tr><td class="label">Autor'
+        '<td class="nomeParteEAdvogado">Nome<span>Adv:</span>X</table>',
+        "partes_processo",
+        [{"AutorNomeAdv:X": "Nome", "Defesa": {"Adv:": "X"}}],
+        [{"Autor": "Nome", "Defesa": {"Adv:": "X"}}],
+    ),
+    "tr_sem_fechamento": (
+        '<table><tbody id="tabelaTodasMovimentacoes"><tr><td class="dataMovimentacao">01/01'
+        '<td class="descricaoMovimentacao">T<br>D<tr><td class="dataMovimentacao">02/01</td>'
+        '<td class="descricaoMovimentacao">U</td></tbody></table>',
+        "lista_movimentacoes",
+        [{"Data": "01/01TD02/01U",
+          "Movimento": {"titulo_movimentacao": "T", "descricao_movimentacao": "D|||02/01|||U"}},
+         {"Data": "02/01", "Movimento": {"titulo_movimentacao": "U", "descricao_movimentacao": None}}],
+        [{"Data": "01/01", "Movimento": {"titulo_movimentacao": "T", "descricao_movimentacao": "D"}},
+         {"Data": "02/01", "Movimento": {"titulo_movimentacao": "U", "descricao_movimentacao": None}}],
+    ),
+    "p_aninhado": ('<p id="classeProcesso">a<p>b</p>c</p>', "classe", "abc", "a"),
+    "p_sem_abertura": ('<div id="classeProcesso">José</p> Cícero</div>', "classe", "JoséCícero", "José Cícero"),
+}
+
+
+@pytest.mark.parametrize("extrator", [LxmlDataExtractor, StreamingDataExtractor])
+@pytest.mark.parametrize("html, campo, esperado_html_parser, esperado_lxml", DIFERENCAS_CONHECIDAS.values(),
+                         ids=DIFERENCAS_CONHECIDAS.keys())
+def test_diferencas_conhecidas_html_malformado(html, campo, esperado_html_parser, esperado_lxml, extrator):
+    assert DataExtractor(html).extract(CAMPOS)[campo] == esperado_html_parser
+    assert extrator(html).extract(CAMPOS)[campo] == esperado_lxml
+
+
+@pytest.mark.parametrize("extrator", [DataExtractor, LxmlDataExtractor, StreamingDataExtractor])
+def test_extrai_apenas_movimentacoes_novas(extrator):
+    html = (Path(__file__).parent / "fixtures" / "primeira_instancia.html").read_text(encoding="utf-8")
+    movimentacoes = DataExtractor(html).extract(CAMPOS)["lista_movimentacoes"]
+    assert len(movimentacoes) > 2
+
+    # A partir da terceira movimentação mais recente, apenas as duas anteriores são novas
+    resultado = extrator(html).extract(CAMPOS, movimentacao_conhecida=impressao_movimentacao(movimentacoes[2]))
+
+    assert resultado["lista_movimentacoes"] == movimentacoes[:2]
+    assert resultado["classe"] == DataExtractor(html).extract(CAMPOS)["classe"]
+
+
+def test_movimentacao_conhecida_inexistente_extrai_todas():
+    html = (Path(__file__).parent / "fixtures" / "primeira_instancia.html").read_text(encoding="utf-8")
+    movimentacoes = DataExtractor(html).extract(CAMPOS)["lista_movimentacoes"]
+
+    resultado = StreamingDataExtractor(html).extract(CAMPOS, movimentacao_conhecida="0" * 40)
+
+    assert resultado["lista_movimentacoes"] == movimentacoes
+
+
+def test_lxml_extrai_primeira_instancia():
+    html = (Path(__file__).parent / "fixtures" / "primeira_instancia.html").read_text(encoding="utf-8")
+
+    resultado = LxmlDataExtractor(html).extract(CAMPOS)
+
+    assert resultado["classe"] == "Procedimento Comum Cível"
+    assert resultado["partes_processo"][1] == {
+        "Autora": "Livia Nascimento da Rocha",
+        "Defesa": {"Advogado:": "Vinicius Faria de Cerqueira", "Advogada:": "Márcia & Associados"}
+    }
+    assert len(resultado["lista_movimentacoes"]) == 4
+
+
+@pytest.mark.parametrize("extrator", [LxmlDataExtractor, StreamingDataExtractor])
+def test_documento_vazio(extrator):
+    assert extrator("").extract(CAMPOS) == DataExtractor("").extract(CAMPOS)
+
+
+def test_streaming_interrompe_leitura_apos_encontrar_campos():
+    html = """
+    <html><body>
+        <span id="classeProcesso">Classe</span>
+        <table><tbody id="tabelaTodasMovimentacoes">
+            <tr><td class="dataMovimentacao">01/01/2020</td><td class="descricaoMovimentacao">Título</td></tr>
+        </tbody></table>
+        <span id="classeProcesso">Repetido após todos os campos</span>
+    </body></html>
+    """
+    extractor = StreamingDataExtractor(html)
+
+    resultado = extractor.extract({"classe": "classeProcesso", "lista_movimentacoes": "tabelaTodasMovimentacoes"})
+
+    assert resultado["classe"] == "Classe"
+    assert len(resultado["lista_movimentacoes"]) == 1
+    assert len(extractor.elementos["classeProcesso"]) == 1
+
+
+def test_streaming_nao_mantem_elementos_fora_dos_campos():
+    html = """
+    <html><body>
+        <div id="cabecalho"><p>Texto</p><p>descartado</p></div>
+        <span id="classeProcesso">Classe</span>
+    </body></html>
+    """
+    extractor = StreamingDataExtractor(html)
+
+    extractor.extract({"classe": "classeProcesso"})
+
+    body = extractor.ids["classeProcesso"].getparent()
+    assert len(body.find("div")) == 0
+
+
+@pytest.mark.parametrize("parser, classe", [
+    ("lxml", LxmlDataExtractor), ("streaming", StreamingDataExtractor), ("html.parser", DataExtractor)
+])
+def test_criar_extrator(parser, classe):
+    assert type(criar_extrator(html_sample, parser=parser)) is classe
+
+
+def test_criar_extrator_padrao_html_parser(monkeypatch):
+    monkeypatch.delenv("PARSER_HTML", raising=False)
+
+    assert type(criar_extrator(html_sample)) is DataExtractor
+
+
+def test_criar_extrator_parser_invalido():
+    with pytest.raises(InvalidParameterError):
+        criar_extrator(html_sample, parser="inexistente")
+
+
+def test_criar_extrator_nao_mascara_key_error_da_analise():
+    with patch.dict("crawler.default.data_extractor.EXTRATORES", {"lxml": Mock(side_effect=KeyError("id"))}):
+        with pytest.raises(KeyError):
+            criar_extrator(html_sample, parser="lxml")
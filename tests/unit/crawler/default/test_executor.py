@@ -0,0 +1,82 @@
+from concurrent.futures.process import BrokenProcessPool
+from os import _exit, kill
+from pathlib import Path
+from signal import SIGKILL
+
+import pytest
+
+from api.exceptions import InvalidParameterError
+from crawler.default.executor import ExtracaoExecutor
+from crawler.default.instances.first_instance import FirstInstance
+
+
+HTML = (Path(__file__).parent / "fixtures" / "primeira_instancia.html").read_text(encoding="utf-8")
+
+
+def encerrar_processo(_):
+    """Encerra o processo do pool sem devolver resultado, como uma falha do parser ou a falta de memória."""
+    _exit(1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("tipo", ["process", "thread", "inline"])
+async def test_run_extrai_dados(tipo):
+    """Testa se a extração produz o mesmo resultado em todos os tipos de executor."""
+    executor = ExtracaoExecutor(tipo=tipo, max_workers=1)
+    try:
+        resultado = await executor.run(FirstInstance._extrair_dados, HTML)
+    finally:
+        executor.close()
+
+    assert resultado == FirstInstance._extrair_dados(HTML)
+    assert executor.executor is None
+
+
+def test_start_inline_sem_pool():
+    executor = ExtracaoExecutor(tipo="inline")
+
+    assert executor.start() is None
+
+
+def test_start_reutiliza_pool():
+    executor = ExtracaoExecutor(tipo="thread", max_workers=2)
+    try:
+        assert executor.start() is executor.start()
+        assert executor.executor._max_workers == 2
+    finally:
+        executor.close()
+
+
+def test_tipo_invalido():
+    with pytest.raises(InvalidParameterError):
+        ExtracaoExecutor(tipo="inexistente")
+
+
+@pytest.mark.asyncio
+async def test_run_recria_pool_apos_processo_morto():
+    executor = ExtracaoExecutor(tipo="process", max_workers=1)
+    try:
+        await executor.run(FirstInstance._extrair_dados, HTML)
+        pool = executor.executor
+        for processo in list(pool._processes.values()):
+            kill(processo.pid, SIGKILL)
+
+        resultado = await executor.run(FirstInstance._extrair_dados, HTML)
+
+        assert resultado == FirstInstance._extrair_dados(HTML)
+        assert executor.executor is not pool
+    finally:
+        executor.close()
+
+
+@pytest.mark.asyncio
+async def test_run_tenta_uma_unica_vez_apos_pool_quebrado():
+    executor = ExtracaoExecutor(tipo="process", max_workers=1)
+    try:
+        with pytest.raises(BrokenProcessPool):
+            await executor.run(encerrar_processo, HTML)
+
+        # O pool quebrado na nova tentativa também é descartado, e as próximas extrações funcionam
+        assert await executor.run(FirstInstance._extrair_dados, HTML) == FirstInstance._extrair_dados(HTML)
+    finally:
+        executor.close()
@@ -0,0 +1,187 @@
+from time import monotonic
+from unittest.mock import MagicMock, patch
+import asyncio
+
+import pytest
+from aiohttp import ClientResponseError, web
+from aiohttp.test_utils import TestServer
+
+from api.exceptions import TribunalIndisponivelError
+from crawler.default.circuit_breaker import DisjuntorTribunal
+from crawler.default.http_client import HttpClient
+from crawler.default.main import DefaultTJ
+
+
+@pytest.mark.asyncio
+async def test_get_session_reutiliza_sessao():
+    """Testa se a mesma sessão é devolvida em chamadas consecutivas."""
+    http_client = HttpClient()
+
+    session = await http_client.get_session()
+    try:
+        assert await http_client.get_session() is session
+        assert session.connector.limit_per_host == http_client.limite_conexoes_por_host
+    finally:
+        await http_client.close()
+
+    assert session.closed
+    assert http_client.session is None
+
+
+@pytest.mark.asyncio
+async def test_start_recria_sessao_fechada():
+    """Testa se uma nova sessão é criada após o encerramento da anterior."""
+    http_client = HttpClient()
+
+    session = await http_client.start()
+    await http_client.close()
+    nova_session = await http_client.start()
+    try:
+        assert nova_session is not session
+        assert not nova_session.closed
+    finally:
+        await http_client.close()
+
+
+def test_default_tj_injeta_http_client():
+    """Testa se o HttpClient informado é mantido pelo DefaultTJ."""
+    http_client = HttpClient()
+
+    assert DefaultTJ(http_client=http_client).http_client is http_client
+
+
+def criar_servidor(respostas):
+    """Cria um servidor de teste que devolve, em ordem, os status informados e depois 200."""
+    respostas = list(respostas)
+
+    async def handler(request):
+        status = respostas.pop(0) if respostas else 200
+        return web.Response(status=status, text=f"status {status}")
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    return TestServer(app)
+
+
+def criar_http_client():
+    """Cria um HttpClient sem espera entre as tentativas."""
+    http_client = HttpClient()
+    http_client.max_tentativas = 3
+    http_client.backoff_base = 0
+    return http_client
+
+
+@pytest.mark.asyncio
+async def test_get_repete_status_transitorio():
+    """Testa se uma resposta 503 é repetida até o tribunal responder com sucesso."""
+    http_client = criar_http_client()
+    disjuntor = MagicMock()
+    limitador = MagicMock()
+
+    async with criar_servidor([503, 502]) as servidor:
+        try:
+            resposta = await http_client.get(str(servidor.make_url("/")), limitador=limitador, disjuntor=disjuntor)
+        finally:
+            await http_client.close()
+
+    assert resposta.status == 200
+    assert resposta.texto == "status 200"
+    # Cada tentativa passa pelo limitador do tribunal
+    assert limitador.reservar.call_count == 3
+    disjuntor.registrar_sucesso.assert_called_once()
+    disjuntor.registrar_falha.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_tentativas_esgotadas():
+    """Testa se o erro é lançado e registrado no disjuntor quando todas as tentativas falham."""
+    http_client = criar_http_client()
+    disjuntor = MagicMock()
+
+    async with criar_servidor([500, 500, 500]) as servidor:
+        try:
+            with pytest.raises(ClientResponseError) as erro:
+                await http_client.get(str(servidor.make_url("/")), disjuntor=disjuntor)
+        finally:
+            await http_client.close()
+
+    assert erro.value.status == 500
+    disjuntor.registrar_falha.assert_called_once()
+    disjuntor.registrar_sucesso.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_nao_repete_erro_do_cliente():
+    """Testa se uma resposta 404 é devolvida sem novas tentativas."""
+    http_client = criar_http_client()
+
+    async with criar_servidor([404]) as servidor:
+        try:
+            resposta = await http_client.get(str(servidor.make_url("/")))
+        finally:
+            await http_client.close()
+
+    assert resposta.status == 404
+
+
+@pytest.mark.asyncio
+async def test_get_circuito_aberto():
+    """Testa se nenhuma requisição é feita com o circuito do tribunal aberto."""
+    http_client = criar_http_client()
+    disjuntor = MagicMock()
+    disjuntor.verificar.side_effect = TribunalIndisponivelError()
+
+    with patch.object(http_client, "get_session") as get_session:
+        with pytest.raises(TribunalIndisponivelError):
+            await http_client.get("http://example.com", disjuntor=disjuntor)
+
+    get_session.assert_not_called()
+
+
+def criar_disjuntor_meio_aberto():
+    """Cria um disjuntor cujo tempo de circuito aberto já passou, liberando uma requisição de teste."""
+    disjuntor = DisjuntorTribunal("8.02")
+    disjuntor.aberto_em = monotonic() - disjuntor.tempo_aberto - 1
+    return disjuntor
+
+
+@pytest.mark.asyncio
+async def test_get_teste_cancelado_libera_circuito_meio_aberto():
+    """Testa se a requisição de teste cancelada não deixa o circuito meio aberto bloqueado."""
+    http_client = criar_http_client()
+    disjuntor = criar_disjuntor_meio_aberto()
+
+    async def lenta(*args):
+        await asyncio.sleep(10)
+
+    with patch.object(http_client, "_get", side_effect=lenta):
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(http_client.get("http://example.com", disjuntor=disjuntor), timeout=0.01)
+
+    assert disjuntor.estado == DisjuntorTribunal.MEIO_ABERTO
+    # Uma nova requisição de teste é liberada
+    disjuntor.verificar()
+
+
+@pytest.mark.asyncio
+async def test_get_teste_com_erro_fora_da_requisicao_libera_circuito_meio_aberto():
+    """Testa se um erro que não é do tribunal (no limitador, por exemplo) libera a requisição de teste."""
+    http_client = criar_http_client()
+    disjuntor = criar_disjuntor_meio_aberto()
+
+    with patch.object(http_client, "_get", side_effect=ValueError("redis")):
+        with pytest.raises(ValueError):
+            await http_client.get("http://example.com", disjuntor=disjuntor)
+
+    assert disjuntor.falhas == 0
+    disjuntor.verificar()
+
+
+def test_backoff_limitado():
+    """Testa se a espera entre tentativas respeita o backoff máximo."""
+    http_client = HttpClient()
+    http_client.backoff_base = 1
+    http_client.backoff_maximo = 4
+
+    assert 0 <= http_client.backoff(1) <= 1
+    assert all(0 <= http_client.backoff(10) <= 4 for _ in range(100))
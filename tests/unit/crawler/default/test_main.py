@@ -0,0 +1,92 @@
+from asyncio import sleep
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from crawler.default.main import CapturaParcial, DefaultTJ
+
+
+def criar_tj(first_instance_mock, second_instance_mock, captura_concorrente=True, timeout_instancia=None):
+    """Cria um DefaultTJ com instâncias simuladas."""
+    tj = DefaultTJ(http_client=MagicMock())
+    tj.first_instance = MagicMock(capturar_dados=first_instance_mock)
+    tj.second_instance = MagicMock(capturar_dados=second_instance_mock)
+    tj.captura_concorrente = captura_concorrente
+    tj.timeout_instancia = timeout_instancia
+    return tj
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("captura_concorrente", [True, False])
+async def test_capturar_dados_duas_instancias(captura_concorrente):
+    tj = criar_tj(AsyncMock(return_value={"classe": "A"}), AsyncMock(return_value={"classe": "B"}),
+                  captura_concorrente=captura_concorrente)
+
+    result = await tj.capturar_dados(numero_processo="123")
+
+    assert result == {"first_instance": {"classe": "A"}, "second_instance": {"classe": "B"}}
+    assert not isinstance(result, CapturaParcial)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("captura_concorrente", [True, False])
+async def test_capturar_dados_resultado_parcial_com_erro(captura_concorrente):
+    tj = criar_tj(AsyncMock(side_effect=Exception("Erro")), AsyncMock(return_value={"classe": "B"}),
+                  captura_concorrente=captura_concorrente)
+
+    result = await tj.capturar_dados(numero_processo="123")
+
+    assert result == {"first_instance": None, "second_instance": {"classe": "B"}}
+    assert isinstance(result, CapturaParcial)
+
+
+@pytest.mark.asyncio
+async def test_capturar_dados_resultado_parcial_com_timeout():
+    async def captura_lenta(numero_processo):
+        await sleep(1)
+
+    tj = criar_tj(AsyncMock(return_value={"classe": "A"}), captura_lenta, timeout_instancia=0.01)
+
+    result = await tj.capturar_dados(numero_processo="123")
+
+    assert result == {"first_instance": {"classe": "A"}, "second_instance": None}
+    assert isinstance(result, CapturaParcial)
+
+
+@pytest.mark.asyncio
+async def test_capturar_dados_falha_nas_duas_instancias():
+    tj = criar_tj(AsyncMock(side_effect=ValueError("Erro 1")), AsyncMock(side_effect=ValueError("Erro 2")))
+
+    with pytest.raises(ValueError, match="Erro 1"):
+        await tj.capturar_dados(numero_processo="123")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("captura_concorrente", [True, False])
+async def test_capturar_dados_falha_sem_dados_na_outra_instancia(captura_concorrente):
+    # Processos sem segunda instância: a falha da primeira não pode virar "nenhum dado capturado"
+    tj = criar_tj(AsyncMock(side_effect=TimeoutError()), AsyncMock(return_value=None),
+                  captura_concorrente=captura_concorrente)
+
+    with pytest.raises(TimeoutError):
+        await tj.capturar_dados(numero_processo="123")
+
+
+@pytest.mark.asyncio
+async def test_capturar_dados_sem_dados():
+    tj = criar_tj(AsyncMock(return_value=None), AsyncMock(return_value={}))
+
+    assert await tj.capturar_dados(numero_processo="123") is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("captura_concorrente", [True, False])
+async def test_capturar_dados_movimentacoes_conhecidas(captura_concorrente):
+    first_instance_mock = AsyncMock(return_value={"classe": "A"})
+    second_instance_mock = AsyncMock(return_value=None)
+    tj = criar_tj(first_instance_mock, second_instance_mock, captura_concorrente=captura_concorrente)
+
+    await tj.capturar_dados(numero_processo="123", movimentacoes_conhecidas={"first_instance": "abc"})
+
+    first_instance_mock.assert_called_once_with(numero_processo="123", movimentacao_conhecida="abc")
+    second_instance_mock.assert_called_once_with(numero_processo="123", movimentacao_conhecida=None)
@@ -0,0 +1,84 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from crawler.default.rate_limiter import LimitadorTribunal
+
+
+def criar_limitador(semaforo, token_bucket):
+    """Cria um LimitadorTribunal com o Redis e os scripts Lua simulados."""
+    redis = MagicMock()
+    redis.redis_client = AsyncMock()
+    redis.redis_client.pipeline = MagicMock()
+    redis.redis_client.pipeline.return_value.__aenter__.return_value = MagicMock(execute=AsyncMock())
+    limitador = LimitadorTribunal(chave="8.02", sigla="TJAL", redis=redis)
+    limitador._script_semaforo = AsyncMock(side_effect=semaforo)
+    limitador._script_token_bucket = AsyncMock(side_effect=token_bucket)
+    return limitador
+
+
+@pytest.mark.asyncio
+async def test_reservar_libera_reserva_ao_final():
+    limitador = criar_limitador(semaforo=[1], token_bucket=[0])
+
+    async with limitador.reservar():
+        limitador.redis.redis_client.zrem.assert_not_called()
+
+    reserva = limitador._script_semaforo.call_args.kwargs["args"][2]
+    limitador.redis.redis_client.zrem.assert_called_once_with("limite:8.02:em_andamento", reserva)
+
+
+@pytest.mark.asyncio
+async def test_reservar_aguarda_vaga_e_token():
+    limitador = criar_limitador(semaforo=[0, 0, 1], token_bucket=[20, 0])
+
+    with patch("crawler.default.rate_limiter.sleep", AsyncMock()) as mock_sleep:
+        async with limitador.reservar():
+            pass
+
+    assert limitador._script_semaforo.call_count == 3
+    assert limitador._script_token_bucket.call_count == 2
+    mock_sleep.assert_any_call(0.02)
+
+
+@pytest.mark.asyncio
+async def test_reservar_libera_reserva_em_erro():
+    limitador = criar_limitador(semaforo=[1], token_bucket=[0])
+
+    with pytest.raises(ValueError):
+        async with limitador.reservar():
+            raise ValueError("Erro na requisição")
+
+    limitador.redis.redis_client.zrem.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_metricas():
+    limitador = criar_limitador(semaforo=[], token_bucket=[])
+    limitador.redis.redis_client.hgetall.return_value = {"requisicoes": "4", "espera_total_segundos": "2.0"}
+    limitador.redis.redis_client.zcard.return_value = 3
+
+    assert await limitador.metricas() == {
+        "requisicoes": 4,
+        "espera_total_segundos": 2.0,
+        "espera_media_segundos": 0.5,
+        "em_andamento": 3
+    }
+
+
+def test_config_especifica_do_tribunal():
+    with patch.dict("os.environ", {"LIMITE_REQUISICOES_POR_SEGUNDO": "3", "LIMITE_EM_ANDAMENTO_TJCE": "2"}):
+        limitador = LimitadorTribunal(chave="8.06", sigla="TJCE", redis=MagicMock())
+
+    assert limitador.taxa == 3
+    assert limitador.max_em_andamento == 2
+
+
+@pytest.mark.parametrize("configuracao", [
+    {"LIMITE_REQUISICOES_POR_SEGUNDO": "0"},
+    {"LIMITE_REQUISICOES_POR_SEGUNDO_TJAL": "-1"},
+    {"LIMITE_RAJADA": "0.5"},
+    {"LIMITE_EM_ANDAMENTO": "0"},
+])
+def test_config_invalida(configuracao):
+    with patch.dict("os.environ", configuracao), pytest.raises(ValueError, match="TJAL"):
+        LimitadorTribunal(chave="8.02", sigla="TJAL", redis=MagicMock())
@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from crawler.default import snapshot
+from crawler.default.snapshot import ArmazemSnapshots
+
+HTML = "<html><body><span id='classeProcesso'>Procedimento Comum Cível</span></body></html>"
+AGORA = datetime(2023, 8, 10, 12, 30, tzinfo=timezone.utc)
+
+
+def test_gravar_deduplica_paginas_identicas(tmp_path):
+    armazem = ArmazemSnapshots(tmp_path)
+
+    primeiro = armazem.gravar(HTML, "TJAL", "primeira", "0710802-55.2018.8.02.0001", agora=AGORA)
+    segundo = armazem.gravar(HTML, "TJCE", "primeira", "0070337-91.2008.8.06.0001", agora=AGORA)
+
+    assert primeiro == segundo
+    objeto, = (tmp_path / "objetos").rglob("*.html.*")
+    assert objeto.name == f"{primeiro}.html.zst"
+    assert armazem.ler(primeiro) == HTML
+
+    capturas = list(armazem.capturas())
+    assert [captura["sigla_tribunal"] for captura in capturas] == ["TJAL", "TJCE"]
+    assert capturas[0] == {"capturado_em": "2023-08-10T12:30:00+00:00", "sigla_tribunal": "TJAL",
+                           "instancia": "primeira", "numero_processo": "0710802-55.2018.8.02.0001",
+                           "hash": primeiro}
+    assert (tmp_path / "indice" / "20230810.jsonl").exists()
+
+
+def test_gravar_sem_zstandard_usa_gzip(tmp_path):
+    armazem = ArmazemSnapshots(tmp_path)
+
+    with patch.object(snapshot, "zstandard", None):
+        hash_html = armazem.gravar(HTML, "TJAL", "segunda", "1", agora=AGORA)
+        assert armazem.ler(hash_html) == HTML
+
+    assert list((tmp_path / "objetos").rglob("*.html.gz"))
+    # A página já gravada em gzip não é gravada de novo em zstd
+    armazem.gravar(HTML, "TJAL", "segunda", "1", agora=AGORA)
+    assert not list((tmp_path / "objetos").rglob("*.html.zst"))
+
+
+def test_gravar_mesma_pagina_em_threads(tmp_path):
+    armazem = ArmazemSnapshots(tmp_path)
+
+    # Todas as threads encontram a página ausente e a gravam ao mesmo tempo, como no asyncio.to_thread do salvar
+    with patch.object(ArmazemSnapshots, "_existente", return_value=None), ThreadPoolExecutor(8) as executor:
+        hashes = set(executor.map(lambda indice: armazem.gravar(HTML, "TJAL", "primeira", str(indice), agora=AGORA),
+                                  range(32)))
+
+    hash_html, = hashes
+    assert armazem.ler(hash_html) == HTML
+    assert not list((tmp_path / "objetos").rglob("*.tmp"))
+    assert len(list(armazem.capturas())) == 32
+
+
+def test_ler_snapshot_inexistente(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ArmazemSnapshots(tmp_path).ler("0" * 64)
+
+
+def test_capturas_ignora_linhas_incompletas(tmp_path):
+    armazem = ArmazemSnapshots(tmp_path)
+    armazem.gravar(HTML, "TJAL", "primeira", "1", agora=AGORA)
+    with open(tmp_path / "indice" / "20230810.jsonl", "a", encoding="utf-8") as arquivo:
+        arquivo.write('{"sigla_tribunal": "TJ')
+
+    assert len(list(armazem.capturas())) == 1
+
+
+@pytest.mark.asyncio
+async def test_salvar_desabilitado_nao_grava(tmp_path):
+    armazem = ArmazemSnapshots("")
+
+    assert not armazem.habilitado
+    assert await armazem.salvar(HTML, "TJAL", "primeira", "1") is None
+    assert list(armazem.capturas()) == []
+
+
+@pytest.mark.asyncio
+async def test_salvar_registra_falha_sem_lancar(tmp_path):
+    armazem = ArmazemSnapshots(tmp_path)
+
+    with patch.object(armazem, "gravar", side_effect=OSError("disco cheio")):
+        assert await armazem.salvar(HTML, "TJAL", "primeira", "1") is None
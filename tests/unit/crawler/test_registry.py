@@ -0,0 +1,69 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from api.exceptions import TribunalInexistenteError
+from crawler.registry import RegistroTribunais
+from crawler.tjal.main import TJAL
+from crawler.tjce.main import TJCE
+
+
+def test_registro_padrao_contem_tribunais_disponiveis():
+    registro = RegistroTribunais()
+
+    assert registro.classes == {"TJAL": TJAL, "TJCE": TJCE}
+
+
+def test_obter_cria_uma_unica_instancia():
+    classe = MagicMock()
+    http_client = MagicMock()
+    registro = RegistroTribunais(classes={"TJAL": classe}, http_client=http_client)
+
+    primeira = registro.obter("tjal")
+    segunda = registro.obter("TJAL")
+
+    assert primeira is segunda
+    classe.assert_called_once_with(http_client=http_client)
+
+
+def test_obter_tribunal_sem_crawler():
+    registro = RegistroTribunais(classes={"TJAL": MagicMock()})
+
+    with pytest.raises(TribunalInexistenteError):
+        registro.obter("TJCE")
+
+    with pytest.raises(TribunalInexistenteError):
+        registro.obter(None)
+
+
+def test_registrar_sigla_indisponivel():
+    with pytest.raises(TribunalInexistenteError):
+        RegistroTribunais(classes={"TJSP": MagicMock()})
+
+
+def test_registrar_descarta_instancia_anterior():
+    antiga = MagicMock()
+    nova = MagicMock()
+    registro = RegistroTribunais(classes={"TJAL": antiga})
+    registro.obter("TJAL")
+
+    registro.registrar("TJAL", nova)
+
+    assert registro.obter("TJAL") is nova.return_value
+
+
+def test_iniciar_cria_todos_os_tribunais():
+    classes = {"TJAL": MagicMock(), "TJCE": MagicMock()}
+    registro = RegistroTribunais(classes=classes)
+
+    registro.iniciar()
+
+    classes["TJAL"].assert_called_once()
+    classes["TJCE"].assert_called_once()
+
+
+def test_iniciar_falha_com_tribunal_sem_crawler():
+    registro = RegistroTribunais(classes={"TJAL": MagicMock()})
+
+    with pytest.raises(TribunalInexistenteError):
+        registro.iniciar()
@@ -0,0 +1,77 @@
+from json import dumps
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from database.agenda import AgendaMonitoramento
+
+PROCESSO = {
+    "numero_processo": "0710802-55.2018.8.02.0001",
+    "sigla_tribunal": "TJAL",
+    "intervalo_segundos": 3600,
+    "prioridade": 0,
+    "callback_url": None
+}
+
+
+def criar_agenda():
+    """Cria uma AgendaMonitoramento com o cliente Redis simulado."""
+    redis = MagicMock()
+    redis.redis_client = MagicMock()
+    redis.redis_client.zrangebyscore = AsyncMock()
+    redis.redis_client.hmget = AsyncMock()
+    pipe = MagicMock(execute=AsyncMock(return_value=[1, 1]))
+    redis.redis_client.pipeline.return_value.__aenter__.return_value = pipe
+    return AgendaMonitoramento(redis=redis), pipe
+
+
+@pytest.mark.asyncio
+async def test_agendar_espalha_primeira_captura():
+    """Testa se a primeira captura é sorteada dentro do intervalo sem alterar processos já agendados."""
+    agenda, pipe = criar_agenda()
+
+    await agenda.agendar([PROCESSO], agora=1000)
+
+    pipe.hset.assert_called_once_with("agenda:processos", "TJAL:0710802-55.2018.8.02.0001", dumps(PROCESSO))
+    chave, proximas = pipe.zadd.call_args.args
+    assert chave == "agenda:proximas:TJAL"
+    assert 1000 <= proximas["TJAL:0710802-55.2018.8.02.0001"] <= 1000 + 3600
+    assert pipe.zadd.call_args.kwargs == {"nx": True}
+
+
+@pytest.mark.asyncio
+async def test_vencidos_ordena_por_prioridade():
+    """Testa se os vencidos de maior prioridade, e entre eles os mais antigos, são devolvidos primeiro."""
+    agenda, _ = criar_agenda()
+    agenda.redis.redis_client.zrangebyscore.return_value = [("a", 10.0), ("b", 20.0), ("c", 30.0)]
+    agenda.redis.redis_client.hmget.return_value = [
+        dumps({**PROCESSO, "numero_processo": "a"}),
+        dumps({**PROCESSO, "numero_processo": "b", "prioridade": 5}),
+        dumps({**PROCESSO, "numero_processo": "c", "prioridade": 5}),
+    ]
+
+    vencidos = await agenda.vencidos("TJAL", 2, agora=100)
+
+    assert [processo["numero_processo"] for processo in vencidos] == ["b", "c"]
+    agenda.redis.redis_client.zrangebyscore.assert_called_once_with(
+        "agenda:proximas:TJAL", "-inf", 100, start=0, num=20, withscores=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_vencidos_sem_orcamento():
+    """Testa se nenhum processo é consultado quando não há orçamento no ciclo."""
+    agenda, _ = criar_agenda()
+
+    assert await agenda.vencidos("TJAL", 0) == []
+    agenda.redis.redis_client.zrangebyscore.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_reagendar():
+    """Testa se a próxima captura é agendada um intervalo após o horário atual."""
+    agenda, pipe = criar_agenda()
+
+    await agenda.reagendar([PROCESSO], agora=1000)
+
+    pipe.zadd.assert_called_once_with("agenda:proximas:TJAL", {"TJAL:0710802-55.2018.8.02.0001": 4600}, xx=True)
@@ -0,0 +1,55 @@
+from json import dumps
+
+import pytest
+
+from database.codec import Codec, BIT_ZSTD, FORMATOS, MARCADOR
+
+REGISTRO = {
+    "numero_processo": "0710802-55.2018.8.02.0001",
+    "sigla_tribunal": "TJAL",
+    "first_instance": {
+        "classe": "Procedimento Comum Cível",
+        "lista_movimentacoes": [{"data": "10/08/2023", "movimento": "Conclusão"}] * 100
+    }
+}
+
+
+@pytest.mark.parametrize("formato", ["json", "orjson", "msgpack"])
+@pytest.mark.parametrize("compressao", [True, False])
+def test_codificar_decodificar(formato, compressao):
+    """Testa se cada formato, com e sem compressão, é lido de volta sem perdas."""
+    valor = Codec(formato=formato, compressao=compressao, compressao_minimo=0).codificar(REGISTRO)
+
+    assert valor[:1] == MARCADOR
+    assert valor[1] & ~BIT_ZSTD == FORMATOS[formato]
+    assert bool(valor[1] & BIT_ZSTD) == compressao
+    assert Codec.decodificar(valor) == REGISTRO
+
+
+def test_compressao_apenas_acima_do_minimo():
+    """Testa se valores pequenos são gravados sem compressão."""
+    codec = Codec(formato="orjson", compressao=True, compressao_minimo=1024)
+
+    assert not codec.codificar({"status": "Na Fila"})[1] & BIT_ZSTD
+    assert codec.codificar(REGISTRO)[1] & BIT_ZSTD
+    assert len(codec.codificar(REGISTRO)) < len(dumps(REGISTRO))
+
+
+@pytest.mark.parametrize("valor", [dumps(REGISTRO), dumps(REGISTRO).encode()])
+def test_decodificar_json_legado(valor):
+    """Testa se os valores gravados em JSON antes do codec continuam sendo lidos."""
+    assert Codec.decodificar(valor) == REGISTRO
+
+
+def test_decodificar_none():
+    assert Codec.decodificar(None) is None
+
+
+def test_decodificar_formato_desconhecido():
+    with pytest.raises(ValueError):
+        Codec.decodificar(MARCADOR + bytes([0x7f]) + b"{}")
+
+
+def test_codec_desconhecido():
+    with pytest.raises(ValueError):
+        Codec(formato="xml")
@@ -0,0 +1,121 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, call
+
+from redis.exceptions import ResponseError
+
+from database.queue import RedisQueue
+
+
+def criar_fila():
+    """Cria uma RedisQueue com o cliente Redis simulado."""
+    fila = RedisQueue()
+    fila.redis_client = AsyncMock()
+    return fila
+
+
+@pytest.mark.asyncio
+async def test_criar_grupo_existente():
+    """Testa se a criação de um grupo já existente é ignorada."""
+    fila = criar_fila()
+    fila.redis_client.xgroup_create.side_effect = ResponseError("BUSYGROUP Consumer Group name already exists")
+
+    await fila.criar_grupo()
+
+
+@pytest.mark.asyncio
+async def test_criar_grupo_erro():
+    """Testa se outros erros na criação do grupo são propagados."""
+    fila = criar_fila()
+    fila.redis_client.xgroup_create.side_effect = ResponseError("Outro erro")
+
+    with pytest.raises(ResponseError):
+        await fila.criar_grupo()
+
+
+@pytest.mark.asyncio
+async def test_enqueue():
+    """Testa a inclusão de uma solicitação na fila."""
+    fila = criar_fila()
+
+    await fila.enqueue("id_solicitacao")
+
+    fila.redis_client.xadd.assert_called_once_with(fila.stream, {"solicitacao_id": "id_solicitacao"})
+
+
+@pytest.mark.asyncio
+async def test_enqueue_many():
+    """Testa a inclusão de várias solicitações na fila em um único pipeline."""
+    fila = criar_fila()
+    fila.redis_client = MagicMock()
+    mock_pipe = MagicMock(execute=AsyncMock(return_value=["1-0", "2-0"]))
+    fila.redis_client.pipeline.return_value.__aenter__.return_value = mock_pipe
+
+    assert await fila.enqueue_many(["a", "b"]) == ["1-0", "2-0"]
+
+    mock_pipe.xadd.assert_has_calls([
+        call(fila.stream, {"solicitacao_id": "a"}), call(fila.stream, {"solicitacao_id": "b"})
+    ])
+    mock_pipe.execute.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_enqueue_many_vazio():
+    """Testa se um lote vazio não acessa o Redis."""
+    fila = criar_fila()
+
+    assert await fila.enqueue_many([]) == []
+    fila.redis_client.pipeline.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_consume():
+    """Testa a leitura de mensagens da fila."""
+    fila = criar_fila()
+    fila.redis_client.xreadgroup.return_value = [
+        [fila.stream, [("1-0", {"solicitacao_id": "a"}), ("2-0", {"solicitacao_id": "b"})]]
+    ]
+
+    assert await fila.consume("consumidor", quantidade=2) == [("1-0", "a"), ("2-0", "b")]
+
+
+@pytest.mark.asyncio
+async def test_consume_fila_vazia():
+    """Testa a leitura de uma fila vazia."""
+    fila = criar_fila()
+    fila.redis_client.xreadgroup.return_value = []
+
+    assert await fila.consume("consumidor") == []
+
+
+@pytest.mark.asyncio
+async def test_ack():
+    """Testa a confirmação e remoção de uma mensagem."""
+    fila = criar_fila()
+
+    await fila.ack("1-0")
+
+    fila.redis_client.xack.assert_called_once_with(fila.stream, fila.grupo, "1-0")
+    fila.redis_client.xdel.assert_called_once_with(fila.stream, "1-0")
+
+
+@pytest.mark.asyncio
+async def test_reclaim():
+    """Testa a recuperação de mensagens pendentes com o número de entregas."""
+    fila = criar_fila()
+    fila.redis_client.xautoclaim.return_value = ["0-0", [("1-0", {"solicitacao_id": "a"}), ("2-0", None)]]
+    fila.redis_client.xpending_range.return_value = [{"message_id": "1-0", "times_delivered": 2}]
+
+    assert await fila.reclaim("consumidor") == [("1-0", "a", 2)]
+    fila.redis_client.xautoclaim.assert_called_once()
+    assert fila.redis_client.xautoclaim.call_args.kwargs["min_idle_time"] == fila.visibility_timeout * 1000
+
+
+def test_check_redis_client():
+    """Testa se o cliente é criado apenas uma vez."""
+    fila = RedisQueue()
+    fila.check_redis_client()
+    cliente = fila.redis_client
+
+    fila.check_redis_client()
+
+    assert fila.redis_client is cliente
@@ -1,8 +1,9 @@
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, AsyncMock, MagicMock, call
 
+import pytest
 from pytest import raises
 from redis.exceptions import ConnectionError
-from database.service import RedisConnection
+from database.service import RedisConnection, AsyncRedisConnection, SCRIPT_REMOVER_SE_IGUAL
 
 
 def test_check_redis_client_connection_error():
@@ -44,3 +45,92 @@ def test_set_data():
     with patch("database.service.StrictRedis.from_url", return_value=mock_redis):
         connection.set_data("test_key", "test_value")
         mock_redis.set.assert_called_with("test_key", "test_value")
+
+
+@pytest.mark.asyncio
+async def test_async_get_data():
+    """Teste a obtenção assíncrona de dados do Redis."""
+    connection = AsyncRedisConnection()
+    connection.redis_client = AsyncMock()
+    connection.redis_client.get.return_value = "test_value"
+
+    result = await connection.get_data("test_key")
+
+    connection.redis_client.get.assert_called_with("test_key")
+    assert result == "test_value"
+
+
+@pytest.mark.asyncio
+async def test_async_set_data():
+    """Teste a definição assíncrona de dados no Redis."""
+    connection = AsyncRedisConnection()
+    connection.redis_client = AsyncMock()
+
+    await connection.set_data("test_key", "test_value")
+
+    connection.redis_client.set.assert_called_with("test_key", "test_value", ex=None, nx=False)
+
+
+@pytest.mark.asyncio
+async def test_async_get_many():
+    """Teste a obtenção de várias chaves com um único MGET."""
+    connection = AsyncRedisConnection()
+    connection.redis_client = AsyncMock()
+    connection.redis_client.mget.return_value = ["a", None]
+
+    assert await connection.get_many(["key_a", "key_b"]) == ["a", None]
+    connection.redis_client.mget.assert_called_once_with(["key_a", "key_b"])
+    assert await connection.get_many([]) == []
+
+
+@pytest.mark.asyncio
+async def test_async_set_many():
+    """Teste a definição de várias chaves em um único pipeline."""
+    connection = AsyncRedisConnection()
+    connection.redis_client = MagicMock()
+    mock_pipe = MagicMock(execute=AsyncMock())
+    connection.redis_client.pipeline.return_value.__aenter__.return_value = mock_pipe
+
+    await connection.set_many({"key_a": "a", "key_b": "b"})
+
+    mock_pipe.set.assert_has_calls([call("key_a", "a"), call("key_b", "b")])
+    mock_pipe.execute.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_async_delete_if_value():
+    """Teste a remoção atômica de uma chave condicionada ao seu valor."""
+    connection = AsyncRedisConnection()
+    connection.redis_client = MagicMock()
+    script = AsyncMock(side_effect=[1, 0])
+    connection.redis_client.register_script.return_value = script
+
+    assert await connection.delete_if_value("lock", "token")
+    assert not await connection.delete_if_value("lock", "token")
+
+    script.assert_called_with(keys=["lock"], args=["token"])
+    # O script é registrado uma única vez e executado com EVALSHA
+    connection.redis_client.register_script.assert_called_once_with(SCRIPT_REMOVER_SE_IGUAL)
+
+
+@pytest.mark.asyncio
+async def test_async_expire_if_value():
+    """Teste a renovação atômica da expiração de uma chave condicionada ao seu valor."""
+    connection = AsyncRedisConnection()
+    connection.redis_client = MagicMock()
+    script = AsyncMock(return_value=1)
+    connection.redis_client.register_script.return_value = script
+
+    assert await connection.expire_if_value("lider", "scheduler", 31)
+
+    script.assert_called_once_with(keys=["lider"], args=["scheduler", 31000])
+
+
+def test_async_check_redis_client_compartilha_pool():
+    """Teste se as conexões assíncronas compartilham o mesmo pool de conexões."""
+    primeira, segunda = AsyncRedisConnection(), AsyncRedisConnection()
+
+    primeira.check_redis_client()
+    segunda.check_redis_client()
+
+    assert primeira.redis_client.connection_pool is segunda.redis_client.connection_pool
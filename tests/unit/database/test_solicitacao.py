@@ -0,0 +1,177 @@
+from json import dumps
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from database.codec import codificar, decodificar
+from database.solicitacao import CHAVE_ARQUIVAMENTO, RegistroSolicitacao, situacao_retencao
+
+NA_FILA = {"numero_processo": "1", "sigla_tribunal": "TJAL", "status": "Na Fila"}
+
+
+def criar_registros(resultados_pipeline=None):
+    """Cria um RegistroSolicitacao com o cliente Redis simulado."""
+    redis = MagicMock()
+    redis.get_many = AsyncMock(return_value=[])
+    redis.get_data = AsyncMock(return_value=None)
+    redis.redis_client = MagicMock()
+    redis.redis_client.hmget = AsyncMock()
+    pipe = MagicMock(execute=AsyncMock(return_value=resultados_pipeline or []))
+    redis.redis_client.pipeline.return_value.__aenter__.return_value = pipe
+    return RegistroSolicitacao(redis=redis), pipe
+
+
+@pytest.mark.asyncio
+async def test_criar():
+    """Testa se o registro é gravado como hash, com o horário da etapa, o resultado codificado e a expiração."""
+    registros, pipe = criar_registros()
+
+    await registros.criar({
+        "a": {**NA_FILA, "callback_url": None, "monitorar": True},
+        "b": {**NA_FILA, "status": "Concluído", "resultado": {"first_instance": {"classe": "Penal"}}},
+    })
+
+    (chave_a, ), campos_a = pipe.hset.call_args_list[0].args, pipe.hset.call_args_list[0].kwargs["mapping"]
+    assert chave_a == "solicitacao:a"
+    assert {campo: campos_a[campo] for campo in ("status", "monitorar")} == {"status": "Na Fila", "monitorar": 1}
+    assert "callback_url" not in campos_a
+    assert campos_a["criado_em"] > 0
+
+    campos_b = pipe.hset.call_args_list[1].kwargs["mapping"]
+    assert decodificar(campos_b["resultado"]) == {"first_instance": {"classe": "Penal"}}
+    assert campos_b["finalizado_em"] == campos_b["criado_em"]
+    pipe.expire.assert_any_call("solicitacao:a", registros.retencao["NA_FILA"])
+    pipe.expire.assert_called_with("solicitacao:b", registros.retencao["CONCLUIDO"])
+    pipe.zadd.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_atualizar_status():
+    """Testa se apenas o status e o horário da etapa são alterados, devolvendo o registro visível ao cliente."""
+    registros, pipe = criar_registros([1, True, [b"1", b"TJAL", b"Em processamento"]])
+
+    registro = await registros.atualizar("a", "Em processamento")
+
+    campos = pipe.hset.call_args.kwargs["mapping"]
+    assert set(campos) == {"status", "em_processamento_em"}
+    assert registro == {"numero_processo": "1", "sigla_tribunal": "TJAL", "status": "Em processamento"}
+
+
+@pytest.mark.asyncio
+async def test_atualizar_resultado():
+    registros, pipe = criar_registros([1, True, [b"1", b"TJAL", "Concluído".encode()]])
+    resultado = {"first_instance": {"classe": "Penal"}}
+
+    assert await registros.atualizar("a", "Concluído", resultado) == resultado
+    campos = pipe.hset.call_args.kwargs["mapping"]
+    assert decodificar(campos["resultado"]) == resultado
+    assert "finalizado_em" in campos
+
+
+def test_situacao_retencao():
+    assert situacao_retencao("Na Fila") == "NA_FILA"
+    assert situacao_retencao("Em processamento") == "EM_PROCESSAMENTO"
+    assert situacao_retencao("Concluído") == "CONCLUIDO"
+    assert situacao_retencao("Encerrado - Nenhum dado capturado") == "CONCLUIDO"
+    assert situacao_retencao("Erro - tribunal indisponível") == "ERRO"
+
+
+@pytest.mark.asyncio
+async def test_atualizar_com_arquivamento():
+    """Testa se a solicitação encerrada entra na lista de arquivamento, com margem na expiração do Redis."""
+    registros, pipe = criar_registros([1, 1, True, [b"1", b"TJAL", b"Erro tribunal inexistente"]])
+    registros.arquivar = True
+
+    await registros.atualizar("a", "Erro tribunal inexistente")
+
+    chave, vencimentos = pipe.zadd.call_args.args
+    agora = pipe.hset.call_args.kwargs["mapping"]["finalizado_em"]
+    assert chave == CHAVE_ARQUIVAMENTO
+    assert vencimentos == {"a": agora + registros.retencao["ERRO"]}
+    pipe.expire.assert_called_once_with("solicitacao:a", registros.retencao["ERRO"] + registros.margem_arquivamento)
+
+
+@pytest.mark.asyncio
+async def test_atualizar_em_andamento_nao_arquiva():
+    registros, pipe = criar_registros([1, True, [b"1", b"TJAL", b"Em processamento"]])
+    registros.arquivar = True
+
+    await registros.atualizar("a", "Em processamento")
+
+    pipe.zadd.assert_not_called()
+    pipe.expire.assert_called_once_with("solicitacao:a", registros.retencao["EM_PROCESSAMENTO"])
+
+
+@pytest.mark.asyncio
+async def test_remover():
+    registros, pipe = criar_registros()
+
+    await registros.remover(["a", "b"])
+
+    pipe.delete.assert_called_once_with("solicitacao:a", "solicitacao:b")
+    pipe.zrem.assert_called_once_with(CHAVE_ARQUIVAMENTO, "a", "b")
+
+
+@pytest.mark.asyncio
+async def test_obter_many_sem_resultado():
+    """Testa se os metadados são convertidos e o resultado não é lido sem com_resultado."""
+    registros, pipe = criar_registros([
+        [b"1", b"TJAL", b"Na Fila", b"https://cliente.com/retorno", b"1", b"1691625600.0", None, None],
+    ])
+
+    solicitacao = await registros.obter("a")
+
+    assert pipe.hmget.call_args.args[1][-1] == "finalizado_em"
+    assert solicitacao == {**NA_FILA, "callback_url": "https://cliente.com/retorno", "monitorar": True,
+                           "criado_em": 1691625600.0}
+
+
+@pytest.mark.asyncio
+async def test_obter_many_formato_anterior():
+    """Testa se as solicitações gravadas no formato anterior continuam sendo lidas."""
+    registros, _ = criar_registros([[None] * 9, [None] * 9, [None] * 9])
+    registros.redis.get_many.return_value = [dumps(NA_FILA).encode(), dumps({"first_instance": {}}).encode(), None]
+
+    solicitacoes = await registros.obter_many(["a", "b", "c"], com_resultado=True)
+
+    registros.redis.get_many.assert_called_once_with(["a", "b", "c"])
+    assert solicitacoes == [NA_FILA, {"status": "Concluído", "resultado": {"first_instance": {}}}, None]
+
+
+@pytest.mark.asyncio
+async def test_obter_registro():
+    """Testa se o resultado gravado é devolvido sem ser decodificado e, sem resultado, o status codificado."""
+    registros, _ = criar_registros()
+    resultado = codificar({"first_instance": {"classe": "Penal"}})
+
+    registros.redis.redis_client.hmget.return_value = [b"1", b"TJAL", "Concluído".encode(), resultado]
+    assert await registros.obter_registro("a") is resultado
+
+    registros.redis.redis_client.hmget.return_value = [b"1", b"TJAL", b"Na Fila", None]
+    assert decodificar(await registros.obter_registro("a")) == NA_FILA
+
+
+@pytest.mark.asyncio
+async def test_obter_registro_inexistente():
+    registros, _ = criar_registros()
+    registros.redis.redis_client.hmget.return_value = [None] * 4
+
+    assert await registros.obter_registro("a") is None
+    registros.redis.get_data.assert_called_once_with("a")
+
+
+@pytest.mark.asyncio
+async def test_obter_registro_formato_anterior_sem_campos_internos():
+    """Testa se os campos internos das solicitações gravadas no formato anterior não são devolvidos ao cliente."""
+    registros, _ = criar_registros()
+    registros.redis.redis_client.hmget.return_value = [None] * 4
+
+    registros.redis.get_data.return_value = dumps({
+        **NA_FILA, "callback_url": "https://cliente.com/retorno", "monitorar": True
+    }).encode()
+    assert decodificar(await registros.obter_registro("a")) == NA_FILA
+
+    registros.redis.get_data.return_value = dumps({
+        "first_instance": {"classe": "Penal"}, "callback_url": "https://cliente.com/retorno"
+    }).encode()
+    assert decodificar(await registros.obter_registro("a")) == {"first_instance": {"classe": "Penal"}}
@@ -1,7 +1,8 @@
 import json
-from unittest.mock import patch, Mock
+from unittest.mock import patch, AsyncMock
 
 from fastapi.testclient import TestClient
+from database.codec import codificar
 from main import app
 
 client = TestClient(app)
@@ -12,6 +13,12 @@ def test_read_root():
     assert response.status_code == 200
 
 
+def test_metricas():
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert "jusbrasil_solicitacoes_encerradas" in response.text
+
+
 def test_handle_invalid_parameter_error():
     response = client.post("/consulta-processo", json={"numero_processo": "123", "sigla_tribunal": "TJAL"})
     assert response.status_code == 422  # Expected status code for InvalidParameterError
@@ -19,8 +26,34 @@ def test_handle_invalid_parameter_error():
                'message': "numero_processo '123' não é compatível com o padrão NNNNNNN-DD.AAAA.J.TR.OOOO"} == response.json()
 
 
-@patch("main.redis.get_data",
-       Mock(return_value='{"numero_processo": "12345", "sigla_tribunal": "TJSP", "status": "Na Fila"}'))
+@patch("main.registros.criar", AsyncMock())
+@patch("main.cache.get", AsyncMock(return_value=(False, None)))
+@patch("main.fila.enqueue", new_callable=AsyncMock)
+def test_consulta_processo(mock_enqueue):
+    response = client.post("/consulta-processo",
+                           json={"numero_processo": "0710802-55.2018.8.02.0001", "sigla_tribunal": "TJAL"})
+    assert response.status_code == 200
+    mock_enqueue.assert_called_once_with(response.json()["numero_solicitacao"])
+
+
+@patch("main.cache.get", AsyncMock(return_value=(True, None)))
+@patch("main.fila.enqueue", new_callable=AsyncMock)
+@patch("main.registros.criar", new_callable=AsyncMock)
+def test_consulta_processo_em_cache(mock_criar, mock_enqueue):
+    response = client.post("/consulta-processo",
+                           json={"numero_processo": "0710802-55.2018.8.02.0001", "sigla_tribunal": "TJAL"})
+    assert response.status_code == 200
+    mock_enqueue.assert_not_called()
+    mock_criar.assert_called_once_with({response.json()["numero_solicitacao"]: {
+        "numero_processo": "0710802-55.2018.8.02.0001",
+        "sigla_tribunal": "TJAL",
+        "status": "Encerrado - Nenhum dado capturado",
+        "resultado": None
+    }})
+
+
+@patch("main.registros.obter_registro",
+       AsyncMock(return_value=codificar({"numero_processo": "12345", "sigla_tribunal": "TJSP", "status": "Na Fila"})))
 def test_status_solicitacao():
     response = client.get("/status-solicitacao/d00bc000-0f0d-0d00-0cdf-000b00d00000")
     assert response.status_code == 200
@@ -31,8 +64,166 @@ def test_status_solicitacao():
     }
 
 
-@patch("main.redis.get_data", Mock(return_value=None))
+@patch("main.registros.obter_registro", AsyncMock(return_value=codificar({"first_instance": {"classe": "Penal"}})))
+def test_status_solicitacao_concluida():
+    response = client.get("/status-solicitacao/d00bc000-0f0d-0d00-0cdf-000b00d00000")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.content == b'{"first_instance":{"classe":"Penal"}}'
+
+
+@patch("main.registros.obter_registro", AsyncMock(return_value=None))
 def test_status_solicitacao_not_found():
     response = client.get("/status-solicitacao/d00bc000-0f0d-0d00-0cdf-000b00d00000")
     assert response.status_code == 404
     assert json.loads(response.content) == {"error": "Solicitação não encontrada"}
+
+
+@patch("main.registrar_lote", new_callable=AsyncMock)
+def test_consulta_processo_lote(mock_registrar_lote):
+    mock_registrar_lote.return_value = ["d00bc000-0f0d-0d00-0cdf-000b00d00000"]
+
+    response = client.post("/consulta-processo/lote", json=[
+        {"numero_processo": "0710802-55.2018.8.02.0001", "sigla_tribunal": "TJAL"},
+        {"numero_processo": "123", "sigla_tribunal": "TJAL"},
+    ])
+
+    assert response.status_code == 200
+    assert response.json()["solicitacoes"] == [{
+        "indice": 0,
+        "numero_processo": "0710802-55.2018.8.02.0001",
+        "sigla_tribunal": "TJAL",
+        "numero_solicitacao": "d00bc000-0f0d-0d00-0cdf-000b00d00000"
+    }]
+    assert [erro["indice"] for erro in response.json()["erros"]] == [1]
+
+
+@patch("main.registrar_lote", new_callable=AsyncMock)
+def test_consulta_processo_lote_numero_processo_nao_texto(mock_registrar_lote):
+    mock_registrar_lote.return_value = ["d00bc000-0f0d-0d00-0cdf-000b00d00000"]
+
+    response = client.post("/consulta-processo/lote", json=[
+        {"numero_processo": None, "sigla_tribunal": "TJAL"},
+        {"numero_processo": "0710802-55.2018.8.02.0001", "sigla_tribunal": "TJAL"},
+        {"numero_processo": 123, "sigla_tribunal": "TJAL"},
+    ])
+
+    assert response.status_code == 200
+    assert [solicitacao["indice"] for solicitacao in response.json()["solicitacoes"]] == [1]
+    assert [erro["indice"] for erro in response.json()["erros"]] == [0, 2]
+
+
+@patch("main.registrar_lote", new_callable=AsyncMock)
+def test_consulta_processo_lote_ndjson(mock_registrar_lote):
+    mock_registrar_lote.return_value = ["d00bc000-0f0d-0d00-0cdf-000b00d00000"]
+
+    response = client.post("/consulta-processo/lote",
+                           content=b'{"numero_processo": "0710802-55.2018.8.02.0001", "sigla_tribunal": "TJAL"}\n',
+                           headers={"content-type": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    assert len(response.json()["solicitacoes"]) == 1
+
+
+def test_consulta_processo_lote_invalido():
+    response = client.post("/consulta-processo/lote", content=b"invalido",
+                           headers={"content-type": "application/json"})
+
+    assert response.status_code == 422
+
+
+@patch("main.registros.obter_many", AsyncMock(return_value=[
+    {"numero_processo": "12345", "sigla_tribunal": "TJAL", "status": "Na Fila", "criado_em": 1691625600.0}, None
+]))
+def test_status_solicitacao_lote():
+    response = client.post("/status-solicitacao/lote", json={
+        "numeros_solicitacao": ["d00bc000-0f0d-0d00-0cdf-000b00d00000", "550e8400-e29b-41d4-a716-446655440000"]
+    })
+    assert response.status_code == 200
+    assert response.json() == {
+        "solicitacoes": [{
+            "numero_solicitacao": "d00bc000-0f0d-0d00-0cdf-000b00d00000",
+            "numero_processo": "12345",
+            "sigla_tribunal": "TJAL",
+            "status": "Na Fila"
+        }],
+        "nao_encontradas": ["550e8400-e29b-41d4-a716-446655440000"]
+    }
+
+
+def test_status_solicitacao_lote_invalido():
+    response = client.post("/status-solicitacao/lote", json={"numeros_solicitacao": ["123"]})
+    assert response.status_code == 422
+
+
+@patch("main.cache.get", AsyncMock(return_value=(True, None)))
+@patch("main.fila.enqueue", new_callable=AsyncMock)
+@patch("main.registros.criar", new_callable=AsyncMock)
+def test_consulta_processo_com_callback(mock_criar, mock_enqueue):
+    response = client.post("/consulta-processo", json={
+        "numero_processo": "0710802-55.2018.8.02.0001", "sigla_tribunal": "TJAL",
+        "callback_url": "https://cliente.com/retorno"
+    })
+    assert response.status_code == 200
+    # Com callback a solicitação passa pela fila mesmo com o processo em cache
+    mock_enqueue.assert_called_once_with(response.json()["numero_solicitacao"])
+    registro, = mock_criar.call_args.args[0].values()
+    assert registro["callback_url"] == "https://cliente.com/retorno"
+
+
+@patch("main.registros.obter", AsyncMock(return_value=None))
+def test_status_solicitacao_eventos_not_found():
+    response = client.get("/status-solicitacao/d00bc000-0f0d-0d00-0cdf-000b00d00000/eventos")
+    assert response.status_code == 404
+
+
+@patch("main.monitoramento.alteracoes_desde", new_callable=AsyncMock)
+def test_alteracoes_processo(mock_alteracoes_desde):
+    mock_alteracoes_desde.return_value = [{
+        "instancia": "first_instance",
+        "capturado_em": "2023-08-10T12:00:00+00:00",
+        "movimentacoes": [{"Data": "10/08/2023", "Movimento": {"titulo_movimentacao": "Ato Emitido"}}]
+    }]
+
+    response = client.get("/processos/TJAL/0710802-55.2018.8.02.0001/alteracoes",
+                          params={"desde": "2023-08-10T00:00:00"})
+
+    assert response.status_code == 200
+    assert response.json()["alteracoes"] == mock_alteracoes_desde.return_value
+    assert mock_alteracoes_desde.call_args.args[2].isoformat() == "2023-08-10T00:00:00"
+
+
+def test_alteracoes_processo_numero_invalido():
+    response = client.get("/processos/TJAL/123/alteracoes")
+    assert response.status_code == 422
+
+
+@patch("main.agenda.agendar", new_callable=AsyncMock)
+def test_monitoramento_agendar(mock_agendar):
+    response = client.post("/monitoramento", json=[
+        {"numero_processo": "0710802-55.2018.8.02.0001", "sigla_tribunal": "TJAL", "prioridade": 2}
+    ])
+
+    assert response.status_code == 200
+    assert response.json() == {"agendados": 1}
+    assert mock_agendar.call_args.args[0] == [{
+        "sigla_tribunal": "TJAL", "numero_processo": "0710802-55.2018.8.02.0001", "intervalo_segundos": 86400,
+        "prioridade": 2, "callback_url": None
+    }]
+
+
+@patch("main.agenda.obter", AsyncMock(return_value={
+    "numero_processo": "0710802-55.2018.8.02.0001", "sigla_tribunal": "TJAL", "intervalo_segundos": 86400,
+    "prioridade": 0, "callback_url": None, "proxima_captura": 0
+}))
+def test_monitoramento_consultar():
+    response = client.get("/monitoramento/TJAL/0710802-55.2018.8.02.0001")
+
+    assert response.status_code == 200
+    assert response.json()["proxima_captura"] == "1970-01-01T00:00:00+00:00"
+
+
+@patch("main.agenda.remover", AsyncMock(return_value=False))
+def test_monitoramento_remover_not_found():
+    response = client.delete("/monitoramento/TJAL/0710802-55.2018.8.02.0001")
+    assert response.status_code == 404
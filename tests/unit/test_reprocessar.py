@@ -0,0 +1,64 @@
+from json import loads
+from pathlib import Path
+
+from crawler.default.snapshot import ArmazemSnapshots
+from reprocessar import Reprocessador, main, reextrair
+
+FIXTURES = Path(__file__).parent / "crawler" / "default" / "fixtures"
+
+
+def gravar_fixtures(diretorio):
+    """Grava as páginas das fixtures como capturas de três processos, dois com a mesma página."""
+    armazem = ArmazemSnapshots(diretorio)
+    primeira = (FIXTURES / "primeira_instancia.html").read_text(encoding="utf-8")
+    segunda = (FIXTURES / "segunda_instancia.html").read_text(encoding="utf-8")
+    armazem.gravar("<html></html>", "TJAL", "primeira", "1")
+    armazem.gravar(primeira, "TJAL", "primeira", "1")
+    armazem.gravar(primeira, "TJAL", "primeira", "2")
+    armazem.gravar(segunda, "TJCE", "segunda", "3")
+    return armazem
+
+
+def test_selecionar_usa_a_captura_mais_recente(tmp_path):
+    reprocessador = Reprocessador(gravar_fixtures(tmp_path), workers=1)
+
+    capturas = reprocessador.selecionar()
+    assert [captura["numero_processo"] for captura in capturas] == ["1", "2", "3"]
+    assert capturas[0]["hash"] == capturas[1]["hash"]
+    assert [captura["numero_processo"] for captura in reprocessador.selecionar(siglas=["TJCE"])] == ["3"]
+    assert reprocessador.selecionar(instancias=["segunda"]) == reprocessador.selecionar(siglas=["TJCE"])
+
+
+def test_reextrair(tmp_path):
+    armazem = gravar_fixtures(tmp_path)
+    captura = Reprocessador(armazem).selecionar(siglas=["TJCE"])[0]
+
+    dados, erro = reextrair(str(tmp_path), (captura["hash"], "segunda"))
+    assert erro is None
+    assert len(dados["lista_movimentacoes"]) == 2
+
+    dados, erro = reextrair(str(tmp_path), ("0" * 64, "primeira"))
+    assert dados is None
+    assert "FileNotFoundError" in erro
+
+
+def test_executar_extrai_cada_pagina_uma_vez(tmp_path):
+    armazem = gravar_fixtures(tmp_path / "snapshots")
+    saida = tmp_path / "saida.jsonl"
+
+    resumo = Reprocessador(armazem, workers=2).executar(saida)
+
+    assert resumo == {"capturas": 3, "paginas": 2, "erros": 0}
+    linhas = [loads(linha) for linha in saida.read_text(encoding="utf-8").splitlines()]
+    assert [linha["numero_processo"] for linha in linhas] == ["1", "2", "3"]
+    assert linhas[0]["dados"] == linhas[1]["dados"]
+    assert linhas[0]["dados"]["classe"]
+    assert len(linhas[0]["dados"]["lista_movimentacoes"]) == 4
+
+
+def test_main_sem_diretorio(monkeypatch, capsys):
+    monkeypatch.setattr("reprocessar.configurar_log", lambda **_: None)
+    monkeypatch.setattr("reprocessar.ArmazemSnapshots", lambda diretorio: ArmazemSnapshots(""))
+
+    assert main([]) == 1
+    assert "SNAPSHOT_DIRETORIO" in capsys.readouterr().err
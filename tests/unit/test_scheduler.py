@@ -0,0 +1,71 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from scheduler import Scheduler
+
+PROCESSO = {
+    "numero_processo": "0710802-55.2018.8.02.0001",
+    "sigla_tribunal": "TJAL",
+    "intervalo_segundos": 3600,
+    "prioridade": 0,
+    "callback_url": "https://cliente.com/retorno"
+}
+
+
+def criar_scheduler(orcamento_diario=86400):
+    """Cria um Scheduler com a agenda e a fila simuladas e o orçamento informado para todos os tribunais."""
+    scheduler = Scheduler(agenda=AsyncMock(), fila=AsyncMock(), intervalo=10)
+    scheduler.redis = AsyncMock()
+    scheduler.orcamento_diario = lambda sigla_tribunal: orcamento_diario
+    return scheduler
+
+
+@pytest.mark.asyncio
+async def test_executar_ciclo_envia_vencidos():
+    scheduler = criar_scheduler()
+    scheduler.agenda.vencidos.side_effect = lambda sigla, quantidade, agora: [PROCESSO] if sigla == "TJAL" else []
+
+    with patch("scheduler.registrar_lote", new_callable=AsyncMock) as mock_registrar_lote:
+        assert await scheduler.executar_ciclo(agora=1000) == {"TJAL": 1}
+
+    processos = mock_registrar_lote.call_args.args[3]
+    assert processos[0].numero_processo == PROCESSO["numero_processo"]
+    assert processos[0].callback_url == PROCESSO["callback_url"]
+    assert processos[0].monitorar
+    scheduler.agenda.reagendar.assert_called_once_with([PROCESSO], 1000)
+
+
+def test_quantidade_ciclo_distribui_orcamento():
+    # 8640 capturas por dia em ciclos de 10 segundos: uma captura por ciclo
+    scheduler = criar_scheduler(orcamento_diario=8640)
+    assert scheduler._quantidade_ciclo("TJAL") == 1
+
+    # 864 capturas por dia: uma captura a cada 10 ciclos
+    scheduler = criar_scheduler(orcamento_diario=864)
+    quantidades = [scheduler._quantidade_ciclo("TJAL") for _ in range(10)]
+    assert quantidades[:9] == [0] * 9
+    assert quantidades[9] == 1
+
+
+def test_quantidade_ciclo_nao_acumula_rajada():
+    scheduler = criar_scheduler(orcamento_diario=86400)
+
+    # Sem processos vencidos o saldo não é consumido, mas não passa de um ciclo
+    for _ in range(100):
+        quantidade = scheduler._quantidade_ciclo("TJAL")
+
+    assert quantidade == 10
+
+
+@pytest.mark.asyncio
+async def test_liderar():
+    scheduler = criar_scheduler()
+    scheduler.redis.set_data.return_value = None
+    scheduler.redis.expire_if_value.return_value = False
+
+    assert not await scheduler._liderar()
+
+    # A renovação só ocorre se o lock ainda for deste scheduler, verificado no Redis de forma atômica
+    scheduler.redis.expire_if_value.return_value = True
+    assert await scheduler._liderar()
+    scheduler.redis.expire_if_value.assert_called_with("agenda:lider", scheduler.nome, int(scheduler.intervalo * 3) + 1)
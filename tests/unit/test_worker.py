@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from prometheus_client import REGISTRY
+
+from worker import Worker
+
+
+def criar_worker():
+    """Cria um Worker com a fila simulada."""
+    fila = AsyncMock()
+    fila.visibility_timeout = 300
+    fila.max_entregas = 3
+    return Worker(fila=fila, concorrencia=1)
+
+
+@pytest.mark.asyncio
+async def test_processar_confirma_mensagem():
+    worker = criar_worker()
+
+    with patch("worker.process_request", AsyncMock()) as mock_process_request:
+        await worker._processar("consumidor", "1-0", "id_solicitacao")
+
+    mock_process_request.assert_called_once_with("id_solicitacao")
+    worker.fila.ack.assert_called_once_with("1-0")
+
+
+@pytest.mark.asyncio
+async def test_processar_erro_nao_confirma_mensagem():
+    worker = criar_worker()
+
+    antes = REGISTRY.get_sample_value("jusbrasil_falhas_processamento_total", {"erro": "Exception"}) or 0
+
+    with patch("worker.process_request", AsyncMock(side_effect=Exception("Erro"))):
+        await worker._processar("consumidor", "1-0", "id_solicitacao")
+
+    worker.fila.ack.assert_not_called()
+    assert REGISTRY.get_sample_value("jusbrasil_falhas_processamento_total", {"erro": "Exception"}) == antes + 1
+
+
+@pytest.mark.asyncio
+async def test_processar_espera_fila_apenas_na_primeira_entrega():
+    worker = criar_worker()
+
+    with patch("worker.process_request", AsyncMock()), \
+            patch("worker.registrar_espera_fila") as mock_registrar_espera_fila:
+        await worker._processar("consumidor", "1-0", "id_reentregue", 2)
+        mock_registrar_espera_fila.assert_not_called()
+
+        await worker._processar("consumidor", "2-0", "id_solicitacao")
+        mock_registrar_espera_fila.assert_called_once_with("2-0")
+
+
+@pytest.mark.asyncio
+async def test_consumir_ate_parar():
+    worker = criar_worker()
+
+    async def processar(consumidor, mensagem_id, solicitacao_id):
+        worker.parar()
+
+    worker.fila.consume.return_value = [("1-0", "id_solicitacao")]
+
+    with patch.object(worker, "_processar", AsyncMock(side_effect=processar)) as mock_processar:
+        await worker._consumir("consumidor")
+
+    mock_processar.assert_called_once_with("consumidor", "1-0", "id_solicitacao")
+
+
+@pytest.mark.asyncio
+async def test_recuperar_pendentes_descarta_apos_max_entregas():
+    worker = criar_worker()
+    worker.fila.reclaim.side_effect = lambda consumidor: worker.parar() or [
+        ("1-0", "id_esgotado", 4), ("2-0", "id_reentregue", 2)
+    ]
+
+    with patch.object(worker, "_processar", AsyncMock()) as mock_processar, \
+            patch.object(worker, "_marcar_erro", AsyncMock()) as mock_marcar_erro:
+        await worker._recuperar_pendentes("recuperador")
+
+    mock_marcar_erro.assert_called_once_with("id_esgotado")
+    worker.fila.ack.assert_called_once_with("1-0")
+    mock_processar.assert_called_once_with("recuperador", "2-0", "id_reentregue", 2)
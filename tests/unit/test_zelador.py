@@ -0,0 +1,42 @@
+from gzip import open as gzip_open
+from json import loads
+
+import pytest
+from unittest.mock import AsyncMock
+
+from zelador import Zelador
+
+CONCLUIDA = {"numero_processo": "1", "sigla_tribunal": "TJAL", "status": "Concluído",
+             "resultado": {"first_instance": {"classe": "Penal"}}}
+
+
+@pytest.mark.asyncio
+async def test_executar_ciclo_arquiva_e_remove(tmp_path):
+    registros = AsyncMock()
+    # Dois lotes: o primeiro completo e o segundo com uma solicitação já expirada no Redis
+    registros.vencidas.side_effect = [["a", "b"], ["c", "d"], []]
+    registros.obter_many.side_effect = [[CONCLUIDA, CONCLUIDA], [CONCLUIDA, None]]
+    zelador = Zelador(registros=registros, diretorio=tmp_path, quantidade=2)
+
+    assert await zelador.executar_ciclo(agora=1691625600) == 3
+
+    registros.obter_many.assert_called_with(["c", "d"], com_resultado=True)
+    registros.remover.assert_called_with(["c", "d"])
+
+    arquivo, = tmp_path.iterdir()
+    assert arquivo.name == "solicitacoes-20230810-00.jsonl.gz"
+    with gzip_open(arquivo, "rt", encoding="utf-8") as linhas:
+        arquivadas = [loads(linha) for linha in linhas]
+    assert [solicitacao["numero_solicitacao"] for solicitacao in arquivadas] == ["a", "b", "c"]
+    assert arquivadas[0]["resultado"] == CONCLUIDA["resultado"]
+
+
+@pytest.mark.asyncio
+async def test_executar_ciclo_sem_vencidas(tmp_path):
+    registros = AsyncMock()
+    registros.vencidas.return_value = []
+    zelador = Zelador(registros=registros, diretorio=tmp_path)
+
+    assert await zelador.executar_ciclo() == 0
+    registros.remover.assert_not_called()
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,190 @@
+from logging import getLogger
+from os import getpid
+from signal import SIGINT, SIGTERM
+from socket import gethostname
+import asyncio
+
+from decouple import config
+
+from api.services.log import configurar_log, contexto_solicitacao
+from api.services.metricas import FALHAS_PROCESSAMENTO, expor_metricas, registrar_espera_fila
+from api.services.notificacao import aguardar_callbacks, finalizar_solicitacao, http_client_callbacks
+from api.services.process_handler import process_request
+from crawler.default.executor import extracao_executor
+from crawler.default.http_client import http_client
+from crawler.registry import tribunais
+from database.queue import RedisQueue
+from database.service import AsyncRedisConnection
+from database.solicitacao import RegistroSolicitacao
+
+logger = getLogger(__name__)
+
+
+class Worker:
+    """
+    Classe Worker consome a fila de solicitações e executa process_request para cada uma delas.
+
+    Roda em um processo separado da API, podendo ser escalada horizontalmente. Cada consumidor só
+    confirma a mensagem após o processamento; mensagens de workers que morreram são recuperadas
+    depois do visibility timeout.
+
+    :ivar fila: Fila de solicitações.
+    :ivar concorrencia: Número de solicitações processadas simultaneamente pelo worker.
+    :ivar nome: Prefixo dos nomes dos consumidores deste worker no consumer group.
+    """
+
+    def __init__(self, fila=None, concorrencia=None):
+        """
+        Inicializa o worker.
+
+        :param fila: Fila de solicitações. Cria uma RedisQueue se não informada.
+        :param concorrencia: Número de consumidores simultâneos. Usa WORKER_CONCORRENCIA se não informado.
+        """
+        self.fila = fila or RedisQueue()
+        self.concorrencia = concorrencia or config("WORKER_CONCORRENCIA", default=10, cast=int)
+        self.nome = f"{gethostname()}-{getpid()}"
+        self._parar = asyncio.Event()
+
+    def parar(self):
+        """Sinaliza aos consumidores que devem encerrar após a solicitação em andamento."""
+        logger.info("Encerrando worker")
+        self._parar.set()
+
+    async def run(self):
+        """Inicia os consumidores e o recuperador de mensagens pendentes e aguarda até que terminem."""
+        await self.fila.criar_grupo()
+        await http_client.start()
+        extracao_executor.start()
+        tribunais.iniciar()
+        expor_metricas(config("METRICAS_PORTA_WORKER", default=9100, cast=int))
+        logger.info(f"Worker {self.nome} iniciado com {self.concorrencia} consumidores")
+        try:
+            await asyncio.gather(
+                *(self._consumir(f"{self.nome}-{indice}") for indice in range(self.concorrencia)),
+                self._recuperar_pendentes(f"{self.nome}-recuperador")
+            )
+        finally:
+            # Os callbacks usam a sessão HTTP própria, encerrada em seguida
+            await aguardar_callbacks(config("CALLBACK_TIMEOUT_ENCERRAMENTO", default=30, cast=float))
+            await http_client_callbacks.close()
+            await http_client.close()
+            extracao_executor.close()
+            await AsyncRedisConnection.close()
+
+    async def _consumir(self, consumidor):
+        """
+        Laço de um consumidor: lê uma mensagem por vez da fila e a processa.
+
+        :param consumidor: Nome do consumidor no consumer group.
+        """
+        while not self._parar.is_set():
+            try:
+                mensagens = await self.fila.consume(consumidor, quantidade=1, bloqueio_ms=1000)
+            except Exception as e:
+                logger.error(f"Erro ao ler a fila no consumidor {consumidor}: {e}")
+                await asyncio.sleep(1)
+                continue
+
+            for mensagem_id, solicitacao_id in mensagens:
+                await self._processar(consumidor, mensagem_id, solicitacao_id)
+
+    async def _recuperar_pendentes(self, consumidor):
+        """
+        Laço que assume mensagens cujo visibility timeout expirou e as processa novamente. Mensagens que
+        excederam o número máximo de entregas são descartadas e a solicitação é marcada com erro.
+
+        :param consumidor: Nome do consumidor no consumer group.
+        """
+        intervalo = max(self.fila.visibility_timeout / 2, 1)
+        while not self._parar.is_set():
+            try:
+                recuperadas = await self.fila.reclaim(consumidor)
+            except Exception as e:
+                logger.error(f"Erro ao recuperar mensagens pendentes: {e}")
+                recuperadas = []
+
+            for mensagem_id, solicitacao_id, entregas in recuperadas:
+                if entregas > self.fila.max_entregas:
+                    logger.error(f"Solicitação {solicitacao_id} descartada após {entregas - 1} tentativas")
+                    await self._marcar_erro(solicitacao_id)
+                    await self.fila.ack(mensagem_id)
+                    continue
+                logger.info(f"Reprocessando solicitação {solicitacao_id} (entrega {entregas})")
+                await self._processar(consumidor, mensagem_id, solicitacao_id, entregas)
+
+            try:
+                await asyncio.wait_for(self._parar.wait(), timeout=intervalo)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _processar(self, consumidor, mensagem_id, solicitacao_id, entregas=1):
+        """
+        Processa uma solicitação, renovando a posse da mensagem enquanto isso, e confirma a mensagem ao final.
+        Em caso de erro a mensagem não é confirmada e será reentregue após o visibility timeout.
+
+        :param consumidor: Nome do consumidor no consumer group.
+        :param mensagem_id: ID da mensagem no stream.
+        :param solicitacao_id: ID da solicitação a ser processada.
+        :param entregas: Número de entregas da mensagem, incluindo a atual.
+        """
+        # O ID da mensagem guarda o momento do enfileiramento; nas reentregas a espera incluiria as tentativas
+        # anteriores e o visibility timeout, por isso apenas a primeira entrega é medida
+        if entregas == 1:
+            registrar_espera_fila(mensagem_id)
+        heartbeat = asyncio.create_task(self._heartbeat(consumidor, mensagem_id))
+        try:
+            # Os registros de log emitidos durante o processamento levam o ID da solicitação
+            with contexto_solicitacao(solicitacao_id):
+                await process_request(solicitacao_id)
+        except Exception as e:
+            logger.error(f"Erro ao processar a solicitação {solicitacao_id}: {e}")
+            FALHAS_PROCESSAMENTO.labels(erro=type(e).__name__).inc()
+            return
+        finally:
+            heartbeat.cancel()
+
+        await self.fila.ack(mensagem_id)
+
+    async def _heartbeat(self, consumidor, mensagem_id):
+        """
+        Renova periodicamente a posse da mensagem enquanto ela estiver em processamento.
+
+        :param consumidor: Nome do consumidor no consumer group.
+        :param mensagem_id: ID da mensagem no stream.
+        """
+        intervalo = max(self.fila.visibility_timeout / 3, 1)
+        while True:
+            await asyncio.sleep(intervalo)
+            try:
+                await self.fila.heartbeat(consumidor, mensagem_id)
+            except Exception as e:
+                logger.error(f"Erro ao renovar a mensagem {mensagem_id}: {e}")
+
+    @staticmethod
+    async def _marcar_erro(solicitacao_id):
+        """
+        Marca uma solicitação como erro após exceder o número máximo de tentativas.
+
+        :param solicitacao_id: ID da solicitação.
+        """
+        registros = RegistroSolicitacao()
+        solicitacao = await registros.obter(solicitacao_id)
+        if solicitacao is None:
+            return
+        await finalizar_solicitacao(registros, solicitacao_id, "Erro - número máximo de tentativas excedido",
+                                    callback_url=solicitacao.get("callback_url"),
+                                    sigla_tribunal=solicitacao.get("sigla_tribunal"))
+
+
+async def main():
+    """Executa o worker até receber SIGINT ou SIGTERM."""
+    configurar_log()
+    worker = Worker()
+    loop = asyncio.get_running_loop()
+    for sinal in (SIGINT, SIGTERM):
+        loop.add_signal_handler(sinal, worker.parar)
+    await worker.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
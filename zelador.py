@@ -0,0 +1,131 @@
+from datetime import datetime, timezone
+from gzip import open as gzip_open
+from json import dumps
+from logging import getLogger
+from pathlib import Path
+from signal import SIGINT, SIGTERM
+from time import time
+import asyncio
+
+from decouple import config
+
+from api.services.log import configurar_log
+from database.service import AsyncRedisConnection
+from database.solicitacao import RegistroSolicitacao
+
+logger = getLogger(__name__)
+
+
+class Zelador:
+    """
+    Classe Zelador arquiva em disco as solicitações encerradas cuja retenção no Redis venceu.
+
+    Os registros são gravados, com o resultado, em arquivos JSON Lines comprimidos com gzip, um por hora
+    (solicitacoes-AAAAMMDD-HH.jsonl.gz), e removidos do Redis em seguida. Se o zelador não estiver em execução,
+    os registros expiram no Redis ao fim da margem de arquivamento, sem serem arquivados.
+
+    :ivar registros: RegistroSolicitacao com os registros das solicitações.
+    :ivar diretorio: Diretório dos arquivos.
+    :ivar intervalo: Tempo, em segundos, entre dois ciclos.
+    :ivar quantidade: Número máximo de solicitações lidas do Redis por vez.
+    """
+
+    def __init__(self, registros=None, diretorio=None, intervalo=None, quantidade=None):
+        """
+        Inicializa o zelador.
+
+        :param registros: RegistroSolicitacao. Cria um se não informado.
+        :param diretorio: Diretório dos arquivos. Usa ARQUIVO_DIRETORIO se não informado.
+        :param intervalo: Tempo, em segundos, entre dois ciclos. Usa ZELADOR_INTERVALO se não informado.
+        :param quantidade: Solicitações lidas por vez. Usa ZELADOR_QUANTIDADE se não informada.
+        """
+        self.registros = registros or RegistroSolicitacao()
+        self.diretorio = Path(diretorio or config("ARQUIVO_DIRETORIO", default="arquivo"))
+        self.intervalo = intervalo or config("ZELADOR_INTERVALO", default=60, cast=float)
+        self.quantidade = quantidade or config("ZELADOR_QUANTIDADE", default=500, cast=int)
+        self._parar = asyncio.Event()
+
+    def parar(self):
+        """Sinaliza ao zelador que deve encerrar após o ciclo em andamento."""
+        logger.info("Encerrando zelador")
+        self._parar.set()
+
+    async def run(self):
+        """Executa os ciclos do zelador até ser encerrado."""
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Zelador iniciado, arquivando em {self.diretorio}")
+        try:
+            while not self._parar.is_set():
+                try:
+                    await self.executar_ciclo()
+                except Exception as e:
+                    logger.error(f"Erro no ciclo do zelador: {e!r}")
+
+                try:
+                    await asyncio.wait_for(self._parar.wait(), timeout=self.intervalo)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await AsyncRedisConnection.close()
+
+    async def executar_ciclo(self, agora=None):
+        """
+        Arquiva e remove do Redis todas as solicitações com a retenção vencida.
+
+        :param agora: Timestamp atual (usado nos testes). Usa o horário do sistema se não informado.
+        :return: Número de solicitações arquivadas.
+        """
+        agora = agora or time()
+        arquivadas = 0
+        while not self._parar.is_set():
+            solicitacoes_ids = await self.registros.vencidas(self.quantidade, agora)
+            if not solicitacoes_ids:
+                break
+
+            solicitacoes = await self.registros.obter_many(solicitacoes_ids, com_resultado=True)
+            linhas = [
+                {"numero_solicitacao": solicitacao_id, **solicitacao}
+                for solicitacao_id, solicitacao in zip(solicitacoes_ids, solicitacoes)
+                if solicitacao is not None
+            ]
+            if linhas:
+                # A gravação e a compressão não bloqueiam o event loop
+                await asyncio.to_thread(self._gravar, linhas, agora)
+            # O registro só é removido depois de gravado em disco
+            await self.registros.remover(solicitacoes_ids)
+
+            arquivadas += len(linhas)
+            if len(solicitacoes_ids) < self.quantidade:
+                break
+
+        if arquivadas:
+            logger.info(f"{arquivadas} solicitações arquivadas em {self.diretorio}")
+        return arquivadas
+
+    def _gravar(self, linhas, agora):
+        """
+        Acrescenta as solicitações ao arquivo da hora atual.
+
+        :param linhas: Lista de dicionários das solicitações.
+        :param agora: Timestamp atual, que define o arquivo.
+        :return: Caminho do arquivo.
+        """
+        caminho = self.diretorio / f"solicitacoes-{datetime.fromtimestamp(agora, timezone.utc):%Y%m%d-%H}.jsonl.gz"
+        # Cada gravação acrescenta um novo membro gzip ao arquivo, lido como um único fluxo pelo gzip/zcat
+        with gzip_open(caminho, "at", encoding="utf-8") as arquivo:
+            arquivo.writelines(dumps(linha, ensure_ascii=False) + "\n" for linha in linhas)
+        return caminho
+
+
+async def main():
+    """Executa o zelador até receber SIGINT ou SIGTERM."""
+    configurar_log()
+    zelador = Zelador()
+    loop = asyncio.get_running_loop()
+    for sinal in (SIGINT, SIGTERM):
+        loop.add_signal_handler(sinal, zelador.parar)
+    await zelador.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())